@@ -84,6 +84,11 @@ export interface CrawlProgressData {
   activeWorkers?: number;
   chunksInBatch?: number;
   totalChunksInBatch?: number;
+  // Delta protocol: a snapshot (isDelta false) carries every field and the retained logs,
+  // later messages only the changed fields plus the log lines added since the last one
+  seq?: number;
+  isDelta?: boolean;
+  newLogs?: string[];
 }
 
 export interface ProgressStep {
@@ -100,12 +105,64 @@ interface StreamProgressOptions {
 
 type ProgressCallback = (data: any) => void;
 
+// Matches the number of log lines the server keeps per progress ID
+const MAX_PROGRESS_LOGS = 200;
+
 class CrawlProgressService {
   private wsService: WebSocketService = knowledgeSocketIO;
   private activeSubscriptions: Map<string, () => void> = new Map();
   private messageHandlers: Map<string, ProgressCallback> = new Map();
+  private progressStates: Map<string, CrawlProgressData> = new Map();
+  private pendingSnapshots: Set<string> = new Set();
   private isConnected: boolean = false;
 
+  /**
+   * Fold a progress message into the accumulated state for its progress ID.
+   *
+   * Returns the full state to hand to callbacks, or null when a delta arrives before any
+   * snapshot to apply it to.
+   */
+  private applyProgressMessage(progressId: string, data: CrawlProgressData): CrawlProgressData | null {
+    const { isDelta, newLogs, ...fields } = data;
+    const previous = this.progressStates.get(progressId);
+    let state: CrawlProgressData;
+
+    if (!isDelta) {
+      this.pendingSnapshots.delete(progressId);
+      state = fields;
+    } else if (!previous) {
+      this.requestSnapshot(progressId);
+      return null;
+    } else {
+      if (typeof data.seq === 'number' && typeof previous.seq === 'number' && data.seq !== previous.seq + 1) {
+        // Missed an update - apply this one anyway and ask for a fresh snapshot
+        this.requestSnapshot(progressId);
+      }
+      state = {
+        ...previous,
+        ...fields,
+        logs: [...(previous.logs || []), ...(newLogs || [])].slice(-MAX_PROGRESS_LOGS)
+      };
+    }
+
+    this.progressStates.set(progressId, state);
+    return state;
+  }
+
+  /**
+   * Re-subscribe to a progress ID; the server answers with a full snapshot
+   */
+  private requestSnapshot(progressId: string): void {
+    if (this.pendingSnapshots.has(progressId)) {
+      return;
+    }
+    this.pendingSnapshots.add(progressId);
+    this.wsService.send({
+      type: 'crawl_subscribe',
+      data: { progress_id: progressId }
+    });
+  }
+
   /**
    * Stream crawl progress with Socket.IO
    */
@@ -165,7 +222,10 @@ class CrawlProgressService {
         // Only process messages for this specific progressId
         if (data.progressId === progressId) {
           console.log(`✅ [${progressId}] Progress match! Processing message`);
-          onMessage(data);
+          const state = this.applyProgressMessage(progressId, data);
+          if (state) {
+            onMessage(state);
+          }
         } else {
           console.log(`❌ [${progressId}] Progress ID mismatch: got ${data.progressId}`);
         }
@@ -295,6 +355,8 @@ class CrawlProgressService {
       this.wsService.removeMessageHandler('progress_update', handler);
       this.messageHandlers.delete(progressId);
     }
+    this.progressStates.delete(progressId);
+    this.pendingSnapshots.delete(progressId);
     
     // Remove from active subscriptions
     this.activeSubscriptions.delete(progressId);
@@ -313,6 +375,8 @@ class CrawlProgressService {
     
     // Clear all handlers
     this.messageHandlers.clear();
+    this.progressStates.clear();
+    this.pendingSnapshots.clear();
     
     // Note: We don't disconnect the shared Socket.IO connection
     // as it may be used by other services
@@ -44,6 +44,15 @@ BEGIN
     -- Code examples policies
     DROP POLICY IF EXISTS "Allow public read access to archon_code_examples" ON archon_code_examples;
     
+    -- Embedding cache policies
+    DROP POLICY IF EXISTS "Allow service role full access to archon_embedding_cache" ON archon_embedding_cache;
+    
+    -- Code summary cache policies
+    DROP POLICY IF EXISTS "Allow service role full access to archon_code_summary_cache" ON archon_code_summary_cache;
+    
+    -- Chunk context cache policies
+    DROP POLICY IF EXISTS "Allow service role full access to archon_chunk_context_cache" ON archon_chunk_context_cache;
+    
     -- Projects policies
     DROP POLICY IF EXISTS "Allow service role full access to archon_projects" ON archon_projects;
     DROP POLICY IF EXISTS "Allow authenticated users to read and update archon_projects" ON archon_projects;
@@ -132,6 +141,12 @@ BEGIN
     -- Search functions (new with archon_ prefix)
     DROP FUNCTION IF EXISTS match_archon_crawled_pages(vector, int, jsonb, text) CASCADE;
     DROP FUNCTION IF EXISTS match_archon_code_examples(vector, int, jsonb, text) CASCADE;
+    DROP FUNCTION IF EXISTS match_archon_crawled_pages(vector, int, jsonb, text, int, int) CASCADE;
+    DROP FUNCTION IF EXISTS match_archon_code_examples(vector, int, jsonb, text, int, int) CASCADE;
+    DROP FUNCTION IF EXISTS rebuild_archon_vector_indexes(text, int, int, int, int) CASCADE;
+    DROP FUNCTION IF EXISTS match_archon_crawled_pages_keyword(text[], int, jsonb, text) CASCADE;
+    DROP FUNCTION IF EXISTS match_archon_code_examples_keyword(text[], int, jsonb, text) CASCADE;
+    DROP FUNCTION IF EXISTS build_archon_keyword_tsquery(text[]) CASCADE;
     
     -- Search functions (old without prefix)
     DROP FUNCTION IF EXISTS match_crawled_pages(vector, int, jsonb, text) CASCADE;
@@ -139,6 +154,10 @@ BEGIN
     
     -- Task management functions
     DROP FUNCTION IF EXISTS archive_task(UUID, TEXT) CASCADE;
+    DROP FUNCTION IF EXISTS upsert_archon_project_document(UUID, JSONB) CASCADE;
+    DROP FUNCTION IF EXISTS update_archon_project_document(UUID, TEXT, JSONB) CASCADE;
+    DROP FUNCTION IF EXISTS delete_archon_project_document(UUID, TEXT) CASCADE;
+    DROP FUNCTION IF EXISTS create_archon_document_version(UUID, TEXT, JSONB, TEXT, INTEGER, TEXT, TEXT, TEXT, TEXT) CASCADE;
     
     RAISE NOTICE 'Functions dropped successfully.';
     
@@ -166,6 +185,10 @@ BEGIN
     -- Knowledge Base System - new archon_ prefixed tables
     DROP TABLE IF EXISTS archon_code_examples CASCADE;
     DROP TABLE IF EXISTS archon_crawled_pages CASCADE;
+    DROP TABLE IF EXISTS archon_page_fingerprints CASCADE;
+    DROP TABLE IF EXISTS archon_embedding_cache CASCADE;
+    DROP TABLE IF EXISTS archon_code_summary_cache CASCADE;
+    DROP TABLE IF EXISTS archon_chunk_context_cache CASCADE;
     DROP TABLE IF EXISTS archon_sources CASCADE;
     
     -- Configuration System - new archon_ prefixed table
@@ -125,6 +125,7 @@ INSERT INTO archon_settings (key, value, is_encrypted, category, description) VA
 
 -- Processing Settings
 ('CODE_EXTRACTION_MAX_WORKERS', '3', false, 'code_extraction', 'Number of parallel workers for generating code summaries'),
+('CODE_EXTRACTION_WORKERS', '0', false, 'code_extraction', 'Processes used to extract and validate code blocks from crawled pages (0 = one per spare CPU core, up to 8)'),
 ('ENABLE_CODE_SUMMARIES', 'true', false, 'code_extraction', 'Generate AI-powered summaries and names for extracted code examples')
 
 -- Only insert if they don't already exist
@@ -139,6 +140,19 @@ INSERT INTO archon_settings (key, value, is_encrypted, category, description) VA
 ('CRAWL_DELAY_BEFORE_HTML', '0.5', false, 'rag_strategy', 'Time to wait for JavaScript rendering in seconds (0.1-5.0)')
 ON CONFLICT (key) DO NOTHING;
 
+-- Streaming Crawl Pipeline Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('CRAWL_STREAMING_ENABLED', 'true', false, 'rag_strategy', 'Chunk, embed and store pages while the crawl is still running'),
+('CRAWL_STREAM_QUEUE_SIZE', '20', false, 'rag_strategy', 'Maximum crawled pages waiting to be chunked before the crawler pauses (1-200)'),
+('CRAWL_STREAM_BATCH_CHUNKS', '100', false, 'rag_strategy', 'Target number of chunks per streamed storage batch (25-500)')
+ON CONFLICT (key) DO NOTHING;
+
+-- Incremental Recrawl Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('CRAWL_INCREMENTAL_ENABLED', 'true', false, 'rag_strategy', 'On recrawls, skip pages and chunks whose content hash, HTTP validators or sitemap lastmod show no change'),
+('CRAWL_INCREMENTAL_CONDITIONAL_REQUESTS', 'true', false, 'rag_strategy', 'Send conditional HEAD requests (ETag / Last-Modified) before re-fetching known sitemap pages')
+ON CONFLICT (key) DO NOTHING;
+
 -- Document Storage Performance Settings (from add_performance_settings.sql and optimize_batch_sizes.sql)
 INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
 ('DOCUMENT_STORAGE_BATCH_SIZE', '100', false, 'rag_strategy', 'Number of document chunks to process per batch (50-200) - increased for better performance'),
@@ -149,6 +163,13 @@ ON CONFLICT (key) DO UPDATE SET
     value = EXCLUDED.value,
     description = EXCLUDED.description;
 
+-- Document storage pipeline: bulk writer (copy requires SUPABASE_DB_URL on the server) and
+-- the upper bound for batches that overlap embedding and insert work
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('DOCUMENT_STORAGE_MAX_INFLIGHT_BATCHES', '4', false, 'rag_strategy', 'Maximum document batches embedding or inserting at once; the live bound adapts to provider 429s and latency (1-16)'),
+('STORAGE_BULK_WRITER', 'postgrest', false, 'rag_strategy', 'How chunk and code example batches are written: postgrest (REST inserts) or copy (binary COPY over SUPABASE_DB_URL)')
+ON CONFLICT (key) DO NOTHING;
+
 -- Advanced Performance Settings (from add_performance_settings.sql and optimize_batch_sizes.sql)
 INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
 ('MEMORY_THRESHOLD_PERCENT', '80', false, 'rag_strategy', 'Memory usage threshold for crawler dispatcher (50-90)'),
@@ -160,6 +181,52 @@ ON CONFLICT (key) DO UPDATE SET
     value = EXCLUDED.value,
     description = EXCLUDED.description;
 
+-- Embedding Cache Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('EMBEDDING_CACHE_ENABLED', 'true', false, 'rag_strategy', 'Reuse embeddings for unchanged content (keyed by provider, model, dimensions and content hash) instead of re-embedding on every crawl'),
+('EMBEDDING_CACHE_MAX_ENTRIES', '5000', false, 'rag_strategy', 'Maximum number of embeddings kept in the in-process cache tier (1000-50000)')
+ON CONFLICT (key) DO NOTHING;
+
+-- Code Summary Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('CODE_SUMMARY_BATCH_SIZE', '5', false, 'rag_strategy', 'Code blocks summarized per LLM request (1-20)'),
+('CODE_SUMMARY_CACHE_ENABLED', 'true', false, 'rag_strategy', 'Reuse code summaries for unchanged code and context (keyed by model and content hash) instead of re-summarizing on every crawl')
+ON CONFLICT (key) DO NOTHING;
+
+-- Contextual Embedding Cache Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('CONTEXTUAL_EMBEDDING_CACHE_ENABLED', 'true', false, 'rag_strategy', 'Reuse generated chunk contexts (keyed by model, document hash and chunk hash) instead of regenerating them on every crawl')
+ON CONFLICT (key) DO NOTHING;
+
+-- Query Embedding Cache Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('QUERY_EMBEDDING_CACHE_ENABLED', 'true', false, 'rag_strategy', 'Cache search query embeddings in-process and coalesce concurrent queries into shared embedding requests'),
+('QUERY_EMBEDDING_CACHE_TTL', '600', false, 'rag_strategy', 'Seconds a cached query embedding stays valid (60-86400)'),
+('QUERY_EMBEDDING_CACHE_MAX_ENTRIES', '1000', false, 'rag_strategy', 'Maximum number of query embeddings kept in the in-process cache (100-10000)')
+ON CONFLICT (key) DO NOTHING;
+
+-- LLM Client Connection Pool Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('LLM_CLIENT_MAX_CONNECTIONS', '100', false, 'rag_strategy', 'Maximum open connections per pooled LLM/embedding provider client (10-500)'),
+('LLM_CLIENT_MAX_KEEPALIVE_CONNECTIONS', '20', false, 'rag_strategy', 'Idle keep-alive connections retained per provider client (5-100)'),
+('LLM_CLIENT_KEEPALIVE_EXPIRY', '30', false, 'rag_strategy', 'Seconds an idle provider connection is kept open before closing'),
+('LLM_CLIENT_HTTP2', 'true', false, 'rag_strategy', 'Use HTTP/2 for provider connections when the h2 package is installed')
+ON CONFLICT (key) DO NOTHING;
+
+-- Hybrid Search Fusion Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('HYBRID_FUSION_MODE', 'boost', false, 'rag_strategy', 'How hybrid search merges vector and keyword results: boost (1.2x boost for dual matches) or rrf (reciprocal-rank fusion)'),
+('HYBRID_RRF_K', '60', false, 'rag_strategy', 'Reciprocal-rank fusion constant; higher values flatten the advantage of top-ranked results'),
+('HYBRID_VECTOR_WEIGHT', '1.0', false, 'rag_strategy', 'Weight of the vector search ranking in reciprocal-rank fusion'),
+('HYBRID_KEYWORD_WEIGHT', '1.0', false, 'rag_strategy', 'Weight of the keyword search ranking in reciprocal-rank fusion')
+ON CONFLICT (key) DO NOTHING;
+
+-- Vector Index Query Settings
+INSERT INTO archon_settings (key, value, is_encrypted, category, description) VALUES
+('VECTOR_SEARCH_EF_SEARCH', '100', false, 'rag_strategy', 'HNSW candidate list size per query (hnsw.ef_search); higher improves recall at some latency cost (40-400)'),
+('VECTOR_SEARCH_PROBES', '10', false, 'rag_strategy', 'IVFFlat lists scanned per query (ivfflat.probes) when IVFFlat indexes are used (1-100)')
+ON CONFLICT (key) DO NOTHING;
+
 -- Add a comment to document when this migration was added
 COMMENT ON TABLE archon_settings IS 'Stores application configuration including API keys, RAG settings, and code extraction parameters';
 
@@ -206,10 +273,18 @@ CREATE TABLE IF NOT EXISTS archon_crawled_pages (
 );
 
 -- Create indexes for better performance
-CREATE INDEX ON archon_crawled_pages USING ivfflat (embedding vector_cosine_ops);
+-- HNSW builds a usable graph even on an empty table (an ivfflat index built here would have
+-- meaningless centroids); switch with rebuild_archon_vector_indexes() once data exists
+CREATE INDEX IF NOT EXISTS idx_archon_crawled_pages_embedding ON archon_crawled_pages
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 CREATE INDEX idx_archon_crawled_pages_metadata ON archon_crawled_pages USING GIN (metadata);
 CREATE INDEX idx_archon_crawled_pages_source_id ON archon_crawled_pages (source_id);
 
+-- Full-text search column and index used by hybrid keyword search
+ALTER TABLE archon_crawled_pages ADD COLUMN IF NOT EXISTS content_search TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('english', content)) STORED;
+CREATE INDEX IF NOT EXISTS idx_archon_crawled_pages_content_search ON archon_crawled_pages USING GIN (content_search);
+
 -- Create the code_examples table
 CREATE TABLE IF NOT EXISTS archon_code_examples (
     id BIGSERIAL PRIMARY KEY,
@@ -230,20 +305,97 @@ CREATE TABLE IF NOT EXISTS archon_code_examples (
 );
 
 -- Create indexes for better performance
-CREATE INDEX ON archon_code_examples USING ivfflat (embedding vector_cosine_ops);
+CREATE INDEX IF NOT EXISTS idx_archon_code_examples_embedding ON archon_code_examples
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 CREATE INDEX idx_archon_code_examples_metadata ON archon_code_examples USING GIN (metadata);
 CREATE INDEX idx_archon_code_examples_source_id ON archon_code_examples (source_id);
 
+-- Full-text search column and index used by hybrid keyword search (summary ranks above code)
+ALTER TABLE archon_code_examples ADD COLUMN IF NOT EXISTS content_search TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', summary), 'A') || setweight(to_tsvector('english', content), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_archon_code_examples_content_search ON archon_code_examples USING GIN (content_search);
+
+-- MinHash signature of the normalized code, used to skip near-duplicates when a source is re-crawled
+ALTER TABLE archon_code_examples ADD COLUMN IF NOT EXISTS minhash_signature INTEGER[];
+
+-- Create the content-addressed embedding cache table
+CREATE TABLE IF NOT EXISTS archon_embedding_cache (
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,  -- sha256 hex digest of the embedded text
+    embedding FLOAT4[] NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+
+    PRIMARY KEY (provider, model, dimensions, content_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_archon_embedding_cache_created_at ON archon_embedding_cache (created_at);
+
+COMMENT ON TABLE archon_embedding_cache IS 'Embeddings keyed by provider, model, dimensions and sha256 of the text so unchanged content is not re-embedded';
+
+-- Create the content-addressed code summary cache table
+CREATE TABLE IF NOT EXISTS archon_code_summary_cache (
+    model TEXT NOT NULL,
+    content_hash TEXT NOT NULL,  -- sha256 hex digest of the language, code and surrounding context
+    example_name TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+
+    PRIMARY KEY (model, content_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_archon_code_summary_cache_created_at ON archon_code_summary_cache (created_at);
+
+COMMENT ON TABLE archon_code_summary_cache IS 'Code example names and summaries keyed by model and sha256 of the code and its context so unchanged snippets are not re-summarized';
+
+-- Create the content-addressed chunk context cache table used by contextual embeddings
+CREATE TABLE IF NOT EXISTS archon_chunk_context_cache (
+    model TEXT NOT NULL,
+    document_hash TEXT NOT NULL,  -- sha256 hex digest of the document text sent with the chunk
+    chunk_hash TEXT NOT NULL,  -- sha256 hex digest of the chunk
+    context TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+
+    PRIMARY KEY (model, document_hash, chunk_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_archon_chunk_context_cache_created_at ON archon_chunk_context_cache (created_at);
+
+COMMENT ON TABLE archon_chunk_context_cache IS 'Contextual-embedding contexts keyed by model, document hash and chunk hash so unchanged chunks are not re-contextualized';
+
+-- Create the per-page fingerprint table used by incremental recrawls
+CREATE TABLE IF NOT EXISTS archon_page_fingerprints (
+    url VARCHAR PRIMARY KEY,
+    source_id TEXT NOT NULL REFERENCES archon_sources(source_id) ON DELETE CASCADE,
+    content_hash TEXT NOT NULL,  -- sha256 hex digest of the page markdown
+    chunk_hashes TEXT[] NOT NULL DEFAULT '{}',  -- sha256 per chunk, indexed by chunk_number
+    word_count INTEGER NOT NULL DEFAULT 0,
+    etag TEXT,
+    last_modified TEXT,
+    sitemap_lastmod TIMESTAMP WITH TIME ZONE,
+    crawled_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_archon_page_fingerprints_source_id ON archon_page_fingerprints (source_id);
+
+COMMENT ON TABLE archon_page_fingerprints IS 'Content hashes and HTTP validators per crawled URL so recrawls skip unchanged pages and chunks';
+
 -- =====================================================
 -- SECTION 5: SEARCH FUNCTIONS
 -- =====================================================
 
 -- Create a function to search for documentation chunks
+DROP FUNCTION IF EXISTS match_archon_crawled_pages(vector, int, jsonb, text);
 CREATE OR REPLACE FUNCTION match_archon_crawled_pages (
   query_embedding VECTOR(1536),
   match_count INT DEFAULT 10,
   filter JSONB DEFAULT '{}'::jsonb,
-  source_filter TEXT DEFAULT NULL
+  source_filter TEXT DEFAULT NULL,
+  ef_search INT DEFAULT NULL,  -- hnsw.ef_search for this query (HNSW indexes)
+  probes INT DEFAULT NULL      -- ivfflat.probes for this query (IVFFlat indexes)
 ) RETURNS TABLE (
   id BIGINT,
   url VARCHAR,
@@ -257,6 +409,14 @@ LANGUAGE plpgsql
 AS $$
 #variable_conflict use_column
 BEGIN
+  -- Recall/latency knobs apply to this transaction only
+  IF ef_search IS NOT NULL THEN
+    PERFORM set_config('hnsw.ef_search', ef_search::TEXT, true);
+  END IF;
+  IF probes IS NOT NULL THEN
+    PERFORM set_config('ivfflat.probes', probes::TEXT, true);
+  END IF;
+
   RETURN QUERY
   SELECT
     id,
@@ -275,11 +435,14 @@ END;
 $$;
 
 -- Create a function to search for code examples
+DROP FUNCTION IF EXISTS match_archon_code_examples(vector, int, jsonb, text);
 CREATE OR REPLACE FUNCTION match_archon_code_examples (
   query_embedding VECTOR(1536),
   match_count INT DEFAULT 10,
   filter JSONB DEFAULT '{}'::jsonb,
-  source_filter TEXT DEFAULT NULL
+  source_filter TEXT DEFAULT NULL,
+  ef_search INT DEFAULT NULL,  -- hnsw.ef_search for this query (HNSW indexes)
+  probes INT DEFAULT NULL      -- ivfflat.probes for this query (IVFFlat indexes)
 ) RETURNS TABLE (
   id BIGINT,
   url VARCHAR,
@@ -294,6 +457,14 @@ LANGUAGE plpgsql
 AS $$
 #variable_conflict use_column
 BEGIN
+  -- Recall/latency knobs apply to this transaction only
+  IF ef_search IS NOT NULL THEN
+    PERFORM set_config('hnsw.ef_search', ef_search::TEXT, true);
+  END IF;
+  IF probes IS NOT NULL THEN
+    PERFORM set_config('ivfflat.probes', probes::TEXT, true);
+  END IF;
+
   RETURN QUERY
   SELECT
     id,
@@ -312,6 +483,192 @@ BEGIN
 END;
 $$;
 
+-- Rebuild the embedding indexes as HNSW or IVFFlat. IVFFlat is only built once a table holds
+-- at least min_rows embeddings, with lists sized from the row count unless given explicitly.
+-- Large tables can take minutes; run it from the SQL editor if the API statement timeout hits.
+CREATE OR REPLACE FUNCTION rebuild_archon_vector_indexes (
+  index_type TEXT DEFAULT 'hnsw',
+  hnsw_m INT DEFAULT 16,
+  hnsw_ef_construction INT DEFAULT 64,
+  ivfflat_lists INT DEFAULT NULL,
+  min_rows INT DEFAULT 1000
+) RETURNS TABLE (
+  table_name TEXT,
+  index_name TEXT,
+  index_method TEXT,
+  row_count BIGINT,
+  lists INT,
+  rebuilt BOOLEAN
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  tbl TEXT;
+  existing_index TEXT;
+  embedded_rows BIGINT;
+  list_count INT;
+BEGIN
+  IF index_type NOT IN ('hnsw', 'ivfflat') THEN
+    RAISE EXCEPTION 'index_type must be hnsw or ivfflat, got %', index_type;
+  END IF;
+
+  FOREACH tbl IN ARRAY ARRAY['archon_crawled_pages', 'archon_code_examples'] LOOP
+    EXECUTE format('SELECT count(*) FROM %I WHERE embedding IS NOT NULL', tbl) INTO embedded_rows;
+    list_count := NULL;
+
+    IF index_type = 'ivfflat' AND embedded_rows < min_rows THEN
+      -- Too few rows for meaningful centroids; keep whatever index exists
+      RETURN QUERY SELECT tbl, NULL::TEXT, index_type, embedded_rows, NULL::INT, false;
+      CONTINUE;
+    END IF;
+
+    FOR existing_index IN
+      SELECT pg_indexes.indexname FROM pg_indexes
+      WHERE pg_indexes.schemaname = 'public'
+        AND pg_indexes.tablename = tbl
+        AND (pg_indexes.indexdef ILIKE '%USING ivfflat%' OR pg_indexes.indexdef ILIKE '%USING hnsw%')
+    LOOP
+      EXECUTE format('DROP INDEX IF EXISTS %I', existing_index);
+    END LOOP;
+
+    IF index_type = 'hnsw' THEN
+      EXECUTE format(
+        'CREATE INDEX %I ON %I USING hnsw (embedding vector_cosine_ops) WITH (m = %s, ef_construction = %s)',
+        'idx_' || tbl || '_embedding', tbl, hnsw_m, hnsw_ef_construction
+      );
+    ELSE
+      -- pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond
+      list_count := COALESCE(
+        ivfflat_lists,
+        GREATEST(1, CASE WHEN embedded_rows <= 1000000 THEN embedded_rows / 1000
+                         ELSE floor(sqrt(embedded_rows)) END)::INT
+      );
+      EXECUTE format(
+        'CREATE INDEX %I ON %I USING ivfflat (embedding vector_cosine_ops) WITH (lists = %s)',
+        'idx_' || tbl || '_embedding', tbl, list_count
+      );
+    END IF;
+
+    RETURN QUERY SELECT tbl, 'idx_' || tbl || '_embedding', index_type, embedded_rows, list_count, true;
+  END LOOP;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION rebuild_archon_vector_indexes(TEXT, INT, INT, INT, INT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_archon_vector_indexes(TEXT, INT, INT, INT, INT) TO service_role;
+
+-- Build an OR tsquery from keyword search terms; returns NULL if no term yields a lexeme
+CREATE OR REPLACE FUNCTION build_archon_keyword_tsquery (
+  search_terms TEXT[]
+) RETURNS TSQUERY
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+  term TEXT;
+  term_query TSQUERY;
+  combined TSQUERY;
+BEGIN
+  FOREACH term IN ARRAY COALESCE(search_terms, ARRAY[]::TEXT[]) LOOP
+    term_query := plainto_tsquery('english', term);
+    IF numnode(term_query) > 0 THEN
+      combined := CASE WHEN combined IS NULL THEN term_query ELSE combined || term_query END;
+    END IF;
+  END LOOP;
+  RETURN combined;
+END;
+$$;
+
+-- Create a function to keyword search documentation chunks via the full-text index
+CREATE OR REPLACE FUNCTION match_archon_crawled_pages_keyword (
+  search_terms TEXT[],
+  match_count INT DEFAULT 10,
+  filter JSONB DEFAULT '{}'::jsonb,
+  source_filter TEXT DEFAULT NULL
+) RETURNS TABLE (
+  id BIGINT,
+  url VARCHAR,
+  chunk_number INTEGER,
+  content TEXT,
+  metadata JSONB,
+  source_id TEXT,
+  rank FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  ts_query TSQUERY := build_archon_keyword_tsquery(search_terms);
+BEGIN
+  IF ts_query IS NULL THEN
+    RETURN;
+  END IF;
+
+  RETURN QUERY
+  SELECT
+    id,
+    url,
+    chunk_number,
+    content,
+    metadata,
+    source_id,
+    ts_rank_cd(archon_crawled_pages.content_search, ts_query)::FLOAT AS rank
+  FROM archon_crawled_pages
+  WHERE archon_crawled_pages.content_search @@ ts_query
+    AND metadata @> filter
+    AND (source_filter IS NULL OR source_id = source_filter)
+  ORDER BY ts_rank_cd(archon_crawled_pages.content_search, ts_query) DESC
+  LIMIT match_count;
+END;
+$$;
+
+-- Create a function to keyword search code examples via the full-text index
+CREATE OR REPLACE FUNCTION match_archon_code_examples_keyword (
+  search_terms TEXT[],
+  match_count INT DEFAULT 10,
+  filter JSONB DEFAULT '{}'::jsonb,
+  source_filter TEXT DEFAULT NULL
+) RETURNS TABLE (
+  id BIGINT,
+  url VARCHAR,
+  chunk_number INTEGER,
+  content TEXT,
+  summary TEXT,
+  metadata JSONB,
+  source_id TEXT,
+  rank FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  ts_query TSQUERY := build_archon_keyword_tsquery(search_terms);
+BEGIN
+  IF ts_query IS NULL THEN
+    RETURN;
+  END IF;
+
+  RETURN QUERY
+  SELECT
+    id,
+    url,
+    chunk_number,
+    content,
+    summary,
+    metadata,
+    source_id,
+    ts_rank_cd(archon_code_examples.content_search, ts_query)::FLOAT AS rank
+  FROM archon_code_examples
+  WHERE archon_code_examples.content_search @@ ts_query
+    AND metadata @> filter
+    AND (source_filter IS NULL OR source_id = source_filter)
+  ORDER BY ts_rank_cd(archon_code_examples.content_search, ts_query) DESC
+  LIMIT match_count;
+END;
+$$;
+
 -- =====================================================
 -- SECTION 6: RLS POLICIES FOR KNOWLEDGE BASE
 -- =====================================================
@@ -320,6 +677,10 @@ $$;
 ALTER TABLE archon_crawled_pages ENABLE ROW LEVEL SECURITY;
 ALTER TABLE archon_sources ENABLE ROW LEVEL SECURITY;
 ALTER TABLE archon_code_examples ENABLE ROW LEVEL SECURITY;
+ALTER TABLE archon_embedding_cache ENABLE ROW LEVEL SECURITY;
+ALTER TABLE archon_code_summary_cache ENABLE ROW LEVEL SECURITY;
+ALTER TABLE archon_chunk_context_cache ENABLE ROW LEVEL SECURITY;
+ALTER TABLE archon_page_fingerprints ENABLE ROW LEVEL SECURITY;
 
 -- Create policies that allow anyone to read
 CREATE POLICY "Allow public read access to archon_crawled_pages"
@@ -340,6 +701,26 @@ CREATE POLICY "Allow public read access to archon_code_examples"
   TO public
   USING (true);
 
+-- The embedding cache is internal to the server
+CREATE POLICY "Allow service role full access to archon_embedding_cache"
+  ON archon_embedding_cache
+  FOR ALL USING (auth.role() = 'service_role');
+
+-- The code summary cache is internal to the server
+CREATE POLICY "Allow service role full access to archon_code_summary_cache"
+  ON archon_code_summary_cache
+  FOR ALL USING (auth.role() = 'service_role');
+
+-- The chunk context cache is internal to the server
+CREATE POLICY "Allow service role full access to archon_chunk_context_cache"
+  ON archon_chunk_context_cache
+  FOR ALL USING (auth.role() = 'service_role');
+
+-- Page fingerprints are internal to the server
+CREATE POLICY "Allow service role full access to archon_page_fingerprints"
+  ON archon_page_fingerprints
+  FOR ALL USING (auth.role() = 'service_role');
+
 -- =====================================================
 -- SECTION 7: PROJECTS AND TASKS MODULE
 -- =====================================================
@@ -423,6 +804,10 @@ CREATE TABLE IF NOT EXISTS archon_document_versions (
   UNIQUE(project_id, task_id, field_name, version_number)
 );
 
+-- Versions are stored as full snapshots or as JSON patch deltas against base_version
+ALTER TABLE archon_document_versions ADD COLUMN IF NOT EXISTS content_format TEXT DEFAULT 'snapshot';
+ALTER TABLE archon_document_versions ADD COLUMN IF NOT EXISTS base_version INTEGER;
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_archon_tasks_project_id ON archon_tasks(project_id);
 CREATE INDEX IF NOT EXISTS idx_archon_tasks_status ON archon_tasks(status);
@@ -437,6 +822,7 @@ CREATE INDEX IF NOT EXISTS idx_archon_document_versions_task_id ON archon_docume
 CREATE INDEX IF NOT EXISTS idx_archon_document_versions_field_name ON archon_document_versions(field_name);
 CREATE INDEX IF NOT EXISTS idx_archon_document_versions_version_number ON archon_document_versions(version_number);
 CREATE INDEX IF NOT EXISTS idx_archon_document_versions_created_at ON archon_document_versions(created_at);
+CREATE INDEX IF NOT EXISTS idx_archon_document_versions_chain ON archon_document_versions(project_id, field_name, version_number DESC);
 
 -- Apply triggers to tables
 CREATE OR REPLACE TRIGGER update_archon_projects_updated_at
@@ -488,6 +874,153 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Project document functions. Each one changes a single element of archon_projects.docs inside
+-- the database while holding the project row lock, so callers never round-trip the whole array
+-- and concurrent edits to different documents cannot overwrite each other.
+
+-- Replace the document with the same id, or append it. Returns the replaced document (NULL
+-- when appended) and no row when the project does not exist.
+CREATE OR REPLACE FUNCTION upsert_archon_project_document(
+    project_id_param UUID,
+    document_param JSONB
+)
+RETURNS TABLE (previous_document JSONB) AS $$
+DECLARE
+    current_docs JSONB;
+    doc_index INT;
+BEGIN
+    SELECT COALESCE(docs, '[]'::jsonb) INTO current_docs
+    FROM archon_projects WHERE id = project_id_param FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT ordinality - 1 INTO doc_index
+    FROM jsonb_array_elements(current_docs) WITH ORDINALITY
+    WHERE value ->> 'id' = document_param ->> 'id'
+    LIMIT 1;
+
+    IF doc_index IS NULL THEN
+        previous_document := NULL;
+        current_docs := current_docs || jsonb_build_array(document_param);
+    ELSE
+        previous_document := current_docs -> doc_index;
+        current_docs := jsonb_set(current_docs, ARRAY[doc_index::TEXT], document_param);
+    END IF;
+
+    UPDATE archon_projects SET docs = current_docs, updated_at = NOW()
+    WHERE id = project_id_param;
+
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Merge patch_param into one document. Returns the document before and after the patch (both
+-- NULL when the document does not exist) and no row when the project does not exist.
+CREATE OR REPLACE FUNCTION update_archon_project_document(
+    project_id_param UUID,
+    doc_id_param TEXT,
+    patch_param JSONB
+)
+RETURNS TABLE (previous_document JSONB, document JSONB) AS $$
+DECLARE
+    current_docs JSONB;
+    doc_index INT;
+BEGIN
+    SELECT COALESCE(docs, '[]'::jsonb) INTO current_docs
+    FROM archon_projects WHERE id = project_id_param FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT ordinality - 1 INTO doc_index
+    FROM jsonb_array_elements(current_docs) WITH ORDINALITY
+    WHERE value ->> 'id' = doc_id_param
+    LIMIT 1;
+
+    IF doc_index IS NULL THEN
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    previous_document := current_docs -> doc_index;
+    document := previous_document || patch_param;
+
+    UPDATE archon_projects
+    SET docs = jsonb_set(current_docs, ARRAY[doc_index::TEXT], document), updated_at = NOW()
+    WHERE id = project_id_param;
+
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Remove one document. Returns the removed document (NULL when it does not exist) and no row
+-- when the project does not exist.
+CREATE OR REPLACE FUNCTION delete_archon_project_document(
+    project_id_param UUID,
+    doc_id_param TEXT
+)
+RETURNS TABLE (deleted_document JSONB) AS $$
+DECLARE
+    current_docs JSONB;
+    doc_index INT;
+BEGIN
+    SELECT COALESCE(docs, '[]'::jsonb) INTO current_docs
+    FROM archon_projects WHERE id = project_id_param FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT ordinality - 1 INTO doc_index
+    FROM jsonb_array_elements(current_docs) WITH ORDINALITY
+    WHERE value ->> 'id' = doc_id_param
+    LIMIT 1;
+
+    IF doc_index IS NOT NULL THEN
+        deleted_document := current_docs -> doc_index;
+        UPDATE archon_projects SET docs = current_docs - doc_index, updated_at = NOW()
+        WHERE id = project_id_param;
+    END IF;
+
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Insert a document version, numbering it in the same statement. The advisory lock serializes
+-- writers of one project field, so concurrent versions never race for a version number.
+CREATE OR REPLACE FUNCTION create_archon_document_version(
+    project_id_param UUID,
+    field_name_param TEXT,
+    content_param JSONB,
+    content_format_param TEXT DEFAULT 'snapshot',
+    base_version_param INTEGER DEFAULT NULL,
+    change_summary_param TEXT DEFAULT NULL,
+    change_type_param TEXT DEFAULT 'update',
+    document_id_param TEXT DEFAULT NULL,
+    created_by_param TEXT DEFAULT 'system'
+)
+RETURNS SETOF archon_document_versions AS $$
+DECLARE
+    new_version archon_document_versions;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(project_id_param::TEXT || ':' || field_name_param));
+
+    INSERT INTO archon_document_versions (
+        project_id, field_name, version_number, content, content_format, base_version,
+        change_summary, change_type, document_id, created_by
+    )
+    SELECT
+        project_id_param, field_name_param, COALESCE(MAX(v.version_number), 0) + 1, content_param,
+        content_format_param, base_version_param, change_summary_param, change_type_param,
+        document_id_param, created_by_param
+    FROM archon_document_versions v
+    WHERE v.project_id = project_id_param AND v.field_name = field_name_param
+    RETURNING * INTO new_version;
+
+    RETURN NEXT new_version;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Add comments to document the soft delete fields
 COMMENT ON COLUMN archon_tasks.assignee IS 'The agent or user assigned to this task. Can be any valid agent name or "User"';
 COMMENT ON COLUMN archon_tasks.archived IS 'Soft delete flag - TRUE if task is archived/deleted';
@@ -497,7 +1030,9 @@ COMMENT ON COLUMN archon_tasks.archived_by IS 'User/system that archived the tas
 -- Add comments for versioning table
 COMMENT ON TABLE archon_document_versions IS 'Version control for JSONB fields in projects only - task versioning has been removed to simplify MCP operations';
 COMMENT ON COLUMN archon_document_versions.field_name IS 'Name of JSONB field being versioned (docs, features, data) - task fields and prd removed as unused';
-COMMENT ON COLUMN archon_document_versions.content IS 'Full snapshot of field content at this version';
+COMMENT ON COLUMN archon_document_versions.content IS 'Field content at this version (a JSON patch when content_format is delta) - for single document edits, a one-element array holding that document';
+COMMENT ON COLUMN archon_document_versions.content_format IS 'snapshot: content is the full field value; delta: content is a JSON patch applied to base_version';
+COMMENT ON COLUMN archon_document_versions.base_version IS 'For deltas, the version_number (same project, field and document) the patch applies to';
 COMMENT ON COLUMN archon_document_versions.change_type IS 'Type of change: create, update, delete, restore, backup';
 COMMENT ON COLUMN archon_document_versions.document_id IS 'For docs arrays, the specific document ID that was changed';
 COMMENT ON COLUMN archon_document_versions.task_id IS 'DEPRECATED: No longer used for new versions, kept for historical task version data';
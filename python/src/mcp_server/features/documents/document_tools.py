@@ -14,6 +14,7 @@ import httpx
 from mcp.server.fastmcp import Context, FastMCP
 
 from src.mcp_server.utils.error_handling import MCPErrorFormatter
+from src.mcp_server.utils.http_client import get_http_client
 from src.mcp_server.utils.timeout_config import get_default_timeout
 from src.server.config.service_discovery import get_api_url
 
@@ -94,7 +95,7 @@ def register_document_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.post(
                     urljoin(api_url, f"/api/projects/{project_id}/docs"),
                     json={
@@ -143,7 +144,7 @@ def register_document_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.get(urljoin(api_url, f"/api/projects/{project_id}/docs"))
 
                 if response.status_code == 200:
@@ -181,7 +182,7 @@ def register_document_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.get(
                     urljoin(api_url, f"/api/projects/{project_id}/docs/{doc_id}")
                 )
@@ -250,7 +251,7 @@ def register_document_tools(mcp: FastMCP):
             if author is not None:
                 update_fields["author"] = author
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.put(
                     urljoin(api_url, f"/api/projects/{project_id}/docs/{doc_id}"),
                     json=update_fields,
@@ -293,7 +294,7 @@ def register_document_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.delete(
                     urljoin(api_url, f"/api/projects/{project_id}/docs/{doc_id}")
                 )
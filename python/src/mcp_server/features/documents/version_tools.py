@@ -14,6 +14,7 @@ import httpx
 from mcp.server.fastmcp import Context, FastMCP
 
 from src.mcp_server.utils.error_handling import MCPErrorFormatter
+from src.mcp_server.utils.http_client import get_http_client
 from src.mcp_server.utils.timeout_config import get_default_timeout
 from src.server.config.service_discovery import get_api_url
 
@@ -93,7 +94,7 @@ def register_version_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.post(
                     urljoin(api_url, f"/api/projects/{project_id}/versions"),
                     json={
@@ -193,7 +194,7 @@ def register_version_tools(mcp: FastMCP):
             if field_name:
                 params["field_name"] = field_name
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.get(
                     urljoin(api_url, f"/api/projects/{project_id}/versions"), params=params
                 )
@@ -238,7 +239,7 @@ def register_version_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.get(
                     urljoin(
                         api_url,
@@ -304,7 +305,7 @@ def register_version_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.post(
                     urljoin(
                         api_url,
@@ -15,6 +15,7 @@ import httpx
 from mcp.server.fastmcp import Context, FastMCP
 
 from src.mcp_server.utils.error_handling import MCPErrorFormatter
+from src.mcp_server.utils.http_client import get_http_client
 from src.mcp_server.utils.timeout_config import (
     get_default_timeout,
     get_max_polling_attempts,
@@ -74,7 +75,7 @@ def register_project_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.post(
                     urljoin(api_url, "/api/projects"),
                     json={"title": title, "description": description, "github_repo": github_repo},
@@ -96,9 +97,7 @@ def register_project_tools(mcp: FastMCP):
                                 await asyncio.sleep(sleep_interval)
 
                                 # Create new client with polling timeout
-                                async with httpx.AsyncClient(
-                                    timeout=polling_timeout
-                                ) as poll_client:
+                                async with get_http_client(timeout=polling_timeout) as poll_client:
                                     list_response = await poll_client.get(
                                         urljoin(api_url, "/api/projects")
                                     )
@@ -166,6 +165,7 @@ def register_project_tools(mcp: FastMCP):
 
         Returns:
             JSON array of all projects with their basic information
+            (use get_project for a project's docs, features and data)
 
         Example:
             list_projects()
@@ -174,8 +174,11 @@ def register_project_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(urljoin(api_url, "/api/projects"))
+            async with get_http_client(timeout=timeout) as client:
+                # Always exclude large fields in MCP responses
+                response = await client.get(
+                    urljoin(api_url, "/api/projects"), params={"exclude_large_fields": True}
+                )
 
                 if response.status_code == 200:
                     projects = response.json()
@@ -211,7 +214,7 @@ def register_project_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.get(urljoin(api_url, f"/api/projects/{project_id}"))
 
                 if response.status_code == 200:
@@ -251,7 +254,7 @@ def register_project_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.delete(urljoin(api_url, f"/api/projects/{project_id}"))
 
                 if response.status_code == 200:
@@ -319,7 +322,7 @@ def register_project_tools(mcp: FastMCP):
                     suggestion="Provide at least one field to update (title, description, or github_repo)",
                 )
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.put(
                     urljoin(api_url, f"/api/projects/{project_id}"), json=update_data
                 )
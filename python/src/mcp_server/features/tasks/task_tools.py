@@ -14,6 +14,7 @@ import httpx
 from mcp.server.fastmcp import Context, FastMCP
 
 from src.mcp_server.utils.error_handling import MCPErrorFormatter
+from src.mcp_server.utils.http_client import get_http_client
 from src.mcp_server.utils.timeout_config import get_default_timeout
 from src.server.config.service_discovery import get_api_url
 
@@ -114,7 +115,7 @@ def register_task_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.post(
                     urljoin(api_url, "/api/tasks"),
                     json={
@@ -206,7 +207,7 @@ def register_task_tools(mcp: FastMCP):
                 if project_id:
                     params["project_id"] = project_id
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.get(url, params=params)
                 response.raise_for_status()
 
@@ -276,7 +277,7 @@ def register_task_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.get(urljoin(api_url, f"/api/tasks/{task_id}"))
 
                 if response.status_code == 200:
@@ -362,7 +363,7 @@ def register_task_tools(mcp: FastMCP):
                     suggestion="Provide at least one field to update",
                 )
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.put(
                     urljoin(api_url, f"/api/tasks/{task_id}"), json=update_fields
                 )
@@ -411,7 +412,7 @@ def register_task_tools(mcp: FastMCP):
             api_url = get_api_url()
             timeout = get_default_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.delete(urljoin(api_url, f"/api/tasks/{task_id}"))
 
                 if response.status_code == 200:
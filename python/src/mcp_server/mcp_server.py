@@ -57,6 +57,7 @@ logger = logging.getLogger(__name__)
 from src.server.config.logfire_config import mcp_logger, setup_logfire
 
 # Import service client for HTTP calls
+from src.mcp_server.utils.http_client import close_http_client_pool, get_http_transport
 from src.server.services.mcp_service_client import get_mcp_service_client
 
 # Import session management
@@ -163,6 +164,10 @@ async def lifespan(server: FastMCP) -> AsyncIterator[ArchonContext]:
             service_client = get_mcp_service_client()
             logger.info("✓ Service client initialized")
 
+            # Open the shared keep-alive pool used by all MCP tools
+            get_http_transport()
+            logger.info("✓ HTTP connection pool initialized")
+
             # Create context
             context = ArchonContext(service_client=service_client)
 
@@ -184,6 +189,11 @@ async def lifespan(server: FastMCP) -> AsyncIterator[ArchonContext]:
         finally:
             # Clean up resources
             logger.info("🧹 Cleaning up MCP server...")
+            try:
+                await close_http_client_pool()
+                await get_mcp_service_client().close()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP connection pools: {e}")
             logger.info("✅ MCP server shutdown complete")
 
 
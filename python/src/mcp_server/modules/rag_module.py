@@ -15,10 +15,11 @@ import logging
 import os
 from urllib.parse import urljoin
 
-import httpx
-
 from mcp.server.fastmcp import Context, FastMCP
 
+from src.mcp_server.utils.http_client import get_http_client
+from src.mcp_server.utils.timeout_config import get_rag_timeout
+
 # Import service discovery for HTTP communication
 from src.server.config.service_discovery import get_api_url
 
@@ -53,9 +54,9 @@ def register_rag_tools(mcp: FastMCP):
         """
         try:
             api_url = get_api_url()
-            timeout = httpx.Timeout(30.0, connect=5.0)
+            timeout = get_rag_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 response = await client.get(urljoin(api_url, "/api/rag/sources"))
 
                 if response.status_code == 200:
@@ -98,9 +99,9 @@ def register_rag_tools(mcp: FastMCP):
         """
         try:
             api_url = get_api_url()
-            timeout = httpx.Timeout(30.0, connect=5.0)
+            timeout = get_rag_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 request_data = {"query": query, "match_count": match_count}
                 if source_domain:
                     request_data["source"] = source_domain
@@ -155,9 +156,9 @@ def register_rag_tools(mcp: FastMCP):
         """
         try:
             api_url = get_api_url()
-            timeout = httpx.Timeout(30.0, connect=5.0)
+            timeout = get_rag_timeout()
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
+            async with get_http_client(timeout=timeout) as client:
                 request_data = {"query": query, "match_count": match_count}
                 if source_domain:
                     request_data["source"] = source_domain
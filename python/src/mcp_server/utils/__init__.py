@@ -3,19 +3,23 @@ Utility modules for MCP Server.
 """
 
 from .error_handling import MCPErrorFormatter
-from .http_client import get_http_client
+from .http_client import close_http_client_pool, get_http_client, get_shared_transport
 from .timeout_config import (
     get_default_timeout,
     get_max_polling_attempts,
     get_polling_interval,
     get_polling_timeout,
+    get_rag_timeout,
 )
 
 __all__ = [
     "MCPErrorFormatter",
     "get_http_client",
+    "close_http_client_pool",
+    "get_shared_transport",
     "get_default_timeout",
     "get_polling_timeout",
+    "get_rag_timeout",
     "get_max_polling_attempts",
     "get_polling_interval",
 ]
\ No newline at end of file
@@ -1,9 +1,15 @@
 """
 HTTP client utilities for MCP Server.
 
-Provides consistent HTTP client configuration.
+Provides consistent HTTP client configuration on top of one process-wide connection pool,
+so tool calls to the API service reuse keep-alive connections instead of opening a new
+TCP connection per call.
 """
 
+import asyncio
+import importlib.util
+import logging
+import os
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Optional
 
@@ -11,13 +17,126 @@ import httpx
 
 from .timeout_config import get_default_timeout, get_polling_timeout
 
+logger = logging.getLogger(__name__)
+
+# Process-wide connection pool shared by every get_http_client() call
+_pool: Optional[httpx.AsyncBaseTransport] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+# Closes of pools replaced after an event loop change, kept referenced until they finish
+_closing: set = set()
+
+
+def get_pool_limits() -> httpx.Limits:
+    """
+    Get connection pool limits from environment or defaults.
+
+    Environment variables:
+    - MCP_HTTP_MAX_CONNECTIONS: Maximum open connections (default: 100)
+    - MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS: Maximum idle keep-alive connections (default: 20)
+    - MCP_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open (default: 30)
+
+    Returns:
+        Configured httpx.Limits object
+    """
+    return httpx.Limits(
+        max_connections=int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.getenv("MCP_HTTP_KEEPALIVE_EXPIRY", "30.0")),
+    )
+
+
+def http2_enabled() -> bool:
+    """
+    Whether to negotiate HTTP/2 (MCP_HTTP2_ENABLED, default: false).
+
+    HTTP/2 needs the optional 'h2' package; without it the pool stays on HTTP/1.1.
+    """
+    if os.getenv("MCP_HTTP2_ENABLED", "false").lower() != "true":
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("MCP_HTTP2_ENABLED is set but the 'h2' package is not installed")
+        return False
+    return True
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Per-client view of the shared pool; closing the client leaves the pool open.
+
+    The pool is looked up on every request, so a long-lived client keeps working after the
+    pool is replaced on another event loop.
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await get_http_transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+async def _close_quietly(pool: httpx.AsyncBaseTransport) -> None:
+    try:
+        await pool.aclose()
+    except Exception as e:
+        logger.debug(f"Error closing replaced HTTP connection pool: {e}")
+
+
+def _schedule_close(pool: httpx.AsyncBaseTransport, pool_loop: asyncio.AbstractEventLoop) -> None:
+    """Close a replaced pool on its own loop if that loop still runs, else on the current one."""
+    if pool_loop.is_running():
+        future = asyncio.run_coroutine_threadsafe(_close_quietly(pool), pool_loop)
+    else:
+        future = asyncio.get_running_loop().create_task(_close_quietly(pool))
+    _closing.add(future)
+    future.add_done_callback(_closing.discard)
+
+
+def get_http_transport() -> httpx.AsyncBaseTransport:
+    """
+    Get or create the shared connection pool.
+
+    Pooled connections belong to the event loop that opened them, so a pool created on
+    another loop is replaced and the old one is closed in the background.
+
+    Returns:
+        The process-wide transport
+    """
+    global _pool, _pool_loop
+
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        if _pool is not None and _pool_loop is not None:
+            _schedule_close(_pool, _pool_loop)
+        _pool = httpx.AsyncHTTPTransport(limits=get_pool_limits(), http2=http2_enabled())
+        _pool_loop = loop
+    return _pool
+
+
+def get_shared_transport() -> httpx.AsyncBaseTransport:
+    """
+    Get a transport for a long-lived httpx.AsyncClient that sends through the shared pool.
+
+    Closing a client built on it leaves the pool open; the pool itself is closed by
+    close_http_client_pool().
+    """
+    return _SharedTransport()
+
+
+async def close_http_client_pool() -> None:
+    """Close the shared connection pool. Called from the MCP server lifespan on shutdown."""
+    global _pool, _pool_loop
+
+    pool, _pool, _pool_loop = _pool, None, None
+    if pool is not None:
+        await pool.aclose()
+
 
 @asynccontextmanager
 async def get_http_client(
     timeout: Optional[httpx.Timeout] = None, for_polling: bool = False
 ) -> AsyncIterator[httpx.AsyncClient]:
     """
-    Create an HTTP client with consistent configuration.
+    Get an HTTP client with consistent configuration backed by the shared pool.
 
     Args:
         timeout: Optional custom timeout. If not provided, uses defaults.
@@ -33,6 +152,5 @@ async def get_http_client(
     if timeout is None:
         timeout = get_polling_timeout() if for_polling else get_default_timeout()
 
-    # Future: Could add retry logic, custom headers, etc. here
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        yield client
\ No newline at end of file
+    async with httpx.AsyncClient(timeout=timeout, transport=get_shared_transport()) as client:
+        yield client
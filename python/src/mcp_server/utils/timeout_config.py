@@ -48,6 +48,25 @@ def get_polling_timeout() -> httpx.Timeout:
     )
 
 
+def get_rag_timeout() -> httpx.Timeout:
+    """
+    Get timeout configuration for knowledge base (RAG) requests.
+
+    Searches may rerank results on the API side, so reads get the full request timeout.
+
+    Environment variables:
+    - MCP_RAG_TIMEOUT: Total and read timeout in seconds (default: 30)
+    - MCP_CONNECT_TIMEOUT: Connection timeout in seconds (default: 5)
+
+    Returns:
+        Configured httpx.Timeout object for RAG requests
+    """
+    return httpx.Timeout(
+        timeout=float(os.getenv("MCP_RAG_TIMEOUT", "30.0")),
+        connect=float(os.getenv("MCP_CONNECT_TIMEOUT", "5.0")),
+    )
+
+
 def get_max_polling_attempts() -> int:
     """
     Get maximum number of polling attempts.
@@ -21,7 +21,7 @@ from pydantic import BaseModel
 from ..utils import get_supabase_client
 from ..services.storage import DocumentStorageService
 from ..services.search.rag_service import RAGService
-from ..services.knowledge import KnowledgeItemService, DatabaseMetricsService
+from ..services.knowledge import KnowledgeItemService, DatabaseMetricsService, VectorIndexService
 from ..services.crawling import CrawlOrchestrationService
 from ..services.crawler_manager import get_crawler
 
@@ -94,6 +94,14 @@ class RagQueryRequest(BaseModel):
     match_count: int = 5
 
 
+class VectorIndexRebuildRequest(BaseModel):
+    index_type: str = "hnsw"  # "hnsw" or "ivfflat"
+    m: int = 16  # HNSW max connections per layer
+    ef_construction: int = 64  # HNSW build-time candidate list size
+    lists: int | None = None  # IVFFlat lists (default: derived from row count)
+    min_rows: int = 1000  # Minimum embedded rows before building IVFFlat
+
+
 @router.get("/test-socket-progress/{progress_id}")
 async def test_socket_progress(progress_id: str):
     """Test endpoint to verify Socket.IO crawl progress is working."""
@@ -869,6 +877,25 @@ async def get_database_metrics():
         raise HTTPException(status_code=500, detail={"error": str(e)})
 
 
+@router.post("/database/vector-indexes/rebuild")
+async def rebuild_vector_indexes(request: VectorIndexRebuildRequest):
+    """Rebuild the embedding indexes as HNSW or IVFFlat (admin maintenance)."""
+    try:
+        service = VectorIndexService(get_supabase_client())
+        return await service.rebuild_indexes(
+            index_type=request.index_type,
+            m=request.m,
+            ef_construction=request.ef_construction,
+            lists=request.lists,
+            min_rows=request.min_rows,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)})
+    except Exception as e:
+        safe_logfire_error(f"Failed to rebuild vector indexes | error={str(e)}")
+        raise HTTPException(status_code=500, detail={"error": str(e)})
+
+
 @router.get("/health")
 async def knowledge_health():
     """Knowledge API health check."""
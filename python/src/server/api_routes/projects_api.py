@@ -74,14 +74,19 @@ class CreateTaskRequest(BaseModel):
 
 
 @router.get("/projects")
-async def list_projects():
-    """List all projects."""
+async def list_projects(exclude_large_fields: bool = False):
+    """
+    List all projects.
+
+    With exclude_large_fields, only scalar columns and linked sources are returned; the docs,
+    features and data JSONB are loaded per project from GET /projects/{project_id}.
+    """
     try:
-        logfire.info("Listing all projects")
+        logfire.info(f"Listing all projects | exclude_large_fields={exclude_large_fields}")
 
         # Use ProjectService to get projects
         project_service = ProjectService()
-        success, result = project_service.list_projects()
+        success, result = project_service.list_projects(exclude_large_fields=exclude_large_fields)
 
         if not success:
             raise HTTPException(status_code=500, detail=result)
@@ -201,7 +206,7 @@ async def projects_health():
         try:
             project_service = ProjectService(supabase_client)
             # Try to list projects with limit 1 to test table access
-            success, _ = project_service.list_projects()
+            success, _ = project_service.list_projects(exclude_large_fields=True)
             projects_table_exists = success
             if success:
                 logfire.info("Projects table detected successfully")
@@ -14,6 +14,7 @@ from ..services.background_task_manager import get_task_manager
 from ..services.projects.project_service import ProjectService
 from ..services.projects.source_linking_service import SourceLinkingService
 from ..socketio_app import get_socketio_instance
+from ..utils.progress import ProgressTracker
 
 logger = get_logger(__name__)
 
@@ -22,9 +23,12 @@ sio = get_socketio_instance()
 logger.info(f"🔗 [SOCKETIO] Socket.IO instance ID: {id(sio)}")
 
 # Rate limiting for Socket.IO broadcasts
-_last_broadcast_times: dict[str, float] = {}
 _min_broadcast_interval = 0.1  # Minimum 100ms between broadcasts per room
 
+# Crawl progress trackers by progress_id, dropped once the crawl finishes
+_crawl_trackers: dict[str, ProgressTracker] = {}
+_crawl_tracker_idle_timeout = 300  # Drop trackers that have not emitted for 5 minutes
+
 
 # Broadcast helper functions
 async def broadcast_task_update(project_id: str, event_type: str, task_data: dict):
@@ -113,32 +117,29 @@ async def broadcast_progress_update(progress_id: str, progress_data: dict):
 
 
 async def broadcast_crawl_progress(progress_id: str, data: dict):
-    """Broadcast crawl progress to subscribers with resilience and rate limiting."""
+    """
+    Broadcast crawl progress to subscribers with resilience and rate limiting.
+
+    Updates are merged into the crawl's ProgressTracker, which sends subscribers a full
+    snapshot first and then only the changed fields and new log lines (see ProgressTracker).
+    Updates arriving within the broadcast interval are coalesced rather than dropped, and
+    important statuses are sent immediately as snapshots.
+    """
     # Ensure progressId is included in the data
     data["progressId"] = progress_id
 
-    # Rate limiting: Check if we've broadcasted too recently
-    current_time = time.time()
-    last_broadcast = _last_broadcast_times.get(progress_id, 0)
-    time_since_last = current_time - last_broadcast
-
-    # Skip this update if it's too soon (except for important statuses)
-    important_statuses = ["error", "completed", "complete", "starting"]
+    important_statuses = ["error", "completed", "complete", "cancelled", "starting"]
+    final_statuses = ["error", "completed", "complete", "cancelled"]
     current_status = data.get("status", "")
 
-    if time_since_last < _min_broadcast_interval and current_status not in important_statuses:
-        # Skip this update - too frequent
-        return
-
-    # Update last broadcast time
-    _last_broadcast_times[progress_id] = current_time
-
-    # Clean up old entries (older than 5 minutes)
-    if len(_last_broadcast_times) > 100:  # Only clean when it gets large
-        cutoff_time = current_time - 300  # 5 minutes
-        old_keys = [pid for pid, t in _last_broadcast_times.items() if t <= cutoff_time]
-        for key in old_keys:
-            del _last_broadcast_times[key]
+    tracker = _crawl_trackers.get(progress_id)
+    is_new_tracker = tracker is None
+    if is_new_tracker:
+        _prune_crawl_trackers()
+        tracker = ProgressTracker(
+            sio, progress_id, "crawl", max_emits_per_second=1 / _min_broadcast_interval
+        )
+        _crawl_trackers[progress_id] = tracker
 
     # Add resilience - don't let Socket.IO errors crash the crawl
     try:
@@ -179,7 +180,7 @@ async def broadcast_crawl_progress(progress_id: str, data: dict):
 
     # Emit the event with error handling
     try:
-        await sio.emit("crawl_progress", data, room=progress_id)
+        await tracker.merge(data, snapshot=is_new_tracker or current_status in important_statuses)
         logger.info(f"✅ [SOCKETIO] Broadcasted crawl progress for {progress_id}")
     except Exception as e:
         # Don't let Socket.IO errors crash the crawl
@@ -190,6 +191,17 @@ async def broadcast_crawl_progress(progress_id: str, data: dict):
         logger.error(f"Traceback: {traceback.format_exc()}")
         # Continue execution - crawl should not fail due to Socket.IO issues
 
+    if current_status in final_statuses:
+        _crawl_trackers.pop(progress_id, None)
+
+
+def _prune_crawl_trackers():
+    """Drop trackers of crawls that stopped reporting without a final status."""
+    cutoff_time = time.monotonic() - _crawl_tracker_idle_timeout
+    for progress_id, tracker in list(_crawl_trackers.items()):
+        if tracker.last_emit_time <= cutoff_time:
+            del _crawl_trackers[progress_id]
+
 
 # Crawl progress helper functions for knowledge API
 async def start_crawl_progress(progress_id: str, data: dict):
@@ -386,8 +398,12 @@ async def crawl_subscribe(sid, data=None):
         await sio.emit("error", {"message": "progress_id required"}, to=sid)
         return
 
-    # Enter the room
-    await sio.enter_room(sid, progress_id)
+    # Enter the room; a running crawl's tracker also sends the snapshot deltas apply to
+    tracker = _crawl_trackers.get(progress_id)
+    if tracker is not None:
+        await tracker.join_room(sid)
+    else:
+        await sio.enter_room(sid, progress_id)
     logger.info(f"✅ [SOCKETIO] Client {sid} subscribed to crawl progress room: {progress_id}")
     logger.info(f"Client {sid} subscribed to crawl progress {progress_id}")
 
@@ -433,39 +449,42 @@ async def crawl_subscribe(sid, data=None):
 
         traceback.print_exc()
 
-    # Check if there's an active task for this progress_id
-    task_manager = get_task_manager()
-    task_status = await task_manager.get_task_status(progress_id)
+    if tracker is not None:
+        logger.info(f"📤 [SOCKETIO] Sent crawl progress snapshot to {sid}")
+    else:
+        # No tracker yet - check if there's an active task for this progress_id
+        task_manager = get_task_manager()
+        task_status = await task_manager.get_task_status(progress_id)
 
-    if "error" not in task_status:
-        # There's an active task - send current progress state
-        current_progress = task_status.get("progress", 0)
-        current_status = task_status.get("status", "running")
-        last_update = task_status.get("last_update", {})
+        if "error" not in task_status:
+            # There's an active task - send current progress state
+            current_progress = task_status.get("progress", 0)
+            current_status = task_status.get("status", "running")
+            last_update = task_status.get("last_update", {})
 
-        logger.info(
-            f"📤 [SOCKETIO] Found active task for {progress_id}: status={current_status}, progress={current_progress}%"
-        )
+            logger.info(
+                f"📤 [SOCKETIO] Found active task for {progress_id}: status={current_status}, progress={current_progress}%"
+            )
 
-        # Send the complete last update state to the reconnecting client
-        # This includes all the fields like logs, currentUrl, etc.
-        current_state_data = last_update.copy() if last_update else {}
-        current_state_data.update({
-            "progressId": progress_id,
-            "status": current_status,
-            "percentage": current_progress,
-            "isReconnect": True,
-        })
+            # Send the complete last update state to the reconnecting client
+            # This includes all the fields like logs, currentUrl, etc.
+            current_state_data = last_update.copy() if last_update else {}
+            current_state_data.update({
+                "progressId": progress_id,
+                "status": current_status,
+                "percentage": current_progress,
+                "isReconnect": True,
+            })
 
-        # If no last_update, provide minimal data
-        if not last_update:
-            current_state_data["message"] = "Reconnected to active crawl"
+            # If no last_update, provide minimal data
+            if not last_update:
+                current_state_data["message"] = "Reconnected to active crawl"
 
-        await sio.emit("crawl_progress", current_state_data, to=sid)
-        logger.info(f"📤 [SOCKETIO] Sent current crawl state to reconnecting client {sid}")
-    else:
-        # No active task - just send acknowledgment
-        logger.info(f"📤 [SOCKETIO] No active task found for {progress_id}")
+            await sio.emit("crawl_progress", current_state_data, to=sid)
+            logger.info(f"📤 [SOCKETIO] Sent current crawl state to reconnecting client {sid}")
+        else:
+            # No active task - just send acknowledgment
+            logger.info(f"📤 [SOCKETIO] No active task found for {progress_id}")
 
     # Send acknowledgment
     ack_data = {"progress_id": progress_id, "status": "subscribed"}
@@ -602,9 +621,22 @@ async def crawl_stop(sid, data):
 # Document Synchronization Socket.IO Event Handlers
 # Real-time document collaboration with conflict resolution
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from typing import Any
 
+from ..services.document_sync_store import DocumentBusyError, get_document_sync_store
+from ..services.projects.json_patch import (
+    apply_patch,
+    escape_token,
+    paths_overlap,
+    touched_paths,
+)
+
+# Applied changes remembered per document for merging concurrent edits
+DOCUMENT_HISTORY_LIMIT = 100
+# Top-level fields of the document that change patches apply to
+DOCUMENT_FIELDS = frozenset({"title", "content", "metadata"})
+
 
 @dataclass
 class DocumentChange:
@@ -635,11 +667,44 @@ class DocumentState:
     last_modified_by: str
     is_locked: bool = False
     lock_expiry: float | None = None
+    # Changes applied per user, and the paths touched by recent versions
+    version_vector: dict[str, int] = field(default_factory=dict)
+    history: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class AppliedChange:
+    """A change merged into a document state, as broadcast to the room."""
+
+    patch: list[dict[str, Any]]
+    base_version: int
+    version: int
+    version_vector: dict[str, int]
+    merged: bool
+
 
+# Document states and locks live in the document sync store (in-memory, or Redis when
+# REDIS_URL is set so every API worker shares them)
 
-# In-memory document state storage (in production, use Redis or database)
-document_states: dict[str, DocumentState] = {}
-document_locks: dict[str, dict[str, Any]] = {}
+
+async def get_document_state(document_id: str) -> DocumentState | None:
+    """Load a document's sync state from the store."""
+    data = await get_document_sync_store().get_state(document_id)
+    return DocumentState(**data) if data is not None else None
+
+
+async def save_document_state(state: DocumentState) -> None:
+    """Write a document's sync state back to the store."""
+    await get_document_sync_store().save_state(asdict(state))
+
+
+async def set_document_lock_state(document_id: str, lock_expiry: float | None) -> None:
+    """Mirror a document's lock onto its state, if it has one (caller holds the mutex)."""
+    state = await get_document_state(document_id)
+    if state is not None:
+        state.is_locked = lock_expiry is not None
+        state.lock_expiry = lock_expiry
+        await save_document_state(state)
 
 
 @sio.event
@@ -658,8 +723,8 @@ async def join_document_room(sid, data):
     logger.info(f"📄 [DOCUMENT SYNC] Client {sid} joined document room: {room_name}")
 
     # Send current document state if exists
-    if document_id in document_states:
-        state = document_states[document_id]
+    state = await get_document_state(document_id)
+    if state is not None:
         await sio.emit("document_state", asdict(state), to=sid)
 
     await sio.emit(
@@ -690,9 +755,7 @@ async def request_document_states(sid, data):
         return
 
     # Get all documents for the project
-    project_docs = [
-        asdict(state) for state in document_states.values() if state.project_id == project_id
-    ]
+    project_docs = await get_document_sync_store().list_states(project_id)
 
     await sio.emit("document_states", project_docs, to=sid)
     logger.info(f"📄 [DOCUMENT SYNC] Sent {len(project_docs)} document states to {sid}")
@@ -708,7 +771,14 @@ async def document_change(sid, data):
             return
 
         change = DocumentChange(**change_data)
-        await process_document_change(sid, change)
+        conflict = await process_document_change(sid, change)
+
+        if conflict:
+            await sio.emit(
+                "conflicts_detected",
+                {"conflicts": [conflict], "document_id": change.document_id},
+                to=sid,
+            )
 
     except Exception as e:
         logger.error(f"📄 [DOCUMENT SYNC] Error processing document change: {e}")
@@ -731,17 +801,19 @@ async def document_batch_update(sid, data):
 
         # Process each change in the batch
         changes = [DocumentChange(**change_data) for change_data in changes_data]
+        applied_changes = []
         conflicts = []
 
         for change in changes:
-            conflict = await process_document_change(sid, change, broadcast=False)
+            applied, conflict = await apply_document_change(change)
             if conflict:
                 conflicts.append(conflict)
+            else:
+                applied_changes.append(applied)
 
-        # Broadcast the final state after all changes
-        if document_id in document_states:
+        # Broadcast the applied patches as one event, never the full document
+        if applied_changes:
             room_name = f"doc_{project_id}_{document_id}"
-            state = document_states[document_id]
 
             await sio.emit(
                 "document_updated",
@@ -751,9 +823,15 @@ async def document_batch_update(sid, data):
                     "project_id": project_id,
                     "user_id": changes[-1].user_id,
                     "timestamp": changes[-1].timestamp,
-                    "data": asdict(state),
-                    "version": state.version,
-                    "batch_size": len(changes),
+                    "patch": [
+                        operation for applied in applied_changes for operation in applied.patch
+                    ],
+                    "base_version": applied_changes[0].base_version,
+                    "version": applied_changes[-1].version,
+                    "versions": [applied.version for applied in applied_changes],
+                    "version_vector": applied_changes[-1].version_vector,
+                    "merged": any(applied.merged for applied in applied_changes),
+                    "batch_size": len(applied_changes),
                 },
                 room=room_name,
                 skip_sid=sid,
@@ -774,102 +852,178 @@ async def document_batch_update(sid, data):
         await sio.emit("error", {"message": f"Failed to process batch: {str(e)}"}, to=sid)
 
 
-async def process_document_change(
-    sid: str, change: DocumentChange, broadcast: bool = True
-) -> dict | None:
-    """Process a single document change with conflict detection."""
-    document_id = change.document_id
-    project_id = change.project_id
+def change_to_patch(change: DocumentChange, state: DocumentState) -> list[dict[str, Any]]:
+    """
+    Get the JSON patch for a change, relative to {"title", "content", "metadata"}.
 
-    # Get or create document state
-    if document_id not in document_states:
-        document_states[document_id] = DocumentState(
-            id=document_id,
-            project_id=project_id,
-            title="",
-            content={},
-            metadata={},
-            version=0,
-            last_modified=change.timestamp,
-            last_modified_by=change.user_id,
-        )
+    Clients may send the patch directly; otherwise it is derived from change_type and data
+    (dict data is merged key by key, anything else replaces the field).
+    """
+    if change.patch is not None:
+        return change.patch
 
-    state = document_states[document_id]
+    def merge_fields(field_name: str, current: Any, data: Any) -> list[dict[str, Any]]:
+        if isinstance(data, dict) and isinstance(current, dict):
+            return [
+                {"op": "add", "path": f"/{field_name}/{escape_token(key)}", "value": value}
+                for key, value in data.items()
+            ]
+        return [{"op": "replace", "path": f"/{field_name}", "value": data}]
 
-    # Check for conflicts (version or timestamp-based)
-    conflict = None
-    if change.version <= state.version:
-        # Version conflict - resolve based on timestamp
-        if change.timestamp > state.last_modified:
-            # Remote change is newer, apply it
-            logger.warning(
-                f"📄 [CONFLICT] Version conflict resolved by timestamp for {document_id}"
+    if change.change_type == "content":
+        return merge_fields("content", state.content, change.data)
+    if change.change_type == "title":
+        return [{"op": "replace", "path": "/title", "value": change.data.get("title", state.title)}]
+    if change.change_type == "metadata":
+        return merge_fields("metadata", state.metadata, change.data)
+    if change.change_type == "delete":
+        # Mark for deletion - in practice, you might want to soft delete
+        deletion = {
+            "deleted": True,
+            "deleted_by": change.user_id,
+            "deleted_at": change.timestamp,
+        }
+        return merge_fields("metadata", state.metadata, deletion)
+    return []
+
+
+async def apply_document_change(
+    change: DocumentChange,
+) -> tuple[AppliedChange | None, dict | None]:
+    """
+    Apply a change to the shared document state, merging it with concurrent changes.
+
+    change.version is the version the client expects to produce, so the change was made on top
+    of version - 1. Changes made on an older version are merged when no other user changed an
+    overlapping path since then, and rejected otherwise.
+
+    Returns:
+        Tuple of (applied change, None) or (None, conflict)
+    """
+    document_id = change.document_id
+    project_id = change.project_id
+    base_version = change.version - 1
+
+    # Another worker may be changing the same document, so read-modify-write under its mutex
+    async with get_document_sync_store().document_mutex(document_id):
+        state = await get_document_state(document_id)
+        if state is None:
+            state = DocumentState(
+                id=document_id,
+                project_id=project_id,
+                title="",
+                content={},
+                metadata={},
+                version=0,
+                last_modified=change.timestamp,
+                last_modified_by=change.user_id,
             )
-        else:
-            # Local state is newer, reject the change
-            conflict = {
-                "type": "version_conflict",
+
+        document = {"title": state.title, "content": state.content, "metadata": state.metadata}
+        patch = change_to_patch(change, state)
+        paths = touched_paths(document, patch)
+
+        # Check for conflicts with changes the client had not seen
+        merged = base_version < state.version
+        if merged:
+            oldest_known = state.history[0]["version"] if state.history else state.version + 1
+            if base_version + 1 < oldest_known:
+                # Changes since the base are no longer remembered, so treat the whole
+                # document ("" is the root pointer) as changed
+                conflicting_paths = [""]
+            else:
+                conflicting_paths = sorted({
+                    seen_path
+                    for entry in state.history
+                    if entry["version"] > base_version and entry["user_id"] != change.user_id
+                    for seen_path in entry["paths"]
+                    if any(paths_overlap(seen_path, path) for path in paths)
+                })
+            if conflicting_paths:
+                return None, {
+                    "type": "version_conflict",
+                    "document_id": document_id,
+                    "local_version": state.version,
+                    "remote_version": change.version,
+                    "conflicting_paths": conflicting_paths,
+                    "resolution": "rejected",
+                }
+            logger.info(
+                f"📄 [DOCUMENT SYNC] Merged change on version {base_version} into version "
+                f"{state.version} for {document_id}"
+            )
+
+        # Apply the change
+        try:
+            document = apply_patch(document, patch)
+            if not isinstance(document, dict) or not DOCUMENT_FIELDS <= document.keys():
+                raise ValueError(
+                    f"patch must leave a document with {', '.join(sorted(DOCUMENT_FIELDS))}"
+                )
+        except ValueError as e:
+            return None, {
+                "type": "invalid_patch",
                 "document_id": document_id,
-                "local_version": state.version,
                 "remote_version": change.version,
+                "message": str(e),
                 "resolution": "rejected",
             }
-            return conflict
-
-    # Check for simultaneous edits (within 1 second)
-    time_diff = abs(state.last_modified - change.timestamp)
-    if time_diff < 1000 and state.last_modified_by != change.user_id:
-        logger.warning(f"📄 [CONFLICT] Simultaneous edit detected for {document_id}")
-        conflict = {
-            "type": "simultaneous_edit",
-            "document_id": document_id,
-            "time_diff": time_diff,
-            "resolution": "last_write_wins",
-        }
 
-    # Apply the change
-    if change.change_type == "content":
-        if isinstance(change.data, dict) and isinstance(state.content, dict):
-            state.content.update(change.data)
-        else:
-            state.content = change.data
-    elif change.change_type == "title":
-        state.title = change.data.get("title", state.title)
-    elif change.change_type == "metadata":
-        if isinstance(change.data, dict) and isinstance(state.metadata, dict):
-            state.metadata.update(change.data)
-        else:
-            state.metadata = change.data
-    elif change.change_type == "delete":
-        # Mark for deletion - in practice, you might want to soft delete
-        state.metadata["deleted"] = True
-        state.metadata["deleted_by"] = change.user_id
-        state.metadata["deleted_at"] = change.timestamp
+        # Update state metadata
+        state.title = document["title"]
+        state.content = document["content"]
+        state.metadata = document["metadata"]
+        state.version += 1
+        state.version_vector[change.user_id] = state.version_vector.get(change.user_id, 0) + 1
+        state.history = [
+            *state.history,
+            {"version": state.version, "user_id": change.user_id, "paths": paths},
+        ][-DOCUMENT_HISTORY_LIMIT:]
+        state.last_modified = change.timestamp
+        state.last_modified_by = change.user_id
+        await save_document_state(state)
+
+    return AppliedChange(
+        patch=patch,
+        base_version=base_version,
+        version=state.version,
+        version_vector=dict(state.version_vector),
+        merged=merged,
+    ), None
 
-    # Update state metadata
-    state.version = max(state.version, change.version)
-    state.last_modified = change.timestamp
-    state.last_modified_by = change.user_id
 
-    # Broadcast change to other clients in the room if enabled
+async def process_document_change(
+    sid: str, change: DocumentChange, broadcast: bool = True
+) -> dict | None:
+    """Process a single document change with conflict detection."""
+    applied, conflict = await apply_document_change(change)
+    if conflict:
+        return conflict
+
+    # Broadcast the applied patch to other clients in the room if enabled
     if broadcast:
-        room_name = f"doc_{project_id}_{document_id}"
+        room_name = f"doc_{change.project_id}_{change.document_id}"
 
         event_data = {
             "type": "document_updated",
-            "document_id": document_id,
-            "project_id": project_id,
+            "document_id": change.document_id,
+            "project_id": change.project_id,
             "user_id": change.user_id,
             "timestamp": change.timestamp,
-            "data": change.data,
-            "version": state.version,
+            "patch": applied.patch,
+            "base_version": applied.base_version,
+            "version": applied.version,
+            "version_vector": applied.version_vector,
+            "merged": applied.merged,
             "change_type": change.change_type,
         }
 
         await sio.emit("document_updated", event_data, room=room_name, skip_sid=sid)
-        logger.info(f"📄 [DOCUMENT SYNC] Broadcasted {change.change_type} change for {document_id}")
+        logger.info(
+            f"📄 [DOCUMENT SYNC] Broadcasted {change.change_type} change for {change.document_id}"
+        )
 
-    return conflict
+    return None
 
 
 @sio.event
@@ -885,31 +1039,41 @@ async def lock_document(sid, data):
 
     current_time = time.time() * 1000  # Convert to milliseconds
     lock_expiry = current_time + lock_duration
+    store = get_document_sync_store()
 
-    # Check if document is already locked
-    if document_id in document_locks:
-        existing_lock = document_locks[document_id]
-        if existing_lock["expiry"] > current_time and existing_lock["user_id"] != user_id:
-            await sio.emit(
-                "lock_failed",
-                {
-                    "document_id": document_id,
-                    "reason": "already_locked",
-                    "locked_by": existing_lock["user_id"],
-                    "expires_at": existing_lock["expiry"],
-                },
-                to=sid,
-            )
-            return
-
-    # Create lock
-    document_locks[document_id] = {"user_id": user_id, "expiry": lock_expiry, "sid": sid}
-
-    # Update document state
-    if document_id in document_states:
-        state = document_states[document_id]
-        state.is_locked = True
-        state.lock_expiry = lock_expiry
+    try:
+        async with store.document_mutex(document_id):
+            # Check if document is already locked
+            existing_lock = await store.get_lock(document_id)
+            if (
+                existing_lock
+                and existing_lock["expiry"] > current_time
+                and existing_lock["user_id"] != user_id
+            ):
+                await sio.emit(
+                    "lock_failed",
+                    {
+                        "document_id": document_id,
+                        "reason": "already_locked",
+                        "locked_by": existing_lock["user_id"],
+                        "expires_at": existing_lock["expiry"],
+                    },
+                    to=sid,
+                )
+                return
+
+            # Create lock
+            await store.save_lock(document_id, {"user_id": user_id, "expiry": lock_expiry, "sid": sid})
+
+            # Update document state
+            await set_document_lock_state(document_id, lock_expiry)
+    except DocumentBusyError as e:
+        await sio.emit(
+            "lock_failed",
+            {"document_id": document_id, "reason": "busy", "message": str(e)},
+            to=sid,
+        )
+        return
 
     # Broadcast lock event
     project_id = data.get("project_id", "")
@@ -941,29 +1105,37 @@ async def unlock_document(sid, data):
         await sio.emit("error", {"message": "document_id and user_id required"}, to=sid)
         return
 
-    # Check if user owns the lock
-    if document_id in document_locks:
-        existing_lock = document_locks[document_id]
-        if existing_lock["user_id"] != user_id:
-            await sio.emit(
-                "unlock_failed",
-                {
-                    "document_id": document_id,
-                    "reason": "not_lock_owner",
-                    "locked_by": existing_lock["user_id"],
-                },
-                to=sid,
-            )
-            return
-
-        # Remove lock
-        del document_locks[document_id]
+    store = get_document_sync_store()
 
-    # Update document state
-    if document_id in document_states:
-        state = document_states[document_id]
-        state.is_locked = False
-        state.lock_expiry = None
+    try:
+        async with store.document_mutex(document_id):
+            # Check if user owns the lock
+            existing_lock = await store.get_lock(document_id)
+            if existing_lock:
+                if existing_lock["user_id"] != user_id:
+                    await sio.emit(
+                        "unlock_failed",
+                        {
+                            "document_id": document_id,
+                            "reason": "not_lock_owner",
+                            "locked_by": existing_lock["user_id"],
+                        },
+                        to=sid,
+                    )
+                    return
+
+                # Remove lock
+                await store.delete_lock(document_id)
+
+            # Update document state
+            await set_document_lock_state(document_id, None)
+    except DocumentBusyError as e:
+        await sio.emit(
+            "unlock_failed",
+            {"document_id": document_id, "reason": "busy", "message": str(e)},
+            to=sid,
+        )
+        return
 
     # Broadcast unlock event
     project_id = data.get("project_id", "")
@@ -998,12 +1170,15 @@ async def delete_document(sid, data):
         )
         return
 
-    # Remove from local state
-    if document_id in document_states:
-        del document_states[document_id]
-
-    if document_id in document_locks:
-        del document_locks[document_id]
+    # Remove from shared state
+    store = get_document_sync_store()
+    try:
+        async with store.document_mutex(document_id):
+            await store.delete_state(document_id)
+            await store.delete_lock(document_id)
+    except DocumentBusyError as e:
+        await sio.emit("error", {"message": str(e)}, to=sid)
+        return
 
     # Broadcast deletion
     room_name = f"doc_{project_id}_{document_id}"
@@ -1028,27 +1203,38 @@ async def delete_document(sid, data):
 async def cleanup_expired_locks():
     """Clean up expired document locks."""
     current_time = time.time() * 1000
-    expired_locks = []
+    store = get_document_sync_store()
+    locks = await store.list_locks()
 
-    for document_id, lock_info in document_locks.items():
-        if lock_info["expiry"] <= current_time:
-            expired_locks.append(document_id)
+    expired_locks = [
+        document_id
+        for document_id, lock_info in locks.items()
+        if lock_info["expiry"] <= current_time
+    ]
 
     for document_id in expired_locks:
-        logger.info(f"📄 [DOCUMENT SYNC] Cleaning up expired lock for {document_id}")
-
-        # Update document state
-        if document_id in document_states:
-            state = document_states[document_id]
-            state.is_locked = False
-            state.lock_expiry = None
-
-        # Remove lock
-        del document_locks[document_id]
+        try:
+            async with store.document_mutex(document_id):
+                # The lock may have been renewed, or already cleaned up by another worker
+                lock_info = await store.get_lock(document_id)
+                if not lock_info or lock_info["expiry"] > current_time:
+                    continue
+                if not await store.delete_lock(document_id):
+                    continue
+
+                logger.info(f"📄 [DOCUMENT SYNC] Cleaning up expired lock for {document_id}")
+
+                # Update document state
+                await set_document_lock_state(document_id, None)
+                state = await get_document_state(document_id)
+        except DocumentBusyError:
+            # Still expired on the next sweep, so retry then
+            logger.warning(f"📄 [DOCUMENT SYNC] {document_id} busy, skipping lock cleanup")
+            continue
 
         # Broadcast unlock event (find project_id from state)
-        if document_id in document_states:
-            project_id = document_states[document_id].project_id
+        if state is not None:
+            project_id = state.project_id
             room_name = f"doc_{project_id}_{document_id}"
 
             await sio.emit(
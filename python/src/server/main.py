@@ -164,6 +164,38 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             api_logger.warning("Could not cleanup background task manager", error=str(e))
 
+        # Close pooled LLM provider clients
+        try:
+            from .services.llm_provider_service import close_llm_clients
+
+            await close_llm_clients()
+        except Exception as e:
+            api_logger.warning("Could not close LLM clients", error=str(e))
+
+        # Close the bulk writer's database pool
+        try:
+            from .services.storage.bulk_writer import close_bulk_pool
+
+            await close_bulk_pool()
+        except Exception as e:
+            api_logger.warning("Could not close bulk writer pool", error=str(e))
+
+        # Close the document sync store's Redis connection
+        try:
+            from .services.document_sync_store import close_document_sync_store
+
+            await close_document_sync_store()
+        except Exception as e:
+            api_logger.warning("Could not close document sync store", error=str(e))
+
+        # Stop code extraction worker processes
+        try:
+            from .services.crawling.code_extraction_engine import shutdown_code_extraction_pool
+
+            shutdown_code_extraction_pool()
+        except Exception as e:
+            api_logger.warning("Could not stop code extraction workers", error=str(e))
+
         api_logger.info("✅ Cleanup completed")
 
     except Exception as e:
@@ -2,14 +2,21 @@
 Client Manager Service
 
 Manages database and API client connections.
+
+Services run inside a single asyncio event loop, so database calls must not block it:
+execute_async() runs any PostgREST query builder without blocking, awaiting it natively
+for async clients and on the threading service's I/O pool for sync ones.
 """
 
+import inspect
 import os
 import re
+from typing import Any
 
 from supabase import Client, create_client
 
 from ..config.logfire_config import search_logger
+from .threading_service import get_threading_service
 
 
 def get_supabase_client() -> Client:
@@ -41,3 +48,22 @@ def get_supabase_client() -> Client:
     except Exception as e:
         search_logger.error(f"Failed to create Supabase client: {e}")
         raise
+
+
+async def execute_async(query: Any) -> Any:
+    """
+    Execute a PostgREST query builder without blocking the event loop.
+
+    Accepts builders from either client: async builders are awaited directly, while sync
+    builders are executed on the threading service's I/O pool, so services can swap
+    `query.execute()` for `await execute_async(query)` whichever client they hold.
+
+    Args:
+        query: A query builder exposing execute() (table/from_/rpc chains)
+
+    Returns:
+        The PostgREST API response
+    """
+    if inspect.iscoroutinefunction(query.execute):
+        return await query.execute()
+    return await get_threading_service().run_io_bound(query.execute)
@@ -0,0 +1,191 @@
+"""
+Content-Addressed Cache
+
+Base class for caches of values derived from content (embeddings, generated summaries and
+contexts), addressed by sha256 hashes of that content.
+
+Two tiers are consulted in order:
+1. An in-process LRU holding recently used values
+2. A Supabase table, so values survive restarts and re-crawls
+
+An entry is identified by scope columns that are fixed for one call (e.g. the model) plus key
+columns holding content hashes. Cache failures are never fatal - a broken table tier simply
+degrades to a miss.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Generic, TypeVar
+
+from ..config.logfire_config import search_logger
+from .client_manager import execute_async, get_supabase_client
+
+# PostgREST encodes IN filters into the query string, so keep lookups bounded
+_TABLE_LOOKUP_CHUNK_SIZE = 100
+
+V = TypeVar("V")
+Scope = tuple[Any, ...]  # scope column values, in scope_columns order
+Key = tuple[str, ...]  # key column values, in key_columns order
+
+
+def hash_text(text: str) -> str:
+    """Return the sha256 hex digest used as the content address for a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ContentAddressedCache(Generic[V]):
+    """
+    Two-tier (LRU + table) cache. Subclasses name the table and its columns and expose
+    get_many/put_many in terms of their own keys, built on _get_many/_put_many.
+
+    The table needs a unique constraint over scope_columns + key_columns. Lookups match every
+    column with eq except the last key column, which is fetched with an IN filter.
+    """
+
+    table: str
+    scope_columns: tuple[str, ...] = ("model",)
+    key_columns: tuple[str, ...] = ("content_hash",)
+    value_columns: tuple[str, ...] = ()
+
+    def __init__(self, max_entries: int = 5000, use_table: bool = True):
+        self.max_entries = max_entries
+        self.use_table = use_table
+        self._memory: OrderedDict[tuple, Any] = OrderedDict()
+        self._supabase = None
+
+        # Cumulative counters since process start
+        self.memory_hits = 0
+        self.table_hits = 0
+        self.misses = 0
+
+    def _get_client(self):
+        if self._supabase is None:
+            self._supabase = get_supabase_client()
+        return self._supabase
+
+    def _to_memory(self, value: V) -> Any:
+        """Convert a value to the form kept in the LRU tier."""
+        return value
+
+    def _from_memory(self, stored: Any) -> V:
+        return stored
+
+    def _value_to_row(self, value: V) -> dict[str, Any]:
+        """Table columns for a value: the value itself, or a dict with one item per column."""
+        if len(self.value_columns) == 1:
+            return {self.value_columns[0]: value}
+        return {column: value[column] for column in self.value_columns}
+
+    def _value_from_row(self, row: dict[str, Any]) -> V | None:
+        """Value stored in a table row, or None to treat the row as a miss."""
+        if len(self.value_columns) == 1:
+            return row.get(self.value_columns[0])
+        return {column: row[column] for column in self.value_columns}
+
+    def _remember(self, scope: Scope, key: Key, value: V) -> None:
+        memory_key = (*scope, *key)
+        self._memory[memory_key] = self._to_memory(value)
+        self._memory.move_to_end(memory_key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _lookup(self, scope: Scope, keys: list[Key]) -> tuple[dict[Key, V], set[Key]]:
+        """
+        Look up values without touching the counters.
+
+        Returns:
+            Mapping of key to value for the keys found, and the keys served from memory
+        """
+        found: dict[Key, V] = {}
+        from_memory: set[Key] = set()
+        pending: list[Key] = []
+
+        for key in dict.fromkeys(keys):
+            memory_key = (*scope, *key)
+            cached = self._memory.get(memory_key)
+            if cached is not None:
+                self._memory.move_to_end(memory_key)
+                found[key] = self._from_memory(cached)
+                from_memory.add(key)
+            else:
+                pending.append(key)
+
+        if pending and self.use_table:
+            for key, value in (await self._fetch_from_table(scope, pending)).items():
+                self._remember(scope, key, value)
+                found[key] = value
+
+        return found, from_memory
+
+    async def _get_many(self, scope: Scope, keys: list[Key]) -> dict[Key, V]:
+        """Look up values for a list of keys, counting hits and misses per unique key."""
+        found, from_memory = await self._lookup(scope, keys)
+        self.memory_hits += len(from_memory)
+        self.table_hits += len(found) - len(from_memory)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    async def _put_many(self, scope: Scope, values: dict[Key, V]) -> None:
+        """Store freshly created values in both cache tiers."""
+        rows = []
+        for key, value in values.items():
+            self._remember(scope, key, value)
+            rows.append({
+                **dict(zip(self.scope_columns, scope, strict=True)),
+                **dict(zip(self.key_columns, key, strict=True)),
+                **self._value_to_row(value),
+            })
+
+        if rows and self.use_table:
+            try:
+                await execute_async(
+                    self._get_client()
+                    .table(self.table)
+                    .upsert(rows, on_conflict=",".join(self.scope_columns + self.key_columns))
+                )
+            except Exception as e:
+                search_logger.warning(f"Failed to persist {len(rows)} rows to {self.table}: {e}")
+
+    async def _fetch_from_table(self, scope: Scope, keys: list[Key]) -> dict[Key, V]:
+        *prefix_columns, last_column = self.key_columns
+        eq_columns = (*self.scope_columns, *prefix_columns)
+
+        # Keys sharing all but their last column are fetched together
+        groups: dict[Key, list[str]] = {}
+        for key in keys:
+            groups.setdefault(key[:-1], []).append(key[-1])
+
+        found: dict[Key, V] = {}
+        try:
+            client = self._get_client()
+            for prefix, last_values in groups.items():
+                for i in range(0, len(last_values), _TABLE_LOOKUP_CHUNK_SIZE):
+                    query = client.table(self.table).select(
+                        ", ".join((last_column, *self.value_columns))
+                    )
+                    for column, value in zip(eq_columns, (*scope, *prefix), strict=True):
+                        query = query.eq(column, value)
+                    response = await execute_async(
+                        query.in_(last_column, last_values[i : i + _TABLE_LOOKUP_CHUNK_SIZE])
+                    )
+                    for row in response.data or []:
+                        value = self._value_from_row(row)
+                        if value is not None:
+                            found[(*prefix, row[last_column])] = value
+        except Exception as e:
+            search_logger.warning(f"Cache table lookup on {self.table} failed: {e}")
+        return found
+
+    def get_stats(self) -> dict[str, int]:
+        """Get cumulative hit/miss counters and current LRU size."""
+        return {
+            "memory_hits": self.memory_hits,
+            "table_hits": self.table_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self) -> None:
+        """Drop all in-process entries (the table tier is left untouched)."""
+        self._memory.clear()
@@ -0,0 +1,1273 @@
+"""
+Code Extraction Engine
+
+CPU-bound code block extraction, cleaning and validation for crawled documents.
+
+Everything here is synchronous and depends only on a CodeExtractionSettings snapshot, so
+documents can be fanned out to a process pool: regex-heavy extraction then runs on other
+cores instead of blocking the event loop. Pattern tables are compiled once at import time.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlparse
+
+from ...config.logfire_config import safe_logfire_error, safe_logfire_info
+from ..storage.code_storage_service import extract_code_blocks
+from ..threading_service import get_threading_service
+
+
+@dataclass(frozen=True)
+class CodeExtractionSettings:
+    """Code extraction settings, resolved once per extraction run."""
+
+    min_code_length: int = 250
+    max_code_length: int = 5000
+    prose_filtering: bool = True
+    max_prose_ratio: float = 0.15
+    min_code_indicators: int = 3
+    diagram_filtering: bool = True
+    contextual_length: bool = True
+    context_window_size: int = 1000
+    workers: int = 0  # Extraction processes; 0 picks one per spare CPU core
+
+    def as_setting_overrides(self) -> dict[str, str]:
+        """Settings in archon_settings form, for extract_code_blocks' markdown fallback."""
+        return {
+            "MIN_CODE_BLOCK_LENGTH": str(self.min_code_length),
+            "MAX_CODE_BLOCK_LENGTH": str(self.max_code_length),
+            "ENABLE_PROSE_FILTERING": str(self.prose_filtering).lower(),
+            "MAX_PROSE_RATIO": str(self.max_prose_ratio),
+            "MIN_CODE_INDICATORS": str(self.min_code_indicators),
+            "ENABLE_DIAGRAM_FILTERING": str(self.diagram_filtering).lower(),
+            "ENABLE_CONTEXTUAL_LENGTH": str(self.contextual_length).lower(),
+            "CONTEXT_WINDOW_SIZE": str(self.context_window_size),
+        }
+
+
+# Language-specific patterns for better extraction
+LANGUAGE_PATTERNS = {
+    "typescript": {
+        "block_start": r"^\s*(export\s+)?(class|interface|function|const|type|enum)\s+\w+",
+        "block_end": r"^\}(\s*;)?$",
+        "min_indicators": [":", "{", "}", "=>", "function", "class", "interface", "type"],
+    },
+    "javascript": {
+        "block_start": r"^\s*(export\s+)?(class|function|const|let|var)\s+\w+",
+        "block_end": r"^\}(\s*;)?$",
+        "min_indicators": ["function", "{", "}", "=>", "const", "let", "var"],
+    },
+    "python": {
+        "block_start": r"^\s*(class|def|async\s+def)\s+\w+",
+        "block_end": r"^\S",  # Unindented line
+        "min_indicators": ["def", ":", "return", "self", "import", "class"],
+    },
+    "java": {
+        "block_start": r"^\s*(public|private|protected)?\s*(class|interface|enum)\s+\w+",
+        "block_end": r"^\}$",
+        "min_indicators": ["class", "public", "private", "{", "}", ";"],
+    },
+    "rust": {
+        "block_start": r"^\s*(pub\s+)?(fn|struct|impl|trait|enum)\s+\w+",
+        "block_end": r"^\}$",
+        "min_indicators": ["fn", "let", "mut", "impl", "struct", "->"],
+    },
+    "go": {
+        "block_start": r"^\s*(func|type|struct)\s+\w+",
+        "block_end": r"^\}$",
+        "min_indicators": ["func", "type", "struct", "{", "}", ":="],
+    },
+}
+
+# Comprehensive patterns for various code block formats
+# Order matters - more specific patterns first
+_HTML_CODE_PATTERN_SOURCES = [
+    # GitHub/GitLab patterns
+    (
+        r'<div[^>]*class=["\'][^"\']*highlight[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*(?:language-)?(\w+)[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
+        "github-highlight",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*snippet-clipboard-content[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
+        "github-snippet",
+    ),
+    # Docusaurus patterns
+    (
+        r'<div[^>]*class=["\'][^"\']*codeBlockContainer[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*prism-code[^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</pre>',
+        "docusaurus",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>.*?<pre[^>]*class=["\'][^"\']*prism-code[^"\']*["\'][^>]*>(.*?)</pre>',
+        "docusaurus-alt",
+    ),
+    # Milkdown specific patterns - check their actual HTML structure
+    (
+        r'<pre[^>]*><code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code></pre>',
+        "milkdown-typed",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*code-wrapper[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+        "milkdown-wrapper",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*code-block-wrapper[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
+        "milkdown-wrapper-code",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*milkdown-code-block[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
+        "milkdown-code-block",
+    ),
+    (
+        r'<pre[^>]*class=["\'][^"\']*code-block[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
+        "milkdown",
+    ),
+    (r"<div[^>]*data-code-block[^>]*>.*?<pre[^>]*>(.*?)</pre>", "milkdown-alt"),
+    (
+        r'<div[^>]*class=["\'][^"\']*milkdown[^"\']*["\'][^>]*>.*?<pre[^>]*><code[^>]*>(.*?)</code></pre>',
+        "milkdown-div",
+    ),
+    # Monaco Editor - capture all view-lines content
+    (
+        r'<div[^>]*class=["\'][^"\']*monaco-editor[^"\']*["\'][^>]*>.*?<div[^>]*class=["\'][^"\']*view-lines[^"\']*[^>]*>(.*?)</div>(?=.*?</div>.*?</div>)',
+        "monaco",
+    ),
+    # CodeMirror patterns
+    (
+        r'<div[^>]*class=["\'][^"\']*cm-content[^"\']*["\'][^>]*>((?:<div[^>]*class=["\'][^"\']*cm-line[^"\']*["\'][^>]*>.*?</div>\s*)+)</div>',
+        "codemirror",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*CodeMirror[^"\']*["\'][^>]*>.*?<div[^>]*class=["\'][^"\']*CodeMirror-code[^"\']*["\'][^>]*>(.*?)</div>',
+        "codemirror-legacy",
+    ),
+    # Prism.js with language - must be before generic pre
+    (
+        r'<pre[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>',
+        "prism",
+    ),
+    (
+        r'<pre[^>]*>\s*<code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code>\s*</pre>',
+        "prism-alt",
+    ),
+    # highlight.js - must be before generic pre/code
+    (
+        r'<pre[^>]*><code[^>]*class=["\'][^"\']*hljs(?:\s+language-(\w+))?[^"\']*["\'][^>]*>(.*?)</code></pre>',
+        "hljs",
+    ),
+    (
+        r'<pre[^>]*class=["\'][^"\']*hljs[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
+        "hljs-pre",
+    ),
+    # Shiki patterns (VitePress, Astro, etc.)
+    (
+        r'<pre[^>]*class=["\'][^"\']*shiki[^"\']*["\'][^>]*(?:.*?style=["\'][^"\']*background-color[^"\']*["\'])?[^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>',
+        "shiki",
+    ),
+    (r'<pre[^>]*class=["\'][^"\']*astro-code[^"\']*["\'][^>]*>(.*?)</pre>', "astro-shiki"),
+    (
+        r'<div[^>]*class=["\'][^"\']*astro-code[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+        "astro-wrapper",
+    ),
+    # VitePress/Vue patterns
+    (
+        r'<div[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+        "vitepress",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*vp-code[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+        "vitepress-vp",
+    ),
+    # Nextra patterns
+    (r"<div[^>]*data-nextra-code[^>]*>.*?<pre[^>]*>(.*?)</pre>", "nextra"),
+    (
+        r'<pre[^>]*class=["\'][^"\']*nx-[^"\']*["\'][^>]*><code[^>]*>(.*?)</code></pre>',
+        "nextra-nx",
+    ),
+    # Standard pre/code patterns - should be near the end
+    (
+        r'<pre[^>]*><code[^>]*class=["\'][^"\']*language-(\w+)[^"\']*["\'][^>]*>(.*?)</code></pre>',
+        "standard-lang",
+    ),
+    (r"<pre[^>]*>\s*<code[^>]*>(.*?)</code>\s*</pre>", "standard"),
+    # Generic patterns - should be last
+    (
+        r'<div[^>]*class=["\'][^"\']*code-block[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+        "generic-div",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*codeblock[^"\']*["\'][^>]*>(.*?)</div>',
+        "generic-codeblock",
+    ),
+    (
+        r'<div[^>]*class=["\'][^"\']*highlight[^"\']*["\'][^>]*>.*?<pre[^>]*>(.*?)</pre>',
+        "highlight",
+    ),
+]
+
+# These HTML patterns capture the language in group 1 and the code in group 2
+_LANGUAGE_GROUP_SOURCE_TYPES = frozenset(
+    ["standard-lang", "prism", "vitepress", "hljs", "milkdown-typed"]
+)
+
+_TEXT_LANGUAGE_LABEL_SOURCE = r"(?:^|\n)((?:typescript|javascript|python|java|c\+\+|rust|go|ruby|php|swift|kotlin|scala|r|matlab|julia|dart|elixir|erlang|haskell|clojure|lua|perl|shell|bash|sql|html|css|xml|json|yaml|toml|ini|dockerfile|makefile|cmake|gradle|maven|npm|yarn|pip|cargo|gem|pod|composer|nuget|apt|yum|brew|choco|snap|flatpak|appimage|msi|exe|dmg|pkg|deb|rpm|tar|zip|7z|rar|gz|bz2|xz|zst|lz4|lzo|lzma|lzip|lzop|compress|uncompress|gzip|gunzip|bzip2|bunzip2|xz|unxz|zstd|unzstd|lz4|unlz4|lzo|unlzo|lzma|unlzma|lzip|lunzip|lzop|unlzop)\s*(?:code|example|snippet)?)[:\s]*\n((?:(?:^[ \t]+.*\n?)+)|(?:.*\n)+?)(?=\n(?:[A-Z][a-z]+\s*:|^\s*$|\n#|\n\*|\n-|\n\d+\.))"
+
+# Language detection patterns
+_LANGUAGE_DETECTION_SOURCES = {
+    "python": [
+        r"\bdef\s+\w+\s*\(",
+        r"\bclass\s+\w+",
+        r"\bimport\s+\w+",
+        r"\bfrom\s+\w+\s+import",
+    ],
+    "javascript": [
+        r"\bfunction\s+\w+\s*\(",
+        r"\bconst\s+\w+\s*=",
+        r"\blet\s+\w+\s*=",
+        r"\bvar\s+\w+\s*=",
+    ],
+    "typescript": [
+        r"\binterface\s+\w+",
+        r":\s*\w+\[\]",
+        r"\btype\s+\w+\s*=",
+        r"\bclass\s+\w+.*\{",
+    ],
+    "java": [
+        r"\bpublic\s+class\s+\w+",
+        r"\bprivate\s+\w+\s+\w+",
+        r"\bpublic\s+static\s+void\s+main",
+    ],
+    "rust": [r"\bfn\s+\w+\s*\(", r"\blet\s+mut\s+\w+", r"\bimpl\s+\w+", r"\bstruct\s+\w+"],
+    "go": [r"\bfunc\s+\w+\s*\(", r"\bpackage\s+\w+", r"\btype\s+\w+\s+struct"],
+}
+
+# Natural code boundaries used to extend a block that is too short
+_BOUNDARY_PATTERN_SOURCES = [
+    r"\n}\s*$",  # Closing brace at end of line
+    r"\n}\s*;?\s*$",  # Closing brace with optional semicolon
+    r"\n\)\s*;?\s*$",  # Closing parenthesis
+    r"\n\s*$\n\s*$",  # Double newline (paragraph break)
+    r"\n(?=class\s)",  # Before next class
+    r"\n(?=function\s)",  # Before next function
+    r"\n(?=def\s)",  # Before next Python function
+    r"\n(?=export\s)",  # Before next export
+    r"\n(?=const\s)",  # Before next const declaration
+    r"\n(?=//)",  # Before comment block
+    r"\n(?=#)",  # Before Python comment
+    r"\n(?=\*)",  # Before JSDoc/comment
+    r"\n(?=```)",  # Before next code block
+]
+
+# Common patterns where spaces are missing between keywords after span removal
+_SPACING_FIX_SOURCES = [
+    # Import statements
+    (r"(\b(?:from|import|as)\b)([A-Za-z])", r"\1 \2"),
+    # Function/class definitions
+    (r"(\b(?:def|class|async|await|return|raise|yield)\b)([A-Za-z])", r"\1 \2"),
+    # Control flow
+    (r"(\b(?:if|elif|else|for|while|try|except|finally|with)\b)([A-Za-z])", r"\1 \2"),
+    # Type hints and declarations
+    (
+        r"(\b(?:int|str|float|bool|list|dict|tuple|set|None|True|False)\b)([A-Za-z])",
+        r"\1 \2",
+    ),
+    # Common Python keywords
+    (r"(\b(?:and|or|not|in|is|lambda)\b)([A-Za-z])", r"\1 \2"),
+    # Fix missing spaces around operators (but be careful with negative numbers)
+    (r"([A-Za-z_)])(\+|-|\*|/|=|<|>|%)", r"\1 \2"),
+    (r"(\+|-|\*|/|=|<|>|%)([A-Za-z_(])", r"\1 \2"),
+]
+
+# Formatting issues that indicate poor extraction
+_BAD_PATTERN_SOURCES = [
+    # Concatenated keywords without spaces (but allow camelCase)
+    r"\b(from|import|def|class|if|for|while|return)(?=[a-z])",
+    # HTML entities that weren't decoded
+    r"&[lg]t;|&amp;|&quot;|&#\d+;",
+    # Excessive HTML tags
+    r"<[^>]{50,}>",  # Very long HTML tags
+    # Multiple spans in a row (indicates poor extraction)
+    r"(<span[^>]*>){5,}",
+    # Suspicious character sequences
+    r"[^\s]{200,}",  # Very long unbroken strings (increased threshold)
+]
+
+# Indicators of minimum code complexity
+_CODE_INDICATOR_SOURCES = {
+    "function_calls": r"\w+\s*\([^)]*\)",
+    "assignments": r"\w+\s*=\s*.+",
+    "control_flow": r"\b(if|for|while|switch|case|try|catch|except)\b",
+    "declarations": r"\b(var|let|const|def|class|function|interface|type|struct|enum)\b",
+    "imports": r"\b(import|from|require|include|using|use)\b",
+    "brackets": r"[\{\}\[\]]",
+    "operators": r"[\+\-\*\/\%\&\|\^<>=!]",
+    "method_chains": r"\.\w+",
+    "arrows": r"(=>|->)",
+    "keywords": r"\b(return|break|continue|yield|await|async)\b",
+}
+
+_COMMENT_PATTERN_SOURCES = [
+    r"^\s*(//|#|/\*|\*|<!--)",  # Single line comments
+    r'^\s*"""',  # Python docstrings
+    r"^\s*'''",  # Python docstrings alt
+    r"^\s*\*\s",  # JSDoc style
+]
+
+_PROSE_INDICATOR_SOURCES = [
+    r"\b(the|this|that|these|those|is|are|was|were|will|would|should|could|have|has|had)\b",
+    r"[.!?]\s+[A-Z]",  # Sentence endings followed by capital letter
+    r"\b(however|therefore|furthermore|moreover|nevertheless)\b",
+]
+
+# Compiled pattern tables
+HTML_CODE_PATTERNS = [
+    (re.compile(source, re.DOTALL | re.IGNORECASE), source_type)
+    for source, source_type in _HTML_CODE_PATTERN_SOURCES
+]
+LANGUAGE_BLOCK_END_PATTERNS = {
+    language: re.compile(info["block_end"], re.MULTILINE)
+    for language, info in LANGUAGE_PATTERNS.items()
+}
+LANGUAGE_DETECTION_PATTERNS = {
+    language: [re.compile(source, re.MULTILINE) for source in sources]
+    for language, sources in _LANGUAGE_DETECTION_SOURCES.items()
+}
+BOUNDARY_PATTERNS = [re.compile(source, re.MULTILINE) for source in _BOUNDARY_PATTERN_SOURCES]
+SPACING_FIXES = [(re.compile(source), replacement) for source, replacement in _SPACING_FIX_SOURCES]
+BAD_CODE_PATTERNS = [re.compile(source) for source in _BAD_PATTERN_SOURCES]
+CODE_INDICATOR_PATTERNS = {
+    name: re.compile(source) for name, source in _CODE_INDICATOR_SOURCES.items()
+}
+COMMENT_LINE_PATTERNS = [re.compile(source) for source in _COMMENT_PATTERN_SOURCES]
+PROSE_INDICATOR_PATTERNS = [
+    re.compile(source, re.IGNORECASE) for source in _PROSE_INDICATOR_SOURCES
+]
+
+_PRE_TAG = re.compile(r"<pre[^>]*>", re.IGNORECASE)
+_CLASS_LANGUAGE = re.compile(r'class=["\'].*?language-(\w+)')
+_CODEMIRROR_LINE = re.compile(
+    r'<div[^>]*class=["\'][^"\']*cm-line[^"\']*["\'][^>]*>(.*?)</div>', re.DOTALL
+)
+_STANDALONE_CODE = re.compile(r"<code[^>]*>(.*?)</code>", re.DOTALL | re.IGNORECASE)
+_TEXT_BACKTICK_BLOCK = re.compile(r"```(\w*)[^\n]*\n(.*?)```", re.DOTALL | re.MULTILINE)
+_TEXT_LANGUAGE_LABEL = re.compile(_TEXT_LANGUAGE_LABEL_SOURCE, re.IGNORECASE | re.MULTILINE)
+_LEADING_WORD = re.compile(r"(\w+)")
+_SPAN_OPEN = re.compile(r"<span[^>]*>")
+_SPAN_CLOSE = re.compile(r"</span>")
+_SPAN_CLOSE_BEFORE_WORD = re.compile(r"</span>(?=[A-Za-z0-9])")
+_DIV_OPEN = re.compile(r"<div[^>]*>")
+_DIV_CLOSE = re.compile(r"</div>")
+_HTML_TAG = re.compile(r"</?[^>]+>")
+_SPACE_RUN = re.compile(r" +")
+_MULTI_SPACE = re.compile(r" {2,}")
+_PYTHON_IMPORT_SPACING = re.compile(r"(\b(?:from|import)\b)(\w+)(\b(?:import)\b)")
+_PYTHON_MISSING_COLON = re.compile(
+    r"(\b(?:def|class|if|elif|else|for|while|try|except|finally|with)\b[^:]+)$", re.MULTILINE
+)
+
+
+class CodeBlockExtractor:
+    """
+    Extracts code blocks from a single crawled document.
+    """
+
+    def __init__(self, settings: CodeExtractionSettings):
+        self.settings = settings
+
+    def extract_document(self, doc: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Extract code blocks from one document, trying text-file, HTML and markdown extraction.
+
+        Args:
+            doc: Crawled document with url, html, markdown and optional content_type
+
+        Returns:
+            Code blocks tagged with source_url and source_id
+        """
+        source_url = doc["url"]
+        html_content = doc.get("html", "")
+        md = doc.get("markdown", "")
+
+        safe_logfire_info(
+            f"Document content check | url={source_url} | has_html={bool(html_content)} | has_markdown={bool(md)} | html_len={len(html_content) if html_content else 0} | md_len={len(md) if md else 0}"
+        )
+
+        # Improved extraction logic - check for text files first, then HTML, then markdown
+        code_blocks = []
+
+        # Check if this is a text file (e.g., .txt, .md)
+        is_text_file = source_url.endswith((
+            ".txt",
+            ".text",
+            ".md",
+        )) or "text/plain" in doc.get("content_type", "")
+
+        if is_text_file:
+            # For text files, the HTML content should be the raw text (not wrapped in <pre>)
+            text_content = html_content if html_content else md
+            if text_content:
+                safe_logfire_info(
+                    f"🎯 TEXT FILE DETECTED | url={source_url} | using {'HTML' if html_content else 'MARKDOWN'} content"
+                )
+                code_blocks = self.extract_text_file_code_blocks(text_content, source_url)
+                safe_logfire_info(
+                    f"📦 Text extraction complete | found={len(code_blocks)} blocks | url={source_url}"
+                )
+            else:
+                safe_logfire_info(f"⚠️ NO CONTENT for text file | url={source_url}")
+
+        # If not a text file or no code blocks found, try HTML extraction first
+        if len(code_blocks) == 0 and html_content and not is_text_file:
+            html_code_blocks = self.extract_html_code_blocks(html_content)
+            if html_code_blocks:
+                code_blocks = html_code_blocks
+                safe_logfire_info(
+                    f"Found {len(code_blocks)} code blocks from HTML | url={source_url}"
+                )
+
+        # If still no code blocks, try markdown extraction as fallback
+        if len(code_blocks) == 0 and md and "```" in md:
+            # Markdown extraction keeps its fixed 250-character default minimum
+            code_blocks = extract_code_blocks(
+                md, min_length=250, settings=self.settings.as_setting_overrides()
+            )
+            safe_logfire_info(
+                f"Found {len(code_blocks)} code blocks from markdown | url={source_url}"
+            )
+
+        # Always extract source_id from URL
+        parsed_url = urlparse(source_url)
+        source_id = parsed_url.netloc or parsed_url.path
+        return [
+            {"block": block, "source_url": source_url, "source_id": source_id}
+            for block in code_blocks
+        ]
+
+    def extract_html_code_blocks(self, content: str) -> list[dict[str, Any]]:
+        """
+        Extract code blocks from HTML patterns in content.
+        This is a fallback when markdown conversion didn't preserve code blocks.
+
+        Args:
+            content: The content to search for HTML code patterns
+            min_length: Minimum length for code blocks
+
+        Returns:
+            List of code blocks with metadata
+        """
+        # Add detailed logging
+        safe_logfire_info(f"Processing HTML of length {len(content)} for code extraction")
+
+        # Check if we have actual content
+        if len(content) < 1000:
+            safe_logfire_info(
+                f"Warning: HTML content seems too short, first 500 chars: {repr(content[:500])}"
+            )
+
+        # Look for specific indicators of code blocks
+        has_prism = "prism" in content.lower()
+        has_highlight = "highlight" in content.lower()
+        has_shiki = "shiki" in content.lower()
+        has_codemirror = "codemirror" in content.lower() or "cm-" in content
+        safe_logfire_info(
+            f"Code library indicators | prism={has_prism} | highlight={has_highlight} | shiki={has_shiki} | codemirror={has_codemirror}"
+        )
+
+        # Check for any pre tags with different attributes
+        pre_matches = _PRE_TAG.findall(content[:5000])
+        if pre_matches:
+            safe_logfire_info(f"Found {len(pre_matches)} <pre> tags in first 5000 chars")
+            for i, pre_tag in enumerate(pre_matches[:3]):  # Show first 3
+                safe_logfire_info(f"Pre tag {i + 1}: {pre_tag}")
+
+        code_blocks = []
+        extracted_positions = set()  # Track already extracted code block positions
+
+        # Patterns are ordered: more specific code block formats first
+        for pattern, source_type in HTML_CODE_PATTERNS:
+            matches = list(pattern.finditer(content))
+
+            # Log pattern matches for Milkdown patterns and CodeMirror
+            if matches and (
+                "milkdown" in source_type
+                or "codemirror" in source_type
+                or "milkdown" in content[:1000].lower()
+            ):
+                safe_logfire_info(f"Pattern {source_type} found {len(matches)} matches")
+
+            for match in matches:
+                # Extract code content based on pattern type
+                if source_type in _LANGUAGE_GROUP_SOURCE_TYPES:
+                    # These patterns capture language in group 1, code in group 2
+                    if match.lastindex and match.lastindex >= 2:
+                        language = match.group(1)
+                        code_content = match.group(2).strip()
+                    else:
+                        code_content = match.group(1).strip()
+                        language = ""
+                else:
+                    # Most patterns have code in group 1
+                    code_content = match.group(1).strip()
+                    # Try to extract language from the full match
+                    full_match = match.group(0)
+                    lang_match = _CLASS_LANGUAGE.search(full_match)
+                    language = lang_match.group(1) if lang_match else ""
+
+                # Get the start position for complete block extraction
+                code_start_pos = match.start()
+
+                # For CodeMirror, extract text from cm-lines
+                if source_type == "codemirror":
+                    # Extract text from each cm-line div
+                    cm_lines = _CODEMIRROR_LINE.findall(code_content)
+                    if cm_lines:
+                        # Clean each line and join
+                        cleaned_lines = []
+                        for line in cm_lines:
+                            # Remove span tags but keep content
+                            line = _SPAN_OPEN.sub("", line)
+                            line = _SPAN_CLOSE.sub("", line)
+                            # Remove other HTML tags
+                            line = _HTML_TAG.sub("", line)
+                            cleaned_lines.append(line)
+                        code_content = "\n".join(cleaned_lines)
+                    else:
+                        # Fallback: just clean HTML
+                        code_content = _SPAN_OPEN.sub("", code_content)
+                        code_content = _SPAN_CLOSE.sub("", code_content)
+                        code_content = _HTML_TAG.sub("\n", code_content)
+
+                # For Monaco, extract text from nested divs
+                if source_type == "monaco":
+                    # Extract actual code from Monaco's complex structure
+                    code_content = _DIV_OPEN.sub("\n", code_content)
+                    code_content = _DIV_CLOSE.sub("", code_content)
+                    code_content = _SPAN_OPEN.sub("", code_content)
+                    code_content = _SPAN_CLOSE.sub("", code_content)
+
+                # Calculate dynamic minimum length
+                context_for_length = content[max(0, code_start_pos - 500) : code_start_pos + 500]
+                min_length = self._calculate_min_length(language, context_for_length)
+
+                # Skip if initial content is too short
+                if len(code_content) < min_length:
+                    # Try to find complete block if we have a language
+                    if language and code_start_pos > 0:
+                        # Look for complete code block
+                        complete_code, block_end_pos = self._find_complete_code_block(
+                            content, code_start_pos, min_length, language
+                        )
+                        if len(complete_code) >= min_length:
+                            code_content = complete_code
+                            end_pos = block_end_pos
+                        else:
+                            continue
+                    else:
+                        continue
+
+                # Extract position info for deduplication
+                start_pos = match.start()
+                end_pos = (
+                    match.end()
+                    if len(code_content) <= len(match.group(0))
+                    else code_start_pos + len(code_content)
+                )
+
+                # Check if we've already extracted code from this position
+                position_key = (start_pos, end_pos)
+                overlapping = False
+                for existing_start, existing_end in extracted_positions:
+                    # Check if this match overlaps with an existing extraction
+                    if not (end_pos <= existing_start or start_pos >= existing_end):
+                        overlapping = True
+                        break
+
+                if not overlapping:
+                    extracted_positions.add(position_key)
+
+                    # Extract context
+                    context_before = content[max(0, start_pos - 1000) : start_pos].strip()
+                    context_after = content[end_pos : min(len(content), end_pos + 1000)].strip()
+
+                    # Clean the code content
+                    cleaned_code = self.clean_code_content(code_content, language)
+
+                    # Validate code quality
+                    if self.validate_code_quality(cleaned_code, language):
+                        # Log successful extraction
+                        safe_logfire_info(
+                            f"Extracted code block | source_type={source_type} | language={language} | min_length={min_length} | original_length={len(code_content)} | cleaned_length={len(cleaned_code)}"
+                        )
+
+                        code_blocks.append({
+                            "code": cleaned_code,
+                            "language": language,
+                            "context_before": context_before,
+                            "context_after": context_after,
+                            "full_context": f"{context_before}\n\n{cleaned_code}\n\n{context_after}",
+                            "source_type": source_type,  # Track which pattern matched
+                        })
+                    else:
+                        safe_logfire_info(
+                            f"Code block failed validation | source_type={source_type} | language={language} | length={len(cleaned_code)}"
+                        )
+
+        # Pattern 2: <code>...</code> (standalone)
+        if not code_blocks:  # Only if we didn't find pre/code blocks
+            matches = _STANDALONE_CODE.finditer(content)
+
+            for match in matches:
+                code_content = match.group(1).strip()
+                # Clean the code content
+                cleaned_code = self.clean_code_content(code_content, "")
+
+                # Check if it's multiline or substantial enough and validate quality
+                # Use a minimal length for standalone code tags
+                if len(cleaned_code) >= 100 and ("\n" in cleaned_code or len(cleaned_code) > 100):
+                    if self.validate_code_quality(cleaned_code, ""):
+                        start_pos = match.start()
+                        end_pos = match.end()
+                        context_before = content[max(0, start_pos - 1000) : start_pos].strip()
+                        context_after = content[end_pos : min(len(content), end_pos + 1000)].strip()
+
+                        code_blocks.append({
+                            "code": cleaned_code,
+                            "language": "",
+                            "context_before": context_before,
+                            "context_after": context_after,
+                            "full_context": f"{context_before}\n\n{cleaned_code}\n\n{context_after}",
+                        })
+                    else:
+                        safe_logfire_info(
+                            f"Standalone code block failed validation | length={len(cleaned_code)}"
+                        )
+
+        return code_blocks
+
+    def extract_text_file_code_blocks(
+        self, content: str, url: str, min_length: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Extract code blocks from plain text files (like .txt files).
+        Handles formats like llms.txt where code blocks may be indicated by:
+        - Triple backticks (```)
+        - Language indicators (e.g., "typescript", "python")
+        - Indentation patterns
+        - Code block separators
+
+        Args:
+            content: The plain text content
+            url: The URL of the text file for context
+            min_length: Minimum length for code blocks
+
+        Returns:
+            List of code blocks with metadata
+        """
+        safe_logfire_info(
+            f"🔍 TEXT FILE EXTRACTION START | url={url} | content_length={len(content)}"
+        )
+        safe_logfire_info(f"📄 First 1000 chars: {repr(content[:1000])}...")
+        safe_logfire_info(
+            f"📄 Sample showing backticks: {repr(content[5000:6000])}..."
+            if len(content) > 6000
+            else "Content too short for mid-sample"
+        )
+
+        code_blocks = []
+
+        # Method 1: Look for triple backtick code blocks (Markdown style)
+        # Pattern allows for additional text after language (e.g., "typescript TypeScript")
+        matches = list(_TEXT_BACKTICK_BLOCK.finditer(content))
+        safe_logfire_info(f"📊 Backtick pattern matches: {len(matches)}")
+
+        for i, match in enumerate(matches):
+            language = match.group(1) or ""
+            code_content = match.group(2).strip()
+
+            # Log match info without including the actual content that might break formatting
+            safe_logfire_info(
+                f"🔎 Match {i + 1}: language='{language}', raw_length={len(code_content)}"
+            )
+
+            # Get position info first
+            start_pos = match.start()
+            end_pos = match.end()
+
+            # Calculate dynamic minimum length
+            context_around = content[max(0, start_pos - 500) : min(len(content), end_pos + 500)]
+            if min_length is None:
+                actual_min_length = self._calculate_min_length(language, context_around)
+            else:
+                actual_min_length = min_length
+
+            if len(code_content) >= actual_min_length:
+                # Get context
+                context_before = content[max(0, start_pos - 500) : start_pos].strip()
+                context_after = content[end_pos : min(len(content), end_pos + 500)].strip()
+
+                # Clean and validate
+                cleaned_code = self.clean_code_content(code_content, language)
+                safe_logfire_info(f"🧹 After cleaning: length={len(cleaned_code)}")
+
+                if self.validate_code_quality(cleaned_code, language):
+                    safe_logfire_info(
+                        f"✅ VALID backtick code block | language={language} | length={len(cleaned_code)}"
+                    )
+                    code_blocks.append({
+                        "code": cleaned_code,
+                        "language": language,
+                        "context_before": context_before,
+                        "context_after": context_after,
+                        "full_context": f"{context_before}\n\n{cleaned_code}\n\n{context_after}",
+                        "source_type": "text_backticks",
+                    })
+                else:
+                    safe_logfire_info(
+                        f"❌ INVALID code block failed validation | language={language}"
+                    )
+            else:
+                safe_logfire_info(
+                    f"❌ Code block too short: {len(code_content)} < {actual_min_length}"
+                )
+
+        # Method 2: Look for language-labeled code blocks (e.g., "TypeScript:" or "Python example:")
+        matches = _TEXT_LANGUAGE_LABEL.finditer(content)
+
+        for match in matches:
+            language_info = match.group(1).lower()
+            # Extract just the language name
+            word_match = _LEADING_WORD.match(language_info)
+            language = word_match.group(1) if word_match else ""
+            code_content = match.group(2).strip()
+
+            # Calculate dynamic minimum length for language-labeled blocks
+            if min_length is None:
+                actual_min_length_lang = self._calculate_min_length(
+                    language, code_content[:500]
+                )
+            else:
+                actual_min_length_lang = min_length
+
+            if len(code_content) >= actual_min_length_lang:
+                # Get context
+                start_pos = match.start()
+                end_pos = match.end()
+                context_before = content[max(0, start_pos - 500) : start_pos].strip()
+                context_after = content[end_pos : min(len(content), end_pos + 500)].strip()
+
+                # Clean and validate
+                cleaned_code = self.clean_code_content(code_content, language)
+                if self.validate_code_quality(cleaned_code, language):
+                    safe_logfire_info(
+                        f"Found language-labeled code block | language={language} | length={len(cleaned_code)}"
+                    )
+                    code_blocks.append({
+                        "code": cleaned_code,
+                        "language": language,
+                        "context_before": context_before,
+                        "context_after": context_after,
+                        "full_context": f"{context_before}\n\n{cleaned_code}\n\n{context_after}",
+                        "source_type": "text_language_label",
+                    })
+
+        # Method 3: Look for consistently indented blocks (at least 4 spaces or 1 tab)
+        # This is more heuristic and should be used carefully
+        if len(code_blocks) == 0:  # Only if we haven't found code blocks yet
+            # Split content into potential code sections
+            lines = content.split("\n")
+            indented_min_length = (
+                min_length if min_length is not None else self.settings.min_code_length
+            )
+            current_block = []
+            current_indent = None
+            block_start_idx = 0
+
+            for i, line in enumerate(lines):
+                # Check if line is indented
+                stripped = line.lstrip()
+                indent = len(line) - len(stripped)
+
+                if indent >= 4 and stripped:  # At least 4 spaces and not empty
+                    if current_indent is None:
+                        current_indent = indent
+                        block_start_idx = i
+                    current_block.append(line)
+                elif current_block and len("\n".join(current_block)) >= indented_min_length:
+                    # End of indented block, check if it's code
+                    code_content = "\n".join(current_block)
+
+                    # Try to detect language from content
+                    language = self._detect_language_from_content(code_content)
+
+                    # Get context
+                    context_before_lines = lines[max(0, block_start_idx - 10) : block_start_idx]
+                    context_after_lines = lines[i : min(len(lines), i + 10)]
+                    context_before = "\n".join(context_before_lines).strip()
+                    context_after = "\n".join(context_after_lines).strip()
+
+                    # Clean and validate
+                    cleaned_code = self.clean_code_content(code_content, language)
+                    if self.validate_code_quality(cleaned_code, language):
+                        safe_logfire_info(
+                            f"Found indented code block | language={language} | length={len(cleaned_code)}"
+                        )
+                        code_blocks.append({
+                            "code": cleaned_code,
+                            "language": language,
+                            "context_before": context_before,
+                            "context_after": context_after,
+                            "full_context": f"{context_before}\n\n{cleaned_code}\n\n{context_after}",
+                            "source_type": "text_indented",
+                        })
+
+                    # Reset for next block
+                    current_block = []
+                    current_indent = None
+                else:
+                    # Reset if not indented
+                    if current_block and not stripped:
+                        # Allow empty lines within code blocks
+                        current_block.append(line)
+                    else:
+                        current_block = []
+                        current_indent = None
+
+        safe_logfire_info(
+            f"📊 TEXT FILE EXTRACTION COMPLETE | total_blocks={len(code_blocks)} | url={url}"
+        )
+        for i, block in enumerate(code_blocks[:3]):  # Log first 3 blocks
+            safe_logfire_info(
+                f"📦 Block {i + 1} summary: language='{block.get('language', '')}', source_type='{block.get('source_type', '')}', length={len(block.get('code', ''))}"
+            )
+        return code_blocks
+
+    def _detect_language_from_content(self, code: str) -> str:
+        """
+        Try to detect programming language from code content.
+        This is a simple heuristic approach.
+        """
+        # Count matches for each language
+        scores = {}
+        for lang, lang_patterns in LANGUAGE_DETECTION_PATTERNS.items():
+            score = 0
+            for pattern in lang_patterns:
+                if pattern.search(code):
+                    score += 1
+            if score > 0:
+                scores[lang] = score
+
+        # Return language with highest score
+        if scores:
+            return max(scores, key=scores.get)
+
+        return ""
+
+    def _find_complete_code_block(
+        self,
+        content: str,
+        start_pos: int,
+        min_length: int = 250,
+        language: str = "",
+        max_length: int = None,
+    ) -> tuple[str, int]:
+        """
+        Find a complete code block starting from a position, extending until we find a natural boundary.
+
+        Args:
+            content: The full content to search in
+            start_pos: Starting position in the content
+            min_length: Minimum length for the code block
+            language: Detected language for language-specific patterns
+
+        Returns:
+            Tuple of (complete_code_block, end_position)
+        """
+        # Start with the minimum content
+        if start_pos + min_length > len(content):
+            return content[start_pos:], len(content)
+
+        # Look for natural code boundaries, language-specific block ends first
+        boundary_patterns = BOUNDARY_PATTERNS
+        if language and language.lower() in LANGUAGE_BLOCK_END_PATTERNS:
+            boundary_patterns = [LANGUAGE_BLOCK_END_PATTERNS[language.lower()], *BOUNDARY_PATTERNS]
+
+        # Extend until we find a boundary
+        extended_pos = start_pos + min_length
+        while extended_pos < len(content):
+            # Check next 500 characters for a boundary
+            lookahead_end = min(extended_pos + 500, len(content))
+            lookahead = content[extended_pos:lookahead_end]
+
+            for pattern in boundary_patterns:
+                match = pattern.search(lookahead)
+                if match:
+                    final_pos = extended_pos + match.end()
+                    return content[start_pos:final_pos].rstrip(), final_pos
+
+            # If no boundary found, extend by another chunk
+            extended_pos += 100
+
+            # Cap at maximum length
+            if max_length is None:
+                max_length = self.settings.max_code_length
+            if extended_pos - start_pos > max_length:
+                break
+
+        # Return what we have
+        return content[start_pos:extended_pos].rstrip(), extended_pos
+
+    def _calculate_min_length(self, language: str, context: str) -> int:
+        """
+        Calculate appropriate minimum length based on language and context.
+
+        Args:
+            language: The detected programming language
+            context: Surrounding context of the code
+
+        Returns:
+            Calculated minimum length
+        """
+        # Base lengths by language
+        # Check if contextual length adjustment is enabled
+        if not self.settings.contextual_length:
+            # Return default minimum length
+            return self.settings.min_code_length
+
+        # Base lengths by language
+        base_lengths = {
+            "json": 100,  # JSON can be short
+            "yaml": 100,  # YAML too
+            "xml": 100,  # XML structures
+            "html": 150,  # HTML snippets
+            "css": 150,  # CSS rules
+            "sql": 150,  # SQL queries
+            "python": 200,  # Python functions
+            "javascript": 250,  # JavaScript typically longer
+            "typescript": 250,  # TypeScript typically longer
+            "java": 300,  # Java even more verbose
+            "c++": 300,  # C++ similar to Java
+            "cpp": 300,  # C++ alternative
+            "c": 250,  # C slightly less verbose
+            "rust": 250,  # Rust medium verbosity
+            "go": 200,  # Go is concise
+        }
+
+        # Get default minimum from settings
+        default_min = self.settings.min_code_length
+        min_length = base_lengths.get(language.lower(), default_min)
+
+        # Adjust based on context clues
+        context_lower = context.lower()
+        if any(word in context_lower for word in ["example", "snippet", "sample", "demo"]):
+            min_length = int(min_length * 0.7)  # Examples can be shorter
+        elif any(word in context_lower for word in ["implementation", "complete", "full"]):
+            min_length = int(min_length * 1.5)  # Full implementations should be longer
+        elif any(word in context_lower for word in ["minimal", "simple", "basic"]):
+            min_length = int(min_length * 0.8)  # Simple examples can be shorter
+
+        # Ensure reasonable bounds
+        return max(100, min(1000, min_length))
+
+    def _decode_html_entities(self, text: str) -> str:
+        """Decode common HTML entities and clean HTML tags from code."""
+        # First, handle span tags that wrap individual tokens
+        # Check if spans are being used for syntax highlighting (no spaces between tags)
+        if "</span><span" in text:
+            # This indicates syntax highlighting - preserve the structure
+            text = _SPAN_CLOSE.sub("", text)
+            text = _SPAN_OPEN.sub("", text)
+        else:
+            # Normal span usage - might need spacing
+            # Only add space if there isn't already whitespace
+            text = _SPAN_CLOSE_BEFORE_WORD.sub(" ", text)
+            text = _SPAN_OPEN.sub("", text)
+
+        # Remove any other HTML tags but preserve their content
+        text = _HTML_TAG.sub("", text)
+
+        # Decode HTML entities
+        replacements = {
+            "&lt;": "<",
+            "&gt;": ">",
+            "&amp;": "&",
+            "&quot;": '"',
+            "&#39;": "'",
+            "&nbsp;": " ",
+            "&#x27;": "'",
+            "&#x2F;": "/",
+            "&#60;": "<",
+            "&#62;": ">",
+        }
+
+        for entity, char in replacements.items():
+            text = text.replace(entity, char)
+
+        # Replace escaped newlines with actual newlines
+        text = text.replace("\\n", "\n")
+
+        # Clean up excessive whitespace while preserving intentional spacing
+        # Replace multiple spaces with single space, but preserve newlines
+        lines = text.split("\n")
+        cleaned_lines = []
+        for line in lines:
+            # Replace multiple spaces with single space
+            line = _SPACE_RUN.sub(" ", line)
+            # Trim trailing spaces but preserve leading spaces (indentation)
+            line = line.rstrip()
+            cleaned_lines.append(line)
+
+        text = "\n".join(cleaned_lines)
+
+        return text
+
+    def clean_code_content(self, code: str, language: str = "") -> str:
+        """
+        Clean and fix common issues in extracted code content.
+
+        Args:
+            code: The code content to clean
+            language: The detected language (optional)
+
+        Returns:
+            Cleaned code content
+        """
+        # First apply HTML entity decoding and tag cleaning
+        code = self._decode_html_entities(code)
+
+        # Fix common concatenation issues from span removal
+        for pattern, replacement in SPACING_FIXES:
+            code = pattern.sub(replacement, code)
+
+        # Fix specific patterns for different languages
+        if language.lower() in ["python", "py"]:
+            # Fix Python-specific issues
+            code = _PYTHON_IMPORT_SPACING.sub(r"\1 \2 \3", code)
+            # Fix missing colons
+            code = _PYTHON_MISSING_COLON.sub(r"\1:", code)
+
+        # Remove backticks that might have been included
+        if code.startswith("```") and code.endswith("```"):
+            lines = code.split("\n")
+            if len(lines) > 2:
+                # Remove first and last line
+                code = "\n".join(lines[1:-1])
+        elif code.startswith("`") and code.endswith("`"):
+            code = code[1:-1]
+
+        # Final cleanup
+        # Remove any remaining excessive spaces while preserving indentation
+        lines = code.split("\n")
+        cleaned_lines = []
+        for line in lines:
+            # Don't touch leading whitespace (indentation)
+            stripped = line.lstrip()
+            indent = line[: len(line) - len(stripped)]
+            # Clean the rest of the line
+            cleaned = _MULTI_SPACE.sub(" ", stripped)
+            cleaned_lines.append(indent + cleaned)
+
+        return "\n".join(cleaned_lines).strip()
+
+    def validate_code_quality(self, code: str, language: str = "") -> bool:
+        """
+        Enhanced validation to ensure extracted content is actual code.
+
+        Args:
+            code: The code content to validate
+            language: The detected language (optional)
+
+        Returns:
+            True if code passes quality checks, False otherwise
+        """
+        # Basic checks
+        if not code or len(code.strip()) < 20:
+            return False
+
+        # Skip diagram languages if filtering is enabled
+        if self.settings.diagram_filtering:
+            if language.lower() in ["mermaid", "plantuml", "graphviz", "dot", "diagram"]:
+                safe_logfire_info(f"Skipping diagram language: {language}")
+                return False
+
+        # Check for common formatting issues that indicate poor extraction
+        for pattern in BAD_CODE_PATTERNS:
+            if pattern.search(code):
+                safe_logfire_info(f"Code failed quality check: pattern '{pattern.pattern}' found")
+                return False
+
+        # Check for minimum code complexity using various indicators
+        indicator_count = 0
+        indicator_details = []
+        for name, pattern in CODE_INDICATOR_PATTERNS.items():
+            if pattern.search(code):
+                indicator_count += 1
+                indicator_details.append(name)
+
+        # Require minimum code indicators
+        min_indicators = self.settings.min_code_indicators
+        if indicator_count < min_indicators:
+            safe_logfire_info(
+                f"Code has insufficient indicators: {indicator_count} found ({', '.join(indicator_details)})"
+            )
+            return False
+
+        # Check code-to-comment ratio
+        lines = code.split("\n")
+        non_empty_lines = [line for line in lines if line.strip()]
+
+        if not non_empty_lines:
+            return False
+
+        # Count comment lines (various comment styles)
+        comment_lines = 0
+        for line in lines:
+            for pattern in COMMENT_LINE_PATTERNS:
+                if pattern.match(line.strip()):
+                    comment_lines += 1
+                    break
+
+        # Allow up to 70% comments (documentation is important)
+        if non_empty_lines and comment_lines / len(non_empty_lines) > 0.7:
+            safe_logfire_info(
+                f"Code is mostly comments: {comment_lines}/{len(non_empty_lines)} lines"
+            )
+            return False
+
+        # Language-specific validation
+        if language.lower() in LANGUAGE_PATTERNS:
+            lang_info = LANGUAGE_PATTERNS[language.lower()]
+            min_indicators = lang_info.get("min_indicators", [])
+
+            # Check for language-specific indicators
+            found_lang_indicators = sum(
+                1 for indicator in min_indicators if indicator in code.lower()
+            )
+
+            if found_lang_indicators < 2:  # Need at least 2 language-specific indicators
+                safe_logfire_info(
+                    f"Code lacks {language} indicators: only {found_lang_indicators} found"
+                )
+                return False
+
+        # Check for reasonable structure
+        # Too few meaningful lines
+        if len(non_empty_lines) < 3:
+            safe_logfire_info(f"Code has too few non-empty lines: {len(non_empty_lines)}")
+            return False
+
+        # Check for reasonable line lengths
+        very_long_lines = sum(1 for line in lines if len(line) > 300)
+        if len(lines) > 0 and very_long_lines > len(lines) * 0.5:
+            safe_logfire_info("Code has too many very long lines")
+            return False
+
+        # Check if it's mostly prose/documentation
+        prose_score = 0
+        word_count = len(code.split())
+        for pattern in PROSE_INDICATOR_PATTERNS:
+            matches = len(pattern.findall(code))
+            prose_score += matches
+
+        # Check prose filtering
+        if self.settings.prose_filtering:
+            max_prose_ratio = self.settings.max_prose_ratio
+            if word_count > 0 and prose_score / word_count > max_prose_ratio:
+                safe_logfire_info(
+                    f"Code appears to be prose: prose_score={prose_score}, word_count={word_count}"
+                )
+                return False
+
+        # Passed all checks
+        safe_logfire_info(
+            f"Code passed validation: indicators={indicator_count}, language={language}, lines={len(non_empty_lines)}"
+        )
+        return True
+
+
+# Per-process extractor, rebuilt only when a run's settings differ from the previous run's
+_worker_extractor: CodeBlockExtractor | None = None
+
+
+def extract_documents(
+    documents: list[dict[str, Any]], settings: CodeExtractionSettings
+) -> list[list[dict[str, Any]]]:
+    """
+    Extract code blocks from a group of documents. Runs inside extraction worker processes.
+
+    Returns:
+        One list of tagged code blocks per document, in input order; a document that fails
+        to extract yields an empty list
+    """
+    global _worker_extractor
+    if _worker_extractor is None or _worker_extractor.settings != settings:
+        _worker_extractor = CodeBlockExtractor(settings)
+
+    results = []
+    for doc in documents:
+        try:
+            results.append(_worker_extractor.extract_document(doc))
+        except Exception as e:
+            safe_logfire_error(
+                f"Error processing code from document | url={doc.get('url')} | error={str(e)}"
+            )
+            results.append([])
+    return results
+
+
+# Shared extraction process pool, created on first use
+_pool: ProcessPoolExecutor | None = None
+
+
+def resolve_worker_count(requested: int) -> int:
+    """Number of extraction processes for a CODE_EXTRACTION_WORKERS value (0 = automatic)."""
+    if requested > 0:
+        return requested
+    return max(1, min(8, (os.cpu_count() or 2) - 1))
+
+
+def get_code_extraction_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Get the shared extraction process pool, sized by the first run that needs it.
+
+    Workers are spawned rather than forked so they never inherit the server's threads.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_code_extraction_pool(wait: bool = True) -> None:
+    """Shut down the extraction process pool (called on server shutdown)."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+async def extract_documents_off_loop(
+    documents: list[dict[str, Any]], settings: CodeExtractionSettings
+) -> list[list[dict[str, Any]]]:
+    """
+    Run extract_documents in the process pool.
+
+    If the pool cannot be used (e.g. a worker died), the documents are extracted on the
+    threading service's CPU pool instead so the event loop stays responsive.
+    """
+    try:
+        pool = get_code_extraction_pool(resolve_worker_count(settings.workers))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, extract_documents, documents, settings)
+    except (BrokenProcessPool, OSError, RuntimeError) as e:
+        safe_logfire_error(f"Code extraction process pool unavailable, using threads: {e}")
+        shutdown_code_extraction_pool(wait=False)
+        return await get_threading_service().run_cpu_intensive(
+            extract_documents, documents, settings
+        )
@@ -45,7 +45,9 @@ from .helpers.site_config import SiteConfig
 
 # Import operations
 from .document_storage_operations import DocumentStorageOperations
+from .incremental_crawl import IncrementalCrawlState
 from .progress_mapper import ProgressMapper
+from .streaming_pipeline import StreamingCrawlPipeline
 
 logger = get_logger(__name__)
 
@@ -211,6 +213,7 @@ class CrawlingService:
         progress_callback=None,
         start_progress: int = 15,
         end_progress: int = 60,
+        page_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
     ) -> List[Dict[str, Any]]:
         """Batch crawl multiple URLs in parallel."""
         return await self.batch_strategy.crawl_batch_with_progress(
@@ -221,6 +224,7 @@ class CrawlingService:
             progress_callback,
             start_progress,
             end_progress,
+            page_callback,
         )
 
     async def crawl_recursive_with_progress(
@@ -231,6 +235,7 @@ class CrawlingService:
         progress_callback=None,
         start_progress: int = 10,
         end_progress: int = 60,
+        page_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
     ) -> List[Dict[str, Any]]:
         """Recursively crawl internal links from start URLs."""
         return await self.recursive_strategy.crawl_recursive_with_progress(
@@ -242,6 +247,7 @@ class CrawlingService:
             progress_callback,
             start_progress,
             end_progress,
+            page_callback,
         )
 
     # Orchestration methods
@@ -336,87 +342,134 @@ class CrawlingService:
             # Analyzing stage
             await update_mapped_progress("analyzing", 50, f"Analyzing URL type for {url}")
 
-            # Detect URL type and perform crawl
-            crawl_results, crawl_type = await self._crawl_by_url_type(url, request)
+            streaming_settings = await self._get_streaming_settings()
+            incremental_state = await self._load_incremental_state(original_source_id, request)
+            crawl_type = self._detect_crawl_type(url)
+
+            if streaming_settings["enabled"] and crawl_type != "text_file":
+                # Chunk, embed and store pages while the crawl is still running
+                storage_results, code_examples_count = await self._stream_crawl_to_storage(
+                    url,
+                    request,
+                    crawl_type,
+                    original_source_id,
+                    streaming_settings,
+                    incremental_state,
+                )
+                processed_pages = storage_results["pages_stored"]
+                await send_heartbeat_if_needed()
+            else:
+                # Detect URL type and perform crawl
+                crawl_results, crawl_type = await self._crawl_by_url_type(
+                    url, request, incremental_state=incremental_state
+                )
 
-            # Check for cancellation after crawling
-            self._check_cancellation()
+                # Check for cancellation after crawling
+                self._check_cancellation()
 
-            # Send heartbeat after potentially long crawl operation
-            await send_heartbeat_if_needed()
+                # Send heartbeat after potentially long crawl operation
+                await send_heartbeat_if_needed()
 
-            if not crawl_results:
-                raise ValueError("No content was crawled from the provided URL")
+                if not crawl_results and not (
+                    incremental_state and incremental_state.pages_skipped
+                ):
+                    raise ValueError("No content was crawled from the provided URL")
 
-            # Processing stage
-            await update_mapped_progress("processing", 50, "Processing crawled content")
+                # Processing stage
+                await update_mapped_progress("processing", 50, "Processing crawled content")
 
-            # Check for cancellation before document processing
-            self._check_cancellation()
+                # Check for cancellation before document processing
+                self._check_cancellation()
 
-            # Process and store documents using document storage operations
-            async def doc_storage_callback(
-                message: str, percentage: int, batch_info: Optional[dict] = None
-            ):
-                if self.progress_id:
-                    _ensure_socketio_imports()
-                    # Map percentage to document storage range (20-85%)
-                    mapped_percentage = 20 + int((percentage / 100) * (85 - 20))
-                    safe_logfire_info(
-                        f"Document storage progress mapping: {percentage}% -> {mapped_percentage}%"
-                    )
+                # Process and store documents using document storage operations
+                async def doc_storage_callback(
+                    message: str, percentage: int, batch_info: Optional[dict] = None
+                ):
+                    if self.progress_id:
+                        _ensure_socketio_imports()
+                        # Map percentage to document storage range (20-85%)
+                        mapped_percentage = 20 + int((percentage / 100) * (85 - 20))
+                        safe_logfire_info(
+                            f"Document storage progress mapping: {percentage}% -> {mapped_percentage}%"
+                        )
 
-                    # Update progress state while preserving existing fields
-                    self.progress_state.update({
-                        "status": "document_storage",
-                        "percentage": mapped_percentage,
-                        "log": message,
-                    })
+                        # Update progress state while preserving existing fields
+                        self.progress_state.update({
+                            "status": "document_storage",
+                            "percentage": mapped_percentage,
+                            "log": message,
+                        })
 
-                    # Add batch_info fields if provided
-                    if batch_info:
-                        self.progress_state.update(batch_info)
+                        # Add batch_info fields if provided
+                        if batch_info:
+                            self.progress_state.update(batch_info)
 
-                    await update_crawl_progress(self.progress_id, self.progress_state)
+                        await update_crawl_progress(self.progress_id, self.progress_state)
 
-            storage_results = await self.doc_storage_ops.process_and_store_documents(
-                crawl_results,
-                request,
-                crawl_type,
-                original_source_id,
-                doc_storage_callback,
-                self._check_cancellation,
-            )
+                storage_results = await self.doc_storage_ops.process_and_store_documents(
+                    crawl_results,
+                    request,
+                    crawl_type,
+                    original_source_id,
+                    doc_storage_callback,
+                    self._check_cancellation,
+                    incremental_state,
+                )
 
-            # Check for cancellation after document storage
-            self._check_cancellation()
+                # Check for cancellation after document storage
+                self._check_cancellation()
 
-            # Send heartbeat after document storage
-            await send_heartbeat_if_needed()
+                # Send heartbeat after document storage
+                await send_heartbeat_if_needed()
 
-            # Extract code examples if requested
-            code_examples_count = 0
-            if request.get("extract_code_examples", True):
-                await update_mapped_progress("code_extraction", 0, "Starting code extraction...")
+                # Extract code examples if requested
+                code_examples_count = 0
+                if request.get("extract_code_examples", True):
+                    await update_mapped_progress("code_extraction", 0, "Starting code extraction...")
+
+                    # Create progress callback for code extraction
+                    async def code_progress_callback(data: dict):
+                        if self.progress_id:
+                            _ensure_socketio_imports()
+                            # Update progress state while preserving existing fields
+                            self.progress_state.update(data)
+                            await update_crawl_progress(self.progress_id, self.progress_state)
+
+                    # Unchanged pages keep their stored code examples
+                    changed_pages = [
+                        doc
+                        for doc in crawl_results
+                        if doc.get("url") in storage_results["url_to_full_document"]
+                    ]
+                    code_examples_count = await self.doc_storage_ops.extract_and_store_code_examples(
+                        changed_pages,
+                        storage_results["url_to_full_document"],
+                        code_progress_callback,
+                        85,
+                        95,
+                    )
 
-                # Create progress callback for code extraction
-                async def code_progress_callback(data: dict):
-                    if self.progress_id:
-                        _ensure_socketio_imports()
-                        # Update progress state while preserving existing fields
-                        self.progress_state.update(data)
-                        await update_crawl_progress(self.progress_id, self.progress_state)
+                    # Send heartbeat after code extraction
+                    await send_heartbeat_if_needed()
 
-                code_examples_count = await self.doc_storage_ops.extract_and_store_code_examples(
-                    crawl_results,
-                    storage_results["url_to_full_document"],
-                    code_progress_callback,
-                    85,
-                    95,
-                )
+                processed_pages = len(crawl_results)
 
-                # Send heartbeat after code extraction
-                await send_heartbeat_if_needed()
+            if incremental_state:
+                # Unchanged and pruned pages only need their refreshed fingerprints saved
+                await incremental_state.save_fingerprints()
+                skipped = incremental_state.get_stats()
+                safe_logfire_info(
+                    f"Incremental crawl | source_id={original_source_id} | "
+                    f"pages_pruned={skipped['pages_pruned']} | "
+                    f"pages_unchanged={skipped['pages_unchanged']} | "
+                    f"chunks_unchanged={skipped['chunks_unchanged']}"
+                )
+                await update_mapped_progress(
+                    "finalization",
+                    25,
+                    f"Skipped {incremental_state.pages_skipped} unchanged pages",
+                    pages_skipped=incremental_state.pages_skipped,
+                )
 
             # Finalization
             await update_mapped_progress(
@@ -434,8 +487,8 @@ class CrawlingService:
                 f"Crawl completed: {storage_results['chunk_count']} chunks, {code_examples_count} code examples",
                 chunks_stored=storage_results["chunk_count"],
                 code_examples_found=code_examples_count,
-                processed_pages=len(crawl_results),
-                total_pages=len(crawl_results),
+                processed_pages=processed_pages,
+                total_pages=processed_pages,
             )
 
             # Also send the completion event that frontend expects
@@ -445,8 +498,8 @@ class CrawlingService:
                 {
                     "chunks_stored": storage_results["chunk_count"],
                     "code_examples_found": code_examples_count,
-                    "processed_pages": len(crawl_results),
-                    "total_pages": len(crawl_results),
+                    "processed_pages": processed_pages,
+                    "total_pages": processed_pages,
                     "sourceId": storage_results.get("source_id", ""),
                     "log": "Crawl completed successfully!",
                 },
@@ -487,10 +540,141 @@ class CrawlingService:
                     f"Unregistered orchestration service on error | progress_id={self.progress_id}"
                 )
 
-    async def _crawl_by_url_type(self, url: str, request: Dict[str, Any]) -> tuple:
+    async def _stream_crawl_to_storage(
+        self,
+        url: str,
+        request: Dict[str, Any],
+        crawl_type: str,
+        original_source_id: str,
+        streaming_settings: Dict[str, Any],
+        incremental_state: Optional[IncrementalCrawlState] = None,
+    ) -> tuple:
+        """
+        Crawl with pages flowing through a bounded-queue pipeline into storage as they arrive.
+
+        Returns:
+            Tuple of (storage_results, code_examples_count)
+        """
+
+        async def pipeline_progress(message: str, stats: Dict[str, Any]):
+            if self.progress_id:
+                _ensure_socketio_imports()
+                # Report storage totals without moving the crawl percentage
+                self.progress_state.update({
+                    "log": message,
+                    "chunks_stored": stats["chunk_count"],
+                    "code_examples_found": stats["code_examples_count"],
+                })
+                await update_crawl_progress(self.progress_id, self.progress_state)
+
+        pipeline = StreamingCrawlPipeline(
+            self.doc_storage_ops,
+            request,
+            crawl_type,
+            original_source_id,
+            progress_callback=pipeline_progress,
+            cancellation_check=self._check_cancellation,
+            queue_size=streaming_settings["queue_size"],
+            batch_chunks=streaming_settings["batch_chunks"],
+            incremental_state=incremental_state,
+        )
+        pipeline.start()
+
+        try:
+            await self._crawl_by_url_type(
+                url, request, page_callback=pipeline.submit, incremental_state=incremental_state
+            )
+            self._check_cancellation()
+
+            if not pipeline.pages_received and not (
+                incremental_state and incremental_state.pages_skipped
+            ):
+                raise ValueError("No content was crawled from the provided URL")
+
+            await self._handle_progress_update(
+                self.progress_id,
+                {
+                    "status": "document_storage",
+                    "percentage": self.progress_mapper.map_progress("document_storage", 90),
+                    "log": (
+                        f"Crawl finished, storing remaining pages "
+                        f"({pipeline.pages_stored}/{pipeline.pages_received} stored)..."
+                    ),
+                },
+            )
+            stats = await pipeline.finish()
+        except BaseException:
+            await pipeline.abort()
+            raise
+
+        return stats, stats["code_examples_count"]
+
+    def _detect_crawl_type(self, url: str) -> str:
+        """Detect which crawl strategy _crawl_by_url_type will use for a URL."""
+        if self.url_handler.is_txt(url):
+            return "text_file"
+        if self.url_handler.is_sitemap(url):
+            return "sitemap"
+        return "webpage"
+
+    async def _get_streaming_settings(self) -> Dict[str, Any]:
+        """Load streaming pipeline settings, falling back to collect-then-process on errors."""
+        try:
+            from ..credential_service import credential_service
+
+            settings = await credential_service.get_credentials_by_category("rag_strategy")
+            return {
+                "enabled": str(settings.get("CRAWL_STREAMING_ENABLED", "false")).lower() == "true",
+                "queue_size": int(settings.get("CRAWL_STREAM_QUEUE_SIZE", "20")),
+                "batch_chunks": int(settings.get("CRAWL_STREAM_BATCH_CHUNKS", "100")),
+            }
+        except Exception as e:
+            logger.warning(f"Failed to load streaming settings, streaming disabled: {e}")
+            return {"enabled": False}
+
+    async def _load_incremental_state(
+        self, source_id: str, request: Dict[str, Any]
+    ) -> Optional[IncrementalCrawlState]:
+        """Load page fingerprints for an incremental recrawl, or None for a full recrawl."""
+        try:
+            from ..credential_service import credential_service
+
+            settings = await credential_service.get_credentials_by_category("rag_strategy")
+            if str(settings.get("CRAWL_INCREMENTAL_ENABLED", "false")).lower() != "true":
+                return None
+
+            state = IncrementalCrawlState(
+                self.supabase_client,
+                source_id,
+                request,
+                conditional_requests=str(
+                    settings.get("CRAWL_INCREMENTAL_CONDITIONAL_REQUESTS", "true")
+                ).lower()
+                == "true",
+                max_concurrent_checks=int(settings.get("CRAWL_MAX_CONCURRENT", "10")),
+            )
+            return await state.load()
+        except Exception as e:
+            logger.warning(f"Failed to load page fingerprints, doing a full recrawl: {e}")
+            return None
+
+    async def _crawl_by_url_type(
+        self,
+        url: str,
+        request: Dict[str, Any],
+        page_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        incremental_state: Optional[IncrementalCrawlState] = None,
+    ) -> tuple:
         """
         Detect URL type and perform appropriate crawling.
 
+        Args:
+            url: The URL to crawl
+            request: The crawl request
+            page_callback: Optional async callback that receives pages as they are crawled
+                (sitemap and recursive crawls only); results are then not collected
+            incremental_state: Optional page fingerprints used to prune unchanged sitemap URLs
+
         Returns:
             Tuple of (crawl_results, crawl_type)
         """
@@ -525,7 +709,21 @@ class CrawlingService:
                     "log": "Detected sitemap, parsing URLs...",
                 })
                 await update_crawl_progress(self.progress_id, self.progress_state)
-            sitemap_urls = self.parse_sitemap(url)
+            if incremental_state:
+                # Skip URLs the sitemap or a conditional request reports as unchanged
+                sitemap_entries = self.sitemap_strategy.parse_sitemap_entries(url)
+                sitemap_urls = incremental_state.prune_sitemap_entries(sitemap_entries)
+                sitemap_urls = await incremental_state.prune_not_modified(sitemap_urls)
+                if self.progress_id and incremental_state.pages_pruned:
+                    self.progress_state.update({
+                        "log": (
+                            f"Skipping {incremental_state.pages_pruned} of "
+                            f"{len(sitemap_entries)} sitemap URLs unchanged since the last crawl"
+                        ),
+                    })
+                    await update_crawl_progress(self.progress_id, self.progress_state)
+            else:
+                sitemap_urls = self.parse_sitemap(url)
 
             if sitemap_urls:
                 # Emit progress before starting batch crawl
@@ -542,6 +740,7 @@ class CrawlingService:
                     progress_callback=await self._create_crawl_progress_callback("crawling"),
                     start_progress=15,
                     end_progress=20,
+                    page_callback=page_callback,
                 )
                 crawl_type = "sitemap"
 
@@ -566,6 +765,7 @@ class CrawlingService:
                 progress_callback=await self._create_crawl_progress_callback("crawling"),
                 start_progress=10,
                 end_progress=20,
+                page_callback=page_callback,
             )
             crawl_type = "webpage"
 
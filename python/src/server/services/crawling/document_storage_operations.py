@@ -9,14 +9,20 @@ from typing import Dict, Any, List, Optional, Callable
 from urllib.parse import urlparse
 
 from ...config.logfire_config import safe_logfire_info, safe_logfire_error
+from ..client_manager import execute_async
 from ..storage.storage_services import DocumentStorageService
 from ..storage.document_storage_service import add_documents_to_supabase
 from ..storage.code_storage_service import (
     generate_code_summaries_batch,
     add_code_examples_to_supabase
 )
-from ..source_management_service import update_source_info, extract_source_summary
+from ..source_management_service import (
+    extract_source_summary_async,
+    generate_source_title_async,
+    upsert_source_records
+)
 from .code_extraction_service import CodeExtractionService
+from .incremental_crawl import IncrementalCrawlState
 
 
 class DocumentStorageOperations:
@@ -34,6 +40,8 @@ class DocumentStorageOperations:
         self.supabase_client = supabase_client
         self.doc_storage_service = DocumentStorageService(supabase_client)
         self.code_extraction_service = CodeExtractionService(supabase_client)
+        # Source summary/title generation started by _create_source_records
+        self._source_summary_tasks: List[asyncio.Task] = []
     
     async def process_and_store_documents(
         self,
@@ -42,7 +50,8 @@ class DocumentStorageOperations:
         crawl_type: str,
         original_source_id: str,
         progress_callback: Optional[Callable] = None,
-        cancellation_check: Optional[Callable] = None
+        cancellation_check: Optional[Callable] = None,
+        incremental_state: Optional[IncrementalCrawlState] = None
     ) -> Dict[str, Any]:
         """
         Process crawled documents and store them in the database.
@@ -54,6 +63,7 @@ class DocumentStorageOperations:
             original_source_id: The source ID for all documents
             progress_callback: Optional callback for progress updates
             cancellation_check: Optional function to check for cancellation
+            incremental_state: Optional page fingerprints; unchanged pages and chunks are skipped
             
         Returns:
             Dict containing storage statistics and document mappings
@@ -75,54 +85,30 @@ class DocumentStorageOperations:
             if cancellation_check:
                 cancellation_check()
             
-            source_url = doc.get('url', '')
-            markdown_content = doc.get('markdown', '')
+            # Skip pages whose content has not changed since the last crawl
+            if incremental_state and incremental_state.is_unchanged(doc):
+                continue
             
-            if not markdown_content:
+            chunked = await self.chunk_document(
+                doc, request, crawl_type, original_source_id, storage_service, cancellation_check
+            )
+            if not chunked:
                 continue
+            if incremental_state:
+                chunked = incremental_state.select_changed_chunks(chunked)
             
             # Store full document for code extraction context
-            url_to_full_document[source_url] = markdown_content
+            url_to_full_document[chunked['url']] = doc.get('markdown', '')
             
-            # CHUNK THE CONTENT
-            chunks = storage_service.smart_chunk_text(markdown_content, chunk_size=5000)
+            all_urls.extend(chunked['urls'])
+            all_chunk_numbers.extend(chunked['chunk_numbers'])
+            all_contents.extend(chunked['contents'])
+            all_metadatas.extend(chunked['metadatas'])
             
-            # Use the original source_id for all documents
-            source_id = original_source_id
-            safe_logfire_info(f"Using original source_id '{source_id}' for URL '{source_url}'")
-            
-            # Process each chunk
-            for i, chunk in enumerate(chunks):
-                # Check for cancellation during chunk processing
-                if cancellation_check and i % 10 == 0:  # Check every 10 chunks
-                    cancellation_check()
-                
-                all_urls.append(source_url)
-                all_chunk_numbers.append(i)
-                all_contents.append(chunk)
-                
-                # Create metadata for each chunk
-                word_count = len(chunk.split())
-                metadata = {
-                    'url': source_url,
-                    'title': doc.get('title', ''),
-                    'description': doc.get('description', ''),
-                    'source_id': source_id,
-                    'knowledge_type': request.get('knowledge_type', 'documentation'),
-                    'crawl_type': crawl_type,
-                    'word_count': word_count,
-                    'char_count': len(chunk),
-                    'chunk_index': i,
-                    'tags': request.get('tags', [])
-                }
-                all_metadatas.append(metadata)
-                
-                # Accumulate word count
-                source_word_counts[source_id] = source_word_counts.get(source_id, 0) + word_count
-                
-                # Yield control every 10 chunks to prevent event loop blocking
-                if i > 0 and i % 10 == 0:
-                    await asyncio.sleep(0)
+            # Accumulate word count
+            source_word_counts[original_source_id] = (
+                source_word_counts.get(original_source_id, 0) + chunked['word_count']
+            )
             
             # Yield control after processing each document
             if doc_index > 0 and doc_index % 5 == 0:
@@ -137,33 +123,138 @@ class DocumentStorageOperations:
         safe_logfire_info(f"url_to_full_document keys: {list(url_to_full_document.keys())[:5]}")
         
         # Log chunking results
-        safe_logfire_info(f"Document storage | documents={len(crawl_results)} | chunks={len(all_contents)} | avg_chunks_per_doc={len(all_contents)/len(crawl_results):.1f}")
-        
-        # Call add_documents_to_supabase with the correct parameters
-        await add_documents_to_supabase(
-            client=self.supabase_client,
-            urls=all_urls,  # Now has entry per chunk
-            chunk_numbers=all_chunk_numbers,  # Proper chunk numbers (0, 1, 2, etc)
-            contents=all_contents,  # Individual chunks
-            metadatas=all_metadatas,  # Metadata per chunk
-            url_to_full_document=url_to_full_document,
-            batch_size=25,  # Increased from 10 for better performance
-            progress_callback=progress_callback,  # Pass the callback for progress updates
-            enable_parallel_batches=True,  # Enable parallel processing
-            provider=None,  # Use configured provider
-            cancellation_check=cancellation_check  # Pass cancellation check
-        )
+        safe_logfire_info(f"Document storage | documents={len(crawl_results)} | chunks={len(all_contents)} | avg_chunks_per_doc={len(all_contents)/max(len(crawl_results), 1):.1f}")
+        
+        try:
+            if incremental_state:
+                # Only the replaced chunks are deleted; unchanged chunks keep their rows
+                await incremental_state.delete_replaced_chunks(
+                    list(url_to_full_document.keys()), cancellation_check
+                )
+            
+            # Call add_documents_to_supabase with the correct parameters
+            stored_chunks = await add_documents_to_supabase(
+                client=self.supabase_client,
+                urls=all_urls,  # Now has entry per chunk
+                chunk_numbers=all_chunk_numbers,  # Proper chunk numbers (0, 1, 2, etc)
+                contents=all_contents,  # Individual chunks
+                metadatas=all_metadatas,  # Metadata per chunk
+                url_to_full_document=url_to_full_document,
+                batch_size=25,  # Increased from 10 for better performance
+                progress_callback=progress_callback,  # Pass the callback for progress updates
+                enable_parallel_batches=True,  # Enable parallel processing
+                provider=None,  # Use configured provider
+                cancellation_check=cancellation_check,  # Pass cancellation check
+                delete_existing=incremental_state is None
+            )
+        except BaseException:
+            self.cancel_source_summaries()
+            raise
+        
+        # Source summaries were generated while the documents were embedded
+        await self.wait_for_source_summaries()
+        
+        total_word_count = sum(source_word_counts.values())
+        if incremental_state:
+            await incremental_state.save_fingerprints(
+                list(url_to_full_document.keys()), stored_chunks
+            )
+            # The source total also covers the pages this crawl skipped
+            total_word_count = incremental_state.total_word_count()
+            await execute_async(
+                self.supabase_client.table('archon_sources')
+                .update({'total_word_count': total_word_count})
+                .eq('source_id', original_source_id)
+            )
         
         # Calculate actual chunk count
         chunk_count = len(all_contents)
         
         return {
             'chunk_count': chunk_count,
-            'total_word_count': sum(source_word_counts.values()),
+            'total_word_count': total_word_count,
             'url_to_full_document': url_to_full_document,
             'source_id': original_source_id
         }
     
+    async def chunk_document(
+        self,
+        doc: Dict[str, Any],
+        request: Dict[str, Any],
+        crawl_type: str,
+        source_id: str,
+        storage_service: Optional[DocumentStorageService] = None,
+        cancellation_check: Optional[Callable] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Chunk a single crawled document and build the per-chunk metadata.
+        
+        Args:
+            doc: Crawled document with url, markdown and optional title/description
+            request: The original crawl request
+            crawl_type: Type of crawl performed
+            source_id: The source ID for the document
+            storage_service: Optional storage service used for chunking
+            cancellation_check: Optional function to check for cancellation
+            
+        Returns:
+            Dict of parallel chunk lists plus url and word_count, or None if the document is empty
+        """
+        source_url = doc.get('url', '')
+        markdown_content = doc.get('markdown', '')
+        
+        if not markdown_content:
+            return None
+        
+        # CHUNK THE CONTENT
+        storage_service = storage_service or self.doc_storage_service
+        chunks = storage_service.smart_chunk_text(markdown_content, chunk_size=5000)
+        
+        # Use the original source_id for all documents
+        safe_logfire_info(f"Using original source_id '{source_id}' for URL '{source_url}'")
+        
+        chunked = {
+            'url': source_url,
+            'urls': [],
+            'chunk_numbers': [],
+            'contents': [],
+            'metadatas': [],
+            'word_count': 0
+        }
+        
+        # Process each chunk
+        for i, chunk in enumerate(chunks):
+            # Check for cancellation during chunk processing
+            if cancellation_check and i % 10 == 0:  # Check every 10 chunks
+                cancellation_check()
+            
+            chunked['urls'].append(source_url)
+            chunked['chunk_numbers'].append(i)
+            chunked['contents'].append(chunk)
+            
+            # Create metadata for each chunk
+            word_count = len(chunk.split())
+            metadata = {
+                'url': source_url,
+                'title': doc.get('title', ''),
+                'description': doc.get('description', ''),
+                'source_id': source_id,
+                'knowledge_type': request.get('knowledge_type', 'documentation'),
+                'crawl_type': crawl_type,
+                'word_count': word_count,
+                'char_count': len(chunk),
+                'chunk_index': i,
+                'tags': request.get('tags', [])
+            }
+            chunked['metadatas'].append(metadata)
+            chunked['word_count'] += word_count
+            
+            # Yield control every 10 chunks to prevent event loop blocking
+            if i > 0 and i % 10 == 0:
+                await asyncio.sleep(0)
+        
+        return chunked
+    
     async def _create_source_records(
         self,
         all_metadatas: List[Dict],
@@ -174,6 +265,11 @@ class DocumentStorageOperations:
         """
         Create or update source records in the database.
         
+        Chunks reference archon_sources, so the records are upserted and verified (one round
+        trip) before returning, with placeholder summaries and titles. The LLM summaries and
+        titles are generated in the background, concurrently with document embedding, and
+        written back when ready; await wait_for_source_summaries() once documents are stored.
+        
         Args:
             all_metadatas: List of metadata for all chunks
             all_contents: List of all chunk contents
@@ -200,77 +296,135 @@ class DocumentStorageOperations:
             source_id_word_counts[source_id] += metadata.get('word_count', 0)
         
         safe_logfire_info(f"Found {len(unique_source_ids)} unique source_ids: {list(unique_source_ids)}")
+        if not unique_source_ids:
+            return
+        
+        source_ids = sorted(unique_source_ids)
+        knowledge_type = request.get('knowledge_type', 'technical')
+        tags = request.get('tags', [])
+        
+        # Existing sources keep their title (and summary until the new one is ready)
+        existing_sources = {}
+        try:
+            existing = await execute_async(
+                self.supabase_client.table('archon_sources')
+                .select('source_id, title, summary')
+                .in_('source_id', source_ids)
+            )
+            existing_sources = {row['source_id']: row for row in existing.data or []}
+        except Exception as e:
+            safe_logfire_error(f"Failed to load existing source records: {str(e)}")
         
-        # Create source records for ALL unique source_ids
-        for source_id in unique_source_ids:
+        combined_contents = {}
+        records = []
+        for source_id in source_ids:
             # Get combined content for this specific source_id
-            source_contents = source_id_contents[source_id]
             combined_content = ''
-            for chunk in source_contents[:3]:  # First 3 chunks for this source
+            for chunk in source_id_contents[source_id][:3]:  # First 3 chunks for this source
                 if len(combined_content) + len(chunk) < 15000:
                     combined_content += ' ' + chunk
                 else:
                     break
+            combined_contents[source_id] = combined_content
             
-            # Generate summary with fallback
-            try:
-                summary = extract_source_summary(source_id, combined_content)
-            except Exception as e:
-                safe_logfire_error(f"Failed to generate AI summary for '{source_id}': {str(e)}, using fallback")
-                # Fallback to simple summary
-                summary = f"Documentation from {source_id} - {len(source_contents)} pages crawled"
+            existing_source = existing_sources.get(source_id)
+            metadata = {
+                'knowledge_type': knowledge_type,
+                'tags': tags or [],
+                'source_type': "file" if source_id.startswith("file_") else "url",
+                # Titles of existing sources are preserved, not generated
+                'auto_generated': existing_source is None,
+                'update_frequency': 0,  # Set to 0 since we're using manual refresh
+            }
+            if request.get('url'):
+                metadata['original_url'] = request.get('url')  # Store the original crawl URL
             
-            # Update source info in database BEFORE storing documents
-            safe_logfire_info(f"About to create/update source record for '{source_id}' (word count: {source_id_word_counts[source_id]})")
+            records.append({
+                'source_id': source_id,
+                'title': (existing_source or {}).get('title') or source_id,
+                'summary': (existing_source or {}).get('summary') or f"Content from {source_id}",
+                'total_word_count': source_id_word_counts[source_id],
+                'metadata': metadata,
+                'updated_at': 'now()',
+            })
+        
+        # Create/update and verify ALL source records BEFORE storing documents
+        safe_logfire_info(f"About to create/update source records for {source_ids}")
+        try:
+            await upsert_source_records(self.supabase_client, records)
+            safe_logfire_info(f"All {len(records)} source records verified - proceeding with document storage")
+        except Exception as e:
+            safe_logfire_error(f"Failed to create/update source records for {source_ids}: {str(e)}")
+            # Try a simpler approach with minimal data
             try:
-                update_source_info(
-                    client=self.supabase_client,
-                    source_id=source_id,
-                    summary=summary,
-                    word_count=source_id_word_counts[source_id],
-                    content=combined_content,
-                    knowledge_type=request.get('knowledge_type', 'technical'),
-                    tags=request.get('tags', []),
-                    update_frequency=0,  # Set to 0 since we're using manual refresh
-                    original_url=request.get('url')  # Store the original crawl URL
-                )
-                safe_logfire_info(f"Successfully created/updated source record for '{source_id}'")
-            except Exception as e:
-                safe_logfire_error(f"Failed to create/update source record for '{source_id}': {str(e)}")
-                # Try a simpler approach with minimal data
-                try:
-                    safe_logfire_info(f"Attempting fallback source creation for '{source_id}'")
-                    self.supabase_client.table('archon_sources').upsert({
-                        'source_id': source_id,
-                        'title': source_id,  # Use source_id as title fallback
-                        'summary': summary,
-                        'total_word_count': source_id_word_counts[source_id],
+                safe_logfire_info(f"Attempting fallback source creation for {source_ids}")
+                await upsert_source_records(self.supabase_client, [
+                    {
+                        'source_id': record['source_id'],
+                        'title': record['title'],
+                        'summary': record['summary'],
+                        'total_word_count': record['total_word_count'],
                         'metadata': {
-                            'knowledge_type': request.get('knowledge_type', 'technical'),
-                            'tags': request.get('tags', []),
+                            'knowledge_type': knowledge_type,
+                            'tags': tags,
                             'auto_generated': True,
                             'fallback_creation': True,
                             'original_url': request.get('url')
                         }
-                    }).execute()
-                    safe_logfire_info(f"Fallback source creation succeeded for '{source_id}'")
-                except Exception as fallback_error:
-                    safe_logfire_error(f"Both source creation attempts failed for '{source_id}': {str(fallback_error)}")
-                    raise Exception(f"Unable to create source record for '{source_id}'. This will cause foreign key violations. Error: {str(fallback_error)}")
-        
-        # Verify ALL source records exist before proceeding with document storage
-        if unique_source_ids:
-            for source_id in unique_source_ids:
-                try:
-                    source_check = self.supabase_client.table('archon_sources').select('source_id').eq('source_id', source_id).execute()
-                    if not source_check.data:
-                        raise Exception(f"Source record verification failed - '{source_id}' does not exist in sources table")
-                    safe_logfire_info(f"Source record verified for '{source_id}'")
-                except Exception as e:
-                    safe_logfire_error(f"Source verification failed for '{source_id}': {str(e)}")
-                    raise
-            
-            safe_logfire_info(f"All {len(unique_source_ids)} source records verified - proceeding with document storage")
+                    }
+                    for record in records
+                ])
+                safe_logfire_info(f"Fallback source creation succeeded for {source_ids}")
+            except Exception as fallback_error:
+                safe_logfire_error(f"Both source creation attempts failed for {source_ids}: {str(fallback_error)}")
+                raise Exception(f"Unable to create source records for {source_ids}. This will cause foreign key violations. Error: {str(fallback_error)}")
+        
+        self._source_summary_tasks.append(asyncio.create_task(
+            self._generate_source_summaries(records, combined_contents, existing_sources)
+        ))
+    
+    async def _generate_source_summaries(
+        self,
+        records: List[Dict[str, Any]],
+        combined_contents: Dict[str, str],
+        existing_sources: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """
+        Generate summaries (and titles for new sources) concurrently and write them back.
+        
+        Failures only cost the generated text - the placeholder records are already stored.
+        """
+        async def generate(record: Dict[str, Any]) -> Dict[str, Any]:
+            source_id = record['source_id']
+            content = combined_contents[source_id]
+            if source_id in existing_sources:
+                summary = await extract_source_summary_async(source_id, content)
+                return {**record, 'summary': summary}
+            summary, title = await asyncio.gather(
+                extract_source_summary_async(source_id, content),
+                generate_source_title_async(source_id, content)
+            )
+            return {**record, 'summary': summary, 'title': title}
+        
+        try:
+            updated_records = await asyncio.gather(*[generate(record) for record in records])
+            await upsert_source_records(self.supabase_client, list(updated_records))
+            for record in updated_records:
+                safe_logfire_info(f"Stored summary for source '{record['source_id']}' with title: {record['title']}")
+        except Exception as e:
+            safe_logfire_error(f"Failed to store generated source summaries: {str(e)}")
+    
+    async def wait_for_source_summaries(self) -> None:
+        """Wait for the source summaries started by _create_source_records to be stored."""
+        tasks, self._source_summary_tasks = self._source_summary_tasks, []
+        if tasks:
+            await asyncio.gather(*tasks)
+    
+    def cancel_source_summaries(self) -> None:
+        """Cancel pending source summary generation (failed or cancelled crawls)."""
+        tasks, self._source_summary_tasks = self._source_summary_tasks, []
+        for task in tasks:
+            task.cancel()
     
     async def extract_and_store_code_examples(
         self,
@@ -0,0 +1,400 @@
+"""
+Incremental Crawl State
+
+Keeps a fingerprint per crawled URL (content hash, per-chunk hashes, HTTP validators and the
+sitemap <lastmod>) so a recrawl of an existing source only does work for what changed:
+
+- sitemap URLs whose <lastmod> has not moved since the last crawl are not fetched,
+- known URLs that answer a conditional HEAD request with 304 Not Modified are not fetched,
+- fetched pages whose content hash is unchanged are skipped before chunking,
+- changed pages only delete and re-insert the chunks whose text changed.
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from ...config.logfire_config import get_logger, safe_logfire_info
+from ..client_manager import execute_async
+
+logger = get_logger(__name__)
+
+FINGERPRINT_TABLE = "archon_page_fingerprints"
+FINGERPRINT_COLUMNS = (
+    "url, content_hash, chunk_hashes, word_count, etag, last_modified, sitemap_lastmod"
+)
+
+# Rows per request when loading or saving fingerprints
+FINGERPRINT_PAGE_SIZE = 1000
+
+
+def hash_text(text: str) -> str:
+    """Return the sha256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """Parse a sitemap <lastmod> (W3C datetime) into an aware datetime, or None if invalid."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def extract_validators(headers: Optional[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """Pick the ETag and Last-Modified validators out of response headers."""
+    if not isinstance(headers, dict):
+        headers = {}
+    lowered = {str(key).lower(): value for key, value in headers.items()}
+    return {"etag": lowered.get("etag"), "last_modified": lowered.get("last-modified")}
+
+
+class IncrementalCrawlState:
+    """
+    Page fingerprints for one source, loaded before a crawl and saved as pages are stored.
+
+    Call is_unchanged() for every crawled page before chunking it, then
+    select_changed_chunks() with its chunks. Before inserting the selected chunks call
+    delete_replaced_chunks(), and after storing them save_fingerprints() with the chunks that
+    were actually stored.
+    """
+
+    def __init__(
+        self,
+        supabase_client,
+        source_id: str,
+        request: Optional[Dict[str, Any]] = None,
+        conditional_requests: bool = True,
+        max_concurrent_checks: int = 10,
+    ):
+        """
+        Initialize the incremental crawl state.
+
+        Args:
+            supabase_client: The Supabase client for database operations
+            source_id: The source ID being crawled
+            request: The crawl request; its knowledge type and tags are part of every hash so
+                changing them re-stores all chunks with the new metadata
+            conditional_requests: Whether to send conditional HEAD requests before fetching
+            max_concurrent_checks: Maximum concurrent conditional requests
+        """
+        self.supabase_client = supabase_client
+        self.source_id = source_id
+        self.conditional_requests = conditional_requests
+        self.max_concurrent_checks = max(1, max_concurrent_checks)
+
+        request = request or {}
+        self._hash_salt = json.dumps(
+            [request.get("knowledge_type"), sorted(request.get("tags") or [])]
+        )
+
+        self._known: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._sitemap_lastmods: Dict[str, str] = {}
+        # URL -> chunk numbers to delete before inserting; None replaces every chunk of the URL
+        self._replaced_chunks: Dict[str, Optional[List[int]]] = {}
+        # URL -> chunk numbers selected for storing by this crawl
+        self._selected_chunks: Dict[str, List[int]] = {}
+
+        self.pages_pruned = 0  # Never fetched (sitemap lastmod or 304 Not Modified)
+        self.pages_unchanged = 0  # Fetched, but the content hash matched
+        self.chunks_unchanged = 0  # Chunks of changed pages that were kept as stored
+
+    @property
+    def pages_skipped(self) -> int:
+        return self.pages_pruned + self.pages_unchanged
+
+    async def load(self) -> "IncrementalCrawlState":
+        """Load the stored fingerprints for the source."""
+        start = 0
+        while True:
+            result = await execute_async(
+                self.supabase_client.table(FINGERPRINT_TABLE)
+                .select(FINGERPRINT_COLUMNS)
+                .eq("source_id", self.source_id)
+                .order("url")
+                .range(start, start + FINGERPRINT_PAGE_SIZE - 1)
+            )
+            rows = result.data or []
+            for row in rows:
+                self._known[row["url"]] = row
+            if len(rows) < FINGERPRINT_PAGE_SIZE:
+                break
+            start += FINGERPRINT_PAGE_SIZE
+
+        safe_logfire_info(
+            f"Loaded page fingerprints | source_id={self.source_id} | pages={len(self._known)}"
+        )
+        return self
+
+    def prune_sitemap_entries(self, entries: List[Dict[str, Optional[str]]]) -> List[str]:
+        """
+        Drop sitemap entries whose <lastmod> is not newer than at the last crawl.
+
+        Args:
+            entries: Sitemap entries with 'url' and optional 'lastmod'
+
+        Returns:
+            URLs that still need to be fetched
+        """
+        urls = []
+        for entry in entries:
+            url = entry["url"]
+            entry_lastmod = parse_lastmod(entry.get("lastmod"))
+            if entry_lastmod:
+                self._sitemap_lastmods[url] = entry_lastmod.isoformat()
+
+            known = self._known.get(url)
+            stored_lastmod = parse_lastmod(known.get("sitemap_lastmod")) if known else None
+            if entry_lastmod and stored_lastmod and entry_lastmod <= stored_lastmod:
+                self.pages_pruned += 1
+                continue
+            urls.append(url)
+        return urls
+
+    async def prune_not_modified(self, urls: List[str]) -> List[str]:
+        """
+        Drop known URLs that answer a conditional HEAD request with 304 Not Modified.
+
+        URLs without stored validators, and any request that fails, are kept.
+
+        Args:
+            urls: URLs about to be fetched
+
+        Returns:
+            URLs that still need to be fetched, in their original order
+        """
+        if not self.conditional_requests:
+            return urls
+
+        candidates = [
+            url
+            for url in urls
+            if url in self._known
+            and (self._known[url].get("etag") or self._known[url].get("last_modified"))
+        ]
+        if not candidates:
+            return urls
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_checks)
+
+        async def is_not_modified(client: httpx.AsyncClient, url: str) -> bool:
+            known = self._known[url]
+            headers = {}
+            if known.get("etag"):
+                headers["If-None-Match"] = known["etag"]
+            if known.get("last_modified"):
+                headers["If-Modified-Since"] = known["last_modified"]
+            async with semaphore:
+                try:
+                    response = await client.head(url, headers=headers)
+                except httpx.HTTPError as e:
+                    logger.debug(f"Conditional request failed for {url}: {e}")
+                    return False
+            return response.status_code == 304
+
+        async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
+            results = await asyncio.gather(*(is_not_modified(client, url) for url in candidates))
+
+        not_modified = {
+            url for url, unchanged in zip(candidates, results, strict=True) if unchanged
+        }
+        for url in not_modified:
+            # Keep a newer sitemap lastmod so the next crawl can prune without a request
+            self._refresh_fingerprint(url, {})
+        self.pages_pruned += len(not_modified)
+        return [url for url in urls if url not in not_modified]
+
+    def is_unchanged(self, page: Dict[str, Any]) -> bool:
+        """
+        Check a crawled page against its fingerprint and record the new fingerprint.
+
+        Returns:
+            True if the page content is unchanged and it should not be stored again
+        """
+        url = page.get("url", "")
+        markdown = page.get("markdown", "")
+        if not markdown:
+            return False
+
+        content_hash = hash_text(self._hash_salt + markdown)
+        validators = extract_validators(page.get("response_headers"))
+        known = self._known.get(url)
+
+        if known and known.get("content_hash") == content_hash:
+            # Same content; refresh the validators for the next conditional request
+            self._refresh_fingerprint(url, validators)
+            self.pages_unchanged += 1
+            return True
+
+        self._pending[url] = {
+            "url": url,
+            "source_id": self.source_id,
+            "content_hash": content_hash,
+            "chunk_hashes": [],
+            "word_count": 0,
+            **validators,
+            "sitemap_lastmod": self._sitemap_lastmods.get(url)
+            or (known or {}).get("sitemap_lastmod"),
+            "crawled_at": datetime.now(timezone.utc).isoformat(),
+        }
+        return False
+
+    def select_changed_chunks(self, chunked: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Keep only the chunks of a changed page that differ from the stored chunks.
+
+        Args:
+            chunked: Output of DocumentStorageOperations.chunk_document for the page
+
+        Returns:
+            The same structure limited to changed chunks (word_count still covers the whole page)
+        """
+        url = chunked["url"]
+        chunk_hashes = [hash_text(self._hash_salt + content) for content in chunked["contents"]]
+
+        pending = self._pending.get(url)
+        if pending:
+            pending["chunk_hashes"] = chunk_hashes
+            pending["word_count"] = chunked["word_count"]
+
+        known = self._known.get(url)
+        if not known or not pending:
+            self._replaced_chunks[url] = None
+            self._selected_chunks[url] = list(chunked["chunk_numbers"])
+            return chunked
+
+        stored_hashes = known.get("chunk_hashes") or []
+        changed = [
+            i
+            for i, chunk_hash in enumerate(chunk_hashes)
+            if i >= len(stored_hashes) or stored_hashes[i] != chunk_hash
+        ]
+        self.chunks_unchanged += len(chunk_hashes) - len(changed)
+
+        # Changed chunks are replaced; chunks past the new end of the page are removed
+        self._replaced_chunks[url] = [chunked["chunk_numbers"][i] for i in changed] + list(
+            range(len(chunk_hashes), len(stored_hashes))
+        )
+        self._selected_chunks[url] = [chunked["chunk_numbers"][i] for i in changed]
+
+        return {
+            **chunked,
+            "urls": [chunked["urls"][i] for i in changed],
+            "chunk_numbers": [chunked["chunk_numbers"][i] for i in changed],
+            "contents": [chunked["contents"][i] for i in changed],
+            "metadatas": [chunked["metadatas"][i] for i in changed],
+        }
+
+    async def delete_replaced_chunks(
+        self, urls: List[str], cancellation_check: Optional[Callable] = None
+    ) -> None:
+        """
+        Delete the stored chunks that select_changed_chunks() marked for replacement.
+
+        Args:
+            urls: Page URLs about to be stored
+            cancellation_check: Optional function to check for cancellation
+        """
+        full_replace = []
+        for url in dict.fromkeys(urls):
+            if url not in self._replaced_chunks:
+                continue
+            chunk_numbers = self._replaced_chunks.pop(url)
+            if chunk_numbers is None:
+                full_replace.append(url)
+                continue
+            if not chunk_numbers:
+                continue
+
+            if cancellation_check:
+                cancellation_check()
+            await execute_async(
+                self.supabase_client.table("archon_crawled_pages")
+                .delete()
+                .eq("url", url)
+                .in_("chunk_number", chunk_numbers)
+            )
+
+        if full_replace:
+            if cancellation_check:
+                cancellation_check()
+            await execute_async(
+                self.supabase_client.table("archon_crawled_pages").delete().in_("url", full_replace)
+            )
+
+    async def save_fingerprints(
+        self,
+        urls: Optional[List[str]] = None,
+        stored_chunks: Optional[Set[Tuple[str, int]]] = None,
+    ) -> None:
+        """
+        Save recorded fingerprints once their pages are stored.
+
+        Failures are logged, not raised: a missing fingerprint only costs a full re-store
+        of that page on the next crawl.
+
+        Args:
+            urls: Page URLs to save (default: every recorded fingerprint)
+            stored_chunks: (url, chunk_number) pairs returned by add_documents_to_supabase;
+                pages with a selected chunk missing from it are not fingerprinted
+        """
+        if urls is None:
+            urls = list(self._pending)
+        if stored_chunks is not None:
+            for url in dict.fromkeys(urls):
+                selected = self._selected_chunks.pop(url, [])
+                missing = [number for number in selected if (url, number) not in stored_chunks]
+                if missing and self._pending.pop(url, None) is not None:
+                    # Keeping the old fingerprint makes the next crawl store these chunks again
+                    logger.warning(
+                        f"Not fingerprinting {url}: {len(missing)} chunks failed to store"
+                    )
+        rows = [self._pending.pop(url) for url in dict.fromkeys(urls) if url in self._pending]
+
+        try:
+            for i in range(0, len(rows), FINGERPRINT_PAGE_SIZE):
+                await execute_async(
+                    self.supabase_client.table(FINGERPRINT_TABLE).upsert(
+                        rows[i : i + FINGERPRINT_PAGE_SIZE]
+                    )
+                )
+        except Exception as e:
+            logger.warning(f"Failed to save page fingerprints for {self.source_id}: {e}")
+            return
+
+        for row in rows:
+            self._known[row["url"]] = row
+
+    def total_word_count(self) -> int:
+        """Word count of every page of the source, including pages skipped by this crawl."""
+        pages = {**self._known, **self._pending}
+        return sum(row.get("word_count") or 0 for row in pages.values())
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get skip counters for progress reporting."""
+        return {
+            "pages_pruned": self.pages_pruned,
+            "pages_unchanged": self.pages_unchanged,
+            "chunks_unchanged": self.chunks_unchanged,
+        }
+
+    def _refresh_fingerprint(self, url: str, validators: Dict[str, Optional[str]]) -> None:
+        known = self._known[url]
+        self._pending[url] = {
+            **known,
+            "source_id": self.source_id,
+            "etag": validators.get("etag") or known.get("etag"),
+            "last_modified": validators.get("last_modified") or known.get("last_modified"),
+            "sitemap_lastmod": self._sitemap_lastmods.get(url) or known.get("sitemap_lastmod"),
+            "crawled_at": datetime.now(timezone.utc).isoformat(),
+        }
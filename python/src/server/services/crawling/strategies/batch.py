@@ -4,7 +4,7 @@ Batch Crawling Strategy
 Handles batch crawling of multiple URLs in parallel.
 """
 
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 
 from crawl4ai import CrawlerRunConfig, CacheMode, MemoryAdaptiveDispatcher
 from ....config.logfire_config import get_logger
@@ -36,6 +36,7 @@ class BatchCrawlStrategy:
         progress_callback: Optional[Callable] = None,
         start_progress: int = 15,
         end_progress: int = 60,
+        page_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Batch crawl multiple URLs in parallel with progress reporting.
@@ -48,9 +49,11 @@ class BatchCrawlStrategy:
             progress_callback: Optional callback for progress updates
             start_progress: Starting progress percentage
             end_progress: Ending progress percentage
+            page_callback: Optional async callback receiving each successful page as it arrives;
+                when given, pages are streamed to it instead of being collected and returned
 
         Returns:
-            List of crawl results
+            List of crawl results (empty when streaming to page_callback)
         """
         if not self.crawler:
             logger.error("No crawler instance available for batch crawling")
@@ -130,6 +133,7 @@ class BatchCrawlStrategy:
 
         # Use configured batch size
         successful_results = []
+        successful_count = 0
         processed = 0
 
         # Transform all URLs at the beginning
@@ -168,11 +172,19 @@ class BatchCrawlStrategy:
                 if result.success and result.markdown:
                     # Map back to original URL
                     original_url = url_mapping.get(result.url, result.url)
-                    successful_results.append({
+                    page = {
                         "url": original_url,
                         "markdown": result.markdown,
                         "html": result.html,  # Use raw HTML
-                    })
+                        # ETag / Last-Modified for incremental recrawls
+                        "response_headers": getattr(result, "response_headers", None) or {},
+                    }
+                    successful_count += 1
+                    if page_callback:
+                        # Waits while the downstream pipeline is full (backpressure)
+                        await page_callback(page)
+                    else:
+                        successful_results.append(page)
                 else:
                     logger.warning(
                         f"Failed to crawl {result.url}: {getattr(result, 'error_message', 'Unknown error')}"
@@ -188,11 +200,11 @@ class BatchCrawlStrategy:
                 ):  # Report every 5 URLs or at the end
                     await report_progress(
                         progress_percentage,
-                        f"Crawled {processed}/{total_urls} pages ({len(successful_results)} successful)",
+                        f"Crawled {processed}/{total_urls} pages ({successful_count} successful)",
                     )
 
         await report_progress(
             end_progress,
-            f"Batch crawling completed: {len(successful_results)}/{total_urls} pages successful",
+            f"Batch crawling completed: {successful_count}/{total_urls} pages successful",
         )
         return successful_results
@@ -4,7 +4,7 @@ Recursive Crawling Strategy
 Handles recursive crawling of websites by following internal links.
 """
 
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from urllib.parse import urldefrag
 
 from crawl4ai import CrawlerRunConfig, CacheMode, MemoryAdaptiveDispatcher
@@ -40,6 +40,7 @@ class RecursiveCrawlStrategy:
         progress_callback: Optional[Callable] = None,
         start_progress: int = 10,
         end_progress: int = 60,
+        page_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Recursively crawl internal links from start URLs up to a maximum depth with progress reporting.
@@ -53,9 +54,11 @@ class RecursiveCrawlStrategy:
             progress_callback: Optional callback for progress updates
             start_progress: Starting progress percentage
             end_progress: Ending progress percentage
+            page_callback: Optional async callback receiving each successful page as it arrives;
+                when given, pages are streamed to it instead of being collected and returned
 
         Returns:
-            List of crawl results
+            List of crawl results (empty when streaming to page_callback)
         """
         if not self.crawler:
             logger.error("No crawler instance available for recursive crawling")
@@ -139,6 +142,7 @@ class RecursiveCrawlStrategy:
 
         current_urls = set([normalize_url(u) for u in start_urls])
         results_all = []
+        pages_crawled = 0
         total_processed = 0
 
         for depth in range(max_depth):
@@ -185,7 +189,7 @@ class RecursiveCrawlStrategy:
                     batch_progress,
                     f"Depth {depth + 1}: crawling URLs {batch_idx + 1}-{batch_end_idx} of {len(urls_to_crawl)}",
                     totalPages=total_processed + batch_idx,
-                    processedPages=len(results_all),
+                    processedPages=pages_crawled,
                 )
 
                 # Use arun_many for native parallel crawling with streaming
@@ -205,11 +209,14 @@ class RecursiveCrawlStrategy:
                     total_processed += 1
 
                     if result.success and result.markdown:
-                        results_all.append({
+                        page = {
                             "url": original_url,
                             "markdown": result.markdown,
                             "html": result.html,  # Always use raw HTML for code extraction
-                        })
+                            # ETag / Last-Modified for incremental recrawls
+                            "response_headers": getattr(result, "response_headers", None) or {},
+                        }
+                        pages_crawled += 1
                         depth_successful += 1
 
                         # Find internal links for next depth
@@ -222,6 +229,12 @@ class RecursiveCrawlStrategy:
                                 next_level_urls.add(next_url)
                             elif is_binary:
                                 logger.debug(f"Skipping binary file from crawl queue: {next_url}")
+
+                        if page_callback:
+                            # Waits while the downstream pipeline is full (backpressure)
+                            await page_callback(page)
+                        else:
+                            results_all.append(page)
                     else:
                         logger.warning(
                             f"Failed to crawl {original_url}: {getattr(result, 'error_message', 'Unknown error')}"
@@ -237,7 +250,7 @@ class RecursiveCrawlStrategy:
                             current_progress,
                             f"Depth {depth + 1}: processed {current_idx}/{len(urls_to_crawl)} URLs ({depth_successful} successful)",
                             totalPages=total_processed,
-                            processedPages=len(results_all),
+                            processedPages=pages_crawled,
                         )
                     i += 1
 
@@ -251,6 +264,6 @@ class RecursiveCrawlStrategy:
 
         await report_progress(
             end_progress,
-            f"Recursive crawling completed: {len(results_all)} total pages crawled across {max_depth} depth levels",
+            f"Recursive crawling completed: {pages_crawled} total pages crawled across {max_depth} depth levels",
         )
         return results_all
@@ -254,7 +254,12 @@ class SinglePageCrawlStrategy:
                 # Report completion progress
                 await report_progress(end_progress, f"Text file crawled successfully: {original_url}")
                 
-                return [{'url': original_url, 'markdown': result.markdown, 'html': result.html}]
+                return [{
+                    'url': original_url,
+                    'markdown': result.markdown,
+                    'html': result.html,
+                    'response_headers': getattr(result, 'response_headers', None) or {}
+                }]
             else:
                 logger.error(f"Failed to crawl {url}: {result.error_message}")
                 return []
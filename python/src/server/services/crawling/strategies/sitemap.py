@@ -4,7 +4,7 @@ Sitemap Crawling Strategy
 Handles crawling of URLs from XML sitemaps.
 """
 import traceback
-from typing import List
+from typing import Dict, List, Optional
 from xml.etree import ElementTree
 import requests
 
@@ -26,7 +26,19 @@ class SitemapCrawlStrategy:
         Returns:
             List of URLs extracted from the sitemap
         """
-        urls = []
+        return [entry['url'] for entry in self.parse_sitemap_entries(sitemap_url)]
+    
+    def parse_sitemap_entries(self, sitemap_url: str) -> List[Dict[str, Optional[str]]]:
+        """
+        Parse a sitemap and extract each URL with its optional <lastmod> value.
+        
+        Args:
+            sitemap_url: URL of the sitemap to parse
+            
+        Returns:
+            List of dicts with 'url' and 'lastmod' (None when the sitemap omits it)
+        """
+        entries = []
         
         try:
             logger.info(f"Parsing sitemap: {sitemap_url}")
@@ -34,12 +46,27 @@ class SitemapCrawlStrategy:
             
             if resp.status_code != 200:
                 logger.error(f"Failed to fetch sitemap: HTTP {resp.status_code}")
-                return urls
+                return entries
             
             try:
                 tree = ElementTree.fromstring(resp.content)
-                urls = [loc.text for loc in tree.findall('.//{*}loc') if loc.text]
-                logger.info(f"Successfully extracted {len(urls)} URLs from sitemap")
+                for url_element in tree.findall('.//{*}url'):
+                    loc = url_element.find('{*}loc')
+                    if loc is None or not loc.text:
+                        continue
+                    lastmod = url_element.find('{*}lastmod')
+                    entries.append({
+                        'url': loc.text.strip(),
+                        'lastmod': lastmod.text.strip() if lastmod is not None and lastmod.text else None
+                    })
+                
+                # Sitemap indexes and non-standard sitemaps have bare <loc> elements
+                if not entries:
+                    entries = [
+                        {'url': loc.text.strip(), 'lastmod': None}
+                        for loc in tree.findall('.//{*}loc') if loc.text
+                    ]
+                logger.info(f"Successfully extracted {len(entries)} URLs from sitemap")
                 
             except ElementTree.ParseError as e:
                 logger.error(f"Error parsing sitemap XML: {e}")
@@ -52,4 +79,4 @@ class SitemapCrawlStrategy:
             logger.error(f"Unexpected error in sitemap parsing: {e}")
             logger.error(traceback.format_exc())
         
-        return urls
\ No newline at end of file
+        return entries
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+Streaming Crawl Pipeline
+
+Streams crawled pages into storage as they arrive instead of collecting the whole crawl
+before chunking, embedding and storing it:
+
+    crawler --page queue--> chunker --batch queue--> writer (embed + store + code examples)
+
+Both queues are bounded, so a slow writer applies backpressure all the way back to the
+crawler and only a few batches of pages are held in memory at any time.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ...config.logfire_config import get_logger, safe_logfire_info
+from ..client_manager import execute_async
+from ..storage.document_storage_service import add_documents_to_supabase
+from .incremental_crawl import IncrementalCrawlState
+
+logger = get_logger(__name__)
+
+# Marks the end of a stage's input
+_END_OF_STREAM = object()
+
+
+@dataclass
+class PageBatch:
+    """A group of whole pages and their chunks, written to storage together."""
+
+    pages: List[Dict[str, Any]] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+    chunk_numbers: List[int] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    url_to_full_document: Dict[str, str] = field(default_factory=dict)
+    word_count: int = 0
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.contents)
+
+
+class StreamingCrawlPipeline:
+    """
+    Bounded-queue pipeline from crawler to database.
+
+    Usage:
+        pipeline = StreamingCrawlPipeline(doc_storage_ops, request, crawl_type, source_id)
+        pipeline.start()
+        try:
+            await crawl(page_callback=pipeline.submit)
+            stats = await pipeline.finish()
+        except BaseException:
+            await pipeline.abort()
+            raise
+    """
+
+    def __init__(
+        self,
+        doc_storage_ops,
+        request: Dict[str, Any],
+        crawl_type: str,
+        source_id: str,
+        progress_callback: Optional[Callable] = None,
+        cancellation_check: Optional[Callable] = None,
+        queue_size: int = 20,
+        batch_chunks: int = 100,
+        incremental_state: Optional[IncrementalCrawlState] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            doc_storage_ops: DocumentStorageOperations used for chunking, sources and code examples
+            request: The original crawl request
+            crawl_type: Type of crawl performed
+            source_id: The source ID for all documents
+            progress_callback: Optional async callback(message, stats) after each stored batch
+            cancellation_check: Optional function to check for cancellation
+            queue_size: Maximum crawled pages waiting to be chunked
+            batch_chunks: Target number of chunks per storage batch (pages are never split)
+            incremental_state: Optional page fingerprints; unchanged pages and chunks are skipped
+        """
+        self.doc_storage_ops = doc_storage_ops
+        self.request = request
+        self.crawl_type = crawl_type
+        self.source_id = source_id
+        self.progress_callback = progress_callback
+        self.cancellation_check = cancellation_check
+        self.batch_chunks = max(1, batch_chunks)
+        self.incremental_state = incremental_state
+        self.extract_code_examples = request.get("extract_code_examples", True)
+
+        self._page_queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        # Keep one batch ready while the writer is busy with the previous one
+        self._batch_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._tasks: List[asyncio.Task] = []
+        self._error: Optional[BaseException] = None
+        self._source_created = False
+
+        # Running totals
+        self.pages_received = 0
+        self.pages_stored = 0
+        self.chunks_stored = 0
+        self.total_word_count = 0
+        self.code_examples_count = 0
+
+    def start(self) -> None:
+        """Start the chunker and writer stages."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run_chunker()),
+            asyncio.create_task(self._run_writer()),
+        ]
+
+    async def submit(self, page: Dict[str, Any]) -> None:
+        """
+        Hand a crawled page to the pipeline, waiting while the page queue is full.
+
+        Raises the first stage failure so the crawl stops instead of crawling into a dead pipeline.
+        """
+        if self._error:
+            raise self._error
+        if self.cancellation_check:
+            self.cancellation_check()
+        await self._page_queue.put(page)
+        self.pages_received += 1
+
+    async def finish(self) -> Dict[str, Any]:
+        """
+        Signal the end of the crawl, wait for all queued pages to be stored and return totals.
+        """
+        await self._page_queue.put(_END_OF_STREAM)
+        await asyncio.gather(*self._tasks)
+        if self._error:
+            self.doc_storage_ops.cancel_source_summaries()
+            raise self._error
+
+        # The source summary is written to the same row, so it must land before the word count
+        await self.doc_storage_ops.wait_for_source_summaries()
+
+        if self._source_created or self.incremental_state:
+            # The source was created from the first batch; record the final word count
+            total_word_count = (
+                self.incremental_state.total_word_count()
+                if self.incremental_state
+                else self.total_word_count
+            )
+            await execute_async(
+                self.doc_storage_ops.supabase_client.table("archon_sources")
+                .update({"total_word_count": total_word_count})
+                .eq("source_id", self.source_id)
+            )
+
+        safe_logfire_info(
+            f"Streaming pipeline finished | pages={self.pages_stored} | chunks={self.chunks_stored} | "
+            f"code_examples={self.code_examples_count}"
+        )
+        return self.get_stats()
+
+    async def abort(self) -> None:
+        """Stop all stages without storing what is still queued."""
+        for task in self._tasks:
+            task.cancel()
+        self.doc_storage_ops.cancel_source_summaries()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get running totals for progress reporting."""
+        return {
+            "pages_received": self.pages_received,
+            "pages_stored": self.pages_stored,
+            "chunk_count": self.chunks_stored,
+            "total_word_count": self.total_word_count,
+            "code_examples_count": self.code_examples_count,
+            "source_id": self.source_id,
+        }
+
+    def _record_failure(self, error: BaseException) -> None:
+        # Real task cancellation (abort) must propagate; anything else fails the pipeline
+        task = asyncio.current_task()
+        if isinstance(error, asyncio.CancelledError) and task and task.cancelling():
+            raise error
+        if self._error is None:
+            self._error = error
+            logger.error(f"Streaming pipeline stage failed: {error}")
+
+    async def _run_chunker(self) -> None:
+        batch = PageBatch()
+        while True:
+            page = await self._page_queue.get()
+            if page is _END_OF_STREAM:
+                break
+            if self._error:
+                continue  # Drain so the crawler never blocks on a failed pipeline
+            if self.incremental_state and self.incremental_state.is_unchanged(page):
+                continue
+
+            try:
+                chunked = await self.doc_storage_ops.chunk_document(
+                    page,
+                    self.request,
+                    self.crawl_type,
+                    self.source_id,
+                    cancellation_check=self.cancellation_check,
+                )
+            except (Exception, asyncio.CancelledError) as e:
+                self._record_failure(e)
+                continue
+
+            if not chunked:
+                continue
+            if self.incremental_state:
+                chunked = self.incremental_state.select_changed_chunks(chunked)
+
+            batch.pages.append(page)
+            batch.url_to_full_document[chunked["url"]] = page.get("markdown", "")
+            batch.urls.extend(chunked["urls"])
+            batch.chunk_numbers.extend(chunked["chunk_numbers"])
+            batch.contents.extend(chunked["contents"])
+            batch.metadatas.extend(chunked["metadatas"])
+            batch.word_count += chunked["word_count"]
+
+            if batch.chunk_count >= self.batch_chunks:
+                await self._batch_queue.put(batch)
+                batch = PageBatch()
+
+        if batch.pages and not self._error:
+            await self._batch_queue.put(batch)
+        await self._batch_queue.put(_END_OF_STREAM)
+
+    async def _run_writer(self) -> None:
+        while True:
+            batch = await self._batch_queue.get()
+            if batch is _END_OF_STREAM:
+                return
+            if self._error:
+                continue
+
+            try:
+                await self._write_batch(batch)
+            except (Exception, asyncio.CancelledError) as e:
+                self._record_failure(e)
+
+    async def _write_batch(self, batch: PageBatch) -> None:
+        if not self._source_created and batch.contents:
+            # Chunks reference the source row, so it must exist before the first insert
+            await self.doc_storage_ops._create_source_records(
+                batch.metadatas, batch.contents, {self.source_id: batch.word_count}, self.request
+            )
+            self._source_created = True
+
+        page_urls = [page.get("url", "") for page in batch.pages]
+        if self.incremental_state:
+            await self.incremental_state.delete_replaced_chunks(page_urls, self.cancellation_check)
+
+        stored_chunks = await add_documents_to_supabase(
+            client=self.doc_storage_ops.supabase_client,
+            urls=batch.urls,
+            chunk_numbers=batch.chunk_numbers,
+            contents=batch.contents,
+            metadatas=batch.metadatas,
+            url_to_full_document=batch.url_to_full_document,
+            batch_size=25,
+            progress_callback=None,  # Totals are reported per pipeline batch below
+            enable_parallel_batches=True,
+            provider=None,
+            cancellation_check=self.cancellation_check,
+            delete_existing=self.incremental_state is None,
+        )
+        if self.incremental_state:
+            await self.incremental_state.save_fingerprints(page_urls, stored_chunks)
+        self.pages_stored += len(batch.pages)
+        self.chunks_stored += batch.chunk_count
+        self.total_word_count += batch.word_count
+
+        if self.extract_code_examples:
+            self.code_examples_count += await self.doc_storage_ops.extract_and_store_code_examples(
+                batch.pages, batch.url_to_full_document, None
+            )
+
+        if self.progress_callback:
+            await self.progress_callback(
+                f"Stored {self.pages_stored} pages ({self.chunks_stored} chunks, "
+                f"{self.code_examples_count} code examples)",
+                self.get_stats(),
+            )
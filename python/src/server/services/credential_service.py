@@ -239,6 +239,8 @@ class CredentialService:
                 self._rag_cache_timestamp = None
                 logger.debug(f"Invalidated RAG settings cache due to update of {key}")
 
+            await self._invalidate_provider_clients(key)
+
             logger.info(
                 f"Successfully {'encrypted and ' if is_encrypted else ''}stored credential: {key}"
             )
@@ -267,6 +269,8 @@ class CredentialService:
                 self._rag_cache_timestamp = None
                 logger.debug(f"Invalidated RAG settings cache due to deletion of {key}")
 
+            await self._invalidate_provider_clients(key)
+
             logger.info(f"Successfully deleted credential: {key}")
             return True
 
@@ -322,6 +326,14 @@ class CredentialService:
             logger.error(f"Error getting credentials for category {category}: {e}")
             return {}
 
+    async def _invalidate_provider_clients(self, key: str) -> None:
+        """Rebuild pooled LLM clients when a provider-related setting changes."""
+        # Imported lazily - llm_provider_service depends on this module
+        from .llm_provider_service import PROVIDER_SETTING_KEYS, invalidate_llm_clients
+
+        if key in PROVIDER_SETTING_KEYS:
+            await invalidate_llm_clients()
+
     async def list_all_credentials(self) -> list[CredentialItem]:
         """Get all credentials as a list of CredentialItem objects (for Settings UI)."""
         try:
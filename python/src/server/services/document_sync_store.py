@@ -0,0 +1,272 @@
+"""
+Document Sync Store
+
+Shared state for real-time document collaboration: per-document sync state, editing locks and a
+per-document mutex that serializes read-modify-write updates.
+
+By default everything lives in process memory, which only works with a single API worker. When
+REDIS_URL is set, state, locks and the mutex live in Redis (or anything speaking the Redis
+protocol, e.g. Valkey or KeyDB), so every uvicorn worker sees the same documents. The same URL
+backs the Socket.IO message queue (see socketio_app.py), so room broadcasts reach clients
+connected to any worker.
+"""
+
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from ..config.logfire_config import get_logger
+
+logger = get_logger(__name__)
+
+REDIS_KEY_PREFIX = "archon:docsync"
+
+# A worker that dies while holding a document mutex releases it after this many seconds
+MUTEX_TIMEOUT_SECONDS = 10
+
+
+class DocumentBusyError(Exception):
+    """Raised when a document's mutex could not be acquired in time."""
+
+    def __init__(self, document_id: str):
+        super().__init__(f"Document {document_id} is busy, try again")
+        self.document_id = document_id
+
+
+def get_redis_url() -> str | None:
+    """Get the Redis URL shared by the document sync store and the Socket.IO message queue."""
+    return os.getenv("REDIS_URL") or None
+
+
+class DocumentSyncStore(ABC):
+    """Storage for document sync states and locks, keyed by document ID."""
+
+    @abstractmethod
+    async def get_state(self, document_id: str) -> dict[str, Any] | None:
+        """Get a document's sync state, or None if it has none."""
+
+    @abstractmethod
+    async def save_state(self, state: dict[str, Any]) -> None:
+        """Create or replace a document's sync state (state["id"] is the document ID)."""
+
+    @abstractmethod
+    async def delete_state(self, document_id: str) -> None:
+        """Remove a document's sync state."""
+
+    @abstractmethod
+    async def list_states(self, project_id: str) -> list[dict[str, Any]]:
+        """Get the sync states of all documents in a project."""
+
+    @abstractmethod
+    async def get_lock(self, document_id: str) -> dict[str, Any] | None:
+        """Get a document's editing lock, or None if it is not locked."""
+
+    @abstractmethod
+    async def save_lock(self, document_id: str, lock: dict[str, Any]) -> None:
+        """Create or replace a document's editing lock."""
+
+    @abstractmethod
+    async def delete_lock(self, document_id: str) -> bool:
+        """Remove a document's editing lock, returning whether this call removed it."""
+
+    @abstractmethod
+    async def list_locks(self) -> dict[str, dict[str, Any]]:
+        """Get all editing locks by document ID."""
+
+    @abstractmethod
+    def document_mutex(self, document_id: str):
+        """
+        Async context manager held while reading and updating a document's state or lock.
+
+        Raises DocumentBusyError on entry if the mutex could not be acquired in time.
+
+        Usage:
+            async with store.document_mutex(document_id):
+                state = await store.get_state(document_id)
+                ...
+                await store.save_state(state)
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release any connections held by the store."""
+
+
+class InMemoryDocumentSyncStore(DocumentSyncStore):
+    """Process-local store - the default for a single API worker."""
+
+    def __init__(self):
+        self._states: dict[str, dict[str, Any]] = {}
+        self._locks: dict[str, dict[str, Any]] = {}
+        self._mutexes: dict[str, asyncio.Lock] = {}
+
+    async def get_state(self, document_id: str) -> dict[str, Any] | None:
+        state = self._states.get(document_id)
+        return json.loads(json.dumps(state)) if state is not None else None
+
+    async def save_state(self, state: dict[str, Any]) -> None:
+        # Stored as a copy so callers cannot change it without saving, as with Redis
+        self._states[state["id"]] = json.loads(json.dumps(state))
+
+    async def delete_state(self, document_id: str) -> None:
+        # The mutex stays: the caller usually holds it, and other tasks may be waiting on it
+        self._states.pop(document_id, None)
+
+    async def list_states(self, project_id: str) -> list[dict[str, Any]]:
+        return [
+            json.loads(json.dumps(state))
+            for state in self._states.values()
+            if state.get("project_id") == project_id
+        ]
+
+    async def get_lock(self, document_id: str) -> dict[str, Any] | None:
+        lock = self._locks.get(document_id)
+        return dict(lock) if lock is not None else None
+
+    async def save_lock(self, document_id: str, lock: dict[str, Any]) -> None:
+        self._locks[document_id] = dict(lock)
+
+    async def delete_lock(self, document_id: str) -> bool:
+        return self._locks.pop(document_id, None) is not None
+
+    async def list_locks(self) -> dict[str, dict[str, Any]]:
+        return {document_id: dict(lock) for document_id, lock in self._locks.items()}
+
+    @asynccontextmanager
+    async def document_mutex(self, document_id: str) -> AsyncIterator[None]:
+        mutex = self._mutexes.setdefault(document_id, asyncio.Lock())
+        async with mutex:
+            yield
+
+    async def close(self) -> None:
+        # Nothing to release - everything lives in process memory
+        return None
+
+
+class RedisDocumentSyncStore(DocumentSyncStore):
+    """
+    Redis-backed store shared by every API worker.
+
+    Keys (under REDIS_KEY_PREFIX):
+        state:<document_id>   JSON document state
+        project:<project_id>  set of document IDs with state in the project
+        lock:<document_id>    JSON editing lock
+        locks                 set of locked document IDs
+        mutex:<document_id>   redis-py lock serializing updates to one document
+    """
+
+    def __init__(self, url: str | None = None, client: Any = None, prefix: str = REDIS_KEY_PREFIX):
+        """
+        Initialize the store.
+
+        Args:
+            url: Redis connection URL (ignored when client is given)
+            client: Existing redis.asyncio client, e.g. a test stand-in
+            prefix: Key prefix for everything the store writes
+        """
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise ImportError(
+                    "REDIS_URL is set but the redis package is not installed "
+                    "(install the 'redis' extra)"
+                ) from e
+            client = redis.from_url(url, decode_responses=True)
+        self._client = client
+        self._prefix = prefix
+
+    def _key(self, *parts: str) -> str:
+        return ":".join([self._prefix, *parts])
+
+    async def get_state(self, document_id: str) -> dict[str, Any] | None:
+        raw = await self._client.get(self._key("state", document_id))
+        return json.loads(raw) if raw is not None else None
+
+    async def save_state(self, state: dict[str, Any]) -> None:
+        await self._client.set(self._key("state", state["id"]), json.dumps(state))
+        await self._client.sadd(self._key("project", state["project_id"]), state["id"])
+
+    async def delete_state(self, document_id: str) -> None:
+        state = await self.get_state(document_id)
+        await self._client.delete(self._key("state", document_id))
+        if state is not None:
+            await self._client.srem(self._key("project", state["project_id"]), document_id)
+
+    async def list_states(self, project_id: str) -> list[dict[str, Any]]:
+        document_ids = sorted(await self._client.smembers(self._key("project", project_id)))
+        if not document_ids:
+            return []
+        raw_states = await self._client.mget([self._key("state", doc) for doc in document_ids])
+        return [json.loads(raw) for raw in raw_states if raw is not None]
+
+    async def get_lock(self, document_id: str) -> dict[str, Any] | None:
+        raw = await self._client.get(self._key("lock", document_id))
+        return json.loads(raw) if raw is not None else None
+
+    async def save_lock(self, document_id: str, lock: dict[str, Any]) -> None:
+        await self._client.set(self._key("lock", document_id), json.dumps(lock))
+        await self._client.sadd(self._key("locks"), document_id)
+
+    async def delete_lock(self, document_id: str) -> bool:
+        removed = await self._client.delete(self._key("lock", document_id))
+        await self._client.srem(self._key("locks"), document_id)
+        return bool(removed)
+
+    async def list_locks(self) -> dict[str, dict[str, Any]]:
+        document_ids = sorted(await self._client.smembers(self._key("locks")))
+        if not document_ids:
+            return {}
+        raw_locks = await self._client.mget([self._key("lock", doc) for doc in document_ids])
+        return {
+            document_id: json.loads(raw)
+            for document_id, raw in zip(document_ids, raw_locks, strict=False)
+            if raw is not None
+        }
+
+    @asynccontextmanager
+    async def document_mutex(self, document_id: str) -> AsyncIterator[None]:
+        mutex = self._client.lock(
+            self._key("mutex", document_id),
+            timeout=MUTEX_TIMEOUT_SECONDS,
+            blocking_timeout=MUTEX_TIMEOUT_SECONDS,
+        )
+        # acquire() returns False once blocking_timeout passes (async with would raise LockError)
+        if not await mutex.acquire():
+            raise DocumentBusyError(document_id)
+        try:
+            yield
+        finally:
+            await mutex.release()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+# Global store instance, created on first use
+_document_sync_store: DocumentSyncStore | None = None
+
+
+def get_document_sync_store() -> DocumentSyncStore:
+    """Get the document sync store: Redis when REDIS_URL is set, in-memory otherwise."""
+    global _document_sync_store
+    if _document_sync_store is None:
+        redis_url = get_redis_url()
+        if redis_url:
+            _document_sync_store = RedisDocumentSyncStore(redis_url)
+            logger.info("📄 [DOCUMENT SYNC] Using Redis document sync store")
+        else:
+            _document_sync_store = InMemoryDocumentSyncStore()
+    return _document_sync_store
+
+
+async def close_document_sync_store() -> None:
+    """Close the document sync store's connections, if it was created."""
+    global _document_sync_store
+    if _document_sync_store is not None:
+        await _document_sync_store.close()
+        _document_sync_store = None
@@ -4,18 +4,35 @@ Embedding Services
 Handles all embedding-related operations.
 """
 
+from .chunk_context_cache import ChunkContextCache, get_chunk_context_cache
 from .contextual_embedding_service import (
     generate_contextual_embedding,
     generate_contextual_embeddings_batch,
     process_chunk_with_context,
 )
+from .embedding_cache import EmbeddingCache, get_embedding_cache
 from .embedding_service import create_embedding, create_embeddings_batch, get_openai_client
+from .query_embedding_cache import (
+    QueryEmbeddingCache,
+    create_query_embedding,
+    get_query_embedding_cache,
+)
 
 __all__ = [
     # Embedding functions
     "create_embedding",
     "create_embeddings_batch",
     "get_openai_client",
+    # Embedding cache
+    "EmbeddingCache",
+    "get_embedding_cache",
+    # Query embedding cache
+    "QueryEmbeddingCache",
+    "create_query_embedding",
+    "get_query_embedding_cache",
+    # Contextual embedding cache
+    "ChunkContextCache",
+    "get_chunk_context_cache",
     # Contextual embedding functions
     "generate_contextual_embedding",
     "generate_contextual_embeddings_batch",
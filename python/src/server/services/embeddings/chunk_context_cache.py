@@ -0,0 +1,56 @@
+"""
+Chunk Context Cache
+
+Content-addressed cache for contextual-embedding contexts, keyed by
+(model, sha256(document preview), sha256(chunk)).
+
+A ContentAddressedCache: the LRU tier holds recently generated contexts, the
+archon_chunk_context_cache table keeps them across restarts and re-crawls.
+"""
+
+from ..content_cache import ContentAddressedCache, hash_text
+
+CHUNK_CONTEXT_CACHE_TABLE = "archon_chunk_context_cache"
+
+ContextKey = tuple[str, str]  # (document hash, chunk hash)
+
+
+class ChunkContextCache(ContentAddressedCache[str]):
+    """Two-tier (LRU + table) cache of generated chunk contexts."""
+
+    table = CHUNK_CONTEXT_CACHE_TABLE
+    key_columns = ("document_hash", "chunk_hash")
+    value_columns = ("context",)
+
+    def __init__(self, max_entries: int = 10000, use_table: bool = True):
+        super().__init__(max_entries=max_entries, use_table=use_table)
+
+    async def get_many(self, model: str, keys: list[ContextKey]) -> dict[ContextKey, str]:
+        """
+        Look up contexts for (document hash, chunk hash) keys.
+
+        Returns:
+            Mapping of key to cached context for the keys found
+        """
+        return await self._get_many((model,), keys)
+
+    async def put_many(self, model: str, contexts: dict[ContextKey, str]) -> None:
+        """Store freshly generated contexts in both cache tiers."""
+        await self._put_many((model,), contexts)
+
+
+def context_key(document: str, chunk: str) -> ContextKey:
+    """Cache key for a chunk, addressed by the document text sent with it and the chunk."""
+    return hash_text(document), hash_text(chunk)
+
+
+# Global chunk context cache instance
+_chunk_context_cache: ChunkContextCache | None = None
+
+
+def get_chunk_context_cache() -> ChunkContextCache:
+    """Get the global chunk context cache."""
+    global _chunk_context_cache
+    if _chunk_context_cache is None:
+        _chunk_context_cache = ChunkContextCache()
+    return _chunk_context_cache
@@ -5,6 +5,8 @@ Handles generation of contextual embeddings for improved RAG retrieval.
 Includes proper rate limiting for OpenAI API calls.
 """
 
+import asyncio
+import json
 import os
 
 import openai
@@ -12,6 +14,11 @@ import openai
 from ...config.logfire_config import search_logger
 from ..llm_provider_service import get_llm_client
 from ..threading_service import get_threading_service
+from .chunk_context_cache import ContextKey, context_key, get_chunk_context_cache
+
+# Document text sent once per request; chunks are previewed to bound the prompt size
+DOCUMENT_PREVIEW_CHARS = 5000
+CHUNK_PREVIEW_CHARS = 1000
 
 
 async def generate_contextual_embedding(
@@ -51,7 +58,7 @@ async def generate_contextual_embedding(
 
     try:
         # Use rate limiting before making the API call
-        async with threading_service.rate_limited_operation(estimated_tokens):
+        async with threading_service.rate_limited_operation(estimated_tokens) as rate_limit:
             async with get_llm_client(provider=provider) as client:
                 prompt = f"""<document>
 {full_document[:5000]}
@@ -78,6 +85,9 @@ Please give a short succinct context to situate this chunk within the overall do
                     max_tokens=200,
                 )
 
+                usage = getattr(response, "usage", None)
+                rate_limit.record_usage(getattr(usage, "total_tokens", None))
+
                 context = response.choices[0].message.content.strip()
                 contextual_text = f"{context}\n---\n{chunk}"
 
@@ -123,14 +133,91 @@ async def _get_model_choice(provider: str | None = None) -> str:
     return model
 
 
+def _build_document_contexts_prompt(document_preview: str, chunks: list[str]) -> str:
+    """
+    Build one prompt asking for the context of several chunks of the same document.
+
+    The document comes first so every request for a document starts with the same prefix,
+    which providers with automatic prompt caching serve from cache after the first request.
+    """
+    parts = [
+        f"<document>\n{document_preview}\n</document>",
+        "Here are chunks of this document we want to situate within the whole document:",
+    ]
+    for number, chunk in enumerate(chunks, start=1):
+        parts.append(f'<chunk id="{number}">\n{chunk[:CHUNK_PREVIEW_CHARS]}\n</chunk>')
+    parts.append(
+        "For each chunk, give a short succinct context to situate it within the overall "
+        "document for the purposes of improving search retrieval of the chunk. "
+        'Respond in JSON: {"contexts": [{"id": 1, "context": "..."}]} with one entry per '
+        "chunk id."
+    )
+    return "\n\n".join(parts)
+
+
+async def _generate_document_contexts(
+    client, model: str, document_preview: str, chunks: list[str]
+) -> dict[int, str]:
+    """
+    Generate contexts for chunks of one document with a single request.
+
+    Returns:
+        Mapping of chunk position (0-based) to its context, for the chunks the model answered
+    """
+    prompt = _build_document_contexts_prompt(document_preview, chunks)
+    # Roughly 4 characters per token for the prompt, plus the expected answer
+    estimated_tokens = len(prompt) // 4 + 100 * len(chunks)
+
+    async with get_threading_service().rate_limited_operation(estimated_tokens) as rate_limit:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a helpful assistant that generates contextual information for document chunks.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0,
+            max_tokens=100 * len(chunks) + 50,  # Limit response size
+            response_format={"type": "json_object"},
+        )
+        usage = getattr(response, "usage", None)
+        rate_limit.record_usage(getattr(usage, "total_tokens", None))
+
+    try:
+        parsed = json.loads(response.choices[0].message.content or "{}")
+    except json.JSONDecodeError as e:
+        search_logger.error(f"Failed to parse JSON chunk contexts: {e}")
+        return {}
+
+    contexts = {}
+    entries = parsed.get("contexts", []) if isinstance(parsed, dict) else []
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict) or not entry.get("context"):
+            continue
+        try:
+            position = int(entry.get("id")) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= position < len(chunks):
+            contexts[position] = str(entry["context"]).strip()
+    return contexts
+
+
 async def generate_contextual_embeddings_batch(
     full_documents: list[str], chunks: list[str], provider: str = None
 ) -> list[tuple[str, bool]]:
     """
-    Generate contextual information for multiple chunks in a single API call to avoid rate limiting.
+    Generate contextual information for multiple chunks, with one API call per document.
 
-    This processes ALL chunks passed to it in a single API call.
-    The caller should batch appropriately (e.g., 10 chunks at a time).
+    Chunks are grouped by document so each request sends the document text once, followed by
+    all of that document's chunks, instead of repeating it for every chunk. Requests for
+    different documents run concurrently (up to CONTEXTUAL_EMBEDDINGS_MAX_WORKERS) through
+    the shared rate limiter. Generated contexts are cached by (document hash, chunk hash)
+    when CONTEXTUAL_EMBEDDING_CACHE_ENABLED is on, so unchanged chunks are not sent again.
+
+    The caller should batch appropriately (e.g., CONTEXTUAL_EMBEDDING_BATCH_SIZE chunks).
 
     Args:
         full_documents: List of complete document texts
@@ -142,81 +229,88 @@ async def generate_contextual_embeddings_batch(
         - The contextual text that situates the chunk within the document
         - Boolean indicating if contextual embedding was performed
     """
-    try:
-        async with get_llm_client(provider=provider) as client:
-            # Get model choice from credential service (RAG setting)
-            model_choice = await _get_model_choice(provider)
+    results = [(chunk, False) for chunk in chunks]
+    if not chunks:
+        return results
 
-            # Build batch prompt for ALL chunks at once
-            batch_prompt = (
-                "Process the following chunks and provide contextual information for each:\\n\\n"
-            )
-
-            for i, (doc, chunk) in enumerate(zip(full_documents, chunks, strict=False)):
-                # Use only 2000 chars of document context to save tokens
-                doc_preview = doc[:2000] if len(doc) > 2000 else doc
-                batch_prompt += f"CHUNK {i + 1}:\\n"
-                batch_prompt += f"<document_preview>\\n{doc_preview}\\n</document_preview>\\n"
-                batch_prompt += f"<chunk>\\n{chunk[:500]}\\n</chunk>\\n\\n"  # Limit chunk preview
-
-            batch_prompt += "For each chunk, provide a short succinct context to situate it within the overall document for improving search retrieval. Format your response as:\\nCHUNK 1: [context]\\nCHUNK 2: [context]\\netc."
-
-            # Make single API call for ALL chunks
-            response = await client.chat.completions.create(
-                model=model_choice,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that generates contextual information for document chunks.",
-                    },
-                    {"role": "user", "content": batch_prompt},
-                ],
-                temperature=0,
-                max_tokens=100 * len(chunks),  # Limit response size
-            )
+    from ..credential_service import credential_service
 
-            # Parse response
-            response_text = response.choices[0].message.content
-
-            # Extract contexts from response
-            lines = response_text.strip().split("\\n")
-            chunk_contexts = {}
-
-            for line in lines:
-                if line.strip().startswith("CHUNK"):
-                    parts = line.split(":", 1)
-                    if len(parts) == 2:
-                        chunk_num = int(parts[0].strip().split()[1]) - 1
-                        context = parts[1].strip()
-                        chunk_contexts[chunk_num] = context
-
-            # Build results
-            results = []
-            for i, chunk in enumerate(chunks):
-                if i in chunk_contexts:
-                    # Combine context with full chunk (not truncated)
-                    contextual_text = chunk_contexts[i] + "\\n\\n" + chunk
-                    results.append((contextual_text, True))
-                else:
-                    results.append((chunk, False))
-
-            return results
-
-    except openai.RateLimitError as e:
-        if "insufficient_quota" in str(e):
-            search_logger.warning(f"⚠️ QUOTA EXHAUSTED in contextual embeddings: {e}")
-            search_logger.warning(
-                "OpenAI quota exhausted - proceeding without contextual embeddings"
-            )
-        else:
-            search_logger.warning(f"Rate limit hit in contextual embeddings batch: {e}")
+    try:
+        rag_settings = await credential_service.get_credentials_by_category("rag_strategy")
+        max_workers = max(1, int(rag_settings.get("CONTEXTUAL_EMBEDDINGS_MAX_WORKERS", "3")))
+        use_cache = (
+            str(rag_settings.get("CONTEXTUAL_EMBEDDING_CACHE_ENABLED", "true")).lower() == "true"
+        )
+        model_choice = await _get_model_choice(provider)
+    except Exception as e:
+        search_logger.error(f"Failed to load contextual embedding settings: {e}")
+        return results
+
+    previews = [(doc or "")[:DOCUMENT_PREVIEW_CHARS] for doc in full_documents]
+    keys = [context_key(preview, chunk) for preview, chunk in zip(previews, chunks, strict=False)]
+    cache = get_chunk_context_cache() if use_cache else None
+    cached = await cache.get_many(model_choice, keys) if cache else {}
+
+    # Duplicate chunks share one context; pending keys are grouped by document hash
+    pending: dict[ContextKey, list[int]] = {}
+    documents: dict[str, list[ContextKey]] = {}
+    for index, key in enumerate(keys):
+        if key in cached:
+            results[index] = (f"{cached[key]}\n\n{chunks[index]}", True)
+            continue
+        if key not in pending:
+            documents.setdefault(key[0], []).append(key)
+        pending.setdefault(key, []).append(index)
+
+    semaphore = asyncio.Semaphore(max_workers)
+    generated: dict[ContextKey, str] = {}
+
+    async def contextualize_document(client, document_keys: list[ContextKey]) -> None:
+        first = [pending[key][0] for key in document_keys]
+        try:
+            async with semaphore:
+                contexts = await _generate_document_contexts(
+                    client, model_choice, previews[first[0]], [chunks[i] for i in first]
+                )
+        except openai.RateLimitError as e:
+            if "insufficient_quota" in str(e):
+                search_logger.warning(f"⚠️ QUOTA EXHAUSTED in contextual embeddings: {e}")
+            else:
+                search_logger.warning(f"Rate limit hit in contextual embeddings batch: {e}")
             search_logger.warning(
-                "Rate limit hit - proceeding without contextual embeddings for this batch"
+                f"Proceeding without contextual embeddings for {len(first)} chunks"
             )
-        # Return non-contextual for all chunks
-        return [(chunk, False) for chunk in chunks]
+            return
+        except Exception as e:
+            search_logger.error(f"Error in contextual embedding batch: {e}")
+            return
+
+        for position, key in enumerate(document_keys):
+            context = contexts.get(position)
+            if context is None:
+                continue
+            generated[key] = context
+            for index in pending[key]:
+                # Combine context with full chunk (not truncated)
+                results[index] = (f"{context}\n\n{chunks[index]}", True)
+
+    if documents:
+        try:
+            async with get_llm_client(provider=provider) as client:
+                await asyncio.gather(
+                    *[
+                        contextualize_document(client, document_keys)
+                        for document_keys in documents.values()
+                    ]
+                )
+        except Exception as e:
+            search_logger.error(f"Error in contextual embedding batch: {e}")
 
-    except Exception as e:
-        search_logger.error(f"Error in contextual embedding batch: {e}")
-        # Return non-contextual for all chunks
-        return [(chunk, False) for chunk in chunks]
+    if cache and generated:
+        await cache.put_many(model_choice, generated)
+
+    search_logger.debug(
+        f"Contextual embeddings: {len(generated)} generated, {len(cached)} cached, "
+        f"{len(documents)} document requests for {len(chunks)} chunks"
+    )
+    return results
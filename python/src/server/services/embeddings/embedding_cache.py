@@ -0,0 +1,116 @@
+"""
+Embedding Cache
+
+Content-addressed cache for embeddings, keyed by (provider, model, dimensions, sha256(text)).
+
+A ContentAddressedCache: the LRU tier holds recently used vectors as compact float32 arrays,
+the archon_embedding_cache table keeps them across restarts and re-crawls.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+
+from ..content_cache import ContentAddressedCache, hash_text
+
+EMBEDDING_CACHE_TABLE = "archon_embedding_cache"
+
+
+@dataclass
+class EmbeddingCacheLookup:
+    """Result of a cache lookup for a list of texts."""
+
+    hits: dict[int, list[float]] = field(default_factory=dict)  # text index -> embedding
+    misses: list[int] = field(default_factory=list)  # text indices not found
+    memory_hits: int = 0
+    table_hits: int = 0
+
+    @property
+    def hit_count(self) -> int:
+        return self.memory_hits + self.table_hits
+
+    @property
+    def miss_count(self) -> int:
+        return len(self.misses)
+
+
+class EmbeddingCache(ContentAddressedCache[list[float]]):
+    """Two-tier (LRU + table) embedding cache."""
+
+    table = EMBEDDING_CACHE_TABLE
+    scope_columns = ("provider", "model", "dimensions")
+    value_columns = ("embedding",)
+
+    def _to_memory(self, value: list[float]) -> array:
+        return array("f", value)
+
+    def _from_memory(self, stored: array) -> list[float]:
+        return stored.tolist()
+
+    def _value_from_row(self, row: dict) -> list[float] | None:
+        return row.get("embedding") or None
+
+    async def get_many(
+        self, provider: str, model: str, dimensions: int, texts: list[str]
+    ) -> EmbeddingCacheLookup:
+        """
+        Look up embeddings for a list of texts.
+
+        Args:
+            provider: Embedding provider name
+            model: Embedding model name
+            dimensions: Requested embedding dimensions
+            texts: Texts to look up
+
+        Returns:
+            EmbeddingCacheLookup mapping text indices to cached embeddings
+        """
+        keys = [(hash_text(text),) for text in texts]
+        found, from_memory = await self._lookup((provider, model, dimensions), keys)
+
+        # Hits and misses are counted per text, so repeated texts count every time
+        lookup = EmbeddingCacheLookup()
+        for index, key in enumerate(keys):
+            if key not in found:
+                lookup.misses.append(index)
+                continue
+            lookup.hits[index] = found[key]
+            if key in from_memory:
+                lookup.memory_hits += 1
+            else:
+                lookup.table_hits += 1
+
+        self.memory_hits += lookup.memory_hits
+        self.table_hits += lookup.table_hits
+        self.misses += lookup.miss_count
+        return lookup
+
+    async def put_many(
+        self,
+        provider: str,
+        model: str,
+        dimensions: int,
+        texts: list[str],
+        embeddings: list[list[float]],
+    ) -> None:
+        """Store freshly created embeddings in both cache tiers."""
+        await self._put_many(
+            (provider, model, dimensions),
+            {
+                (hash_text(text),): embedding
+                for text, embedding in zip(texts, embeddings, strict=False)
+            },
+        )
+
+
+# Global embedding cache instance
+_embedding_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache(max_entries: int | None = None) -> EmbeddingCache:
+    """Get the global embedding cache, resizing the LRU tier if a new limit is given."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(max_entries=max_entries or 5000)
+    elif max_entries is not None and max_entries != _embedding_cache.max_entries:
+        _embedding_cache.max_entries = max_entries
+    return _embedding_cache
@@ -15,6 +15,7 @@ from ...config.logfire_config import safe_span, search_logger
 from ..credential_service import credential_service
 from ..llm_provider_service import get_embedding_model, get_llm_client
 from ..threading_service import get_threading_service
+from .embedding_cache import get_embedding_cache
 from .embedding_exceptions import (
     EmbeddingAPIError,
     EmbeddingError,
@@ -32,6 +33,7 @@ class EmbeddingBatchResult:
     success_count: int = 0
     failure_count: int = 0
     texts_processed: list[str] = field(default_factory=list)  # Successfully processed texts
+    rate_limited_count: int = 0  # Provider 429 responses seen while creating the batch
 
     def add_success(self, embedding: list[float], text: str):
         """Add a successful embedding."""
@@ -142,6 +144,10 @@ async def create_embeddings_batch(
     "skip, don't corrupt" principle - failed items are tracked but not stored
     with zero embeddings.
 
+    When EMBEDDING_CACHE_ENABLED is set, texts whose content hash is already cached for the
+    current provider/model/dimensions are served from the embedding cache and returned first;
+    only the remaining texts are sent to the provider.
+
     Args:
         texts: List of texts to create embeddings for
         websocket: Optional WebSocket for progress updates
@@ -176,24 +182,59 @@ async def create_embeddings_batch(
 
     result = EmbeddingBatchResult()
     threading_service = get_threading_service()
+    total_texts = len(texts)
+    cached_count = 0
 
     with safe_span(
         "create_embeddings_batch", text_count=len(texts), total_chars=sum(len(t) for t in texts)
     ) as span:
         try:
-            async with get_llm_client(provider=provider, use_embedding_provider=True) as client:
-                # Load batch size and dimensions from settings
-                try:
-                    rag_settings = await credential_service.get_credentials_by_category(
-                        "rag_strategy"
-                    )
-                    batch_size = int(rag_settings.get("EMBEDDING_BATCH_SIZE", "100"))
-                    embedding_dimensions = int(rag_settings.get("EMBEDDING_DIMENSIONS", "1536"))
-                except Exception as e:
-                    search_logger.warning(f"Failed to load embedding settings: {e}, using defaults")
-                    batch_size = 100
-                    embedding_dimensions = 1536
+            # Load batch size, dimensions and cache settings from settings
+            try:
+                rag_settings = await credential_service.get_credentials_by_category("rag_strategy")
+                batch_size = int(rag_settings.get("EMBEDDING_BATCH_SIZE", "100"))
+                embedding_dimensions = int(rag_settings.get("EMBEDDING_DIMENSIONS", "1536"))
+                use_cache = (
+                    str(rag_settings.get("EMBEDDING_CACHE_ENABLED", "false")).lower() == "true"
+                )
+                cache_max_entries = int(rag_settings.get("EMBEDDING_CACHE_MAX_ENTRIES", "5000"))
+                provider_name = provider or rag_settings.get("LLM_PROVIDER", "openai")
+            except Exception as e:
+                search_logger.warning(f"Failed to load embedding settings: {e}, using defaults")
+                batch_size = 100
+                embedding_dimensions = 1536
+                use_cache = False
+                cache_max_entries = 5000
+                provider_name = provider or "openai"
+
+            embedding_model = await get_embedding_model(provider=provider)
+
+            # Serve unchanged content from the embedding cache before calling the provider
+            cache = None
+            if use_cache:
+                cache = get_embedding_cache(cache_max_entries)
+                lookup = await cache.get_many(
+                    provider_name, embedding_model, embedding_dimensions, texts
+                )
+                for index in sorted(lookup.hits):
+                    result.add_success(lookup.hits[index], texts[index])
+                texts = [texts[index] for index in lookup.misses]
+
+                span.set_attribute("cache_hits", lookup.hit_count)
+                span.set_attribute("cache_memory_hits", lookup.memory_hits)
+                span.set_attribute("cache_table_hits", lookup.table_hits)
+                span.set_attribute("cache_misses", lookup.miss_count)
 
+            cached_count = result.success_count
+
+            if not texts:
+                span.set_attribute("embeddings_created", result.success_count)
+                span.set_attribute("embeddings_failed", 0)
+                span.set_attribute("success", True)
+                span.set_attribute("total_tokens_used", 0)
+                return result
+
+            async with get_llm_client(provider=provider, use_embedding_provider=True) as client:
                 total_tokens_used = 0
 
                 for i in range(0, len(texts), batch_size):
@@ -206,24 +247,38 @@ async def create_embeddings_batch(
                         total_tokens_used += batch_tokens
 
                         # Rate limit each batch
-                        async with threading_service.rate_limited_operation(batch_tokens):
+                        async with threading_service.rate_limited_operation(
+                            batch_tokens
+                        ) as rate_limit:
                             retry_count = 0
                             max_retries = 3
 
                             while retry_count < max_retries:
                                 try:
                                     # Create embeddings for this batch
-                                    embedding_model = await get_embedding_model(provider=provider)
                                     response = await client.embeddings.create(
                                         model=embedding_model,
                                         input=batch,
                                         dimensions=embedding_dimensions,
                                     )
 
+                                    # Settle the token estimate against real usage
+                                    usage = getattr(response, "usage", None)
+                                    rate_limit.record_usage(getattr(usage, "total_tokens", None))
+
                                     # Add successful embeddings
                                     for text, item in zip(batch, response.data, strict=False):
                                         result.add_success(item.embedding, text)
 
+                                    if cache is not None:
+                                        await cache.put_many(
+                                            provider_name,
+                                            embedding_model,
+                                            embedding_dimensions,
+                                            batch,
+                                            [item.embedding for item in response.data],
+                                        )
+
                                     break  # Success, exit retry loop
 
                                 except openai.RateLimitError as e:
@@ -257,6 +312,7 @@ async def create_embeddings_batch(
 
                                     else:
                                         # Regular rate limit - retry
+                                        result.rate_limited_count += 1
                                         retry_count += 1
                                         if retry_count < max_retries:
                                             wait_time = 2**retry_count
@@ -287,9 +343,9 @@ async def create_embeddings_batch(
                     # Progress reporting
                     if progress_callback:
                         processed = result.success_count + result.failure_count
-                        progress = (processed / len(texts)) * 100
+                        progress = (processed / total_texts) * 100
 
-                        message = f"Processed {processed}/{len(texts)} texts"
+                        message = f"Processed {processed}/{total_texts} texts"
                         if result.has_failures:
                             message += f" ({result.failure_count} failed)"
 
@@ -298,13 +354,13 @@ async def create_embeddings_batch(
                     # WebSocket update
                     if websocket:
                         processed = result.success_count + result.failure_count
-                        ws_progress = (processed / len(texts)) * 100
+                        ws_progress = (processed / total_texts) * 100
                         await websocket.send_json({
                             "type": "embedding_progress",
                             "processed": processed,
                             "successful": result.success_count,
                             "failed": result.failure_count,
-                            "total": len(texts),
+                            "total": total_texts,
                             "percentage": ws_progress,
                         })
 
@@ -323,8 +379,8 @@ async def create_embeddings_batch(
             span.set_attribute("catastrophic_failure", True)
             search_logger.error(f"Catastrophic failure in batch embedding: {e}", exc_info=True)
 
-            # Mark remaining texts as failed
-            processed_count = result.success_count + result.failure_count
+            # Mark remaining texts as failed (cache hits were never part of `texts`)
+            processed_count = result.success_count + result.failure_count - cached_count
             for text in texts[processed_count:]:
                 result.add_failure(
                     text, EmbeddingAPIError(f"Catastrophic failure: {str(e)}", original_error=e)
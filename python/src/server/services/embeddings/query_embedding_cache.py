@@ -0,0 +1,252 @@
+"""
+Query Embedding Cache
+
+In-process TTL/LRU cache for search query embeddings, keyed by (provider, embedding model,
+dimensions, query text).
+
+Search traffic repeats the same queries often, so besides caching finished vectors this module:
+1. Coalesces identical in-flight queries - concurrent callers share one pending request
+2. Micro-batches concurrent distinct queries - queries arriving within a short window are
+   embedded with a single create_embeddings_batch call
+
+Failures are never cached: a query whose embedding fails is retried through create_embedding,
+so callers see the same EmbeddingError subclasses as before.
+"""
+
+import asyncio
+import time
+from array import array
+from collections import OrderedDict
+
+from ...config.logfire_config import search_logger
+from ..credential_service import credential_service
+from . import embedding_service
+
+QueryKey = tuple[str, str, str, str]  # (provider, model, dimensions, query)
+
+# Queries arriving within this window share one embeddings request
+DEFAULT_BATCH_WINDOW_SECONDS = 0.005
+DEFAULT_MAX_BATCH_SIZE = 32
+
+
+class QueryEmbeddingCache:
+    """TTL/LRU cache of query embeddings with single-flight and micro-batched misses."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 600.0,
+        batch_window_seconds: float = DEFAULT_BATCH_WINDOW_SECONDS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch_size = max_batch_size
+        self._memory: OrderedDict[QueryKey, tuple[float, array]] = OrderedDict()
+        self._in_flight: dict[QueryKey, asyncio.Future] = {}
+        # Open micro-batches per provider override, and the flush tasks draining them
+        self._open_batches: dict[str | None, list[QueryKey]] = {}
+        self._flush_tasks: set[asyncio.Task] = set()
+        # Bumped by clear() so requests started before it do not repopulate the cache
+        self._generation = 0
+
+        # Cumulative counters since process start
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.batches = 0
+
+    def _lookup(self, key: QueryKey) -> list[float] | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, vector = entry
+        if expires_at <= time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return vector.tolist()
+
+    def _remember(self, key: QueryKey, embedding: list[float]) -> None:
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, array("f", embedding))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get_embedding(self, key: QueryKey, provider: str | None = None) -> list[float]:
+        """
+        Get the embedding for a query key, embedding it (once) on a miss.
+
+        Args:
+            key: Query key built from the current embedding settings and the query text
+            provider: Optional provider override passed through to the embedding service
+
+        Returns:
+            The query embedding
+
+        Raises:
+            EmbeddingError: When the query cannot be embedded
+        """
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            self._enqueue(key, provider)
+
+        # Shield the shared future so one cancelled caller does not fail the others
+        return list(await asyncio.shield(future))
+
+    def _enqueue(self, key: QueryKey, provider: str | None) -> None:
+        batch = self._open_batches.get(provider)
+        if batch is None:
+            batch = []
+            self._open_batches[provider] = batch
+            self._spawn(self._flush_after_window(provider, batch))
+
+        batch.append(key)
+        if len(batch) >= self.max_batch_size:
+            self._close_batch(provider, batch)
+            self._spawn(self._flush(provider, batch))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    def _close_batch(self, provider: str | None, batch: list[QueryKey]) -> bool:
+        if self._open_batches.get(provider) is not batch:
+            return False
+        del self._open_batches[provider]
+        return True
+
+    async def _flush_after_window(self, provider: str | None, batch: list[QueryKey]) -> None:
+        await asyncio.sleep(self.batch_window_seconds)
+        # A batch that filled up early has already been flushed
+        if self._close_batch(provider, batch):
+            await self._flush(provider, batch)
+
+    async def _flush(self, provider: str | None, batch: list[QueryKey]) -> None:
+        queries = [key[3] for key in batch]
+        generation = self._generation
+        self.batches += 1
+        try:
+            embeddings: dict[str, list[float]] = {}
+            try:
+                result = await embedding_service.create_embeddings_batch(
+                    queries, provider=provider
+                )
+                # Cached texts are returned first, so map results back by text
+                embeddings = dict(zip(result.texts_processed, result.embeddings, strict=False))
+            except Exception as e:
+                search_logger.warning(f"Batched query embedding failed: {e}")
+
+            for key in batch:
+                future = self._in_flight[key]
+                embedding = embeddings.get(key[3])
+                if embedding is None:
+                    # Retry alone so the caller gets the usual typed embedding error
+                    try:
+                        embedding = await embedding_service.create_embedding(
+                            key[3], provider=provider
+                        )
+                    except Exception as e:
+                        future.set_exception(e)
+                        # Retrieve it now so an abandoned future does not warn
+                        future.exception()
+                        continue
+                if generation == self._generation:
+                    self._remember(key, embedding)
+                future.set_result(embedding)
+        finally:
+            # Release waiters if the flush itself was cancelled (e.g. on shutdown)
+            for key in batch:
+                future = self._in_flight.pop(key, None)
+                if future is not None and not future.done():
+                    future.cancel()
+
+    def get_stats(self) -> dict[str, int]:
+        """Get cumulative hit/miss/coalescing counters and current cache size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached query embeddings; in-flight requests finish without caching."""
+        self._memory.clear()
+        self._generation += 1
+
+
+# Global query embedding cache instance
+_query_embedding_cache: QueryEmbeddingCache | None = None
+
+
+def get_query_embedding_cache(
+    max_entries: int | None = None, ttl_seconds: float | None = None
+) -> QueryEmbeddingCache:
+    """Get the global query embedding cache, applying size/TTL settings when given."""
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        _query_embedding_cache = QueryEmbeddingCache()
+    if max_entries is not None:
+        _query_embedding_cache.max_entries = max_entries
+    if ttl_seconds is not None:
+        _query_embedding_cache.ttl_seconds = ttl_seconds
+    return _query_embedding_cache
+
+
+def clear_query_embedding_cache() -> None:
+    """Drop cached query embeddings, e.g. after the embedding provider or model changes."""
+    if _query_embedding_cache is not None:
+        _query_embedding_cache.clear()
+
+
+async def create_query_embedding(query: str, provider: str | None = None) -> list[float]:
+    """
+    Create an embedding for a search query, served from the query embedding cache when enabled.
+
+    Args:
+        query: Search query to embed
+        provider: Optional provider override
+
+    Returns:
+        List of floats representing the query embedding
+
+    Raises:
+        EmbeddingQuotaExhaustedError: When OpenAI quota is exhausted
+        EmbeddingRateLimitError: When rate limited
+        EmbeddingAPIError: For other API errors
+    """
+    try:
+        rag_settings = await credential_service.get_credentials_by_category("rag_strategy")
+        enabled = str(rag_settings.get("QUERY_EMBEDDING_CACHE_ENABLED", "true")).lower() == "true"
+        max_entries = int(rag_settings.get("QUERY_EMBEDDING_CACHE_MAX_ENTRIES", "1000"))
+        ttl_seconds = float(rag_settings.get("QUERY_EMBEDDING_CACHE_TTL", "600"))
+        key = (
+            provider or str(rag_settings.get("LLM_PROVIDER", "openai")),
+            str(rag_settings.get("EMBEDDING_MODEL", "")),
+            str(rag_settings.get("EMBEDDING_DIMENSIONS", "1536")),
+            query,
+        )
+    except Exception as e:
+        search_logger.warning(f"Failed to load query embedding cache settings: {e}")
+        enabled = False
+
+    if not enabled:
+        return await embedding_service.create_embedding(query, provider=provider)
+
+    cache = get_query_embedding_cache(max_entries, ttl_seconds)
+    return await cache.get_embedding(key, provider=provider)
@@ -5,9 +5,11 @@ Contains services for knowledge management operations.
 """
 from .knowledge_item_service import KnowledgeItemService
 from .database_metrics_service import DatabaseMetricsService
+from .vector_index_service import VectorIndexService
 from .knowledge_item_service import KnowledgeItemService
 
 __all__ = [
     'KnowledgeItemService',
-    'DatabaseMetricsService'
+    'DatabaseMetricsService',
+    'VectorIndexService'
 ]
@@ -0,0 +1,90 @@
+"""
+Vector Index Service
+
+Handles maintenance of the embedding indexes on the knowledge base tables.
+"""
+
+from typing import Any
+
+from ...config.logfire_config import safe_logfire_error, safe_logfire_info
+from ..client_manager import execute_async
+
+VECTOR_INDEX_TYPES = ("hnsw", "ivfflat")
+
+
+class VectorIndexService:
+    """
+    Service for rebuilding the HNSW / IVFFlat embedding indexes.
+    """
+
+    def __init__(self, supabase_client):
+        """
+        Initialize the vector index service.
+
+        Args:
+            supabase_client: The Supabase client for database operations
+        """
+        self.supabase = supabase_client
+
+    async def rebuild_indexes(
+        self,
+        index_type: str = "hnsw",
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: int | None = None,
+        min_rows: int = 1000,
+    ) -> dict[str, Any]:
+        """
+        Rebuild the embedding indexes on archon_crawled_pages and archon_code_examples.
+
+        IVFFlat centroids are computed from the rows present at build time, so an IVFFlat
+        index should be rebuilt once a table holds real data. Tables with fewer than
+        min_rows embeddings keep their current index when IVFFlat is requested.
+
+        Args:
+            index_type: "hnsw" or "ivfflat"
+            m: HNSW max connections per layer
+            ef_construction: HNSW candidate list size while building
+            lists: IVFFlat list count (default: derived from the row count)
+            min_rows: Minimum embedded rows before an IVFFlat index is built
+
+        Returns:
+            Dict with one entry per table describing what was rebuilt
+        """
+        if index_type not in VECTOR_INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {VECTOR_INDEX_TYPES}, got '{index_type}'")
+        if m < 2 or ef_construction < 2 * m:
+            raise ValueError("HNSW requires m >= 2 and ef_construction >= 2 * m")
+        if lists is not None and lists < 1:
+            raise ValueError("lists must be a positive integer")
+
+        try:
+            safe_logfire_info(
+                f"Rebuilding vector indexes | index_type={index_type} | m={m} | "
+                f"ef_construction={ef_construction} | lists={lists} | min_rows={min_rows}"
+            )
+
+            result = await execute_async(
+                self.supabase.rpc(
+                    "rebuild_archon_vector_indexes",
+                    {
+                        "index_type": index_type,
+                        "hnsw_m": m,
+                        "hnsw_ef_construction": ef_construction,
+                        "ivfflat_lists": lists,
+                        "min_rows": min_rows,
+                    },
+                )
+            )
+            tables = result.data or []
+
+            safe_logfire_info(
+                f"Vector indexes rebuilt | index_type={index_type} | "
+                f"rebuilt={[t['table_name'] for t in tables if t.get('rebuilt')]}"
+            )
+
+            return {"index_type": index_type, "tables": tables}
+
+        except Exception as e:
+            safe_logfire_error(f"Failed to rebuild vector indexes | error={str(e)}")
+            raise
@@ -3,12 +3,19 @@ LLM Provider Service
 
 Provides a unified interface for creating OpenAI-compatible clients for different LLM providers.
 Supports OpenAI, Ollama, and Google Gemini.
+
+Clients are long-lived: one AsyncOpenAI (and its pooled httpx connections) is kept per
+(provider, base_url, api_key) and reused across calls until the provider configuration changes.
 """
 
+import asyncio
+import hashlib
+import importlib.util
 import time
 from contextlib import asynccontextmanager
 from typing import Any
 
+import httpx
 import openai
 
 from ..config.logfire_config import get_logger
@@ -38,13 +45,220 @@ def _set_cached_settings(key: str, value: Any) -> None:
     _settings_cache[key] = (value, time.time())
 
 
+# Long-lived client registry keyed by (provider, base_url, api key fingerprint)
+_client_registry: dict[tuple[str, str | None, str], openai.AsyncOpenAI] = {}
+_registry_lock = asyncio.Lock()
+
+# Open get_llm_client contexts per client (by id), so invalidated clients are only closed once
+# nobody is using them
+_client_leases: dict[int, int] = {}
+# Clients dropped from the registry while still leased, closed when their last lease ends
+_retired_clients: dict[int, openai.AsyncOpenAI] = {}
+
+# HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Settings that change which client (or pool) a request should use
+PROVIDER_SETTING_KEYS = {
+    "LLM_PROVIDER",
+    "LLM_BASE_URL",
+    "OPENAI_API_KEY",
+    "GOOGLE_API_KEY",
+    "EMBEDDING_MODEL",
+    "MODEL_CHOICE",
+    "LLM_CLIENT_MAX_CONNECTIONS",
+    "LLM_CLIENT_MAX_KEEPALIVE_CONNECTIONS",
+    "LLM_CLIENT_KEEPALIVE_EXPIRY",
+    "LLM_CLIENT_HTTP2",
+    "llm_provider",
+}
+
+
+def _client_key(
+    provider_name: str, base_url: str | None, api_key: str | None
+) -> tuple[str, str | None, str]:
+    """Registry key for a client. The API key is fingerprinted rather than stored verbatim."""
+    fingerprint = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return (provider_name, base_url, fingerprint)
+
+
+async def _get_pool_settings() -> dict[str, Any]:
+    """Load connection pool settings for provider clients."""
+    cache_key = "rag_strategy_settings"
+    rag_settings = _get_cached_settings(cache_key)
+    if rag_settings is None:
+        rag_settings = await credential_service.get_credentials_by_category("rag_strategy")
+        _set_cached_settings(cache_key, rag_settings)
+
+    try:
+        return {
+            "max_connections": int(rag_settings.get("LLM_CLIENT_MAX_CONNECTIONS", "100")),
+            "max_keepalive_connections": int(
+                rag_settings.get("LLM_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "20")
+            ),
+            "keepalive_expiry": float(rag_settings.get("LLM_CLIENT_KEEPALIVE_EXPIRY", "30")),
+            "http2": str(rag_settings.get("LLM_CLIENT_HTTP2", "true")).lower() == "true",
+        }
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Invalid LLM client pool settings: {e}, using defaults")
+        return {
+            "max_connections": 100,
+            "max_keepalive_connections": 20,
+            "keepalive_expiry": 30.0,
+            "http2": True,
+        }
+
+
+def _create_http_client(pool_settings: dict[str, Any]) -> httpx.AsyncClient:
+    """Create the pooled httpx client shared by one provider client."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_settings["max_connections"],
+            max_keepalive_connections=pool_settings["max_keepalive_connections"],
+            keepalive_expiry=pool_settings["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(600.0, connect=10.0),
+        http2=pool_settings["http2"] and _HTTP2_AVAILABLE,
+    )
+
+
+def _build_client(
+    provider_name: str, api_key: str | None, base_url: str | None, http_client: httpx.AsyncClient
+) -> openai.AsyncOpenAI:
+    """Construct an OpenAI-compatible client for a provider."""
+    if provider_name == "openai":
+        if not api_key:
+            raise ValueError("OpenAI API key not found")
+
+        client = openai.AsyncOpenAI(api_key=api_key, http_client=http_client)
+        logger.info("OpenAI client created successfully")
+
+    elif provider_name == "ollama":
+        # Ollama requires an API key in the client but doesn't actually use it
+        client = openai.AsyncOpenAI(
+            api_key="ollama",  # Required but unused by Ollama
+            base_url=base_url or "http://localhost:11434/v1",
+            http_client=http_client,
+        )
+        logger.info(f"Ollama client created successfully with base URL: {base_url}")
+
+    elif provider_name == "google":
+        if not api_key:
+            raise ValueError("Google API key not found")
+
+        client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url or "https://generativelanguage.googleapis.com/v1beta/openai/",
+            http_client=http_client,
+        )
+        logger.info("Google Gemini client created successfully")
+
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider_name}")
+
+    return client
+
+
+async def _get_or_create_client(
+    provider_name: str, api_key: str | None, base_url: str | None
+) -> openai.AsyncOpenAI:
+    """
+    Return the registered client for this configuration, creating it on first use.
+
+    The caller holds a lease on the returned client and must hand it back with _release_client.
+    """
+    key = _client_key(provider_name, base_url, api_key)
+    client = _client_registry.get(key)
+    if client is not None:
+        _client_leases[id(client)] = _client_leases.get(id(client), 0) + 1
+        return client
+
+    async with _registry_lock:
+        client = _client_registry.get(key)
+        if client is None:
+            logger.info(f"Creating LLM client for provider: {provider_name}")
+            http_client = _create_http_client(await _get_pool_settings())
+            try:
+                client = _build_client(provider_name, api_key, base_url, http_client)
+            except Exception:
+                await http_client.aclose()
+                raise
+            _client_registry[key] = client
+        _client_leases[id(client)] = _client_leases.get(id(client), 0) + 1
+    return client
+
+
+async def _close_client(client: openai.AsyncOpenAI) -> None:
+    try:
+        await client.close()
+    except Exception as e:
+        logger.debug(f"Error closing LLM client: {e}")
+
+
+async def _release_client(client: openai.AsyncOpenAI) -> None:
+    """End one lease on a client, closing it if it was invalidated and this was the last one."""
+    client_id = id(client)
+    remaining = _client_leases.get(client_id, 1) - 1
+    if remaining > 0:
+        _client_leases[client_id] = remaining
+        return
+
+    _client_leases.pop(client_id, None)
+    retired = _retired_clients.pop(client_id, None)
+    if retired is not None:
+        await _close_client(retired)
+
+
+async def invalidate_llm_clients() -> None:
+    """
+    Drop all cached provider clients and provider settings.
+
+    Called when provider configuration changes so the next get_llm_client call
+    rebuilds its client (and connection pool) from the new settings. Cached query embeddings
+    are dropped too, since they may come from the previous embedding model.
+
+    Clients still in use by open get_llm_client contexts keep working and are closed when
+    the last of those contexts exits; idle ones are closed right away.
+    """
+    # Imported lazily - the embedding services depend on this module
+    from .embeddings.query_embedding_cache import clear_query_embedding_cache
+
+    _settings_cache.clear()
+    clear_query_embedding_cache()
+    async with _registry_lock:
+        clients = list(_client_registry.values())
+        _client_registry.clear()
+
+    for client in clients:
+        if _client_leases.get(id(client)):
+            _retired_clients[id(client)] = client
+        else:
+            await _close_client(client)
+
+    if clients:
+        logger.info(f"Invalidated {len(clients)} cached LLM client(s)")
+
+
+async def close_llm_clients() -> None:
+    """Close all pooled provider clients, including ones still in use (application shutdown)."""
+    async with _registry_lock:
+        clients = [*_client_registry.values(), *_retired_clients.values()]
+        _client_registry.clear()
+        _retired_clients.clear()
+        _client_leases.clear()
+
+    for client in clients:
+        await _close_client(client)
+
+
 @asynccontextmanager
 async def get_llm_client(provider: str | None = None, use_embedding_provider: bool = False):
     """
-    Create an async OpenAI-compatible client based on the configured provider.
+    Get an async OpenAI-compatible client based on the configured provider.
 
-    This context manager handles client creation for different LLM providers
-    that support the OpenAI API format.
+    This context manager hands out a pooled, long-lived client for LLM providers
+    that support the OpenAI API format. Clients are shared between callers and are
+    not closed on exit; they are rebuilt when provider settings change.
 
     Args:
         provider: Override provider selection
@@ -91,35 +305,7 @@ async def get_llm_client(provider: str | None = None, use_embedding_provider: bo
             api_key = provider_config["api_key"]
             base_url = provider_config["base_url"]
 
-        logger.info(f"Creating LLM client for provider: {provider_name}")
-
-        if provider_name == "openai":
-            if not api_key:
-                raise ValueError("OpenAI API key not found")
-
-            client = openai.AsyncOpenAI(api_key=api_key)
-            logger.info("OpenAI client created successfully")
-
-        elif provider_name == "ollama":
-            # Ollama requires an API key in the client but doesn't actually use it
-            client = openai.AsyncOpenAI(
-                api_key="ollama",  # Required but unused by Ollama
-                base_url=base_url or "http://localhost:11434/v1",
-            )
-            logger.info(f"Ollama client created successfully with base URL: {base_url}")
-
-        elif provider_name == "google":
-            if not api_key:
-                raise ValueError("Google API key not found")
-
-            client = openai.AsyncOpenAI(
-                api_key=api_key,
-                base_url=base_url or "https://generativelanguage.googleapis.com/v1beta/openai/",
-            )
-            logger.info("Google Gemini client created successfully")
-
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider_name}")
+        client = await _get_or_create_client(provider_name, api_key, base_url)
 
         yield client
 
@@ -129,8 +315,9 @@ async def get_llm_client(provider: str | None = None, use_embedding_provider: bo
         )
         raise
     finally:
-        # Cleanup if needed
-        pass
+        # Pooled clients outlive the context; see invalidate_llm_clients()
+        if client is not None:
+            await _release_client(client)
 
 
 async def get_embedding_model(provider: str | None = None) -> str:
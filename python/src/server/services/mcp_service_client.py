@@ -11,6 +11,8 @@ from urllib.parse import urljoin
 
 import httpx
 
+from ...mcp_server.utils.http_client import get_shared_transport
+from ...mcp_server.utils.timeout_config import get_default_timeout, get_rag_timeout
 from ..config.logfire_config import mcp_logger
 from ..config.service_discovery import get_agents_url, get_api_url
 
@@ -25,12 +27,23 @@ class MCPServiceClient:
         self.api_url = get_api_url()
         self.agents_url = get_agents_url()
         self.service_auth = "mcp-service-key"  # In production, use proper key management
-        self.timeout = httpx.Timeout(
-            connect=5.0,
-            read=300.0,  # 5 minutes for long operations like crawling
-            write=30.0,
-            pool=5.0,
-        )
+        self.health_timeout = httpx.Timeout(5.0)
+        # Sends through the MCP process's shared keep-alive pool; created lazily
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the HTTP client on the shared connection pool, replacing it if it was closed"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=get_default_timeout(), transport=get_shared_transport()
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the HTTP client; the shared pool is closed by close_http_client_pool()"""
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
 
     def _get_headers(self, request_id: str | None = None) -> dict[str, str]:
         """Get common headers for internal requests"""
@@ -67,20 +80,19 @@ class MCPServiceClient:
         mcp_logger.info(f"Calling API service to crawl {url}")
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    endpoint, json=request_data, headers=self._get_headers()
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                # Transform API response to MCP expected format
-                return {
-                    "success": result.get("success", False),
-                    "progressId": result.get("progressId"),
-                    "message": result.get("message", "Crawling started"),
-                    "error": None if result.get("success") else {"message": "Crawl failed"},
-                }
+            response = await self._get_client().post(
+                endpoint, json=request_data, headers=self._get_headers()
+            )
+            response.raise_for_status()
+            result = response.json()
+
+            # Transform API response to MCP expected format
+            return {
+                "success": result.get("success", False),
+                "progressId": result.get("progressId"),
+                "message": result.get("message", "Crawling started"),
+                "error": None if result.get("success") else {"message": "Crawl failed"},
+            }
         except httpx.TimeoutException:
             mcp_logger.error(f"Timeout crawling {url}")
             return {
@@ -120,21 +132,20 @@ class MCPServiceClient:
         mcp_logger.info(f"Calling API service to search: {query}")
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # First, get search results from API service
-                response = await client.post(
-                    endpoint, json=request_data, headers=self._get_headers()
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                # Transform API response to MCP expected format
-                return {
-                    "success": result.get("success", True),
-                    "results": result.get("results", []),
-                    "reranked": False,  # Reranking should be handled by Server's service layer
-                    "error": None,
-                }
+            # First, get search results from API service
+            response = await self._get_client().post(
+                endpoint, json=request_data, headers=self._get_headers(), timeout=get_rag_timeout()
+            )
+            response.raise_for_status()
+            result = response.json()
+
+            # Transform API response to MCP expected format
+            return {
+                "success": result.get("success", True),
+                "results": result.get("results", []),
+                "reranked": False,  # Reranking should be handled by Server's service layer
+                "error": None,
+            }
 
         except Exception as e:
             mcp_logger.error(f"Error searching: {str(e)}")
@@ -200,21 +211,22 @@ class MCPServiceClient:
 
         # Check API service
         api_health_url = urljoin(self.api_url, "/api/health")
+        client = self._get_client()
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
-                mcp_logger.info(f"Checking API service health at: {api_health_url}")
-                response = await client.get(api_health_url)
-                health_status["api_service"] = response.status_code == 200
-                mcp_logger.info(f"API service health check: {response.status_code}")
+            mcp_logger.info(f"Checking API service health at: {api_health_url}")
+            response = await client.get(api_health_url, timeout=self.health_timeout)
+            health_status["api_service"] = response.status_code == 200
+            mcp_logger.info(f"API service health check: {response.status_code}")
         except Exception as e:
             health_status["api_service"] = False
             mcp_logger.warning(f"API service health check failed: {e}")
 
         # Check Agents service
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
-                response = await client.get(urljoin(self.agents_url, "/health"))
-                health_status["agents_service"] = response.status_code == 200
+            response = await client.get(
+                urljoin(self.agents_url, "/health"), timeout=self.health_timeout
+            )
+            health_status["agents_service"] = response.status_code == 200
         except Exception:
             pass
 
@@ -17,6 +17,9 @@ from ...config.logfire_config import get_logger
 
 logger = get_logger(__name__)
 
+# Document fields update_document may change
+DOCUMENT_UPDATE_FIELDS = ("title", "content", "status", "tags", "author", "version")
+
 
 class DocumentService:
     """Service class for document operations within projects"""
@@ -41,18 +44,6 @@ class DocumentService:
             Tuple of (success, result_dict)
         """
         try:
-            # Get current project
-            project_response = (
-                self.supabase_client.table("archon_projects")
-                .select("docs")
-                .eq("id", project_id)
-                .execute()
-            )
-            if not project_response.data:
-                return False, {"error": f"Project with ID {project_id} not found"}
-
-            current_docs = project_response.data[0].get("docs", [])
-
             # Create new document entry
             new_doc = {
                 "id": str(uuid.uuid4()),
@@ -67,30 +58,24 @@ class DocumentService:
             if author:
                 new_doc["author"] = author
 
-            # Add to docs array
-            updated_docs = current_docs + [new_doc]
-
-            # Update project
-            response = (
-                self.supabase_client.table("archon_projects")
-                .update({"docs": updated_docs})
-                .eq("id", project_id)
-                .execute()
-            )
+            # Append to the docs array in the database
+            response = self.supabase_client.rpc(
+                "upsert_archon_project_document",
+                {"project_id_param": project_id, "document_param": new_doc},
+            ).execute()
+            if not response.data:
+                return False, {"error": f"Project with ID {project_id} not found"}
 
-            if response.data:
-                return True, {
-                    "document": {
-                        "id": new_doc["id"],
-                        "project_id": project_id,
-                        "document_type": new_doc["document_type"],
-                        "title": new_doc["title"],
-                        "status": new_doc["status"],
-                        "version": new_doc["version"],
-                    }
+            return True, {
+                "document": {
+                    "id": new_doc["id"],
+                    "project_id": project_id,
+                    "document_type": new_doc["document_type"],
+                    "title": new_doc["title"],
+                    "status": new_doc["status"],
+                    "version": new_doc["version"],
                 }
-            else:
-                return False, {"error": "Failed to add document to project"}
+            }
 
         except Exception as e:
             logger.error(f"Error adding document: {e}")
@@ -189,24 +174,36 @@ class DocumentService:
         """
         Update a document in a project's docs JSONB field.
 
+        Only the target document is patched (server-side, under the project row lock), and the
+        version snapshot holds just that document as it was before the edit.
+
         Returns:
             Tuple of (success, result_dict)
         """
         try:
-            # Get current project docs
-            project_response = (
-                self.supabase_client.table("archon_projects")
-                .select("docs")
-                .eq("id", project_id)
-                .execute()
-            )
-            if not project_response.data:
+            # Update allowed fields
+            patch = {
+                field: update_fields[field]
+                for field in DOCUMENT_UPDATE_FIELDS
+                if field in update_fields
+            }
+            patch["updated_at"] = datetime.now().isoformat()
+
+            response = self.supabase_client.rpc(
+                "update_archon_project_document",
+                {"project_id_param": project_id, "doc_id_param": doc_id, "patch_param": patch},
+            ).execute()
+            if not response.data:
                 return False, {"error": f"Project with ID {project_id} not found"}
 
-            current_docs = project_response.data[0].get("docs", [])
+            updated_doc = response.data[0].get("document")
+            if updated_doc is None:
+                return False, {
+                    "error": f"Document with ID {doc_id} not found in project {project_id}"
+                }
 
             # Create version snapshot if requested
-            if create_version and current_docs:
+            if create_version:
                 try:
                     from .versioning_service import VersioningService
 
@@ -216,7 +213,7 @@ class DocumentService:
                     versioning.create_version(
                         project_id=project_id,
                         field_name="docs",
-                        content=current_docs,
+                        content=[response.data[0]["previous_document"]],
                         change_summary=change_summary,
                         change_type="update",
                         document_id=doc_id,
@@ -227,55 +224,7 @@ class DocumentService:
                         f"Version creation failed for document {doc_id}: {version_error}"
                     )
 
-            # Make a copy to modify
-            docs = current_docs.copy()
-
-            # Find and update the document
-            updated = False
-            for i, doc in enumerate(docs):
-                if doc.get("id") == doc_id:
-                    # Update allowed fields
-                    if "title" in update_fields:
-                        docs[i]["title"] = update_fields["title"]
-                    if "content" in update_fields:
-                        docs[i]["content"] = update_fields["content"]
-                    if "status" in update_fields:
-                        docs[i]["status"] = update_fields["status"]
-                    if "tags" in update_fields:
-                        docs[i]["tags"] = update_fields["tags"]
-                    if "author" in update_fields:
-                        docs[i]["author"] = update_fields["author"]
-                    if "version" in update_fields:
-                        docs[i]["version"] = update_fields["version"]
-
-                    docs[i]["updated_at"] = datetime.now().isoformat()
-                    updated = True
-                    break
-
-            if not updated:
-                return False, {
-                    "error": f"Document with ID {doc_id} not found in project {project_id}"
-                }
-
-            # Update the project
-            response = (
-                self.supabase_client.table("archon_projects")
-                .update({"docs": docs, "updated_at": datetime.now().isoformat()})
-                .eq("id", project_id)
-                .execute()
-            )
-
-            if response.data:
-                # Find the updated document to return
-                updated_doc = None
-                for doc in docs:
-                    if doc.get("id") == doc_id:
-                        updated_doc = doc
-                        break
-
-                return True, {"document": updated_doc}
-            else:
-                return False, {"error": "Failed to update document"}
+            return True, {"document": updated_doc}
 
         except Exception as e:
             logger.error(f"Error updating document: {e}")
@@ -289,39 +238,19 @@ class DocumentService:
             Tuple of (success, result_dict)
         """
         try:
-            # Get current project docs
-            project_response = (
-                self.supabase_client.table("archon_projects")
-                .select("docs")
-                .eq("id", project_id)
-                .execute()
-            )
-            if not project_response.data:
+            response = self.supabase_client.rpc(
+                "delete_archon_project_document",
+                {"project_id_param": project_id, "doc_id_param": doc_id},
+            ).execute()
+            if not response.data:
                 return False, {"error": f"Project with ID {project_id} not found"}
 
-            docs = project_response.data[0].get("docs", [])
-
-            # Remove the document
-            original_length = len(docs)
-            docs = [doc for doc in docs if doc.get("id") != doc_id]
-
-            if len(docs) == original_length:
+            if response.data[0].get("deleted_document") is None:
                 return False, {
                     "error": f"Document with ID {doc_id} not found in project {project_id}"
                 }
 
-            # Update the project
-            response = (
-                self.supabase_client.table("archon_projects")
-                .update({"docs": docs, "updated_at": datetime.now().isoformat()})
-                .eq("id", project_id)
-                .execute()
-            )
-
-            if response.data:
-                return True, {"project_id": project_id, "doc_id": doc_id}
-            else:
-                return False, {"error": "Failed to delete document"}
+            return True, {"project_id": project_id, "doc_id": doc_id}
 
         except Exception as e:
             logger.error(f"Error deleting document: {e}")
@@ -0,0 +1,152 @@
+"""
+JSON Patch Module for Archon
+
+Minimal RFC 6902 support (add, remove and replace operations) used to store document versions
+as deltas against an earlier version instead of full copies, and to merge concurrent edits in
+real-time document sync.
+"""
+
+import copy
+from typing import Any
+
+
+def escape_token(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _split_path(path: str) -> list[str]:
+    return [_unescape(token) for token in path.split("/")[1:]] if path else []
+
+
+def _same_json(source: Any, target: Any) -> bool:
+    # bool is an int subclass in Python, but true and 1 are different JSON values
+    return type(source) is type(target) and source == target
+
+
+def make_patch(source: Any, target: Any, path: str = "") -> list[dict[str, Any]]:
+    """
+    Build a JSON patch that turns source into target.
+
+    Objects and arrays are diffed recursively; arrays are compared by index with additions and
+    removals at the end.
+
+    Returns:
+        List of patch operations (empty when source and target are equal)
+    """
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = []
+        for key in source:
+            if key not in target:
+                operations.append({"op": "remove", "path": f"{path}/{escape_token(key)}"})
+        for key, value in target.items():
+            child_path = f"{path}/{escape_token(key)}"
+            if key not in source:
+                operations.append({"op": "add", "path": child_path, "value": value})
+            else:
+                operations.extend(make_patch(source[key], value, child_path))
+        return operations
+
+    if isinstance(source, list) and isinstance(target, list):
+        operations = []
+        shared = min(len(source), len(target))
+        for index in range(shared):
+            operations.extend(make_patch(source[index], target[index], f"{path}/{index}"))
+        for index in range(shared, len(target)):
+            operations.append({"op": "add", "path": f"{path}/{index}", "value": target[index]})
+        # Remove from the end so earlier indices stay valid
+        for index in range(len(source) - 1, shared - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{index}"})
+        return operations
+
+    if _same_json(source, target):
+        return []
+    return [{"op": "replace", "path": path, "value": target}]
+
+
+def apply_patch(document: Any, patch: list[dict[str, Any]]) -> Any:
+    """
+    Apply a JSON patch, returning a new document (the input is not modified).
+
+    Raises:
+        ValueError: If an operation is unsupported or its path does not exist
+    """
+    result = copy.deepcopy(document)
+    for operation in patch:
+        op = operation.get("op")
+        path = operation.get("path", "")
+        value = copy.deepcopy(operation.get("value"))
+
+        if path == "":
+            if op in ("add", "replace"):
+                result = value
+                continue
+            raise ValueError(f"Unsupported JSON patch operation on the root: {op}")
+
+        tokens = _split_path(path)
+        parent = result
+        try:
+            for token in tokens[:-1]:
+                parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            raise ValueError(f"JSON patch path not found: {path}") from e
+
+        if op not in ("add", "remove", "replace"):
+            raise ValueError(f"Unsupported JSON patch operation: {op}")
+
+        last = tokens[-1]
+        try:
+            if isinstance(parent, list):
+                index = len(parent) if last == "-" else int(last)
+                if op == "add":
+                    parent.insert(index, value)
+                elif op == "remove":
+                    del parent[index]
+                else:
+                    parent[index] = value
+            elif isinstance(parent, dict):
+                if op == "remove":
+                    del parent[last]
+                else:
+                    parent[last] = value
+            else:
+                raise TypeError(f"cannot index {type(parent).__name__}")
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            raise ValueError(f"JSON patch path not found: {path}") from e
+
+    return result
+
+
+def touched_paths(document: Any, patch: list[dict[str, Any]]) -> list[str]:
+    """
+    Get the paths a patch modifies in document, for detecting overlapping edits.
+
+    Adding or removing an array element shifts its siblings, so those operations count as
+    touching the whole array.
+    """
+    paths = []
+    for operation in patch:
+        path = operation.get("path", "")
+        if operation.get("op") in ("add", "remove") and path:
+            parent_path = path.rsplit("/", 1)[0]
+            parent = document
+            try:
+                for token in _split_path(parent_path):
+                    parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+            except (KeyError, IndexError, ValueError, TypeError):
+                # The parent is created by an earlier operation, which already covers it
+                parent = None
+            if isinstance(parent, list):
+                path = parent_path
+        paths.append(path)
+    return paths
+
+
+def paths_overlap(first: str, second: str) -> bool:
+    """Check whether two JSON pointers are equal or one contains the other."""
+    first_tokens, second_tokens = _split_path(first), _split_path(second)
+    shared = min(len(first_tokens), len(second_tokens))
+    return first_tokens[:shared] == second_tokens[:shared]
@@ -16,6 +16,9 @@ from ...config.logfire_config import get_logger
 
 logger = get_logger(__name__)
 
+# Scalar columns returned by summary listings (no docs/features/data JSONB)
+PROJECT_SUMMARY_COLUMNS = "id, title, description, github_repo, created_at, updated_at, pinned"
+
 
 class ProjectService:
     """Service class for project operations"""
@@ -73,24 +76,29 @@ class ProjectService:
             logger.error(f"Error creating project: {e}")
             return False, {"error": f"Database error: {str(e)}"}
 
-    def list_projects(self) -> tuple[bool, dict[str, Any]]:
+    def list_projects(self, exclude_large_fields: bool = False) -> tuple[bool, dict[str, Any]]:
         """
         List all projects.
 
+        Args:
+            exclude_large_fields: Only select scalar columns, leaving out the docs, features
+                and data JSONB (load those per project with get_project)
+
         Returns:
             Tuple of (success, result_dict)
         """
         try:
+            columns = PROJECT_SUMMARY_COLUMNS if exclude_large_fields else "*"
             response = (
                 self.supabase_client.table("archon_projects")
-                .select("*")
+                .select(columns)
                 .order("created_at", desc=True)
                 .execute()
             )
 
             projects = []
             for project in response.data:
-                projects.append({
+                formatted = {
                     "id": project["id"],
                     "title": project["title"],
                     "github_repo": project.get("github_repo"),
@@ -98,10 +106,12 @@ class ProjectService:
                     "updated_at": project["updated_at"],
                     "pinned": project.get("pinned", False),
                     "description": project.get("description", ""),
-                    "docs": project.get("docs", []),
-                    "features": project.get("features", []),
-                    "data": project.get("data", []),
-                })
+                }
+                if not exclude_large_fields:
+                    formatted["docs"] = project.get("docs", [])
+                    formatted["features"] = project.get("features", [])
+                    formatted["data"] = project.get("data", [])
+                projects.append(formatted)
 
             return True, {"projects": projects, "total_count": len(projects)}
 
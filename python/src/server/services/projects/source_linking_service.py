@@ -58,6 +58,44 @@ class SourceLinkingService:
                 "business_sources": [],
             }
 
+    def get_sources_for_projects(
+        self, project_ids: list[str]
+    ) -> tuple[bool, dict[str, dict[str, list[str]]]]:
+        """
+        Get linked sources for many projects with a single query.
+
+        Returns:
+            Tuple of (success, {project_id: {"technical_sources": [...], "business_sources": [...]}})
+        """
+        sources_by_project = {
+            project_id: {"technical_sources": [], "business_sources": []}
+            for project_id in project_ids
+        }
+        if not project_ids:
+            return True, sources_by_project
+
+        try:
+            response = (
+                self.supabase_client.table("archon_project_sources")
+                .select("project_id, source_id, notes")
+                .in_("project_id", project_ids)
+                .execute()
+            )
+
+            for source_link in response.data:
+                sources = sources_by_project.get(source_link["project_id"])
+                if sources is None:
+                    continue
+                if source_link.get("notes") == "technical":
+                    sources["technical_sources"].append(source_link["source_id"])
+                elif source_link.get("notes") == "business":
+                    sources["business_sources"].append(source_link["source_id"])
+
+            return True, sources_by_project
+        except Exception as e:
+            logger.error(f"Error getting sources for {len(project_ids)} projects: {e}")
+            return False, sources_by_project
+
     def update_project_sources(
         self,
         project_id: str,
@@ -127,19 +165,27 @@ class SourceLinkingService:
             logger.error(f"Error updating project sources: {e}")
             return False, {"error": str(e), **result}
 
-    def format_project_with_sources(self, project: dict[str, Any]) -> dict[str, Any]:
+    def format_project_with_sources(
+        self, project: dict[str, Any], sources: dict[str, list[str]] | None = None
+    ) -> dict[str, Any]:
         """
         Format a project dict with its linked sources included.
         Also handles datetime conversion for Socket.IO compatibility.
 
+        Args:
+            project: Project row or listing entry
+            sources: Already fetched linked sources (looked up when not given)
+
         Returns:
-            Formatted project dict with technical_sources and business_sources
+            Formatted project dict with technical_sources and business_sources. The docs,
+            features and data fields are only included when present on the project.
         """
-        # Get linked sources
-        success, sources = self.get_project_sources(project["id"])
-        if not success:
-            logger.warning(f"Failed to get sources for project {project['id']}")
-            sources = {"technical_sources": [], "business_sources": []}
+        if sources is None:
+            # Get linked sources
+            success, sources = self.get_project_sources(project["id"])
+            if not success:
+                logger.warning(f"Failed to get sources for project {project['id']}")
+                sources = {"technical_sources": [], "business_sources": []}
 
         # Ensure datetime objects are converted to strings
         created_at = project.get("created_at", "")
@@ -149,29 +195,39 @@ class SourceLinkingService:
         if hasattr(updated_at, "isoformat"):
             updated_at = updated_at.isoformat()
 
-        return {
+        formatted = {
             "id": project["id"],
             "title": project["title"],
             "description": project.get("description", ""),
             "github_repo": project.get("github_repo"),
             "created_at": created_at,
             "updated_at": updated_at,
-            "docs": project.get("docs", []),
-            "features": project.get("features", []),
-            "data": project.get("data", []),
             "technical_sources": sources["technical_sources"],
             "business_sources": sources["business_sources"],
             "pinned": project.get("pinned", False),
         }
+        # Summary listings leave out the large JSONB fields entirely
+        for field in ("docs", "features", "data"):
+            if field in project:
+                formatted[field] = project[field]
+        return formatted
 
     def format_projects_with_sources(self, projects: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """
         Format a list of projects with their linked sources.
 
+        Sources for all projects are fetched with one query rather than one per project.
+
         Returns:
             List of formatted project dicts
         """
-        formatted_projects = []
-        for project in projects:
-            formatted_projects.append(self.format_project_with_sources(project))
-        return formatted_projects
+        success, sources_by_project = self.get_sources_for_projects(
+            [project["id"] for project in projects]
+        )
+        if not success:
+            logger.warning(f"Failed to get sources for {len(projects)} projects")
+
+        return [
+            self.format_project_with_sources(project, sources_by_project[project["id"]])
+            for project in projects
+        ]
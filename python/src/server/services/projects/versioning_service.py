@@ -3,18 +3,63 @@ Versioning Service Module for Archon
 
 This module provides core business logic for document versioning operations
 that can be shared between MCP tools and FastAPI endpoints.
+
+Versions of a project field (and, for docs, of a single document) form a chain. Most versions
+store a JSON patch against an earlier version of the same chain, with a full snapshot at least
+every SNAPSHOT_INTERVAL versions; reads rebuild content by replaying patches onto the snapshot.
 """
 
 # Removed direct logging import - using unified config
+import json
 from datetime import datetime
 from typing import Any
 
 from src.server.utils import get_supabase_client
 
 from ...config.logfire_config import get_logger
+from .json_patch import apply_patch, make_patch
 
 logger = get_logger(__name__)
 
+# Replaying a version never applies more than SNAPSHOT_INTERVAL - 1 deltas
+SNAPSHOT_INTERVAL = 10
+
+CHAIN_COLUMNS = "version_number, content, content_format, base_version"
+
+
+def _is_delta(version: dict[str, Any]) -> bool:
+    return version.get("content_format") == "delta"
+
+
+def reconstruct_content(
+    versions: dict[int, dict[str, Any]], version_number: int
+) -> tuple[Any, int]:
+    """
+    Rebuild the content of a version from its chain.
+
+    Args:
+        versions: Chain rows (with CHAIN_COLUMNS) keyed by version number
+        version_number: Version to rebuild
+
+    Returns:
+        Tuple of (content, number of deltas replayed)
+
+    Raises:
+        LookupError: If a version the chain depends on is not in versions
+    """
+    deltas = []
+    current = versions.get(version_number)
+    while current is not None and _is_delta(current):
+        deltas.append(current["content"])
+        current = versions.get(current.get("base_version"))
+    if current is None:
+        raise LookupError(f"Version chain for version {version_number} is incomplete")
+
+    content = current["content"]
+    for delta in reversed(deltas):
+        content = apply_patch(content, delta)
+    return content, len(deltas)
+
 
 class VersioningService:
     """Service class for document versioning operations"""
@@ -36,50 +81,41 @@ class VersioningService:
         """
         Create a version snapshot for a project JSONB field.
 
+        The content is stored as a delta against the latest version of its chain unless a full
+        snapshot is due or smaller. Version numbers are assigned by the database in the same
+        statement as the insert, so concurrent writers cannot collide.
+
         Returns:
             Tuple of (success, result_dict)
         """
         try:
-            # Get current highest version number for this project/field
-            existing_versions = (
-                self.supabase_client.table("archon_document_versions")
-                .select("version_number")
-                .eq("project_id", project_id)
-                .eq("field_name", field_name)
-                .order("version_number", desc=True)
-                .limit(1)
-                .execute()
+            content_format, stored_content, base_version = self._encode_content(
+                project_id, field_name, document_id, content
             )
 
-            next_version = 1
-            if existing_versions.data:
-                next_version = existing_versions.data[0]["version_number"] + 1
-
-            # Create new version record
-            version_data = {
-                "project_id": project_id,
-                "field_name": field_name,
-                "version_number": next_version,
-                "content": content,
-                "change_summary": change_summary or f"{change_type.capitalize()} {field_name}",
-                "change_type": change_type,
-                "document_id": document_id,
-                "created_by": created_by,
-                "created_at": datetime.now().isoformat(),
-            }
-
-            result = (
-                self.supabase_client.table("archon_document_versions")
-                .insert(version_data)
-                .execute()
-            )
+            result = self.supabase_client.rpc(
+                "create_archon_document_version",
+                {
+                    "project_id_param": project_id,
+                    "field_name_param": field_name,
+                    "content_param": stored_content,
+                    "content_format_param": content_format,
+                    "base_version_param": base_version,
+                    "change_summary_param": change_summary
+                    or f"{change_type.capitalize()} {field_name}",
+                    "change_type_param": change_type,
+                    "document_id_param": document_id,
+                    "created_by_param": created_by,
+                },
+            ).execute()
 
             if result.data:
+                version = {**result.data[0], "content": content}
                 return True, {
-                    "version": result.data[0],
+                    "version": version,
                     "project_id": project_id,
                     "field_name": field_name,
-                    "version_number": next_version,
+                    "version_number": version["version_number"],
                 }
             else:
                 return False, {"error": "Failed to create version snapshot"}
@@ -88,6 +124,49 @@ class VersioningService:
             logger.error(f"Error creating version: {e}")
             return False, {"error": f"Error creating version: {str(e)}"}
 
+    def _chain_query(
+        self, project_id: str, field_name: str, document_id: str | None, columns: str
+    ):
+        query = (
+            self.supabase_client.table("archon_document_versions")
+            .select(columns)
+            .eq("project_id", project_id)
+            .eq("field_name", field_name)
+        )
+        if document_id:
+            return query.eq("document_id", document_id)
+        return query.is_("document_id", "null")
+
+    def _encode_content(
+        self, project_id: str, field_name: str, document_id: str | None, content: Any
+    ) -> tuple[str, Any, int | None]:
+        """Decide how to store content: ("snapshot", content, None) or ("delta", patch, base)."""
+        recent = (
+            self._chain_query(project_id, field_name, document_id, CHAIN_COLUMNS)
+            .order("version_number", desc=True)
+            .limit(SNAPSHOT_INTERVAL)
+            .execute()
+        )
+        if not recent.data:
+            return "snapshot", content, None
+
+        latest = recent.data[0]["version_number"]
+        try:
+            base_content, depth = reconstruct_content(
+                {row["version_number"]: row for row in recent.data}, latest
+            )
+        except (LookupError, ValueError) as e:
+            logger.warning(f"Storing a full snapshot, could not rebuild version {latest}: {e}")
+            return "snapshot", content, None
+
+        if depth >= SNAPSHOT_INTERVAL - 1:
+            return "snapshot", content, None
+
+        delta = make_patch(base_content, content)
+        if len(json.dumps(delta)) >= len(json.dumps(content)):
+            return "snapshot", content, None
+        return "delta", delta, latest
+
     def list_versions(self, project_id: str, field_name: str = None) -> tuple[bool, dict[str, Any]]:
         """
         Get version history for project JSONB fields.
@@ -113,7 +192,7 @@ class VersioningService:
                 return True, {
                     "project_id": project_id,
                     "field_name": field_name,
-                    "versions": result.data,
+                    "versions": self._materialize_versions(result.data),
                     "total_count": len(result.data),
                 }
             else:
@@ -145,9 +224,10 @@ class VersioningService:
 
             if result.data:
                 version = result.data[0]
+                content = self._rebuild_version(version)
                 return True, {
-                    "version": version,
-                    "content": version["content"],
+                    "version": {**version, "content": content},
+                    "content": content,
                     "field_name": field_name,
                     "version_number": version_number,
                 }
@@ -158,33 +238,80 @@ class VersioningService:
             logger.error(f"Error getting version content: {e}")
             return False, {"error": f"Error getting version content: {str(e)}"}
 
+    def _rebuild_version(self, version: dict[str, Any]) -> Any:
+        """Rebuild a version's content, fetching the part of its chain it depends on."""
+        if not _is_delta(version):
+            return version["content"]
+
+        def fetch_chain(limit: int | None) -> dict[int, dict[str, Any]]:
+            query = (
+                self._chain_query(
+                    version["project_id"],
+                    version["field_name"],
+                    version.get("document_id"),
+                    CHAIN_COLUMNS,
+                )
+                .lte("version_number", version["version_number"])
+                .order("version_number", desc=True)
+            )
+            if limit is not None:
+                query = query.limit(limit)
+            return {row["version_number"]: row for row in query.execute().data or []}
+
+        # Bases are normally the previous chain version, so a short window almost always suffices
+        number = version["version_number"]
+        try:
+            return reconstruct_content(fetch_chain(SNAPSHOT_INTERVAL * 2), number)[0]
+        except LookupError:
+            return reconstruct_content(fetch_chain(None), number)[0]
+
+    def _materialize_versions(self, versions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Replace delta content with full content for a list of version rows."""
+        def chain_key(version: dict[str, Any]) -> tuple[Any, Any, Any]:
+            return version.get("project_id"), version.get("field_name"), version.get("document_id")
+
+        chains: dict[tuple[Any, Any, Any], dict[int, dict[str, Any]]] = {}
+        for version in versions:
+            chains.setdefault(chain_key(version), {})[version["version_number"]] = version
+
+        materialized = []
+        for version in versions:
+            if not _is_delta(version):
+                materialized.append(version)
+                continue
+            try:
+                chain = chains[chain_key(version)]
+                content = reconstruct_content(chain, version["version_number"])[0]
+            except (LookupError, ValueError):
+                content = self._rebuild_version(version)
+            materialized.append({**version, "content": content})
+        return materialized
+
     def restore_version(
         self, project_id: str, field_name: str, version_number: int, restored_by: str = "system"
     ) -> tuple[bool, dict[str, Any]]:
         """
         Restore a project JSONB field to a specific version.
 
+        Single-document docs snapshots (written by DocumentService.update_document) restore
+        just that document; other snapshots replace the whole field.
+
         Returns:
             Tuple of (success, result_dict)
         """
         try:
-            # Get the version to restore
-            version_result = (
-                self.supabase_client.table("archon_document_versions")
-                .select("*")
-                .eq("project_id", project_id)
-                .eq("field_name", field_name)
-                .eq("version_number", version_number)
-                .execute()
-            )
+            # Get the version to restore (with its content rebuilt)
+            found, version_result = self.get_version_content(project_id, field_name, version_number)
 
-            if not version_result.data:
-                return False, {
-                    "error": f"Version {version_number} not found for {field_name} in project {project_id}"
-                }
+            if not found:
+                return False, version_result
+
+            version_to_restore = version_result["version"]
+            content_to_restore = version_result["content"]
 
-            version_to_restore = version_result.data[0]
-            content_to_restore = version_to_restore["content"]
+            document = self._single_document_snapshot(version_to_restore)
+            if document is not None:
+                return self._restore_document(project_id, version_number, document, restored_by)
 
             # Get current content to create backup
             current_project = (
@@ -242,3 +369,61 @@ class VersioningService:
         except Exception as e:
             logger.error(f"Error restoring version: {e}")
             return False, {"error": f"Error restoring version: {str(e)}"}
+
+    def _single_document_snapshot(self, version: dict[str, Any]) -> dict[str, Any] | None:
+        """Return the document held by a single-document docs snapshot, else None."""
+        content = version.get("content")
+        document_id = version.get("document_id")
+        if (
+            version.get("field_name") == "docs"
+            and document_id
+            and isinstance(content, list)
+            and len(content) == 1
+            and isinstance(content[0], dict)
+            and content[0].get("id") == document_id
+        ):
+            return content[0]
+        return None
+
+    def _restore_document(
+        self, project_id: str, version_number: int, document: dict[str, Any], restored_by: str
+    ) -> tuple[bool, dict[str, Any]]:
+        """Put one document back into the docs array, leaving the other documents untouched."""
+        restore_result = self.supabase_client.rpc(
+            "upsert_archon_project_document",
+            {"project_id_param": project_id, "document_param": document},
+        ).execute()
+        if not restore_result.data:
+            return False, {"error": f"Project with ID {project_id} not found"}
+
+        # Back up the document as it was before the restore (absent if it had been deleted)
+        previous_document = restore_result.data[0].get("previous_document")
+        if previous_document is not None:
+            backup_result = self.create_version(
+                project_id=project_id,
+                field_name="docs",
+                content=[previous_document],
+                change_summary=f"Backup before restoring to version {version_number}",
+                change_type="backup",
+                document_id=document["id"],
+                created_by=restored_by,
+            )
+            if not backup_result[0]:
+                logger.warning(f"Failed to create backup version: {backup_result[1]}")
+
+        self.create_version(
+            project_id=project_id,
+            field_name="docs",
+            content=[document],
+            change_summary=f"Restored to version {version_number}",
+            change_type="restore",
+            document_id=document["id"],
+            created_by=restored_by,
+        )
+
+        return True, {
+            "project_id": project_id,
+            "field_name": "docs",
+            "restored_version": version_number,
+            "restored_by": restored_by,
+        }
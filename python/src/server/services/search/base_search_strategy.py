@@ -10,6 +10,8 @@ from typing import Any
 from supabase import Client
 
 from ...config.logfire_config import get_logger, safe_span
+from ..client_manager import execute_async
+from .search_settings import get_search_setting
 
 logger = get_logger(__name__)
 
@@ -24,12 +26,26 @@ class BaseSearchStrategy:
         """Initialize with database client"""
         self.supabase_client = supabase_client
 
+    def _get_index_setting(self, key: str) -> int | None:
+        """Get an optional positive integer index knob from the credential cache or environment."""
+        value = get_search_setting(key, "")
+        if not value:
+            return None
+        try:
+            parsed = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring non-integer {key} setting: {value!r}")
+            return None
+        return parsed if parsed > 0 else None
+
     async def vector_search(
         self,
         query_embedding: list[float],
         match_count: int,
         filter_metadata: dict | None = None,
         table_rpc: str = "match_archon_crawled_pages",
+        ef_search: int | None = None,
+        probes: int | None = None,
     ) -> list[dict[str, Any]]:
         """
         Perform basic vector similarity search.
@@ -41,6 +57,8 @@ class BaseSearchStrategy:
             match_count: Number of results to return
             filter_metadata: Optional metadata filters
             table_rpc: The RPC function to call (match_archon_crawled_pages or match_archon_code_examples)
+            ef_search: HNSW candidate list size for this query (default: VECTOR_SEARCH_EF_SEARCH)
+            probes: IVFFlat lists to scan for this query (default: VECTOR_SEARCH_PROBES)
 
         Returns:
             List of matching documents with similarity scores
@@ -60,8 +78,17 @@ class BaseSearchStrategy:
                 else:
                     rpc_params["filter"] = {}
 
-                # Execute search
-                response = self.supabase_client.rpc(table_rpc, rpc_params).execute()
+                # Per-query index knobs, only sent when configured so older RPCs keep working
+                ef_search = ef_search or self._get_index_setting("VECTOR_SEARCH_EF_SEARCH")
+                if ef_search:
+                    # HNSW never returns more than ef_search rows
+                    rpc_params["ef_search"] = max(ef_search, match_count)
+                probes = probes or self._get_index_setting("VECTOR_SEARCH_PROBES")
+                if probes:
+                    rpc_params["probes"] = probes
+
+                # Execute search off the event loop (the Supabase client is blocking)
+                response = await execute_async(self.supabase_client.rpc(table_rpc, rpc_params))
 
                 # Filter by similarity threshold
                 filtered_results = []
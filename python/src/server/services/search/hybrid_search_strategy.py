@@ -8,19 +8,35 @@ Strategy combines:
 1. Vector/semantic search for conceptual matches
 2. Keyword search for exact term matches
 3. Score boosting for results appearing in both searches
-4. Intelligent result merging with preference ordering
+4. Intelligent result merging with preference ordering, or reciprocal-rank fusion
+
+The vector and keyword legs run concurrently on the threading service's I/O pool,
+so a hybrid query costs max(vector, keyword) rather than their sum.
 """
 
+import asyncio
 from typing import Any
 
 from supabase import Client
 
 from ...config.logfire_config import get_logger, safe_span
-from ..embeddings.embedding_service import create_embedding
+from ..embeddings.query_embedding_cache import create_query_embedding
+from ..threading_service import get_threading_service
 from .keyword_extractor import build_search_terms, extract_keywords
+from .search_settings import get_search_setting
 
 logger = get_logger(__name__)
 
+# Ranked full-text keyword search RPCs (see migration/complete_setup.sql)
+KEYWORD_SEARCH_RPCS = {
+    "archon_crawled_pages": "match_archon_crawled_pages_keyword",
+    "archon_code_examples": "match_archon_code_examples_keyword",
+}
+
+# Result fusion modes for _merge_search_results
+FUSION_MODE_BOOST = "boost"
+FUSION_MODE_RRF = "rrf"
+
 
 class HybridSearchStrategy:
     """Strategy class implementing hybrid search combining vector and keyword search"""
@@ -29,6 +45,28 @@ class HybridSearchStrategy:
         self.supabase_client = supabase_client
         self.base_strategy = base_strategy
 
+    def _get_fusion_settings(self) -> dict[str, Any]:
+        """Load result fusion settings, falling back to the fixed-boost merge on bad values."""
+        fusion_mode = get_search_setting("HYBRID_FUSION_MODE", FUSION_MODE_BOOST).strip().lower()
+        if fusion_mode not in (FUSION_MODE_BOOST, FUSION_MODE_RRF):
+            logger.warning(f"Unknown HYBRID_FUSION_MODE '{fusion_mode}', using '{FUSION_MODE_BOOST}'")
+            fusion_mode = FUSION_MODE_BOOST
+
+        try:
+            rrf_k = max(1, int(get_search_setting("HYBRID_RRF_K", "60")))
+            vector_weight = max(0.0, float(get_search_setting("HYBRID_VECTOR_WEIGHT", "1.0")))
+            keyword_weight = max(0.0, float(get_search_setting("HYBRID_KEYWORD_WEIGHT", "1.0")))
+        except ValueError as e:
+            logger.warning(f"Invalid hybrid fusion setting, using defaults: {e}")
+            rrf_k, vector_weight, keyword_weight = 60, 1.0, 1.0
+
+        return {
+            "fusion_mode": fusion_mode,
+            "rrf_k": rrf_k,
+            "vector_weight": vector_weight,
+            "keyword_weight": keyword_weight,
+        }
+
     async def keyword_search(
         self,
         query: str,
@@ -41,7 +79,9 @@ class HybridSearchStrategy:
         Perform intelligent keyword search using extracted keywords.
 
         This method extracts keywords from the query and searches for documents
-        containing any of those keywords, ranking results by the number of matches.
+        containing any of those keywords. For the archon tables the search runs as a
+        single ranked full-text RPC (ts_rank_cd over a GIN-indexed tsvector); other
+        tables, or databases that predate the keyword RPCs, use ilike queries instead.
 
         Args:
             query: The search query text
@@ -66,80 +106,147 @@ class HybridSearchStrategy:
             # Build search terms including variations
             search_terms = build_search_terms(keywords)[:12]  # Limit total search terms
 
-            # For now, we'll search for documents containing ANY of the keywords
-            # and then rank them by how many keywords they contain
-            all_results = []
-            seen_ids = set()
-
-            # Search for each keyword individually to get better coverage
-            for keyword in search_terms[:6]:  # Limit to avoid too many queries
-                # Build the query with appropriate fields
-                if select_fields:
-                    query_builder = self.supabase_client.from_(table_name).select(select_fields)
-                else:
-                    query_builder = self.supabase_client.from_(table_name).select("*")
-
-                # Add keyword search condition with wildcards
-                search_pattern = f"%{keyword}%"
-
-                # Handle different search patterns based on table
-                if table_name == "archon_code_examples":
-                    # Search both content and summary for code examples
-                    query_builder = query_builder.or_(
-                        f"content.ilike.{search_pattern},summary.ilike.{search_pattern}"
+            keyword_rpc = KEYWORD_SEARCH_RPCS.get(table_name)
+            if keyword_rpc:
+                try:
+                    return await get_threading_service().run_io_bound(
+                        self._full_text_search,
+                        keyword_rpc,
+                        keywords,
+                        search_terms,
+                        match_count,
+                        filter_metadata,
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Full-text keyword search via {keyword_rpc} failed, "
+                        f"falling back to ilike search: {e}"
                     )
-                else:
-                    query_builder = query_builder.ilike("content", search_pattern)
-
-                # Add metadata filters if provided
-                if filter_metadata:
-                    if "source" in filter_metadata and table_name in ["documents", "crawled_pages"]:
-                        query_builder = query_builder.eq("source_id", filter_metadata["source"])
-                    elif "source_id" in filter_metadata:
-                        query_builder = query_builder.eq("source_id", filter_metadata["source_id"])
-
-                # Execute query with limit
-                response = query_builder.limit(match_count * 2).execute()
-
-                if response.data:
-                    for result in response.data:
-                        result_id = result.get("id")
-                        if result_id and result_id not in seen_ids:
-                            # Count how many keywords match in this result
-                            content = result.get("content", "").lower()
-                            summary = (
-                                result.get("summary", "").lower()
-                                if table_name == "archon_code_examples"
-                                else ""
-                            )
-                            combined_text = f"{content} {summary}"
-
-                            # Count keyword matches
-                            match_score = sum(1 for kw in keywords if kw.lower() in combined_text)
-
-                            # Add match score to result
-                            result["keyword_match_score"] = match_score
-                            result["matched_keyword"] = keyword
-
-                            all_results.append(result)
-                            seen_ids.add(result_id)
-
-            # Sort results by keyword match score (descending)
-            all_results.sort(key=lambda x: x.get("keyword_match_score", 0), reverse=True)
-
-            # Return top N results
-            final_results = all_results[:match_count]
-
-            logger.debug(
-                f"Keyword search found {len(final_results)} results from {len(all_results)} total matches"
-            )
 
-            return final_results
+            return await get_threading_service().run_io_bound(
+                self._ilike_search,
+                keywords,
+                search_terms,
+                match_count,
+                table_name,
+                filter_metadata,
+                select_fields,
+            )
 
         except Exception as e:
             logger.error(f"Keyword search failed: {e}")
             return []
 
+    def _full_text_search(
+        self,
+        keyword_rpc: str,
+        keywords: list[str],
+        search_terms: list[str],
+        match_count: int,
+        filter_metadata: dict | None,
+    ) -> list[dict[str, Any]]:
+        """Run keyword search as one ranked RPC against the full-text index."""
+        rpc_params: dict[str, Any] = {"search_terms": search_terms, "match_count": match_count}
+
+        if filter_metadata:
+            metadata_filter = dict(filter_metadata)
+            source_id = metadata_filter.pop("source_id", None)
+            source_filter = metadata_filter.pop("source", None) or source_id
+            if source_filter:
+                rpc_params["source_filter"] = source_filter
+            if metadata_filter:
+                rpc_params["filter"] = metadata_filter
+
+        response = self.supabase_client.rpc(keyword_rpc, rpc_params).execute()
+        results = response.data or []
+
+        # Keep the match count the merge step uses to scale keyword-only similarity
+        for result in results:
+            combined_text = f"{result.get('content', '')} {result.get('summary', '')}".lower()
+            result["keyword_match_score"] = sum(1 for kw in keywords if kw.lower() in combined_text)
+
+        logger.debug(f"Full-text keyword search via {keyword_rpc} found {len(results)} results")
+
+        return results
+
+    def _ilike_search(
+        self,
+        keywords: list[str],
+        search_terms: list[str],
+        match_count: int,
+        table_name: str,
+        filter_metadata: dict | None,
+        select_fields: str | None,
+    ) -> list[dict[str, Any]]:
+        """Search with one ilike query per term, ranking by the number of keywords matched."""
+        all_results = []
+        seen_ids = set()
+
+        # Search for each keyword individually to get better coverage
+        for keyword in search_terms[:6]:  # Limit to avoid too many queries
+            # Build the query with appropriate fields
+            if select_fields:
+                query_builder = self.supabase_client.from_(table_name).select(select_fields)
+            else:
+                query_builder = self.supabase_client.from_(table_name).select("*")
+
+            # Add keyword search condition with wildcards
+            search_pattern = f"%{keyword}%"
+
+            # Handle different search patterns based on table
+            if table_name == "archon_code_examples":
+                # Search both content and summary for code examples
+                query_builder = query_builder.or_(
+                    f"content.ilike.{search_pattern},summary.ilike.{search_pattern}"
+                )
+            else:
+                query_builder = query_builder.ilike("content", search_pattern)
+
+            # Add metadata filters if provided
+            if filter_metadata:
+                if "source" in filter_metadata and table_name in ["documents", "crawled_pages"]:
+                    query_builder = query_builder.eq("source_id", filter_metadata["source"])
+                elif "source_id" in filter_metadata:
+                    query_builder = query_builder.eq("source_id", filter_metadata["source_id"])
+
+            # Execute query with limit
+            response = query_builder.limit(match_count * 2).execute()
+
+            if response.data:
+                for result in response.data:
+                    result_id = result.get("id")
+                    if result_id and result_id not in seen_ids:
+                        # Count how many keywords match in this result
+                        content = result.get("content", "").lower()
+                        summary = (
+                            result.get("summary", "").lower()
+                            if table_name == "archon_code_examples"
+                            else ""
+                        )
+                        combined_text = f"{content} {summary}"
+
+                        # Count keyword matches
+                        match_score = sum(1 for kw in keywords if kw.lower() in combined_text)
+
+                        # Add match score to result
+                        result["keyword_match_score"] = match_score
+                        result["matched_keyword"] = keyword
+
+                        all_results.append(result)
+                        seen_ids.add(result_id)
+
+        # Sort results by keyword match score (descending)
+        all_results.sort(key=lambda x: x.get("keyword_match_score", 0), reverse=True)
+
+        # Return top N results
+        final_results = all_results[:match_count]
+
+        logger.debug(
+            f"Keyword search found {len(final_results)} results from {len(all_results)} total matches"
+        )
+
+        return final_results
+
     async def search_documents_hybrid(
         self,
         query: str,
@@ -161,28 +268,31 @@ class HybridSearchStrategy:
         """
         with safe_span("hybrid_search_documents") as span:
             try:
-                # 1. Get vector search results using base strategy
-                vector_results = await self.base_strategy.vector_search(
-                    query_embedding=query_embedding,
-                    match_count=match_count * 2,  # Get more for filtering
-                    filter_metadata=filter_metadata,
-                    table_rpc="match_archon_crawled_pages",
-                )
-
-                # 2. Get keyword search results
-                keyword_results = await self.keyword_search(
-                    query=query,
-                    match_count=match_count * 2,
-                    table_name="archon_crawled_pages",
-                    filter_metadata=filter_metadata,
-                    select_fields="id, url, chunk_number, content, metadata, source_id",
+                # 1 & 2. Run vector and keyword search concurrently
+                vector_results, keyword_results = await asyncio.gather(
+                    self.base_strategy.vector_search(
+                        query_embedding=query_embedding,
+                        match_count=match_count * 2,  # Get more for filtering
+                        filter_metadata=filter_metadata,
+                        table_rpc="match_archon_crawled_pages",
+                    ),
+                    self.keyword_search(
+                        query=query,
+                        match_count=match_count * 2,
+                        table_name="archon_crawled_pages",
+                        filter_metadata=filter_metadata,
+                        select_fields="id, url, chunk_number, content, metadata, source_id",
+                    ),
                 )
 
                 # 3. Combine and merge results intelligently
+                fusion_settings = self._get_fusion_settings()
                 combined_results = self._merge_search_results(
-                    vector_results, keyword_results, match_count
+                    vector_results, keyword_results, match_count, **fusion_settings
                 )
 
+                span.set_attribute("fusion_mode", fusion_settings["fusion_mode"])
+
                 span.set_attribute("vector_results_count", len(vector_results))
                 span.set_attribute("keyword_results_count", len(keyword_results))
                 span.set_attribute("final_results_count", len(combined_results))
@@ -219,43 +329,51 @@ class HybridSearchStrategy:
         """
         with safe_span("hybrid_search_code_examples") as span:
             try:
-                # Create query embedding (no enhancement needed)
-                query_embedding = await create_embedding(query)
-
-                if not query_embedding:
-                    logger.error("Failed to create embedding for code example query")
-                    return []
-
-                # 1. Get vector search results using base strategy
-                combined_filter = filter_metadata or {}
+                # Copy the filters so the caller's dict is not mutated by either leg
+                combined_filter = dict(filter_metadata or {})
                 if source_id:
                     combined_filter["source"] = source_id
 
-                vector_results = await self.base_strategy.vector_search(
-                    query_embedding=query_embedding,
-                    match_count=match_count * 2,
-                    filter_metadata=combined_filter,
-                    table_rpc="match_archon_code_examples",
-                )
-
-                # 2. Get keyword search results
-                keyword_filter = filter_metadata or {}
+                keyword_filter = dict(filter_metadata or {})
                 if source_id:
                     keyword_filter["source_id"] = source_id
 
-                keyword_results = await self.keyword_search(
-                    query=query,
-                    match_count=match_count * 2,
-                    table_name="archon_code_examples",
-                    filter_metadata=keyword_filter,
-                    select_fields="id, url, chunk_number, content, summary, metadata, source_id",
+                async def vector_leg() -> list[dict[str, Any]] | None:
+                    # Create query embedding (no enhancement needed)
+                    query_embedding = await create_query_embedding(query)
+                    if not query_embedding:
+                        return None
+                    return await self.base_strategy.vector_search(
+                        query_embedding=query_embedding,
+                        match_count=match_count * 2,
+                        filter_metadata=combined_filter,
+                        table_rpc="match_archon_code_examples",
+                    )
+
+                # 1 & 2. Embed + vector search concurrently with keyword search
+                vector_results, keyword_results = await asyncio.gather(
+                    vector_leg(),
+                    self.keyword_search(
+                        query=query,
+                        match_count=match_count * 2,
+                        table_name="archon_code_examples",
+                        filter_metadata=keyword_filter,
+                        select_fields="id, url, chunk_number, content, summary, metadata, source_id",
+                    ),
                 )
 
+                if vector_results is None:
+                    logger.error("Failed to create embedding for code example query")
+                    return []
+
                 # 3. Combine and merge results intelligently
+                fusion_settings = self._get_fusion_settings()
                 combined_results = self._merge_search_results(
-                    vector_results, keyword_results, match_count
+                    vector_results, keyword_results, match_count, **fusion_settings
                 )
 
+                span.set_attribute("fusion_mode", fusion_settings["fusion_mode"])
+
                 span.set_attribute("vector_results_count", len(vector_results))
                 span.set_attribute("keyword_results_count", len(keyword_results))
                 span.set_attribute("final_results_count", len(combined_results))
@@ -276,23 +394,38 @@ class HybridSearchStrategy:
         vector_results: list[dict[str, Any]],
         keyword_results: list[dict[str, Any]],
         match_count: int,
+        fusion_mode: str = FUSION_MODE_BOOST,
+        rrf_k: int = 60,
+        vector_weight: float = 1.0,
+        keyword_weight: float = 1.0,
     ) -> list[dict[str, Any]]:
         """
         Intelligently merge vector and keyword search results with preference ordering.
 
-        Priority order:
+        Priority order ("boost" mode):
         1. Results appearing in BOTH searches (highest relevance) - get score boost
         2. Vector-only results (semantic matches)
         3. Keyword-only results (exact term matches)
 
+        In "rrf" mode results are instead ordered by weighted reciprocal-rank fusion.
+
         Args:
             vector_results: Results from vector/semantic search
             keyword_results: Results from keyword search
             match_count: Maximum number of final results to return
+            fusion_mode: "boost" (fixed 1.2x boost for dual matches) or "rrf"
+            rrf_k: RRF rank constant; larger values flatten the contribution of top ranks
+            vector_weight: RRF weight of the vector ranking
+            keyword_weight: RRF weight of the keyword ranking
 
         Returns:
             Merged and prioritized list of results
         """
+        if fusion_mode == FUSION_MODE_RRF:
+            return self._reciprocal_rank_fusion(
+                vector_results, keyword_results, match_count, rrf_k, vector_weight, keyword_weight
+            )
+
         seen_ids: set[str] = set()
         combined_results: list[dict[str, Any]] = []
 
@@ -326,27 +459,7 @@ class HybridSearchStrategy:
             if result_id and result_id not in seen_ids and len(combined_results) < match_count:
                 # Convert keyword result to match vector result format
                 # Use keyword match score to influence similarity score
-                keyword_score = keyword_result.get("keyword_match_score", 1)
-                # Scale keyword score to similarity range (0.3 to 0.7 based on matches)
-                scaled_similarity = min(0.7, 0.3 + (keyword_score * 0.1))
-
-                standardized_result = {
-                    "id": keyword_result["id"],
-                    "url": keyword_result["url"],
-                    "chunk_number": keyword_result["chunk_number"],
-                    "content": keyword_result["content"],
-                    "metadata": keyword_result["metadata"],
-                    "source_id": keyword_result["source_id"],
-                    "similarity": scaled_similarity,
-                    "match_type": "keyword",
-                    "keyword_match_score": keyword_score,
-                }
-
-                # Include summary if present (for code examples)
-                if "summary" in keyword_result:
-                    standardized_result["summary"] = keyword_result["summary"]
-
-                combined_results.append(standardized_result)
+                combined_results.append(self._standardize_keyword_result(keyword_result))
                 seen_ids.add(result_id)
 
         # Return only up to the requested match count
@@ -359,3 +472,80 @@ class HybridSearchStrategy:
         )
 
         return final_results
+
+    def _standardize_keyword_result(self, keyword_result: dict[str, Any]) -> dict[str, Any]:
+        """Convert a keyword-only result to the vector result format."""
+        # Use keyword match score to influence similarity score
+        keyword_score = keyword_result.get("keyword_match_score", 1)
+        # Scale keyword score to similarity range (0.3 to 0.7 based on matches)
+        scaled_similarity = min(0.7, 0.3 + (keyword_score * 0.1))
+
+        standardized_result = {
+            "id": keyword_result["id"],
+            "url": keyword_result["url"],
+            "chunk_number": keyword_result["chunk_number"],
+            "content": keyword_result["content"],
+            "metadata": keyword_result["metadata"],
+            "source_id": keyword_result["source_id"],
+            "similarity": scaled_similarity,
+            "match_type": "keyword",
+            "keyword_match_score": keyword_score,
+        }
+
+        # Include summary if present (for code examples)
+        if "summary" in keyword_result:
+            standardized_result["summary"] = keyword_result["summary"]
+
+        return standardized_result
+
+    def _reciprocal_rank_fusion(
+        self,
+        vector_results: list[dict[str, Any]],
+        keyword_results: list[dict[str, Any]],
+        match_count: int,
+        rrf_k: int,
+        vector_weight: float,
+        keyword_weight: float,
+    ) -> list[dict[str, Any]]:
+        """
+        Merge results by weighted reciprocal-rank fusion.
+
+        Each result scores sum(weight / (rrf_k + rank)) over the rankings it appears in,
+        so agreement between the legs is rewarded without comparing their raw scores.
+        """
+        fused: dict[Any, dict[str, Any]] = {}
+
+        for rank, vector_result in enumerate(vector_results, start=1):
+            result_id = vector_result.get("id")
+            if not result_id or result_id in fused:
+                continue
+            vector_result["match_type"] = "vector"
+            vector_result["rrf_score"] = vector_weight / (rrf_k + rank)
+            fused[result_id] = vector_result
+
+        seen_keyword_ids: set[Any] = set()
+        for rank, keyword_result in enumerate(keyword_results, start=1):
+            result_id = keyword_result.get("id")
+            if not result_id or result_id in seen_keyword_ids:
+                continue
+            seen_keyword_ids.add(result_id)
+
+            contribution = keyword_weight / (rrf_k + rank)
+            if result_id in fused:
+                fused[result_id]["match_type"] = "hybrid"
+                fused[result_id]["rrf_score"] += contribution
+            else:
+                standardized_result = self._standardize_keyword_result(keyword_result)
+                standardized_result["rrf_score"] = contribution
+                fused[result_id] = standardized_result
+
+        final_results = sorted(fused.values(), key=lambda r: r["rrf_score"], reverse=True)
+        final_results = final_results[:match_count]
+
+        logger.debug(
+            f"RRF merge stats - Hybrid: {sum(1 for r in final_results if r.get('match_type') == 'hybrid')}, "
+            f"Vector: {sum(1 for r in final_results if r.get('match_type') == 'vector')}, "
+            f"Keyword: {sum(1 for r in final_results if r.get('match_type') == 'keyword')}"
+        )
+
+        return final_results
@@ -12,18 +12,18 @@ It combines multiple RAG strategies in a pipeline fashion:
 Multiple strategies can be enabled simultaneously and work together.
 """
 
-import os
 from typing import Any
 
 from ...config.logfire_config import get_logger, safe_span
 from ...utils import get_supabase_client
-from ..embeddings.embedding_service import create_embedding
+from ..embeddings.query_embedding_cache import create_query_embedding
 from .agentic_rag_strategy import AgenticRAGStrategy
 
 # Import all strategies
 from .base_search_strategy import BaseSearchStrategy
 from .hybrid_search_strategy import HybridSearchStrategy
 from .reranking_strategy import RerankingStrategy
+from .search_settings import get_bool_search_setting, get_search_setting
 
 logger = get_logger(__name__)
 
@@ -60,29 +60,11 @@ class RAGService:
 
     def get_setting(self, key: str, default: str = "false") -> str:
         """Get a setting from the credential service or fall back to environment variable."""
-        try:
-            from ..credential_service import credential_service
-
-            if hasattr(credential_service, "_cache") and credential_service._cache_initialized:
-                cached_value = credential_service._cache.get(key)
-                if isinstance(cached_value, dict) and cached_value.get("is_encrypted"):
-                    encrypted_value = cached_value.get("encrypted_value")
-                    if encrypted_value:
-                        try:
-                            return credential_service._decrypt_value(encrypted_value)
-                        except Exception:
-                            pass
-                elif cached_value:
-                    return str(cached_value)
-            # Fallback to environment variable
-            return os.getenv(key, default)
-        except Exception:
-            return os.getenv(key, default)
+        return get_search_setting(key, default)
 
     def get_bool_setting(self, key: str, default: bool = False) -> bool:
         """Get a boolean setting from credential service."""
-        value = self.get_setting(key, "false" if not default else "true")
-        return value.lower() in ("true", "1", "yes", "on")
+        return get_bool_search_setting(key, default)
 
     async def search_documents(
         self,
@@ -113,7 +95,7 @@ class RAGService:
         ) as span:
             try:
                 # Create embedding for the query
-                query_embedding = await create_embedding(query)
+                query_embedding = await create_query_embedding(query)
 
                 if not query_embedding:
                     logger.error("Failed to create embedding for query")
@@ -0,0 +1,208 @@
+"""
+Reranking Engine
+
+Runs CrossEncoder inference off the event loop. Pairs from concurrent rerank requests are
+collected for a few milliseconds and scored with a single predict call on one dedicated worker
+thread, so searches no longer block the API while the model runs.
+
+Documents are clipped to a token budget before scoring (the model truncates anyway, but
+tokenizing long chunks is wasted work), and (query, document) scores are kept in an LRU so
+repeated searches skip inference entirely.
+"""
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+# Pair budget in model tokens; words are estimated at ~1.3 tokens like elsewhere in the codebase
+DEFAULT_MAX_PAIR_TOKENS = 512
+_TOKENS_PER_WORD = 1.3
+
+# Pairs from requests arriving within this window share one predict call
+DEFAULT_BATCH_WINDOW_SECONDS = 0.005
+DEFAULT_MAX_BATCH_PAIRS = 64
+
+ScoreKey = tuple[str, str]  # (query, sha256 of the clipped document)
+
+# One inference thread shared by every engine - CPU inference does not benefit from more
+_inference_executor: ThreadPoolExecutor | None = None
+
+
+def _get_inference_executor() -> ThreadPoolExecutor:
+    global _inference_executor
+    if _inference_executor is None:
+        _inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+    return _inference_executor
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """Clip text to roughly max_tokens model tokens, keeping whole words."""
+    max_words = max(1, int(max_tokens / _TOKENS_PER_WORD))
+    words = text.split()
+    if len(words) <= max_words:
+        return text
+    return " ".join(words[:max_words])
+
+
+@dataclass
+class _PendingRequest:
+    pairs: list[list[str]]
+    future: asyncio.Future
+
+
+@dataclass
+class _Batch:
+    requests: list[_PendingRequest] = field(default_factory=list)
+    pair_count: int = 0
+
+
+class RerankingEngine:
+    """Micro-batched, thread-offloaded scorer for a CrossEncoder-like model."""
+
+    def __init__(
+        self,
+        model: Any,
+        max_pair_tokens: int = DEFAULT_MAX_PAIR_TOKENS,
+        max_batch_pairs: int = DEFAULT_MAX_BATCH_PAIRS,
+        batch_window_seconds: float = DEFAULT_BATCH_WINDOW_SECONDS,
+        cache_max_entries: int = 10000,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            model: CrossEncoder instance or any object with a predict(pairs) method
+            max_pair_tokens: Approximate token budget for a query-document pair
+            max_batch_pairs: Pairs that trigger an immediate flush of the open batch
+            batch_window_seconds: How long a batch stays open for concurrent requests
+            cache_max_entries: Maximum number of cached (query, document) scores
+        """
+        self.model = model
+        self.max_pair_tokens = max_pair_tokens
+        self.max_batch_pairs = max_batch_pairs
+        self.batch_window_seconds = batch_window_seconds
+        self.cache_max_entries = cache_max_entries
+        self._scores: OrderedDict[ScoreKey, float] = OrderedDict()
+        self._open_batch: _Batch | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+        # Cumulative counters since process start
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.batches = 0
+
+    async def score(self, query: str, documents: list[str]) -> list[float]:
+        """
+        Score documents against a query, highest meaning most relevant.
+
+        Args:
+            query: The search query
+            documents: Document texts to score
+
+        Returns:
+            One score per document, in input order
+        """
+        doc_budget = self.max_pair_tokens - int(len(query.split()) * _TOKENS_PER_WORD)
+        clipped = [clip_to_tokens(document, doc_budget) for document in documents]
+        keys = [
+            (query, hashlib.sha256(document.encode("utf-8")).hexdigest()) for document in clipped
+        ]
+
+        # Scores are copied out of the LRU so evictions during inference cannot lose them
+        known: dict[ScoreKey, float] = {}
+        missing: dict[ScoreKey, str] = {}
+        for key, document in zip(keys, clipped, strict=False):
+            if key in known or key in missing:
+                continue
+            if key in self._scores:
+                self._scores.move_to_end(key)
+                known[key] = self._scores[key]
+                self.cache_hits += 1
+            else:
+                missing[key] = document
+                self.cache_misses += 1
+
+        if missing:
+            scores = await self._predict([[query, document] for document in missing.values()])
+            for key, score in zip(missing, scores, strict=False):
+                self._remember(key, score)
+                known[key] = score
+
+        return [known[key] for key in keys]
+
+    def _remember(self, key: ScoreKey, score: float) -> None:
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.cache_max_entries:
+            self._scores.popitem(last=False)
+
+    async def _predict(self, pairs: list[list[str]]) -> list[float]:
+        future = asyncio.get_running_loop().create_future()
+        batch = self._open_batch
+        if batch is None:
+            batch = self._open_batch = _Batch()
+            self._spawn(self._flush_after_window(batch))
+
+        batch.requests.append(_PendingRequest(pairs, future))
+        batch.pair_count += len(pairs)
+        if batch.pair_count >= self.max_batch_pairs:
+            self._open_batch = None
+            self._spawn(self._flush(batch))
+
+        return await future
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush_after_window(self, batch: _Batch) -> None:
+        await asyncio.sleep(self.batch_window_seconds)
+        # A batch that filled up early has already been flushed
+        if self._open_batch is batch:
+            self._open_batch = None
+            await self._flush(batch)
+
+    async def _flush(self, batch: _Batch) -> None:
+        pairs = [pair for request in batch.requests for pair in request.pairs]
+        self.batches += 1
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(
+                _get_inference_executor(), self.model.predict, pairs
+            )
+            scores = [float(score) for score in scores]
+            if len(scores) != len(pairs):
+                raise ValueError(f"Model returned {len(scores)} scores for {len(pairs)} pairs")
+        except Exception as e:
+            for request in batch.requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        except BaseException:
+            # Release waiters if the flush itself was cancelled (e.g. on shutdown)
+            for request in batch.requests:
+                request.future.cancel()
+            raise
+
+        offset = 0
+        for request in batch.requests:
+            if not request.future.done():
+                request.future.set_result(scores[offset : offset + len(request.pairs)])
+            offset += len(request.pairs)
+
+    def get_stats(self) -> dict[str, int]:
+        """Get cumulative cache/batch counters and current cache size."""
+        return {
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "batches": self.batches,
+            "cache_entries": len(self._scores),
+            "cache_max_entries": self.cache_max_entries,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached scores."""
+        self._scores.clear()
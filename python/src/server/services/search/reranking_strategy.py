@@ -5,7 +5,9 @@ Implements result reranking using CrossEncoder models to improve search result o
 The reranking process re-scores search results based on query-document relevance using
 a trained neural model, typically improving precision over initial retrieval scores.
 
-Uses the cross-encoder/ms-marco-MiniLM-L-6-v2 model for reranking by default.
+Uses the cross-encoder/ms-marco-MiniLM-L-6-v2 model for reranking by default. Each model is
+loaded once per process and scored through a shared RerankingEngine, which runs inference on a
+worker thread and micro-batches pairs from concurrent searches.
 """
 
 import os
@@ -20,12 +22,41 @@ except ImportError:
     CROSSENCODER_AVAILABLE = False
 
 from ...config.logfire_config import get_logger, safe_span
+from .reranking_engine import RerankingEngine
 
 logger = get_logger(__name__)
 
 # Default reranking model
 DEFAULT_RERANKING_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 
+# Loaded models and their engines, shared by every RerankingStrategy in the process
+_shared_engines: dict[str, RerankingEngine] = {}
+
+
+def _load_crossencoder(model_name: str) -> CrossEncoder:
+    """Load a CrossEncoder model, returning None when it is unavailable."""
+    if not CROSSENCODER_AVAILABLE:
+        logger.warning("sentence-transformers not available - reranking disabled")
+        return None
+
+    try:
+        logger.info(f"Loading reranking model: {model_name}")
+        return CrossEncoder(model_name)
+    except Exception as e:
+        logger.error(f"Failed to load reranking model {model_name}: {e}")
+        return None
+
+
+def get_reranking_engine(model_name: str = DEFAULT_RERANKING_MODEL) -> RerankingEngine | None:
+    """Get the shared engine for a model, loading the model on first use."""
+    engine = _shared_engines.get(model_name)
+    if engine is None:
+        model = _load_crossencoder(model_name)
+        if model is None:
+            return None
+        engine = _shared_engines[model_name] = RerankingEngine(model)
+    return engine
+
 
 class RerankingStrategy:
     """Strategy class implementing result reranking using CrossEncoder models"""
@@ -41,7 +72,12 @@ class RerankingStrategy:
             model_instance: Pre-loaded CrossEncoder instance or any object with a predict method (optional)
         """
         self.model_name = model_name
-        self.model = model_instance or self._load_model()
+        if model_instance is not None:
+            self.model = model_instance
+            self._engine = None
+        else:
+            self._engine = get_reranking_engine(model_name)
+            self.model = self._engine.model if self._engine else None
 
     @classmethod
     def from_model(cls, model: Any, model_name: str = "custom_model") -> "RerankingStrategy":
@@ -59,18 +95,11 @@ class RerankingStrategy:
         """
         return cls(model_name=model_name, model_instance=model)
 
-    def _load_model(self) -> CrossEncoder:
-        """Load the CrossEncoder model for reranking."""
-        if not CROSSENCODER_AVAILABLE:
-            logger.warning("sentence-transformers not available - reranking disabled")
-            return None
-
-        try:
-            logger.info(f"Loading reranking model: {self.model_name}")
-            return CrossEncoder(self.model_name)
-        except Exception as e:
-            logger.error(f"Failed to load reranking model {self.model_name}: {e}")
-            return None
+    def _get_engine(self) -> RerankingEngine:
+        """Get the engine scoring with the current model (rebuilt if the model was replaced)."""
+        if self._engine is None or self._engine.model is not self.model:
+            self._engine = RerankingEngine(self.model)
+        return self._engine
 
     def is_available(self) -> bool:
         """Check if reranking is available (model loaded successfully)."""
@@ -172,9 +201,11 @@ class RerankingStrategy:
                     logger.warning("No valid texts found for reranking")
                     return results
 
-                # Get reranking scores from the model
+                # Get reranking scores from the engine (off the event loop, cached)
                 with safe_span("crossencoder_predict"):
-                    scores = self.model.predict(query_doc_pairs)
+                    scores = await self._get_engine().score(
+                        query, [document for _, document in query_doc_pairs]
+                    )
 
                 # Apply scores and sort results
                 reranked_results = self.apply_rerank_scores(results, scores, valid_indices, top_k)
@@ -10,7 +10,7 @@ from typing import Any
 from supabase import Client
 
 from ..config.logfire_config import get_logger, search_logger
-from .client_manager import get_supabase_client
+from .client_manager import execute_async, get_supabase_client
 
 logger = get_logger(__name__)
 
@@ -32,6 +32,31 @@ def _get_model_choice() -> str:
         return "gpt-4.1-nano"
 
 
+def _source_summary_prompt(source_id: str, content: str) -> str:
+    """Build the prompt for a source summary."""
+    # Limit content length to avoid token limits
+    truncated_content = content[:25000] if len(content) > 25000 else content
+
+    return f"""<source_content>
+{truncated_content}
+</source_content>
+
+The above content is from the documentation for '{source_id}'. Please provide a concise summary (3-5 sentences) that describes what this library/tool/framework is about. The summary should help understand what the library/tool/framework accomplishes and the purpose.
+"""
+
+
+def _source_title_prompt(source_id: str, content: str) -> str:
+    """Build the prompt for a source title."""
+    # Limit content for prompt
+    sample_content = content[:3000] if len(content) > 3000 else content
+
+    return f"""Based on this content from {source_id}, generate a concise, descriptive title (3-6 words) that captures what this source is about:
+
+{sample_content}
+
+Provide only the title, nothing else."""
+
+
 def extract_source_summary(
     source_id: str, content: str, max_length: int = 500, provider: str = None
 ) -> str:
@@ -59,16 +84,8 @@ def extract_source_summary(
     model_choice = _get_model_choice()
     search_logger.info(f"Generating summary for {source_id} using model: {model_choice}")
 
-    # Limit content length to avoid token limits
-    truncated_content = content[:25000] if len(content) > 25000 else content
-
     # Create the prompt for generating the summary
-    prompt = f"""<source_content>
-{truncated_content}
-</source_content>
-
-The above content is from the documentation for '{source_id}'. Please provide a concise summary (3-5 sentences) that describes what this library/tool/framework is about. The summary should help understand what the library/tool/framework accomplishes and the purpose.
-"""
+    prompt = _source_summary_prompt(source_id, content)
 
     try:
         try:
@@ -201,14 +218,7 @@ def generate_source_title_and_metadata(
 
             model_choice = _get_model_choice()
 
-            # Limit content for prompt
-            sample_content = content[:3000] if len(content) > 3000 else content
-
-            prompt = f"""Based on this content from {source_id}, generate a concise, descriptive title (3-6 words) that captures what this source is about:
-
-{sample_content}
-
-Provide only the title, nothing else."""
+            prompt = _source_title_prompt(source_id, content)
 
             response = client.chat.completions.create(
                 model=model_choice,
@@ -334,6 +344,135 @@ def update_source_info(
         raise  # Re-raise the exception so the caller knows it failed
 
 
+async def _complete_rate_limited(
+    source_id: str, system_prompt: str, prompt: str, provider: str | None = None
+) -> str | None:
+    """
+    Run one chat completion on the pooled async client through the shared rate limiter.
+
+    Returns:
+        The stripped response text, or None if the call failed or returned nothing
+    """
+    from .credential_service import credential_service
+    from .llm_provider_service import get_llm_client
+    from .threading_service import get_threading_service
+
+    # Roughly 4 characters per token for the prompt, plus the expected answer
+    estimated_tokens = len(prompt) // 4 + 300
+
+    try:
+        model_choice = await credential_service.get_credential("MODEL_CHOICE", "gpt-4.1-nano")
+        async with get_threading_service().rate_limited_operation(
+            estimated_tokens
+        ) as rate_limit:
+            async with get_llm_client(provider=provider) as client:
+                response = await client.chat.completions.create(
+                    model=model_choice,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                )
+            usage = getattr(response, "usage", None)
+            rate_limit.record_usage(getattr(usage, "total_tokens", None))
+    except Exception as e:
+        search_logger.error(f"LLM call failed for source {source_id}: {e}")
+        return None
+
+    if not response or not response.choices:
+        search_logger.error(f"Empty or invalid response from LLM for {source_id}")
+        return None
+    content = response.choices[0].message.content
+    return content.strip() if content else None
+
+
+async def extract_source_summary_async(
+    source_id: str, content: str, max_length: int = 500, provider: str = None
+) -> str:
+    """
+    Async version of extract_source_summary for use inside the crawl event loop.
+
+    Args:
+        source_id: The source ID (domain)
+        content: The content to extract a summary from
+        max_length: Maximum length of the summary
+        provider: Optional provider override
+
+    Returns:
+        A summary string
+    """
+    default_summary = f"Content from {source_id}"
+    if not content or len(content.strip()) == 0:
+        return default_summary
+
+    summary = await _complete_rate_limited(
+        source_id,
+        "You are a helpful assistant that provides concise library/tool/framework summaries.",
+        _source_summary_prompt(source_id, content),
+        provider,
+    )
+    if not summary:
+        return default_summary
+
+    # Ensure the summary is not too long
+    if len(summary) > max_length:
+        summary = summary[:max_length] + "..."
+    return summary
+
+
+async def generate_source_title_async(
+    source_id: str, content: str, provider: str = None
+) -> str:
+    """
+    Async version of the title generation in generate_source_title_and_metadata.
+
+    Returns:
+        The generated title, or the source ID when there is too little content or the call fails
+    """
+    if not content or len(content.strip()) <= 100:
+        return source_id
+
+    generated_title = await _complete_rate_limited(
+        source_id,
+        "You are a helpful assistant that generates concise titles.",
+        _source_title_prompt(source_id, content),
+        provider,
+    )
+    # Clean up the title
+    generated_title = (generated_title or "").strip("\"'")
+    if generated_title and len(generated_title) < 50:  # Sanity check
+        return generated_title
+    return source_id
+
+
+async def upsert_source_records(client: Client, records: list[dict[str, Any]]) -> None:
+    """
+    Upsert source rows and verify them in a single round trip.
+
+    The upsert returns the written rows, so every source_id is checked against the response
+    instead of with a follow-up SELECT per source.
+
+    Args:
+        client: Supabase client
+        records: Source rows; all rows must have the same keys
+
+    Raises:
+        Exception: If the upsert fails or a source is missing from the returned rows
+    """
+    if not records:
+        return
+
+    result = await execute_async(
+        client.table("archon_sources").upsert(records, on_conflict="source_id")
+    )
+    stored = {row.get("source_id") for row in result.data or []}
+    missing = [record["source_id"] for record in records if record["source_id"] not in stored]
+    if missing:
+        raise Exception(
+            f"Source record verification failed - {missing} do not exist in sources table"
+        )
+
+
 class SourceManagementService:
     """Service class for source management operations"""
 
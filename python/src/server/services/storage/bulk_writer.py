@@ -0,0 +1,172 @@
+"""
+Bulk Writer
+
+Optional direct-Postgres write path for chunk and code example batches.
+
+PostgREST inserts send every embedding as a JSON array of floats, which is slow to encode
+and parse and about four times the size of the vector itself. When STORAGE_BULK_WRITER is
+set to "copy" and SUPABASE_DB_URL points at the database, batches are written with asyncpg
+COPY in binary format instead, with vectors sent through pgvector's binary wire format.
+Without a connection string, or while the pool cannot be opened, writes stay on PostgREST.
+"""
+
+import asyncio
+import json
+import os
+import struct
+import time
+from typing import Any
+
+from ...config.logfire_config import search_logger
+from ..client_manager import execute_async
+from ..credential_service import credential_service
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - asyncpg is a server dependency
+    asyncpg = None
+
+POSTGREST_WRITER = "postgrest"
+COPY_WRITER = "copy"
+
+# Seconds to wait before trying to open the pool again after a connection failure
+POOL_RETRY_INTERVAL_SECONDS = 60.0
+
+# Shared asyncpg pool, created on first COPY write
+_pool = None
+_pool_lock = asyncio.Lock()
+# Set when COPY can never work in this process (no SUPABASE_DB_URL or no asyncpg)
+_pool_unavailable = False
+# time.monotonic() before which a failed pool is not retried
+_pool_retry_at = 0.0
+
+
+def encode_vector(vector: list[float]) -> bytes:
+    """Encode an embedding in pgvector's binary format (dimension, unused, float4 values)."""
+    dim = len(vector)
+    return struct.pack(f">HH{dim}f", dim, 0, *vector)
+
+
+def decode_vector(data: bytes) -> list[float]:
+    """Decode pgvector's binary format back into a list of floats."""
+    dim, _ = struct.unpack_from(">HH", data)
+    return list(struct.unpack_from(f">{dim}f", data, 4))
+
+
+async def _init_connection(conn) -> None:
+    """Register the pgvector binary codec on each new pool connection."""
+    # pgvector may live in public or extensions depending on how it was installed
+    vector_schema = await conn.fetchval(
+        "SELECT n.nspname FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace "
+        "WHERE t.typname = 'vector'"
+    )
+    if vector_schema is None:
+        raise RuntimeError("pgvector extension is not installed in the target database")
+    await conn.set_type_codec(
+        "vector",
+        encoder=encode_vector,
+        decoder=decode_vector,
+        schema=vector_schema,
+        format="binary",
+    )
+
+
+async def get_bulk_pool():
+    """
+    Get the shared asyncpg pool used for COPY writes.
+
+    A pool that fails to open is retried after POOL_RETRY_INTERVAL_SECONDS.
+
+    Returns:
+        The pool, or None when SUPABASE_DB_URL is not set or the database is unreachable
+    """
+    global _pool, _pool_unavailable, _pool_retry_at
+    if _pool is not None or _pool_unavailable or time.monotonic() < _pool_retry_at:
+        return _pool
+
+    async with _pool_lock:
+        if _pool is None and not _pool_unavailable and time.monotonic() >= _pool_retry_at:
+            dsn = os.getenv("SUPABASE_DB_URL")
+            if not dsn or asyncpg is None:
+                search_logger.warning(
+                    "STORAGE_BULK_WRITER is 'copy' but SUPABASE_DB_URL is not set - "
+                    "using PostgREST inserts"
+                )
+                _pool_unavailable = True
+                return None
+            try:
+                # statement_cache_size=0 keeps the pool usable behind transaction-mode poolers
+                _pool = await asyncpg.create_pool(
+                    dsn,
+                    min_size=1,
+                    max_size=int(os.getenv("STORAGE_BULK_POOL_SIZE", "4")),
+                    statement_cache_size=0,
+                    init=_init_connection,
+                )
+                search_logger.info("Bulk writer connection pool initialized")
+            except Exception as e:
+                search_logger.error(
+                    f"Failed to open bulk writer pool, using PostgREST for "
+                    f"{POOL_RETRY_INTERVAL_SECONDS:.0f}s: {e}"
+                )
+                _pool_retry_at = time.monotonic() + POOL_RETRY_INTERVAL_SECONDS
+    return _pool
+
+
+async def close_bulk_pool() -> None:
+    """Close the shared asyncpg pool (called on shutdown)."""
+    global _pool, _pool_unavailable, _pool_retry_at
+    pool, _pool, _pool_unavailable, _pool_retry_at = _pool, None, False, 0.0
+    if pool is None:
+        return
+    try:
+        await pool.close()
+    except Exception as e:
+        search_logger.warning(f"Error closing bulk writer pool: {e}")
+
+
+async def get_bulk_writer_mode() -> str:
+    """Read STORAGE_BULK_WRITER from the rag_strategy settings ("postgrest" or "copy")."""
+    try:
+        rag_settings = await credential_service.get_credentials_by_category("rag_strategy")
+        mode = str(rag_settings.get("STORAGE_BULK_WRITER", POSTGREST_WRITER)).lower()
+    except Exception as e:
+        search_logger.warning(f"Failed to load bulk writer setting: {e}, using PostgREST")
+        return POSTGREST_WRITER
+    return COPY_WRITER if mode == COPY_WRITER else POSTGREST_WRITER
+
+
+async def insert_batch(
+    client, table: str, batch_data: list[dict[str, Any]], mode: str = POSTGREST_WRITER
+) -> None:
+    """
+    Insert a batch of rows, through COPY when enabled and available, else through PostgREST.
+
+    Both paths insert the whole batch atomically and raise on failure, so callers keep
+    their retry and individual-insert fallback logic unchanged.
+
+    Args:
+        client: Supabase client used for the PostgREST path
+        table: Target table name
+        batch_data: Rows as dicts; every row must have the same keys
+        mode: Writer mode from get_bulk_writer_mode()
+    """
+    if not batch_data:
+        return
+
+    pool = await get_bulk_pool() if mode == COPY_WRITER else None
+    if pool is None:
+        await execute_async(client.table(table).insert(batch_data))
+        return
+
+    columns = list(batch_data[0].keys())
+    # jsonb values go over the wire as JSON text; vectors use the binary codec
+    records = [
+        tuple(
+            json.dumps(row[column]) if isinstance(row[column], dict) else row[column]
+            for column in columns
+        )
+        for row in batch_data
+    ]
+    async with pool.acquire() as conn:
+        await conn.copy_records_to_table(table, records=records, columns=columns)
@@ -0,0 +1,153 @@
+"""
+Code Deduplication Index
+
+MinHash signatures and locality-sensitive hashing for near-duplicate code blocks.
+
+Comparing every pair of code blocks with SequenceMatcher is O(n² · length). Instead, each
+block gets a MinHash signature over character shingles of its normalized code, and an LSH
+index buckets signatures by bands so only blocks sharing a band become candidate pairs.
+Signatures are stored with code examples (archon_code_examples.minhash_signature) so a
+re-crawl can dedupe new blocks against examples already stored for the source.
+"""
+
+import zlib
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterable
+
+import numpy as np
+
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 5
+
+# Stored examples only have signatures, so matches against them use estimated Jaccard
+# similarity; 0.7 over 5-character shingles is in line with a 0.85 SequenceMatcher ratio
+STORED_DUPLICATE_THRESHOLD = 0.7
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Fixed seed: signatures are persisted, so the permutations must never change
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def minhash_signature(normalized_code: str) -> list[int]:
+    """
+    Compute the MinHash signature of normalized code.
+
+    Args:
+        normalized_code: Code passed through _normalize_code_for_comparison
+
+    Returns:
+        NUM_PERMUTATIONS values as signed 32-bit integers (the INTEGER[] column type)
+    """
+    text = normalized_code or " "
+    shingles = {
+        text[i : i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))
+    }
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    # Universal hashing (a·x + b mod p) per permutation, minimum over all shingles
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    signature = np.bitwise_and(permuted, _MAX_HASH).min(axis=0).astype(np.uint32)
+    return signature.view(np.int32).tolist()
+
+
+def estimate_similarity(signature1: list[int], signature2: list[int]) -> float:
+    """Estimated Jaccard similarity of two signatures (share of equal positions)."""
+    if len(signature1) != len(signature2) or not signature1:
+        return 0.0
+    return float(np.mean(np.asarray(signature1) == np.asarray(signature2)))
+
+
+class MinHashLSHIndex:
+    """
+    Banded LSH index over MinHash signatures.
+
+    Two signatures become candidates when all rows of at least one band match. With 32 bands
+    of 4 rows, pairs above roughly 0.5 Jaccard similarity are almost always found.
+    """
+
+    def __init__(self, bands: int = LSH_BANDS, rows: int = LSH_ROWS):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: list[dict[tuple[int, ...], list[Hashable]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+        self._signatures: dict[Hashable, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: list[int]) -> Iterable[tuple[int, tuple[int, ...]]]:
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, tuple(signature[start : start + self.rows])
+
+    def add(self, key: Hashable, signature: list[int]) -> None:
+        """Index a signature under a key."""
+        if len(signature) != self.bands * self.rows:
+            return
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+
+    def candidates(self, signature: list[int]) -> set[Hashable]:
+        """Keys sharing at least one band with the signature."""
+        if len(signature) != self.bands * self.rows:
+            return set()
+        found: set[Hashable] = set()
+        for band, band_key in self._band_keys(signature):
+            found.update(self._buckets[band].get(band_key, ()))
+        return found
+
+    def find_similar(self, signature: list[int], threshold: float) -> list[Hashable]:
+        """Candidate keys whose estimated similarity reaches the threshold."""
+        return [
+            key
+            for key in self.candidates(signature)
+            if estimate_similarity(signature, self._signatures[key]) >= threshold
+        ]
+
+
+def group_near_duplicates(
+    signatures: list[list[int]], is_similar: Callable[[int, int], bool]
+) -> list[list[int]]:
+    """
+    Group items into near-duplicate variant groups.
+
+    Grouping is greedy in input order: each ungrouped item starts a group and collects every
+    later ungrouped item that is similar to it. Only LSH candidates are passed to is_similar,
+    which makes the final similarity decision.
+
+    Args:
+        signatures: MinHash signature per item
+        is_similar: Verifies a candidate pair (index of the group seed, index of candidate)
+
+    Returns:
+        Groups of item indices, each in input order, ordered by their first item
+    """
+    index = MinHashLSHIndex()
+    for i, signature in enumerate(signatures):
+        index.add(i, signature)
+
+    grouped: set[int] = set()
+    groups = []
+    for i, signature in enumerate(signatures):
+        if i in grouped:
+            continue
+        group = [i]
+        grouped.add(i)
+        for j in sorted(index.candidates(signature)):
+            if j > i and j not in grouped and is_similar(i, j):
+                group.append(j)
+                grouped.add(j)
+        groups.append(group)
+    return groups
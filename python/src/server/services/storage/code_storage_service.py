@@ -18,6 +18,14 @@ from supabase import Client
 from ...config.logfire_config import search_logger
 from ..embeddings.contextual_embedding_service import generate_contextual_embeddings_batch
 from ..embeddings.embedding_service import create_embeddings_batch
+from ..llm_provider_service import get_llm_client
+from ..threading_service import get_threading_service
+from .bulk_writer import get_bulk_writer_mode, insert_batch
+from .code_dedup import group_near_duplicates, minhash_signature
+from .code_summary_cache import get_code_summary_cache, hash_summary_input
+
+# SequenceMatcher ratio at which two code blocks count as variants of each other
+CODE_SIMILARITY_THRESHOLD = 0.85
 
 
 def _get_model_choice() -> str:
@@ -96,6 +104,11 @@ def _calculate_code_similarity(code1: str, code2: str) -> float:
     return similarity
 
 
+def compute_code_signature(code: str) -> list[int]:
+    """MinHash signature of a code block, taken over its normalized form."""
+    return minhash_signature(_normalize_code_for_comparison(code))
+
+
 def _select_best_code_variant(similar_blocks: list[dict[str, Any]]) -> dict[str, Any]:
     """
     Select the best variant from a list of similar code blocks.
@@ -154,13 +167,17 @@ def _select_best_code_variant(similar_blocks: list[dict[str, Any]]) -> dict[str,
     return best_block
 
 
-def extract_code_blocks(markdown_content: str, min_length: int = None) -> list[dict[str, Any]]:
+def extract_code_blocks(
+    markdown_content: str, min_length: int = None, settings: dict[str, str] | None = None
+) -> list[dict[str, Any]]:
     """
     Extract code blocks from markdown content along with context.
 
     Args:
         markdown_content: The markdown content to extract code blocks from
         min_length: Minimum length of code blocks to extract (default: from settings or 250)
+        settings: Already-resolved code extraction settings; used before the credential
+            cache, e.g. in extraction worker processes where that cache is empty
 
     Returns:
         List of dictionaries containing code blocks and their context
@@ -170,6 +187,8 @@ def extract_code_blocks(markdown_content: str, min_length: int = None) -> list[d
         from ...services.credential_service import credential_service
 
         def _get_setting_fallback(key: str, default: str) -> str:
+            if settings and key in settings:
+                return settings[key]
             if credential_service._cache_initialized and key in credential_service._cache:
                 return credential_service._cache[key]
             return os.getenv(key, default)
@@ -451,33 +470,23 @@ def extract_code_blocks(markdown_content: str, min_length: int = None) -> list[d
 
     search_logger.debug(f"Starting deduplication process for {len(code_blocks)} code blocks")
 
-    # Group similar code blocks together
-    similarity_threshold = 0.85  # 85% similarity threshold
-    grouped_blocks = []
-    processed_indices = set()
-
-    for i, block1 in enumerate(code_blocks):
-        if i in processed_indices:
-            continue
-
-        # Start a new group with this block
-        similar_group = [block1]
-        processed_indices.add(i)
-
-        # Find all similar blocks
-        for j, block2 in enumerate(code_blocks):
-            if j <= i or j in processed_indices:
-                continue
-
-            similarity = _calculate_code_similarity(block1["code"], block2["code"])
+    # Group similar code blocks together. MinHash/LSH narrows the comparisons to candidate
+    # pairs; SequenceMatcher still makes the final call so the threshold keeps its meaning
+    signatures = [compute_code_signature(block["code"]) for block in code_blocks]
 
-            if similarity >= similarity_threshold:
-                similar_group.append(block2)
-                processed_indices.add(j)
-                search_logger.debug(f"Found similar code blocks with {similarity:.2f} similarity")
+    def is_similar(i: int, j: int) -> bool:
+        similarity = _calculate_code_similarity(code_blocks[i]["code"], code_blocks[j]["code"])
+        if similarity >= CODE_SIMILARITY_THRESHOLD:
+            search_logger.debug(f"Found similar code blocks with {similarity:.2f} similarity")
+            return True
+        return False
 
+    grouped_blocks = []
+    for group in group_near_duplicates(signatures, is_similar):
         # Select the best variant from the similar group
-        best_variant = _select_best_code_variant(similar_group)
+        best_variant = _select_best_code_variant([code_blocks[i] for i in group])
+        best_index = next(i for i in group if code_blocks[i] is best_variant)
+        best_variant["minhash_signature"] = signatures[best_index]
         grouped_blocks.append(best_variant)
 
     deduplicated_count = len(code_blocks) - len(grouped_blocks)
@@ -624,117 +633,252 @@ Format your response as JSON:
         }
 
 
+def _default_code_summary(language: str = "") -> dict[str, str]:
+    """Fallback name and summary used when no summary could be generated."""
+    return {
+        "example_name": f"Code Example{f' ({language})' if language else ''}",
+        "summary": "Code example for demonstration purposes.",
+    }
+
+
+def _summary_inputs(block: dict[str, Any]) -> tuple[str, str, str, str]:
+    """The (language, code, context_before, context_after) a summary prompt is built from."""
+    return (
+        block.get("language", "") or "",
+        block.get("code", "")[:1500],
+        block.get("context_before", "")[-500:],
+        block.get("context_after", "")[:500],
+    )
+
+
+def _build_code_summaries_prompt(blocks: list[dict[str, Any]]) -> str:
+    """Build one prompt asking for names and summaries of several code examples."""
+    examples = []
+    for index, block in enumerate(blocks):
+        language, code, context_before, context_after = _summary_inputs(block)
+        examples.append(f"""<example id="{index}">
+<context_before>
+{context_before}
+</context_before>
+
+<code_example language="{language}">
+{code}
+</code_example>
+
+<context_after>
+{context_after}
+</context_after>
+</example>""")
+
+    return (
+        "\n\n".join(examples)
+        + f"""
+
+For EACH of the {len(blocks)} examples above, based on the code and its surrounding context, provide:
+1. A concise, action-oriented name (1-4 words) that describes what this code DOES, not what it is. Focus on the action or purpose.
+   Good examples: "Parse JSON Response", "Validate Email Format", "Connect PostgreSQL", "Handle File Upload", "Sort Array Items", "Fetch User Data"
+   Bad examples: "Function Example", "Code Snippet", "JavaScript Code", "API Code"
+2. A summary (2-3 sentences) that describes what this code example demonstrates and its purpose
+
+Format your response as JSON, with one entry per example id:
+{{
+  "summaries": [
+    {{"id": 0, "example_name": "Action-oriented name (1-4 words)", "summary": "2-3 sentence description of what the code demonstrates"}}
+  ]
+}}
+"""
+    )
+
+
+async def _summarize_code_group(
+    client, model: str, blocks: list[dict[str, Any]]
+) -> dict[int, dict[str, str]]:
+    """
+    Summarize a group of code blocks with a single structured-output request.
+
+    Returns:
+        Mapping of block index (within the group) to its summary, for the blocks the model
+        answered; missing or malformed entries are left out
+    """
+    threading_service = get_threading_service()
+    prompt = _build_code_summaries_prompt(blocks)
+    # Roughly 4 characters per token for the prompt, plus the expected answer
+    estimated_tokens = len(prompt) // 4 + 150 * len(blocks)
+
+    async with threading_service.rate_limited_operation(estimated_tokens) as rate_limit:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a helpful assistant that analyzes code examples and provides JSON responses with example names and summaries.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            response_format={"type": "json_object"},
+        )
+        usage = getattr(response, "usage", None)
+        rate_limit.record_usage(getattr(usage, "total_tokens", None))
+
+    response_content = (response.choices[0].message.content or "").strip()
+    try:
+        parsed = json.loads(response_content)
+    except json.JSONDecodeError as e:
+        search_logger.error(
+            f"Failed to parse JSON code summaries: {e}, Response: {repr(response_content[:200])}"
+        )
+        return {}
+
+    # A single example may come back as a bare object instead of a list
+    entries = parsed.get("summaries", [parsed]) if isinstance(parsed, dict) else parsed
+    results: dict[int, dict[str, str]] = {}
+    for position, entry in enumerate(entries if isinstance(entries, list) else []):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("id", position))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(blocks) and entry.get("example_name") and entry.get("summary"):
+            results[index] = {
+                "example_name": str(entry["example_name"]),
+                "summary": str(entry["summary"]),
+            }
+    return results
+
+
 async def generate_code_summaries_batch(
     code_blocks: list[dict[str, Any]], max_workers: int = None, progress_callback=None
 ) -> list[dict[str, str]]:
     """
-    Generate summaries for multiple code blocks with rate limiting and proper worker management.
+    Generate summaries for multiple code blocks.
+
+    Blocks are packed CODE_SUMMARY_BATCH_SIZE at a time into one JSON-mode request on the
+    shared async LLM client, with up to max_workers requests in flight. Results are cached by
+    model and a hash of the code and context, so unchanged snippets are not re-summarized on
+    re-crawls. Blocks a batched answer leaves out are retried on their own.
 
     Args:
         code_blocks: List of code block dictionaries
-        max_workers: Maximum number of concurrent API requests
+        max_workers: Maximum number of concurrent API requests (CODE_SUMMARY_MAX_WORKERS)
         progress_callback: Optional callback for progress updates (async function)
 
     Returns:
-        List of summary dictionaries
+        List of summary dictionaries, in the order of code_blocks
     """
     if not code_blocks:
         return []
 
-    # Get max_workers from settings if not provided
-    if max_workers is None:
-        try:
-            from ...services.credential_service import credential_service
+    from ..credential_service import credential_service
 
-            if (
-                credential_service._cache_initialized
-                and "CODE_SUMMARY_MAX_WORKERS" in credential_service._cache
-            ):
-                max_workers = int(credential_service._cache["CODE_SUMMARY_MAX_WORKERS"])
-            else:
-                max_workers = int(os.getenv("CODE_SUMMARY_MAX_WORKERS", "3"))
-        except:
-            max_workers = 3  # Default fallback
+    try:
+        rag_settings = await credential_service.get_credentials_by_category("rag_strategy")
+    except Exception as e:
+        search_logger.warning(f"Failed to load code summary settings: {e}, using defaults")
+        rag_settings = {}
 
+    try:
+        if max_workers is None:
+            max_workers = int(rag_settings.get("CODE_SUMMARY_MAX_WORKERS", "3"))
+        batch_size = int(rag_settings.get("CODE_SUMMARY_BATCH_SIZE", "5"))
+    except (TypeError, ValueError):
+        max_workers, batch_size = max_workers or 3, 5
+    max_workers = max(1, max_workers)
+    batch_size = max(1, batch_size)
+    use_cache = str(rag_settings.get("CODE_SUMMARY_CACHE_ENABLED", "true")).lower() == "true"
+    model_choice = rag_settings.get("MODEL_CHOICE") or _get_model_choice()
+
+    total = len(code_blocks)
+    summaries: list[dict[str, str] | None] = [None] * total
+
+    # Identical snippets in the same run are summarized once
+    content_hashes = [hash_summary_input(*_summary_inputs(block)) for block in code_blocks]
+    cache = get_code_summary_cache() if use_cache else None
+    cached = await cache.get_many(model_choice, content_hashes) if cache else {}
+
+    pending: dict[str, list[int]] = {}
+    for index, content_hash in enumerate(content_hashes):
+        if content_hash in cached:
+            summaries[index] = dict(cached[content_hash])
+        else:
+            pending.setdefault(content_hash, []).append(index)
+
+    completed_count = total - sum(len(indices) for indices in pending.values())
     search_logger.info(
-        f"Generating summaries for {len(code_blocks)} code blocks with max_workers={max_workers}"
+        f"Generating summaries for {len(pending)} unique code blocks ({completed_count} cached) "
+        f"with batch_size={batch_size}, max_workers={max_workers}"
     )
 
-    # Semaphore to limit concurrent requests
-    semaphore = asyncio.Semaphore(max_workers)
-    completed_count = 0
-    lock = asyncio.Lock()
+    async def report_progress() -> None:
+        if progress_callback:
+            # Simple progress based on summaries completed
+            await progress_callback({
+                "status": "code_extraction",
+                "percentage": int((completed_count / total) * 100),
+                "log": f"Generated {completed_count}/{total} code summaries",
+                "completed_summaries": completed_count,
+                "total_summaries": total,
+            })
 
-    async def generate_single_summary_with_limit(block: dict[str, Any]) -> dict[str, str]:
-        nonlocal completed_count
-        async with semaphore:
-            # Add delay between requests to avoid rate limiting
-            await asyncio.sleep(0.5)  # 500ms delay between requests
-
-            # Run the synchronous function in a thread
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                generate_code_example_summary,
-                block["code"],
-                block["context_before"],
-                block["context_after"],
-                block.get("language", ""),
-            )
+    if not pending:
+        await report_progress()
+        return summaries
 
-            # Update progress
-            async with lock:
-                completed_count += 1
-                if progress_callback:
-                    # Simple progress based on summaries completed
-                    progress_percentage = int((completed_count / len(code_blocks)) * 100)
-                    await progress_callback({
-                        "status": "code_extraction",
-                        "percentage": progress_percentage,
-                        "log": f"Generated {completed_count}/{len(code_blocks)} code summaries",
-                        "completed_summaries": completed_count,
-                        "total_summaries": len(code_blocks),
-                    })
-
-            return result
-
-    # Process all blocks concurrently but with rate limiting
-    try:
-        summaries = await asyncio.gather(
-            *[generate_single_summary_with_limit(block) for block in code_blocks],
-            return_exceptions=True,
-        )
+    hashes = list(pending)
+    groups = [hashes[i : i + batch_size] for i in range(0, len(hashes), batch_size)]
+    semaphore = asyncio.Semaphore(max_workers)
+    generated: dict[str, dict[str, str]] = {}
 
-        # Handle any exceptions in the results
-        final_summaries = []
-        for i, summary in enumerate(summaries):
-            if isinstance(summary, Exception):
-                search_logger.error(f"Error generating summary for code block {i}: {summary}")
-                # Use fallback summary
-                language = code_blocks[i].get("language", "")
-                fallback = {
-                    "example_name": f"Code Example{f' ({language})' if language else ''}",
-                    "summary": "Code example for demonstration purposes.",
-                }
-                final_summaries.append(fallback)
-            else:
-                final_summaries.append(summary)
+    async def summarize(client, group: list[str]) -> dict[str, dict[str, str]]:
+        blocks = [code_blocks[pending[content_hash][0]] for content_hash in group]
+        try:
+            async with semaphore:
+                results = await _summarize_code_group(client, model_choice, blocks)
+        except Exception as e:
+            search_logger.error(f"Error generating code summaries for {len(group)} blocks: {e}")
+            results = {}
+        return {group[index]: summary for index, summary in results.items()}
 
-        search_logger.info(f"Successfully generated {len(final_summaries)} code summaries")
-        return final_summaries
+    async def run_group(client, group: list[str]) -> None:
+        nonlocal completed_count
+        results = await summarize(client, group)
+        if len(group) > 1:
+            missing = [content_hash for content_hash in group if content_hash not in results]
+            if missing:
+                retried = await asyncio.gather(*[summarize(client, [h]) for h in missing])
+                for retry_results in retried:
+                    results.update(retry_results)
+
+        for content_hash in group:
+            indices = pending[content_hash]
+            summary = results.get(content_hash)
+            if summary is not None:
+                generated[content_hash] = summary
+            else:
+                summary = _default_code_summary(code_blocks[indices[0]].get("language", ""))
+            for index in indices:
+                summaries[index] = dict(summary)
+        completed_count += sum(len(pending[content_hash]) for content_hash in group)
+        await report_progress()
 
+    try:
+        async with get_llm_client() as client:
+            await asyncio.gather(*[run_group(client, group) for group in groups])
     except Exception as e:
         search_logger.error(f"Error in batch summary generation: {e}")
-        # Return fallback summaries for all blocks
-        fallback_summaries = []
-        for block in code_blocks:
-            language = block.get("language", "")
-            fallback = {
-                "example_name": f"Code Example{f' ({language})' if language else ''}",
-                "summary": "Code example for demonstration purposes.",
-            }
-            fallback_summaries.append(fallback)
-        return fallback_summaries
+
+    if cache and generated:
+        await cache.put_many(model_choice, generated)
+
+    # Anything left unset (e.g. the client could not be created) gets the fallback summary
+    final_summaries = [
+        summary if summary is not None else _default_code_summary(block.get("language", ""))
+        for summary, block in zip(summaries, code_blocks, strict=False)
+    ]
+    search_logger.info(
+        f"Generated {len(generated)} new code summaries for {total} code blocks"
+    )
+    return final_summaries
 
 
 async def add_code_examples_to_supabase(
@@ -748,6 +892,7 @@ async def add_code_examples_to_supabase(
     url_to_full_document: dict[str, str] | None = None,
     progress_callback: Callable | None = None,
     provider: str | None = None,
+    signatures: list[list[int]] | None = None,
 ):
     """
     Add code examples to the Supabase code_examples table in batches.
@@ -762,10 +907,14 @@ async def add_code_examples_to_supabase(
         batch_size: Size of each batch for insertion
         url_to_full_document: Optional mapping of URLs to full document content
         progress_callback: Optional async callback for progress updates
+        signatures: Optional MinHash signatures per example; computed when not given
     """
     if not urls:
         return
 
+    if signatures is None or len(signatures) != len(code_examples):
+        signatures = [compute_code_signature(str(code)) for code in code_examples]
+
     # Delete existing records for these URLs
     unique_urls = list(set(urls))
     for url in unique_urls:
@@ -806,6 +955,9 @@ async def add_code_examples_to_supabase(
         f"Using contextual embeddings for code examples: {use_contextual_embeddings}"
     )
 
+    # PostgREST or binary COPY for batch inserts
+    writer_mode = await get_bulk_writer_mode()
+
     # Process in batches
     total_items = len(urls)
     for i in range(0, total_items, batch_size):
@@ -901,6 +1053,7 @@ async def add_code_examples_to_supabase(
                 "metadata": metadatas[idx],  # Store as JSON object, not string
                 "source_id": source_id,
                 "embedding": embedding,
+                "minhash_signature": signatures[idx],
             })
 
         # Insert batch into Supabase with retry logic
@@ -909,7 +1062,7 @@ async def add_code_examples_to_supabase(
 
         for retry in range(max_retries):
             try:
-                client.table("archon_code_examples").insert(batch_data).execute()
+                await insert_batch(client, "archon_code_examples", batch_data, writer_mode)
                 # Success - break out of retry loop
                 break
             except Exception as e:
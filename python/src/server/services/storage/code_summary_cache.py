@@ -0,0 +1,61 @@
+"""
+Code Summary Cache
+
+Content-addressed cache for code example summaries, keyed by (model, sha256(language, code,
+context)).
+
+A ContentAddressedCache: the LRU tier holds recently used summaries, the
+archon_code_summary_cache table keeps them across restarts and re-crawls.
+"""
+
+import hashlib
+import json
+
+from ..content_cache import ContentAddressedCache
+
+CODE_SUMMARY_CACHE_TABLE = "archon_code_summary_cache"
+
+
+def hash_summary_input(language: str, code: str, context_before: str, context_after: str) -> str:
+    """Return the sha256 hex digest used as the content address for a summary prompt."""
+    payload = json.dumps([language, code, context_before, context_after], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CodeSummaryCache(ContentAddressedCache[dict[str, str]]):
+    """Two-tier (LRU + table) code summary cache."""
+
+    table = CODE_SUMMARY_CACHE_TABLE
+    value_columns = ("example_name", "summary")
+
+    async def get_many(self, model: str, content_hashes: list[str]) -> dict[str, dict[str, str]]:
+        """
+        Look up summaries for a list of content hashes.
+
+        Args:
+            model: Model that generated the summaries
+            content_hashes: Hashes from hash_summary_input
+
+        Returns:
+            Mapping of content hash to {"example_name", "summary"} for the hashes found
+        """
+        found = await self._get_many((model,), [(content_hash,) for content_hash in content_hashes])
+        return {key[0]: summary for key, summary in found.items()}
+
+    async def put_many(self, model: str, summaries: dict[str, dict[str, str]]) -> None:
+        """Store freshly generated summaries (content hash -> summary) in both tiers."""
+        await self._put_many(
+            (model,), {(content_hash,): summary for content_hash, summary in summaries.items()}
+        )
+
+
+# Global code summary cache instance
+_code_summary_cache: CodeSummaryCache | None = None
+
+
+def get_code_summary_cache() -> CodeSummaryCache:
+    """Get the global code summary cache."""
+    global _code_summary_cache
+    if _code_summary_cache is None:
+        _code_summary_cache = CodeSummaryCache()
+    return _code_summary_cache
@@ -6,13 +6,37 @@ Handles storage of documents in Supabase with parallel processing support.
 
 import asyncio
 import os
+import time
 from typing import Any
 from urllib.parse import urlparse
 
 from ...config.logfire_config import safe_span, search_logger
+from ..client_manager import execute_async
 from ..credential_service import credential_service
 from ..embeddings.contextual_embedding_service import generate_contextual_embeddings_batch
 from ..embeddings.embedding_service import create_embeddings_batch
+from ..threading_service import AdaptiveConcurrencyLimiter
+from .bulk_writer import get_bulk_writer_mode, insert_batch
+
+# In-flight batch limiter shared by every call (and concurrent crawls), so what it learns from
+# provider throttling and latency carries over between calls instead of restarting at 2
+_ingestion_limiter: AdaptiveConcurrencyLimiter | None = None
+_ingestion_limiter_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_ingestion_limiter(max_inflight_batches: int) -> AdaptiveConcurrencyLimiter:
+    """Get the shared adaptive limiter for parallel batches, applying the current max setting."""
+    global _ingestion_limiter, _ingestion_limiter_loop
+    loop = asyncio.get_running_loop()
+    # asyncio primitives are bound to one event loop; only a new loop (tests) starts over
+    if _ingestion_limiter is None or _ingestion_limiter_loop is not loop:
+        _ingestion_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=min(2, max_inflight_batches), max_limit=max_inflight_batches
+        )
+        _ingestion_limiter_loop = loop
+    else:
+        _ingestion_limiter.set_max_limit(max_inflight_batches)
+    return _ingestion_limiter
 
 
 async def add_documents_to_supabase(
@@ -27,7 +51,8 @@ async def add_documents_to_supabase(
     enable_parallel_batches: bool = True,
     provider: str | None = None,
     cancellation_check: Any | None = None,
-) -> None:
+    delete_existing: bool = True,
+) -> set[tuple[str, int]]:
     """
     Add documents to Supabase with threading optimizations.
 
@@ -42,7 +67,15 @@ async def add_documents_to_supabase(
         url_to_full_document: Dictionary mapping URLs to their full document content
         batch_size: Size of each batch for insertion
         progress_callback: Optional async callback function for progress reporting
+        enable_parallel_batches: Overlap batches up to DOCUMENT_STORAGE_MAX_INFLIGHT_BATCHES
+            in flight (also requires ENABLE_PARALLEL_BATCHES)
         provider: Optional provider override for embeddings
+        delete_existing: Delete all stored chunks of these URLs first (incremental recrawls
+            delete only the replaced chunks themselves and pass False)
+
+    Returns:
+        (url, chunk_number) of every chunk actually stored - chunks whose embedding or insert
+        failed are skipped and left out
     """
     with safe_span(
         "add_documents_to_supabase", total_documents=len(contents), batch_size=batch_size
@@ -59,15 +92,19 @@ async def add_documents_to_supabase(
                 batch_size = int(rag_settings.get("DOCUMENT_STORAGE_BATCH_SIZE", "50"))
             delete_batch_size = int(rag_settings.get("DELETE_BATCH_SIZE", "50"))
             enable_parallel = rag_settings.get("ENABLE_PARALLEL_BATCHES", "true").lower() == "true"
+            max_inflight_batches = int(
+                rag_settings.get("DOCUMENT_STORAGE_MAX_INFLIGHT_BATCHES", "4")
+            )
         except Exception as e:
             search_logger.warning(f"Failed to load storage settings: {e}, using defaults")
             if batch_size is None:
                 batch_size = 50
             delete_batch_size = 50
             enable_parallel = True
+            max_inflight_batches = 4
 
         # Get unique URLs to delete existing records
-        unique_urls = list(set(urls))
+        unique_urls = list(set(urls)) if delete_existing else []
 
         # Delete existing records for these URLs in batches
         try:
@@ -79,7 +116,9 @@ async def add_documents_to_supabase(
                         cancellation_check()
 
                     batch_urls = unique_urls[i : i + delete_batch_size]
-                    client.table("archon_crawled_pages").delete().in_("url", batch_urls).execute()
+                    await execute_async(
+                        client.table("archon_crawled_pages").delete().in_("url", batch_urls)
+                    )
                     # Yield control to allow Socket.IO to process messages
                     if i + delete_batch_size < len(unique_urls):
                         await asyncio.sleep(0.05)  # Reduced pause between delete batches
@@ -98,7 +137,9 @@ async def add_documents_to_supabase(
 
                 batch_urls = unique_urls[i : i + 10]
                 try:
-                    client.table("archon_crawled_pages").delete().in_("url", batch_urls).execute()
+                    await execute_async(
+                        client.table("archon_crawled_pages").delete().in_("url", batch_urls)
+                    )
                     await asyncio.sleep(0.05)  # Rate limit to prevent overwhelming
                 except Exception as inner_e:
                     search_logger.error(
@@ -111,8 +152,6 @@ async def add_documents_to_supabase(
 
         # Check if contextual embeddings are enabled
         # Fix: Get from credential service instead of environment
-        from ..credential_service import credential_service
-
         try:
             use_contextual_embeddings = await credential_service.get_credential(
                 "USE_CONTEXTUAL_EMBEDDINGS", "false", decrypt=True
@@ -123,16 +162,38 @@ async def add_documents_to_supabase(
             # Fallback to environment variable
             use_contextual_embeddings = os.getenv("USE_CONTEXTUAL_EMBEDDINGS", "false") == "true"
 
+        # PostgREST or binary COPY for batch inserts
+        writer_mode = await get_bulk_writer_mode()
+
         # Initialize batch tracking for simplified progress
         completed_batches = 0
         total_batches = (len(contents) + batch_size - 1) // batch_size
 
-        # Process in batches to avoid memory issues
-        for batch_num, i in enumerate(range(0, len(contents), batch_size), 1):
-            # Check for cancellation before each batch
-            if cancellation_check:
-                cancellation_check()
-
+        # Get max workers setting FIRST before using it
+        if use_contextual_embeddings:
+            try:
+                max_workers = await credential_service.get_credential(
+                    "CONTEXTUAL_EMBEDDINGS_MAX_WORKERS", "4", decrypt=True
+                )
+                max_workers = int(max_workers)
+            except:
+                max_workers = 4
+        else:
+            max_workers = 1
+
+        # Batches overlap (contextual-embed, embed, insert) up to an adaptive in-flight bound
+        # that backs off on provider 429s and latency spikes
+        parallel = enable_parallel_batches and enable_parallel
+        limiter = (
+            get_ingestion_limiter(max_inflight_batches)
+            if parallel
+            else AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        )
+
+        stored_chunks: set[tuple[str, int]] = set()
+
+        async def process_batch(batch_num: int, i: int):
+            nonlocal completed_batches
             batch_end = min(i + batch_size, len(contents))
 
             # Get batch slices
@@ -144,18 +205,6 @@ async def add_documents_to_supabase(
             # Simple batch progress - only track completed batches
             current_percentage = int((completed_batches / total_batches) * 100)
 
-            # Get max workers setting FIRST before using it
-            if use_contextual_embeddings:
-                try:
-                    max_workers = await credential_service.get_credential(
-                        "CONTEXTUAL_EMBEDDINGS_MAX_WORKERS", "4", decrypt=True
-                    )
-                    max_workers = int(max_workers)
-                except:
-                    max_workers = 4
-            else:
-                max_workers = 1
-
             # Report batch start with simplified progress
             if progress_callback and asyncio.iscoroutinefunction(progress_callback):
                 await progress_callback(
@@ -235,7 +284,13 @@ async def add_documents_to_supabase(
 
             # Create embeddings for the batch - no progress reporting
             # Don't pass websocket to avoid Socket.IO issues
+            embed_start = time.monotonic()
             result = await create_embeddings_batch(contextual_contents, provider=provider)
+            # Per-chunk latency keeps short final batches comparable with full ones
+            limiter.record(
+                (time.monotonic() - embed_start) / max(1, len(contextual_contents)),
+                throttled=result.rate_limited_count > 0,
+            )
 
             # Log any failures
             if result.has_failures:
@@ -253,7 +308,7 @@ async def add_documents_to_supabase(
                     f"Skipping batch {batch_num} - no successful embeddings created"
                 )
                 completed_batches += 1
-                continue
+                return
 
             # Prepare batch data - only for successful embeddings
             batch_data = []
@@ -302,7 +357,10 @@ async def add_documents_to_supabase(
                     cancellation_check()
 
                 try:
-                    client.table("archon_crawled_pages").insert(batch_data).execute()
+                    await insert_batch(client, "archon_crawled_pages", batch_data, writer_mode)
+                    stored_chunks.update(
+                        (record["url"], record["chunk_number"]) for record in batch_data
+                    )
 
                     # Increment completed batches and report simple progress
                     completed_batches += 1
@@ -346,8 +404,11 @@ async def add_documents_to_supabase(
                                 cancellation_check()
 
                             try:
-                                client.table("archon_crawled_pages").insert(record).execute()
+                                await execute_async(
+                                    client.table("archon_crawled_pages").insert(record)
+                                )
                                 successful_inserts += 1
+                                stored_chunks.add((record["url"], record["chunk_number"]))
                             except Exception as individual_error:
                                 search_logger.error(
                                     f"Failed individual insert for {record['url']}: {individual_error}"
@@ -357,10 +418,48 @@ async def add_documents_to_supabase(
                             f"Individual inserts: {successful_inserts}/{len(batch_data)} successful"
                         )
 
-            # Minimal delay between batches to prevent overwhelming
-            if i + batch_size < len(contents):
-                # Only yield control briefly to keep Socket.IO responsive
-                await asyncio.sleep(0.1)  # Reduced from 1.5s/0.5s to 0.1s
+        batch_errors: list[BaseException] = []
+        in_flight: set[asyncio.Task] = set()
+
+        async def run_batch(batch_num: int, i: int):
+            try:
+                await process_batch(batch_num, i)
+            except (Exception, asyncio.CancelledError) as e:
+                batch_errors.append(e)
+            finally:
+                await limiter.release()
+
+        # Process in batches to avoid memory issues
+        try:
+            for batch_num, i in enumerate(range(0, len(contents), batch_size), 1):
+                # Check for cancellation before each batch
+                if cancellation_check:
+                    cancellation_check()
+
+                await limiter.acquire()
+                if batch_errors:
+                    await limiter.release()
+                    raise batch_errors[0]
+
+                task = asyncio.create_task(run_batch(batch_num, i))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+                if not parallel and i + batch_size < len(contents):
+                    # Sequential mode: yield briefly to keep Socket.IO responsive
+                    await task
+                    await asyncio.sleep(0.1)
+
+            await asyncio.gather(*in_flight)
+            if batch_errors:
+                raise batch_errors[0]
+        finally:
+            for task in list(in_flight):
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+        span.set_attribute("final_concurrency_limit", limiter.limit)
 
         # Send final 100% progress report to ensure UI shows completion
         if progress_callback and asyncio.iscoroutinefunction(progress_callback):
@@ -378,3 +477,4 @@ async def add_documents_to_supabase(
 
         span.set_attribute("success", True)
         span.set_attribute("total_processed", len(contents))
+        return stored_chunks
@@ -74,89 +74,244 @@ class ThreadingConfig:
     health_check_interval: float = 30  # System health check frequency
 
 
+class RateLimitUsage:
+    """Handle yielded by rate_limited_operation for reporting actual token usage"""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens: int | None = None
+
+    def record_usage(self, actual_tokens: Any):
+        """Record the real token count reported by the provider (e.g. usage.total_tokens)"""
+        # Some OpenAI-compatible providers omit usage - keep the estimate in that case
+        if isinstance(actual_tokens, int | float) and actual_tokens >= 0:
+            self.actual_tokens = int(actual_tokens)
+
+
 class RateLimiter:
-    """Thread-safe rate limiter with token bucket algorithm"""
+    """
+    Token-bucket rate limiter for requests and tokens per minute.
+
+    Both budgets refill continuously, so availability is computed in O(1) from the
+    current bucket levels. Waiters queue in FIFO order: only the head of the queue
+    sleeps until enough budget has refilled, and no lock is held while it sleeps.
+    Budget is reconciled once the real token usage of a call is known.
+    """
 
     def __init__(self, config: RateLimitConfig):
         self.config = config
-        self.request_times = deque()
-        self.token_usage = deque()
         self.semaphore = asyncio.Semaphore(config.max_concurrent)
-        self._lock = asyncio.Lock()
+
+        self._token_capacity = float(config.tokens_per_minute)
+        self._request_capacity = float(config.requests_per_minute)
+        self._token_rate = config.tokens_per_minute / 60.0  # tokens per second
+        self._request_rate = config.requests_per_minute / 60.0  # requests per second
+
+        self._tokens = self._token_capacity
+        self._requests = self._request_capacity
+        self._last_refill = time.monotonic()
+
+        self._waiters: deque[asyncio.Event] = deque()
 
     async def acquire(self, estimated_tokens: int = 8000) -> bool:
         """Acquire permission to make API call with token awareness"""
-        async with self._lock:
-            now = time.time()
-
-            # Clean old entries
-            self._clean_old_entries(now)
-
-            # Check if we can make the request
-            if not self._can_make_request(estimated_tokens):
-                wait_time = self._calculate_wait_time(estimated_tokens)
-                if wait_time > 0:
-                    logfire_logger.info(
-                        f"Rate limiting: waiting {wait_time:.1f}s",
-                        tokens=estimated_tokens,
-                        current_usage=self._get_current_usage(),
-                    )
-                    await asyncio.sleep(wait_time)
-                    return await self.acquire(estimated_tokens)
-                return False
+        # A single call larger than the bucket could never be admitted - clamp it
+        tokens = min(float(estimated_tokens), self._token_capacity)
+
+        turn = asyncio.Event()
+        self._waiters.append(turn)
+
+        try:
+            while True:
+                if self._waiters[0] is not turn:
+                    # Not our turn yet - wait for the waiter ahead of us to be admitted
+                    await turn.wait()
+                    turn.clear()
+                    continue
+
+                self._refill()
+                wait_time = self._time_until_available(tokens)
+                if wait_time <= 0:
+                    self._tokens -= tokens
+                    self._requests -= 1
+                    return True
 
-            # Record the request
-            self.request_times.append(now)
-            self.token_usage.append((now, estimated_tokens))
-            return True
+                logfire_logger.info(
+                    f"Rate limiting: waiting {wait_time:.1f}s",
+                    tokens=estimated_tokens,
+                    current_usage=self._get_current_usage(),
+                    queued=len(self._waiters) - 1,
+                )
+                # Sleep until refilled, or earlier if a refund wakes us up
+                try:
+                    await asyncio.wait_for(
+                        turn.wait(), timeout=min(wait_time, self.config.max_backoff)
+                    )
+                except TimeoutError:
+                    pass
+                turn.clear()
+        finally:
+            self._leave_queue(turn)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Settle a completed call against its estimate.
+
+        Over-estimates are refunded to the bucket; under-estimates are charged,
+        which may leave the bucket in debt until it refills.
+        """
+        charged = min(float(estimated_tokens), self._token_capacity)
+        difference = charged - actual_tokens
+        if difference == 0:
+            return
+        self._refill()
+        self._tokens = min(self._token_capacity, self._tokens + difference)
+        if difference > 0:
+            self._wake_head()
+
+    def _leave_queue(self, turn: asyncio.Event):
+        """Remove a waiter from the queue and hand the turn to the next one"""
+        was_head = bool(self._waiters) and self._waiters[0] is turn
+        try:
+            self._waiters.remove(turn)
+        except ValueError:
+            pass
+        if was_head:
+            self._wake_head()
+
+    def _wake_head(self):
+        if self._waiters:
+            self._waiters[0].set()
+
+    def _refill(self):
+        """Top up both buckets for the time elapsed since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self._token_capacity, self._tokens + elapsed * self._token_rate)
+            self._requests = min(
+                self._request_capacity, self._requests + elapsed * self._request_rate
+            )
+            self._last_refill = now
 
     def _can_make_request(self, estimated_tokens: int) -> bool:
         """Check if request can be made within limits"""
-        # Check request rate limit
-        if len(self.request_times) >= self.config.requests_per_minute:
-            return False
-
-        # Check token usage limit
-        current_tokens = sum(tokens for _, tokens in self.token_usage)
-        if current_tokens + estimated_tokens > self.config.tokens_per_minute:
-            return False
-
-        return True
+        self._refill()
+        return self._time_until_available(min(estimated_tokens, self._token_capacity)) <= 0
 
-    def _clean_old_entries(self, current_time: float):
-        """Remove entries older than 1 minute"""
-        cutoff_time = current_time - 60
+    def _time_until_available(self, tokens: float) -> float:
+        """Seconds until both buckets hold enough budget for this request"""
+        token_deficit = tokens - self._tokens
+        request_deficit = 1 - self._requests
 
-        while self.request_times and self.request_times[0] < cutoff_time:
-            self.request_times.popleft()
-
-        while self.token_usage and self.token_usage[0][0] < cutoff_time:
-            self.token_usage.popleft()
-
-    def _calculate_wait_time(self, estimated_tokens: int) -> float:
-        """Calculate how long to wait before retrying"""
-        if not self.request_times:
-            return 0
-
-        oldest_request = self.request_times[0]
-        time_since_oldest = time.time() - oldest_request
-
-        if time_since_oldest < 60:
-            return 60 - time_since_oldest + 0.1
-
-        return 0
+        token_wait = token_deficit / self._token_rate if token_deficit > 0 else 0.0
+        request_wait = request_deficit / self._request_rate if request_deficit > 0 else 0.0
+        return max(token_wait, request_wait)
 
     def _get_current_usage(self) -> dict[str, int]:
         """Get current usage statistics"""
-        current_tokens = sum(tokens for _, tokens in self.token_usage)
+        self._refill()
         return {
-            "requests": len(self.request_times),
-            "tokens": current_tokens,
+            "requests": round(self._request_capacity - self._requests),
+            "tokens": round(self._token_capacity - self._tokens),
             "max_requests": self.config.requests_per_minute,
             "max_tokens": self.config.tokens_per_minute,
+            "queued": len(self._waiters),
         }
 
 
+class AdaptiveConcurrencyLimiter:
+    """
+    Bound on in-flight operations that adapts to provider feedback (AIMD).
+
+    Each completed operation reports its latency and whether it was throttled. A throttled
+    operation halves the limit; a latency well above the best observed baseline shrinks it
+    by one; otherwise the limit grows by one after a full window of healthy completions.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        latency_tolerance: float = 2.0,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self._in_flight = 0
+        self._healthy_streak = 0
+        self._baseline_latency: float | None = None
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def set_max_limit(self, max_limit: int):
+        """Change the upper bound, pulling the current limit down if it is above it"""
+        self.max_limit = max(self.min_limit, max_limit)
+        self._limit = min(self._limit, self.max_limit)
+
+    async def acquire(self):
+        """Wait until fewer operations than the current limit are in flight"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self._limit)
+            self._in_flight += 1
+
+    async def release(self):
+        """Mark an operation finished and wake waiters"""
+        async with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._condition.notify_all()
+
+    def record(self, latency: float, throttled: bool = False):
+        """
+        Feed back one completed operation.
+
+        Args:
+            latency: Observed latency, normalised by the caller so operations are comparable
+            throttled: Whether the provider rate-limited the operation (HTTP 429)
+        """
+        previous = self._limit
+
+        if throttled:
+            self._limit = max(self.min_limit, self._limit // 2)
+            self._healthy_streak = 0
+        elif (
+            self._baseline_latency is not None
+            and latency > self._baseline_latency * self.latency_tolerance
+        ):
+            self._limit = max(self.min_limit, self._limit - 1)
+            self._healthy_streak = 0
+        else:
+            self._healthy_streak += 1
+            if self._healthy_streak >= self._limit:
+                self._limit = min(self.max_limit, self._limit + 1)
+                self._healthy_streak = 0
+
+        if not throttled and latency > 0:
+            # Baseline tracks the best recent latency and drifts up slowly as load changes
+            if self._baseline_latency is None or latency < self._baseline_latency:
+                self._baseline_latency = latency
+            else:
+                self._baseline_latency += (latency - self._baseline_latency) * 0.05
+
+        if self._limit != previous:
+            logfire_logger.info(
+                f"Adaptive concurrency limit {previous} -> {self._limit}",
+                throttled=throttled,
+                latency=latency,
+                baseline_latency=self._baseline_latency,
+            )
+
+
 class MemoryAdaptiveDispatcher:
     """Dynamically adjust concurrency based on memory usage"""
 
@@ -498,19 +653,30 @@ class ThreadingService:
 
     @asynccontextmanager
     async def rate_limited_operation(self, estimated_tokens: int = 8000):
-        """Context manager for rate-limited operations"""
+        """
+        Context manager for rate-limited operations.
+
+        Yields a RateLimitUsage handle; call record_usage() with the provider-reported
+        token count so the limiter can refund (or charge) the difference from the estimate.
+        """
         async with self.rate_limiter.semaphore:
             can_proceed = await self.rate_limiter.acquire(estimated_tokens)
             if not can_proceed:
                 raise Exception("Rate limit exceeded")
 
+            usage = RateLimitUsage(estimated_tokens)
             start_time = time.time()
             try:
-                yield
+                yield usage
             finally:
+                if usage.actual_tokens is not None:
+                    self.rate_limiter.reconcile(estimated_tokens, usage.actual_tokens)
                 duration = time.time() - start_time
                 logfire_logger.debug(
-                    "Rate limited operation completed", duration=duration, tokens=estimated_tokens
+                    "Rate limited operation completed",
+                    duration=duration,
+                    tokens=estimated_tokens,
+                    actual_tokens=usage.actual_tokens,
                 )
 
     async def run_cpu_intensive(self, func: Callable, *args, **kwargs) -> Any:
@@ -3,6 +3,8 @@ Socket.IO Server Integration for Archon
 
 Simple Socket.IO server setup with FastAPI integration.
 All events are handled in projects_api.py using @sio.event decorators.
+
+When REDIS_URL is set, emits go through a Redis message queue so rooms span every API worker.
 """
 
 import logging
@@ -11,15 +13,27 @@ import socketio
 from fastapi import FastAPI
 
 from .config.logfire_config import safe_logfire_info
+from .services.document_sync_store import get_redis_url
 
 logger = logging.getLogger(__name__)
 
+
+def _create_client_manager() -> socketio.AsyncManager | None:
+    """Use a Redis message queue for multi-worker deployments, the default manager otherwise."""
+    redis_url = get_redis_url()
+    if not redis_url:
+        return None
+    logger.info("Socket.IO using Redis message queue")
+    return socketio.AsyncRedisManager(redis_url)
+
+
 # Create Socket.IO server with FastAPI integration
 sio = socketio.AsyncServer(
     async_mode="asgi",
     cors_allowed_origins="*",  # TODO: Configure for production with specific origins
     logger=False,  # Disable verbose Socket.IO logging
     engineio_logger=False,  # Disable verbose Engine.IO logging
+    client_manager=_create_client_manager(),
     # Performance settings for long-running operations
     max_http_buffer_size=1000000,  # 1MB
     ping_timeout=300,  # 5 minutes - increased for background tasks
@@ -2,8 +2,18 @@
 Progress Tracker Utility
 
 Consolidates all Socket.IO progress tracking operations for cleaner service code.
+
+Broadcasts use a delta protocol so traffic stays proportional to what changed:
+- a full snapshot ("isDelta": False) is sent on start, completion, error and to joining sockets,
+- every other emit is a delta ("isDelta": True) carrying only changed fields plus the log
+  entries added since the previous emit in "newLogs",
+- every payload carries an increasing "seq"; a client that sees a gap should re-join the room
+  to receive a fresh snapshot,
+- updates within the same time window are coalesced into one emit per progress_id.
 """
 
+import asyncio
+import time
 from datetime import datetime
 from typing import Any
 
@@ -16,7 +26,14 @@ class ProgressTracker:
     Consolidates all progress-related Socket.IO operations.
     """
 
-    def __init__(self, sio, progress_id: str, operation_type: str = "crawl"):
+    def __init__(
+        self,
+        sio,
+        progress_id: str,
+        operation_type: str = "crawl",
+        max_logs: int = 200,
+        max_emits_per_second: float = 4.0,
+    ):
         """
         Initialize the progress tracker.
 
@@ -24,10 +41,15 @@ class ProgressTracker:
             sio: Socket.IO instance
             progress_id: Unique progress identifier
             operation_type: Type of operation (crawl, upload, etc.)
+            max_logs: Number of most recent log entries kept in the state
+            max_emits_per_second: Upper bound on emits for this progress_id; updates in
+                between are coalesced into the next emit
         """
         self.sio = sio
         self.progress_id = progress_id
         self.operation_type = operation_type
+        self.max_logs = max(1, max_logs)
+        self.min_emit_interval = 1.0 / max_emits_per_second if max_emits_per_second > 0 else 0.0
         self.state = {
             "progressId": progress_id,
             "startTime": datetime.now().isoformat(),
@@ -36,6 +58,14 @@ class ProgressTracker:
             "logs": [],
         }
 
+        # Delta and coalescing bookkeeping
+        self._seq = 0
+        self._last_emitted: dict[str, Any] = {}
+        self._logs_total = 0  # Log entries ever appended (the state keeps only the last max_logs)
+        self._logs_emitted = 0
+        self._last_emit_time = 0.0
+        self._flush_task: asyncio.Task | None = None
+
     async def start(self, initial_data: dict[str, Any] | None = None):
         """
         Start progress tracking with initial data.
@@ -49,7 +79,7 @@ class ProgressTracker:
         if initial_data:
             self.state.update(initial_data)
 
-        await self._emit_progress()
+        await self._emit_progress(snapshot=True)
         safe_logfire_info(
             f"Progress tracking started | progress_id={self.progress_id} | type={self.operation_type}"
         )
@@ -71,10 +101,8 @@ class ProgressTracker:
             "timestamp": datetime.now().isoformat(),
         })
 
-        # Add log entry
-        if "logs" not in self.state:
-            self.state["logs"] = []
-        self.state["logs"].append({
+        # Add log entry, keeping only the most recent entries
+        self._append_log({
             "timestamp": datetime.now().isoformat(),
             "message": log,
             "status": status,
@@ -85,7 +113,41 @@ class ProgressTracker:
         for key, value in kwargs.items():
             self.state[key] = value
 
-        await self._emit_progress()
+        await self._schedule_emit()
+
+    async def merge(self, data: dict[str, Any], snapshot: bool = False):
+        """
+        Merge a progress dict built by the caller into the state and broadcast it.
+
+        Used by services that assemble their own progress payloads (crawls and uploads): the
+        entries of an optional "logs" list and a changed "log" message are appended to the
+        retained log as given, and every other key replaces the state's value.
+
+        Args:
+            data: Progress fields to merge
+            snapshot: Send the full state immediately instead of a coalesced delta
+        """
+        data = dict(data)
+        new_logs = list(data.pop("logs", None) or [])
+        if data.get("log") and data["log"] != self.state.get("log"):
+            new_logs.append(data["log"])
+
+        self.state.update(data)
+        for entry in new_logs:
+            self._append_log(entry)
+
+        if snapshot:
+            await self._emit_progress(snapshot=True)
+        else:
+            await self._schedule_emit()
+
+    def _append_log(self, entry: Any):
+        if "logs" not in self.state:
+            self.state["logs"] = []
+        self.state["logs"].append(entry)
+        self._logs_total += 1
+        if len(self.state["logs"]) > self.max_logs:
+            del self.state["logs"][: -self.max_logs]
 
     async def complete(self, completion_data: dict[str, Any] | None = None):
         """
@@ -109,7 +171,7 @@ class ProgressTracker:
             self.state["duration"] = duration
             self.state["durationFormatted"] = self._format_duration(duration)
 
-        await self._emit_progress()
+        await self._emit_progress(snapshot=True)
         safe_logfire_info(
             f"Progress completed | progress_id={self.progress_id} | type={self.operation_type} | duration={self.state.get('durationFormatted', 'unknown')}"
         )
@@ -131,7 +193,7 @@ class ProgressTracker:
         if error_details:
             self.state["errorDetails"] = error_details
 
-        await self._emit_progress()
+        await self._emit_progress(snapshot=True)
         safe_logfire_error(
             f"Progress error | progress_id={self.progress_id} | type={self.operation_type} | error={error_message}"
         )
@@ -203,10 +265,61 @@ class ProgressTracker:
             totalChunks=total_chunks,
         )
 
-    async def _emit_progress(self):
-        """Emit progress update via Socket.IO."""
+    async def flush(self):
+        """Emit any coalesced update immediately."""
+        if self._flush_task and not self._flush_task.done():
+            await self._emit_progress()
+
+    async def _schedule_emit(self):
+        """Emit now if the time window allows, otherwise fold the update into a delayed emit."""
+        wait = self._last_emit_time + self.min_emit_interval - time.monotonic()
+        if wait <= 0:
+            await self._emit_progress()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after(wait))
+
+    async def _flush_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        await self._emit_progress()
+
+    def _build_delta(self) -> dict[str, Any]:
+        """Fields changed since the last emit plus log entries added since then."""
+        delta = {
+            key: value
+            for key, value in self.state.items()
+            if key != "logs" and self._last_emitted.get(key, ...) != value
+        }
+        new_log_count = min(self._logs_total - self._logs_emitted, len(self.state["logs"]))
+        delta["newLogs"] = self.state["logs"][-new_log_count:] if new_log_count else []
+        return delta
+
+    def _build_snapshot(self) -> dict[str, Any]:
+        """Full state, including the retained log entries."""
+        return {**self.state, "logs": list(self.state["logs"])}
+
+    async def _emit_progress(self, snapshot: bool = False):
+        """
+        Emit progress update via Socket.IO.
+
+        Args:
+            snapshot: Send the full state instead of a delta
+        """
         event_name = f"{self.operation_type}_progress"
 
+        # Emitting now supersedes any pending coalesced emit
+        if self._flush_task and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
+        self._flush_task = None
+
+        payload = self._build_snapshot() if snapshot else self._build_delta()
+        self._seq += 1
+        payload.update({"progressId": self.progress_id, "seq": self._seq, "isDelta": not snapshot})
+
+        self._last_emitted = {key: value for key, value in self.state.items() if key != "logs"}
+        self._logs_emitted = self._logs_total
+        self._last_emit_time = time.monotonic()
+
         # Log detailed progress info for debugging
         safe_logfire_info(f"📢 [SOCKETIO] Broadcasting {event_name} to room: {self.progress_id}")
         safe_logfire_info(
@@ -214,7 +327,7 @@ class ProgressTracker:
         )
 
         # Emit to the progress room
-        await self.sio.emit(event_name, self.state, room=self.progress_id)
+        await self.sio.emit(event_name, payload, room=self.progress_id)
 
     def _format_duration(self, seconds: float) -> str:
         """Format duration in seconds to human-readable string."""
@@ -231,9 +344,21 @@ class ProgressTracker:
         """Get current progress state."""
         return self.state.copy()
 
+    @property
+    def last_emit_time(self) -> float:
+        """time.monotonic() of the last emit, 0.0 before the first one."""
+        return self._last_emit_time
+
     async def join_room(self, sid: str):
-        """Add a socket ID to the progress room."""
+        """Add a socket ID to the progress room and send it a full snapshot to apply deltas to."""
         await self.sio.enter_room(sid, self.progress_id)
+        await self.flush()
+        # Full state at the current sequence number; the room's next delta applies on top
+        await self.sio.emit(
+            f"{self.operation_type}_progress",
+            {**self._build_snapshot(), "seq": self._seq, "isDelta": False},
+            to=sid,
+        )
         safe_logfire_info(f"Socket {sid} joined progress room {self.progress_id}")
 
     async def leave_room(self, sid: str):
@@ -1,7 +1,9 @@
 """Simple test configuration for Archon - Essential tests only."""
 
+import json
 import os
-from unittest.mock import MagicMock, patch
+from contextlib import ExitStack, asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -74,6 +76,38 @@ def mock_supabase_client():
     return mock_client
 
 
+@pytest.fixture
+def fake_llm_client():
+    """
+    Factory installing a fake LLM client as a module's get_llm_client.
+
+    fake_llm_client(module, answer) patches `<module>.get_llm_client` for the rest of the test
+    and returns the client. Each chat completion is answered with json.dumps(answer(prompt)),
+    where prompt is the request's user message.
+    """
+    with ExitStack() as stack:
+
+        def install(module: str, answer) -> MagicMock:
+            async def create(**kwargs):
+                content = json.dumps(answer(kwargs["messages"][1]["content"]))
+                return MagicMock(
+                    choices=[MagicMock(message=MagicMock(content=content))],
+                    usage=MagicMock(total_tokens=100),
+                )
+
+            client = MagicMock()
+            client.chat.completions.create = AsyncMock(side_effect=create)
+
+            @asynccontextmanager
+            async def fake_get_llm_client(*args, **kwargs):
+                yield client
+
+            stack.enter_context(patch(f"{module}.get_llm_client", fake_get_llm_client))
+            return client
+
+        yield install
+
+
 @pytest.fixture
 def client(mock_supabase_client):
     """FastAPI test client with mocked database."""
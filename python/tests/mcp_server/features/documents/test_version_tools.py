@@ -51,7 +51,7 @@ async def test_create_version_success(mock_mcp, mock_context):
         "message": "Version created successfully",
     }
 
-    with patch("src.mcp_server.features.documents.version_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.documents.version_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.post.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -82,7 +82,7 @@ async def test_create_version_invalid_field(mock_mcp, mock_context):
     mock_response.status_code = 400
     mock_response.text = "invalid field_name"
 
-    with patch("src.mcp_server.features.documents.version_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.documents.version_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.post.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -116,7 +116,7 @@ async def test_restore_version_success(mock_mcp, mock_context):
     mock_response.status_code = 200
     mock_response.json.return_value = {"message": "Version 2 restored successfully"}
 
-    with patch("src.mcp_server.features.documents.version_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.documents.version_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.post.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -154,7 +154,7 @@ async def test_list_versions_with_filter(mock_mcp, mock_context):
         ]
     }
 
-    with patch("src.mcp_server.features.documents.version_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.documents.version_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.get.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
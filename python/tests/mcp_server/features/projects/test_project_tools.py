@@ -59,7 +59,7 @@ async def test_create_project_success(mock_mcp, mock_context):
         {"id": "project-123", "title": "Test Project", "created_at": "2024-01-01"}
     ]
 
-    with patch("src.mcp_server.features.projects.project_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.projects.project_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         # First call creates project, subsequent calls list projects
         mock_async_client.post.return_value = mock_create_response
@@ -97,7 +97,7 @@ async def test_create_project_direct_response(mock_mcp, mock_context):
         "message": "Project created immediately",
     }
 
-    with patch("src.mcp_server.features.projects.project_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.projects.project_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.post.return_value = mock_create_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -128,7 +128,7 @@ async def test_list_projects_success(mock_mcp, mock_context):
         {"id": "proj-2", "title": "Project 2", "created_at": "2024-01-02"},
     ]
 
-    with patch("src.mcp_server.features.projects.project_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.projects.project_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.get.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -156,7 +156,7 @@ async def test_get_project_not_found(mock_mcp, mock_context):
     mock_response.status_code = 404
     mock_response.text = "Project not found"
 
-    with patch("src.mcp_server.features.projects.project_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.projects.project_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.get.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -51,7 +51,7 @@ async def test_create_task_with_sources(mock_mcp, mock_context):
         "message": "Task created successfully",
     }
 
-    with patch("src.mcp_server.features.tasks.task_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.tasks.task_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.post.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -97,7 +97,7 @@ async def test_list_tasks_with_project_filter(mock_mcp, mock_context):
         ]
     }
 
-    with patch("src.mcp_server.features.tasks.task_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.tasks.task_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.get.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -125,7 +125,7 @@ async def test_list_tasks_with_status_filter(mock_mcp, mock_context):
     mock_response.status_code = 200
     mock_response.json.return_value = [{"id": "task-1", "title": "Task 1", "status": "todo"}]
 
-    with patch("src.mcp_server.features.tasks.task_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.tasks.task_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.get.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -162,7 +162,7 @@ async def test_update_task_status(mock_mcp, mock_context):
         "message": "Task updated successfully",
     }
 
-    with patch("src.mcp_server.features.tasks.task_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.tasks.task_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.put.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -218,7 +218,7 @@ async def test_delete_task_already_archived(mock_mcp, mock_context):
     mock_response.status_code = 400
     mock_response.text = "Task already archived"
 
-    with patch("src.mcp_server.features.tasks.task_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.tasks.task_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.delete.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
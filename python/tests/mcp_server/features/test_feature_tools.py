@@ -55,7 +55,7 @@ async def test_get_project_features_success(mock_mcp, mock_context):
         ]
     }
 
-    with patch("src.mcp_server.features.feature_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.feature_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.get.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -87,7 +87,7 @@ async def test_get_project_features_empty(mock_mcp, mock_context):
     mock_response.status_code = 200
     mock_response.json.return_value = {"features": []}
 
-    with patch("src.mcp_server.features.feature_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.feature_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.get.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
@@ -112,7 +112,7 @@ async def test_get_project_features_not_found(mock_mcp, mock_context):
     mock_response.status_code = 404
     mock_response.text = "Project not found"
 
-    with patch("src.mcp_server.features.feature_tools.httpx.AsyncClient") as mock_client:
+    with patch("src.mcp_server.features.feature_tools.get_http_client") as mock_client:
         mock_async_client = AsyncMock()
         mock_async_client.get.return_value = mock_response
         mock_client.return_value.__aenter__.return_value = mock_async_client
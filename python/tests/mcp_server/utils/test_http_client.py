@@ -0,0 +1,127 @@
+"""Unit tests for the shared MCP HTTP client pool."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.mcp_server.utils import http_client
+from src.mcp_server.utils.http_client import (
+    close_http_client_pool,
+    get_http_client,
+    get_http_transport,
+    get_pool_limits,
+    get_shared_transport,
+    http2_enabled,
+)
+
+
+@pytest.fixture
+async def mock_pool():
+    """Install a mock transport as the shared pool and record the requests it sees."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    transport = httpx.MockTransport(handler)
+    http_client._pool = transport
+    http_client._pool_loop = asyncio.get_running_loop()
+    yield transport, requests
+    http_client._pool = None
+    http_client._pool_loop = None
+
+
+@pytest.mark.asyncio
+async def test_clients_share_the_pool(mock_pool):
+    """Test that every client sends through the same pool and leaves it open on exit."""
+    transport, requests = mock_pool
+
+    async with get_http_client() as client:
+        await client.get("http://api/one")
+    async with get_http_client(for_polling=True) as client:
+        await client.get("http://api/two")
+
+    assert [str(r.url) for r in requests] == ["http://api/one", "http://api/two"]
+    assert get_http_transport() is transport
+
+
+@pytest.mark.asyncio
+async def test_per_client_timeout_reaches_the_pool(mock_pool):
+    """Test that each client's timeout is applied to its requests."""
+    _, requests = mock_pool
+    timeout = httpx.Timeout(7.0, connect=2.0)
+
+    async with get_http_client(timeout=timeout) as client:
+        await client.get("http://api/tasks")
+
+    assert requests[0].extensions["timeout"]["connect"] == 2.0
+    assert requests[0].extensions["timeout"]["read"] == 7.0
+
+
+@pytest.mark.asyncio
+async def test_close_pool(mock_pool):
+    """Test that closing the pool resets it so the next call opens a new one."""
+    await close_http_client_pool()
+
+    assert http_client._pool is None
+    assert isinstance(get_http_transport(), httpx.AsyncHTTPTransport)
+    await close_http_client_pool()
+
+
+def test_pool_from_another_loop_is_closed_on_replacement():
+    """Test that a pool left by a previous event loop is closed when it is replaced."""
+
+    async def open_pool():
+        return get_http_transport()
+
+    async def replace_pool(old_pool):
+        # A long-lived client built before the loop change keeps working on the new pool
+        async with httpx.AsyncClient(transport=get_shared_transport()) as client:
+            with patch.object(httpx.AsyncHTTPTransport, "handle_async_request") as handle:
+                handle.return_value = httpx.Response(200)
+                response = await client.get("http://api/health")
+        await asyncio.gather(*http_client._closing)
+        return response, old_pool.aclose
+
+    try:
+        old_pool = asyncio.run(open_pool())
+        with patch.object(old_pool, "aclose", new_callable=AsyncMock):
+            response, aclose = asyncio.run(replace_pool(old_pool))
+            new_pool = http_client._pool
+    finally:
+        http_client._pool = None
+        http_client._pool_loop = None
+
+    assert response.status_code == 200
+    assert new_pool is not old_pool
+    aclose.assert_awaited_once()
+
+
+def test_pool_limits_from_env():
+    """Test pool limits from environment variables."""
+    env_vars = {
+        "MCP_HTTP_MAX_CONNECTIONS": "50",
+        "MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS": "5",
+        "MCP_HTTP_KEEPALIVE_EXPIRY": "10",
+    }
+
+    with patch.dict(os.environ, env_vars):
+        limits = get_pool_limits()
+
+    assert limits.max_connections == 50
+    assert limits.max_keepalive_connections == 5
+    assert limits.keepalive_expiry == 10.0
+
+
+def test_http2_requires_h2_package():
+    """Test that HTTP/2 stays off when the h2 package is missing."""
+    with patch.dict(os.environ, {"MCP_HTTP2_ENABLED": "true"}):
+        with patch("src.mcp_server.utils.http_client.importlib.util.find_spec", return_value=None):
+            assert http2_enabled() is False
+
+    with patch.dict(os.environ, {}, clear=True):
+        assert http2_enabled() is False
@@ -0,0 +1,102 @@
+"""
+Tests for the non-blocking database access helpers in client_manager.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.server.services.client_manager import execute_async
+from src.server.services.knowledge.knowledge_item_service import KnowledgeItemService
+
+
+class TestExecuteAsync:
+    """Test suite for execute_async"""
+
+    @pytest.mark.asyncio
+    async def test_sync_builder_runs_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        query = MagicMock()
+
+        def blocking_execute():
+            query.thread = threading.get_ident()
+            return MagicMock(data=[{"id": 1}])
+
+        query.execute.side_effect = blocking_execute
+
+        response = await execute_async(query)
+
+        assert response.data == [{"id": 1}]
+        assert query.thread != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_async_builder_is_awaited_directly(self):
+        query = MagicMock()
+        query.execute = AsyncMock(return_value=MagicMock(data=[{"id": 2}]))
+
+        response = await execute_async(query)
+
+        assert response.data == [{"id": 2}]
+        query.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_blocking_calls_overlap(self):
+        def make_query():
+            query = MagicMock()
+            query.execute.side_effect = lambda: time.sleep(0.1)
+            return query
+
+        start = time.monotonic()
+        await asyncio.gather(*(execute_async(make_query()) for _ in range(4)))
+
+        # Four 100ms calls complete in roughly the time of one
+        assert time.monotonic() - start < 0.3
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self):
+        query = MagicMock()
+        query.execute.side_effect = RuntimeError("connection reset")
+
+        with pytest.raises(RuntimeError, match="connection reset"):
+            await execute_async(query)
+
+
+class TestKnowledgeItemService:
+    """Test suite for KnowledgeItemService queries run through execute_async"""
+
+    @pytest.mark.asyncio
+    async def test_get_item_returns_the_transformed_source(self):
+        source = {
+            "source_id": "src-1",
+            "title": "Docs",
+            "total_words": 500,
+            "metadata": {"knowledge_type": "technical", "tags": ["api"]},
+        }
+        tables = {
+            "archon_sources": MagicMock(data=source),
+            "archon_crawled_pages": MagicMock(data=[{"url": "https://example.com/docs"}]),
+            "archon_code_examples": MagicMock(data=[]),
+        }
+
+        def from_(table):
+            # Every builder method returns the same mock; execute() answers for the table
+            builder = MagicMock()
+            for method in ("select", "eq", "limit", "single"):
+                getattr(builder, method).return_value = builder
+            builder.execute.return_value = tables[table]
+            return builder
+
+        supabase = MagicMock()
+        supabase.from_.side_effect = from_
+        service = KnowledgeItemService(supabase)
+
+        item = await service.get_item("src-1")
+
+        assert item["source_id"] == "src-1"
+        assert item["title"] == "Docs"
+        assert item["url"] == "https://example.com/docs"
+        assert item["metadata"]["tags"] == ["api"]
+        assert item["metadata"]["word_count"] == 500
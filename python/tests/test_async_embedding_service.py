@@ -54,7 +54,7 @@ class TestAsyncEmbeddingService:
         """Mock threading service for testing"""
         mock_service = MagicMock()
         # Create a proper async context manager
-        rate_limit_ctx = AsyncContextManager(None)
+        rate_limit_ctx = AsyncContextManager(MagicMock())
         mock_service.rate_limited_operation.return_value = rate_limit_ctx
         return mock_service
 
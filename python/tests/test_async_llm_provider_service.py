@@ -5,7 +5,7 @@ Tests all aspects of the async LLM provider service after sync function removal.
 Covers different providers (OpenAI, Ollama, Google) and error scenarios.
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -39,8 +39,14 @@ class TestAsyncLLMProviderService:
         import src.server.services.llm_provider_service as llm_module
 
         llm_module._settings_cache.clear()
+        llm_module._client_registry.clear()
+        llm_module._client_leases.clear()
+        llm_module._retired_clients.clear()
         yield
         llm_module._settings_cache.clear()
+        llm_module._client_registry.clear()
+        llm_module._client_leases.clear()
+        llm_module._retired_clients.clear()
 
     @pytest.fixture
     def mock_credential_service(self):
@@ -103,7 +109,7 @@ class TestAsyncLLMProviderService:
 
                 async with get_llm_client() as client:
                     assert client == mock_client
-                    mock_openai.assert_called_once_with(api_key="test-openai-key")
+                    mock_openai.assert_called_once_with(api_key="test-openai-key", http_client=ANY)
 
                 # Verify provider config was fetched
                 mock_credential_service.get_active_provider.assert_called_once_with("llm")
@@ -127,7 +133,7 @@ class TestAsyncLLMProviderService:
                 async with get_llm_client() as client:
                     assert client == mock_client
                     mock_openai.assert_called_once_with(
-                        api_key="ollama", base_url="http://localhost:11434/v1"
+                        api_key="ollama", base_url="http://localhost:11434/v1", http_client=ANY
                     )
 
     @pytest.mark.asyncio
@@ -151,6 +157,7 @@ class TestAsyncLLMProviderService:
                     mock_openai.assert_called_once_with(
                         api_key="test-google-key",
                         base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+                        http_client=ANY,
                     )
 
     @pytest.mark.asyncio
@@ -171,7 +178,7 @@ class TestAsyncLLMProviderService:
 
                 async with get_llm_client(provider="openai") as client:
                     assert client == mock_client
-                    mock_openai.assert_called_once_with(api_key="override-key")
+                    mock_openai.assert_called_once_with(api_key="override-key", http_client=ANY)
 
                 # Verify explicit provider API key was requested
                 mock_credential_service._get_provider_api_key.assert_called_once_with("openai")
@@ -199,7 +206,7 @@ class TestAsyncLLMProviderService:
 
                 async with get_llm_client(use_embedding_provider=True) as client:
                     assert client == mock_client
-                    mock_openai.assert_called_once_with(api_key="embedding-key")
+                    mock_openai.assert_called_once_with(api_key="embedding-key", http_client=ANY)
 
                 # Verify embedding provider was requested
                 mock_credential_service.get_active_provider.assert_called_once_with("embedding")
@@ -472,3 +479,110 @@ class TestAsyncLLMProviderService:
 
                 # Should have been called once for each provider
                 assert mock_credential_service.get_active_provider.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_client_reused_across_calls(self, mock_credential_service, openai_provider_config):
+        """Test that the same pooled client is handed out for the same configuration"""
+        mock_credential_service.get_active_provider.return_value = openai_provider_config
+
+        with patch(
+            "src.server.services.llm_provider_service.credential_service", mock_credential_service
+        ):
+            with patch(
+                "src.server.services.llm_provider_service.openai.AsyncOpenAI"
+            ) as mock_openai:
+                mock_openai.side_effect = lambda **kwargs: MagicMock()
+
+                async with get_llm_client() as first:
+                    pass
+                async with get_llm_client() as second:
+                    pass
+
+                assert first is second
+                assert mock_openai.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_client_rebuilt_after_invalidation(
+        self, mock_credential_service, openai_provider_config
+    ):
+        """Test that invalidating provider clients closes them and forces a rebuild"""
+        from src.server.services.llm_provider_service import invalidate_llm_clients
+
+        mock_credential_service.get_active_provider.return_value = openai_provider_config
+
+        with patch(
+            "src.server.services.llm_provider_service.credential_service", mock_credential_service
+        ):
+            with patch(
+                "src.server.services.llm_provider_service.openai.AsyncOpenAI"
+            ) as mock_openai:
+                mock_openai.side_effect = lambda **kwargs: MagicMock(close=AsyncMock())
+
+                async with get_llm_client() as first:
+                    pass
+
+                await invalidate_llm_clients()
+                first.close.assert_awaited_once()
+
+                async with get_llm_client() as second:
+                    pass
+
+                assert first is not second
+                assert mock_credential_service.get_active_provider.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidation_waits_for_clients_in_use(
+        self, mock_credential_service, openai_provider_config
+    ):
+        """Test that a client in use survives invalidation until its last context exits"""
+        from src.server.services.llm_provider_service import invalidate_llm_clients
+
+        mock_credential_service.get_active_provider.return_value = openai_provider_config
+
+        with patch(
+            "src.server.services.llm_provider_service.credential_service", mock_credential_service
+        ):
+            with patch(
+                "src.server.services.llm_provider_service.openai.AsyncOpenAI"
+            ) as mock_openai:
+                mock_openai.side_effect = lambda **kwargs: MagicMock(close=AsyncMock())
+
+                async with get_llm_client() as outer:
+                    async with get_llm_client() as inner:
+                        await invalidate_llm_clients()
+                    outer.close.assert_not_awaited()
+
+                    # New callers already get a fresh client
+                    async with get_llm_client() as fresh:
+                        assert fresh is not outer
+
+                outer.close.assert_awaited_once()
+                assert inner is outer
+                fresh.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_different_api_keys_get_different_clients(self, mock_credential_service):
+        """Test that the registry is keyed by API key as well as provider"""
+        with patch(
+            "src.server.services.llm_provider_service.credential_service", mock_credential_service
+        ):
+            with patch(
+                "src.server.services.llm_provider_service.openai.AsyncOpenAI"
+            ) as mock_openai:
+                mock_openai.side_effect = lambda **kwargs: MagicMock()
+
+                clients = []
+                for key in ("key-a", "key-b"):
+                    import src.server.services.llm_provider_service as llm_module
+
+                    llm_module._settings_cache.clear()
+                    mock_credential_service.get_active_provider.return_value = {
+                        "provider": "openai",
+                        "api_key": key,
+                        "base_url": None,
+                    }
+                    async with get_llm_client() as client:
+                        clients.append(client)
+
+                assert clients[0] is not clients[1]
+                assert mock_openai.call_count == 2
@@ -0,0 +1,119 @@
+"""
+Tests for the binary COPY bulk writer.
+"""
+
+import json
+import struct
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.storage import bulk_writer
+from src.server.services.storage.bulk_writer import (
+    COPY_WRITER,
+    POSTGREST_WRITER,
+    decode_vector,
+    encode_vector,
+    insert_batch,
+)
+
+ROWS = [
+    {
+        "url": "https://a",
+        "chunk_number": 0,
+        "content": "text",
+        "metadata": {"chunk_size": 4},
+        "source_id": "a",
+        "embedding": [0.5, -1.0, 2.0],
+    }
+]
+
+
+def make_pool() -> tuple[MagicMock, AsyncMock]:
+    conn = MagicMock()
+    conn.copy_records_to_table = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    return pool, conn
+
+
+class TestBulkWriter:
+    """Test suite for the bulk writer"""
+
+    def test_vector_binary_format(self):
+        data = encode_vector([0.5, -1.0, 2.0])
+
+        assert data[:4] == struct.pack(">HH", 3, 0)
+        assert len(data) == 4 + 3 * 4
+        assert decode_vector(data) == [0.5, -1.0, 2.0]
+
+    @pytest.mark.asyncio
+    async def test_copy_mode_writes_records_with_json_metadata(self):
+        pool, conn = make_pool()
+        client = MagicMock()
+
+        with patch.object(bulk_writer, "get_bulk_pool", AsyncMock(return_value=pool)):
+            await insert_batch(client, "archon_crawled_pages", ROWS, COPY_WRITER)
+
+        client.table.assert_not_called()
+        conn.copy_records_to_table.assert_awaited_once()
+        call = conn.copy_records_to_table.await_args
+        assert call.args == ("archon_crawled_pages",)
+        assert call.kwargs["columns"] == list(ROWS[0].keys())
+        record = call.kwargs["records"][0]
+        assert json.loads(record[3]) == {"chunk_size": 4}
+        assert record[5] == [0.5, -1.0, 2.0]
+
+    @pytest.mark.asyncio
+    async def test_copy_mode_without_pool_uses_postgrest(self):
+        client = MagicMock()
+
+        with (
+            patch.object(bulk_writer, "get_bulk_pool", AsyncMock(return_value=None)),
+            patch.object(bulk_writer, "execute_async", AsyncMock()) as execute,
+        ):
+            await insert_batch(client, "archon_crawled_pages", ROWS, COPY_WRITER)
+
+        client.table.return_value.insert.assert_called_once_with(ROWS)
+        execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_postgrest_mode_never_opens_pool(self):
+        with (
+            patch.object(bulk_writer, "get_bulk_pool", AsyncMock()) as get_pool,
+            patch.object(bulk_writer, "execute_async", AsyncMock()),
+        ):
+            await insert_batch(MagicMock(), "archon_code_examples", ROWS, POSTGREST_WRITER)
+
+        get_pool.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_missing_dsn_disables_copy(self, monkeypatch):
+        monkeypatch.delenv("SUPABASE_DB_URL", raising=False)
+        monkeypatch.setattr(bulk_writer, "_pool", None)
+        monkeypatch.setattr(bulk_writer, "_pool_unavailable", False)
+
+        assert await bulk_writer.get_bulk_pool() is None
+        assert bulk_writer._pool_unavailable is True
+
+    @pytest.mark.asyncio
+    async def test_connection_error_is_retried_after_backoff(self, monkeypatch):
+        pool = MagicMock()
+        fake_asyncpg = MagicMock()
+        fake_asyncpg.create_pool = AsyncMock(side_effect=[OSError("refused"), pool])
+        monkeypatch.setenv("SUPABASE_DB_URL", "postgresql://db")
+        monkeypatch.setattr(bulk_writer, "asyncpg", fake_asyncpg)
+        monkeypatch.setattr(bulk_writer, "_pool", None)
+        monkeypatch.setattr(bulk_writer, "_pool_unavailable", False)
+        monkeypatch.setattr(bulk_writer, "_pool_retry_at", 0.0)
+
+        assert await bulk_writer.get_bulk_pool() is None
+        # Within the backoff interval the pool is not retried
+        assert await bulk_writer.get_bulk_pool() is None
+        assert fake_asyncpg.create_pool.await_count == 1
+        assert bulk_writer._pool_unavailable is False
+
+        bulk_writer._pool_retry_at = 0.0
+        assert await bulk_writer.get_bulk_pool() is pool
+        assert fake_asyncpg.create_pool.await_count == 2
@@ -0,0 +1,138 @@
+"""
+Tests for MinHash/LSH code block deduplication.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.server.services.crawling.code_extraction_service import CodeExtractionService
+from src.server.services.storage.code_dedup import (
+    MinHashLSHIndex,
+    estimate_similarity,
+    group_near_duplicates,
+    minhash_signature,
+)
+from src.server.services.storage.code_storage_service import (
+    compute_code_signature,
+    extract_code_blocks,
+)
+
+HANDLER = """from fastapi import FastAPI
+
+app = FastAPI()
+
+
+@app.get("/items/{item_id}")
+async def read_item(item_id: int, q: str | None = None):
+    result = {"item_id": item_id}
+    if q:
+        result.update({"q": q})
+    return result
+"""
+
+VARIANT = HANDLER.replace("q: str | None = None", "q: Optional[str] = None")
+
+CLIENT = """import httpx
+
+
+def fetch_all(urls: list[str]) -> list[bytes]:
+    responses = []
+    with httpx.Client(timeout=10) as client:
+        for url in urls:
+            response = client.get(url)
+            response.raise_for_status()
+            responses.append(response.content)
+    return responses
+"""
+
+
+def make_item(url: str, code: str, source_id: str = "docs.example.com") -> dict:
+    return {
+        "block": {"code": code, "language": "python"},
+        "source_url": url,
+        "source_id": source_id,
+    }
+
+
+class TestMinHash:
+    """Test suite for signatures and the LSH index"""
+
+    def test_signature_is_stable_int32(self):
+        signature = minhash_signature("def f(): return 1")
+
+        assert signature == minhash_signature("def f(): return 1")
+        assert len(signature) == 128
+        assert all(-(2**31) <= value < 2**31 for value in signature)
+
+    def test_variants_are_candidates_and_unrelated_code_is_not(self):
+        index = MinHashLSHIndex()
+        index.add("handler", compute_code_signature(HANDLER))
+
+        assert index.candidates(compute_code_signature(VARIANT)) == {"handler"}
+        assert index.candidates(compute_code_signature(CLIENT)) == set()
+        assert estimate_similarity(
+            compute_code_signature(HANDLER), compute_code_signature(VARIANT)
+        ) > estimate_similarity(compute_code_signature(HANDLER), compute_code_signature(CLIENT))
+
+    def test_grouping_only_verifies_candidates(self):
+        codes = [HANDLER, CLIENT, VARIANT]
+        checked = []
+
+        def is_similar(i, j):
+            checked.append((i, j))
+            return True
+
+        groups = group_near_duplicates([compute_code_signature(c) for c in codes], is_similar)
+
+        assert groups == [[0, 2], [1]]
+        assert checked == [(0, 2)]
+
+
+class TestExtractCodeBlocksDeduplication:
+    """Test suite for variant consolidation in extract_code_blocks"""
+
+    def test_variants_in_document_are_consolidated(self):
+        markdown = f"```python\n{HANDLER}```\n\nOlder syntax:\n\n```python\n{VARIANT}```\n"
+
+        blocks = extract_code_blocks(markdown, min_length=50)
+
+        assert len(blocks) == 1
+        assert blocks[0]["consolidated_variants"] == 2
+        assert blocks[0]["minhash_signature"] in (
+            compute_code_signature(HANDLER),
+            compute_code_signature(VARIANT),
+        )
+
+
+class TestDeduplicateCodeBlocks:
+    """Test suite for deduplication across pages and against stored examples"""
+
+    @pytest.mark.asyncio
+    async def test_skips_blocks_seen_on_other_pages_or_stored(self):
+        service = CodeExtractionService(supabase_client=MagicMock())
+        handler_signature = compute_code_signature(HANDLER)
+        client_signature = compute_code_signature(CLIENT)
+        stored = [
+            {"url": "https://docs.example.com/c", "minhash_signature": None},
+            {"url": "https://docs.example.com/x", "minhash_signature": client_signature},
+            # Examples of re-extracted pages are replaced, so they must not match
+            {"url": "https://docs.example.com/a", "minhash_signature": handler_signature},
+        ]
+        items = [
+            make_item("https://docs.example.com/a", HANDLER),
+            make_item("https://docs.example.com/b", VARIANT),
+            make_item("https://docs.example.com/c", CLIENT),
+        ]
+
+        with patch(
+            "src.server.services.crawling.code_extraction_service.execute_async",
+            return_value=MagicMock(data=stored),
+        ):
+            kept = await service._deduplicate_code_blocks(items)
+
+        assert [item["source_url"] for item in kept] == ["https://docs.example.com/a"]
+        assert kept[0]["block"]["minhash_signature"] == handler_signature
+
+        storage_data = service._prepare_code_examples_for_storage(kept, [{}])
+        assert storage_data["signatures"] == [handler_signature]
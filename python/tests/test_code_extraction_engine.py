@@ -0,0 +1,103 @@
+"""
+Tests for the process-pool code extraction engine.
+"""
+
+import html
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.server.services.crawling.code_extraction_engine import (
+    CodeBlockExtractor,
+    CodeExtractionSettings,
+    extract_documents,
+)
+from src.server.services.crawling.code_extraction_service import CodeExtractionService
+
+PYTHON_CODE = '''import os
+from typing import Any
+
+def load_config(path: str) -> dict[str, Any]:
+    """Load configuration."""
+    with open(path) as f:
+        data = f.read()
+    result = {}
+    for line in data.splitlines():
+        if "=" in line:
+            key, value = line.split("=", 1)
+            result[key.strip()] = value.strip()
+    return result
+'''
+
+
+def make_doc(url: str, markdown: str = "", html_content: str = "") -> dict:
+    return {"url": url, "html": html_content, "markdown": markdown, "content_type": ""}
+
+
+class TestCodeBlockExtractor:
+    """Test suite for CodeBlockExtractor"""
+
+    def test_html_block_is_decoded_and_tagged(self):
+        doc = make_doc(
+            "https://docs.example.com/guide",
+            html_content='<p>Example</p><pre><code class="language-python">'
+            f"{html.escape(PYTHON_CODE)}</code></pre>",
+        )
+
+        blocks = CodeBlockExtractor(CodeExtractionSettings()).extract_document(doc)
+
+        assert len(blocks) == 1
+        assert blocks[0]["source_id"] == "docs.example.com"
+        assert blocks[0]["block"]["language"] == "python"
+        assert 'if "=" in line:' in blocks[0]["block"]["code"]
+
+    def test_settings_snapshot_drives_validation(self):
+        extractor = CodeBlockExtractor(CodeExtractionSettings(min_code_indicators=20))
+
+        assert extractor.validate_code_quality(PYTHON_CODE, "python") is False
+        assert CodeBlockExtractor(CodeExtractionSettings()).validate_code_quality(
+            PYTHON_CODE, "python"
+        )
+
+    def test_failing_document_yields_no_blocks(self):
+        docs = [
+            {"html": "", "markdown": ""},
+            make_doc("https://a/llms.txt", f"```python\n{PYTHON_CODE}```"),
+        ]
+
+        results = extract_documents(docs, CodeExtractionSettings())
+
+        assert results[0] == []
+        assert len(results[1]) == 1
+
+
+class TestExtractCodeBlocksFromDocuments:
+    """Test suite for fanning documents out to the extraction engine"""
+
+    @pytest.mark.asyncio
+    async def test_groups_keep_document_order_and_report_progress(self):
+        service = CodeExtractionService(supabase_client=None)
+        service.EXTRACTION_GROUP_SIZE = 2
+        service._settings_cache = {"CODE_EXTRACTION_WORKERS": 2}
+        docs = [make_doc(f"https://a/{i}.txt", f"```python\n{PYTHON_CODE}```") for i in range(5)]
+        progress = AsyncMock()
+
+        async def run_inline(documents, settings):
+            return extract_documents(documents, settings)
+
+        with (
+            patch(
+                "src.server.services.crawling.code_extraction_service.credential_service"
+                ".get_credential",
+                AsyncMock(side_effect=lambda key, default: default),
+            ),
+            patch(
+                "src.server.services.crawling.code_extraction_service.extract_documents_off_loop",
+                side_effect=run_inline,
+            ) as off_loop,
+        ):
+            blocks = await service._extract_code_blocks_from_documents(docs, progress)
+
+        assert [b["source_url"] for b in blocks] == [doc["url"] for doc in docs]
+        assert off_loop.call_count == 3
+        assert progress.await_args_list[-1].args[0]["completed_documents"] == 5
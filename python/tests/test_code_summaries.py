@@ -0,0 +1,104 @@
+"""
+Tests for batched, cached code summary generation.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.server.services.storage.code_storage_service import generate_code_summaries_batch
+from src.server.services.storage.code_summary_cache import CodeSummaryCache
+
+MODULE = "src.server.services.storage.code_storage_service"
+
+
+def make_block(code: str) -> dict:
+    return {"code": code, "language": "python", "context_before": "", "context_after": ""}
+
+
+def answer_summaries(answer_ids=None):
+    """Answer every example of a request, or only the ids in answer_ids."""
+
+    def answer(prompt: str) -> dict:
+        count = prompt.count("<example id=")
+        ids = [i for i in range(count) if answer_ids is None or count == 1 or i in answer_ids]
+        codes = [prompt.split(f'<example id="{i}">')[1].split("</code_example>")[0] for i in ids]
+        return {
+            "summaries": [
+                {"id": i, "example_name": f"Name {code.split()[-1]}", "summary": "Does things."}
+                for i, code in zip(ids, codes, strict=False)
+            ]
+        }
+
+    return answer
+
+
+def patch_settings(settings: dict, cache=None):
+    return (
+        patch(
+            "src.server.services.credential_service.credential_service"
+            ".get_credentials_by_category",
+            AsyncMock(return_value={"MODEL_CHOICE": "test-model", **settings}),
+        ),
+        patch(f"{MODULE}.get_code_summary_cache", return_value=cache),
+    )
+
+
+class TestGenerateCodeSummariesBatch:
+    """Test suite for generate_code_summaries_batch"""
+
+    @pytest.mark.asyncio
+    async def test_blocks_are_packed_into_requests_and_duplicates_shared(self, fake_llm_client):
+        client = fake_llm_client(MODULE, answer_summaries())
+        blocks = [make_block(f"x = {i}") for i in range(5)] + [make_block("x = 0")]
+        progress = AsyncMock()
+        settings, cache = patch_settings(
+            {"CODE_SUMMARY_BATCH_SIZE": "3", "CODE_SUMMARY_CACHE_ENABLED": "false"}
+        )
+
+        with settings, cache:
+            summaries = await generate_code_summaries_batch(blocks, progress_callback=progress)
+
+        assert client.chat.completions.create.await_count == 2
+        assert [s["example_name"] for s in summaries] == [
+            "Name 0", "Name 1", "Name 2", "Name 3", "Name 4", "Name 0"
+        ]
+        assert progress.await_args_list[-1].args[0]["completed_summaries"] == 6
+
+    @pytest.mark.asyncio
+    async def test_cached_blocks_skip_llm_and_missing_answers_are_retried(self, fake_llm_client):
+        client = fake_llm_client(MODULE, answer_summaries(answer_ids={0}))
+        summary_cache = CodeSummaryCache(use_table=False)
+        blocks = [make_block("x = 1"), make_block("x = 2")]
+        settings, cache = patch_settings({"CODE_SUMMARY_BATCH_SIZE": "5"}, summary_cache)
+
+        with settings, cache:
+            first = await generate_code_summaries_batch(blocks)
+            calls_after_first_run = client.chat.completions.create.await_count
+            second = await generate_code_summaries_batch(blocks)
+
+        # One batched request, then a single-example retry for the block it left out
+        assert calls_after_first_run == 2
+        assert [s["example_name"] for s in first] == ["Name 1", "Name 2"]
+        assert second == first
+        assert client.chat.completions.create.await_count == calls_after_first_run
+        assert summary_cache.get_stats()["memory_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_requests_fall_back_to_default_summaries(self, fake_llm_client):
+        client = fake_llm_client(MODULE, answer_summaries())
+        client.chat.completions.create.side_effect = RuntimeError("boom")
+        summary_cache = CodeSummaryCache(use_table=False)
+        settings, cache = patch_settings({}, summary_cache)
+
+        with settings, cache:
+            summaries = await generate_code_summaries_batch([make_block("x = 1")])
+
+        assert summaries == [
+            {
+                "example_name": "Code Example (python)",
+                "summary": "Code example for demonstration purposes.",
+            }
+        ]
+        # Fallbacks are not cached, so the next crawl tries again
+        assert summary_cache.get_stats()["memory_entries"] == 0
@@ -0,0 +1,116 @@
+"""
+Tests for per-document, cached contextual embedding generation.
+"""
+
+import re
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.embeddings.chunk_context_cache import ChunkContextCache
+from src.server.services.embeddings.contextual_embedding_service import (
+    generate_contextual_embeddings_batch,
+)
+
+MODULE = "src.server.services.embeddings.contextual_embedding_service"
+
+DOC_A = "Document A about installing the CLI. " * 50
+DOC_B = "Document B about configuring logging. " * 50
+
+
+def answer_contexts(skip_ids=()):
+    """Answer every chunk id in the prompt except skip_ids."""
+
+    def answer(prompt: str) -> dict:
+        ids = [int(i) for i in re.findall(r'<chunk id="(\d+)">', prompt)]
+        return {
+            "contexts": [{"id": i, "context": f"context {i}"} for i in ids if i not in skip_ids]
+        }
+
+    return answer
+
+
+def patch_settings(cache):
+    return (
+        patch(f"{MODULE}._get_model_choice", AsyncMock(return_value="test-model")),
+        patch(
+            "src.server.services.credential_service.credential_service"
+            ".get_credentials_by_category",
+            AsyncMock(return_value={}),
+        ),
+        patch(f"{MODULE}.get_chunk_context_cache", return_value=cache),
+    )
+
+
+class TestGenerateContextualEmbeddingsBatch:
+    """Test suite for generate_contextual_embeddings_batch"""
+
+    @pytest.mark.asyncio
+    async def test_one_request_per_document_with_document_sent_once(self, fake_llm_client):
+        client = fake_llm_client(MODULE, answer_contexts())
+        model, settings, cache = patch_settings(ChunkContextCache(use_table=False))
+
+        with model, settings, cache:
+            results = await generate_contextual_embeddings_batch(
+                [DOC_A, DOC_B, DOC_A], ["install step", "log config", "verify install"]
+            )
+
+        assert client.chat.completions.create.await_count == 2
+        calls = client.chat.completions.create.await_args_list
+        prompts = [call.kwargs["messages"][1]["content"] for call in calls]
+        doc_a_prompt = next(p for p in prompts if "Document A" in p)
+        assert doc_a_prompt.count("<document>") == 1
+        assert doc_a_prompt.startswith(f"<document>\n{DOC_A}")
+        assert results == [
+            ("context 1\n\ninstall step", True),
+            ("context 1\n\nlog config", True),
+            ("context 2\n\nverify install", True),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cached_contexts_are_reused_and_missing_ones_fall_back(self, fake_llm_client):
+        client = fake_llm_client(MODULE, answer_contexts(skip_ids={2}))
+        context_cache = ChunkContextCache(use_table=False)
+        model, settings, cache = patch_settings(context_cache)
+
+        with model, settings, cache:
+            first = await generate_contextual_embeddings_batch(
+                [DOC_A, DOC_A], ["install step", "verify install"]
+            )
+            second = await generate_contextual_embeddings_batch(
+                [DOC_A, DOC_A], ["install step", "verify install"]
+            )
+
+        assert first == [("context 1\n\ninstall step", True), ("verify install", False)]
+        assert second == [first[0], ("context 1\n\nverify install", True)]
+        # Only the chunk without a context is requested again
+        last_prompt = client.chat.completions.create.await_args.kwargs["messages"][1]["content"]
+        assert "verify install" in last_prompt and "install step" not in last_prompt
+        assert context_cache.get_stats()["memory_hits"] == 1
+
+
+class TestChunkContextCache:
+    """Test suite for the table tier of ChunkContextCache"""
+
+    @pytest.mark.asyncio
+    async def test_table_lookup_filters_by_document_and_writes_every_key_column(self):
+        context_cache = ChunkContextCache()
+        context_cache._supabase = MagicMock()
+        query = context_cache._supabase.table.return_value.select.return_value
+        query.eq.return_value = query
+        query.in_.return_value = query
+        query.execute.return_value.data = [{"chunk_hash": "c1", "context": "cached"}]
+
+        found = await context_cache.get_many("test-model", [("d1", "c1"), ("d1", "c2")])
+        await context_cache.put_many("test-model", {("d2", "c3"): "fresh"})
+
+        assert found == {("d1", "c1"): "cached"}
+        assert [c.args for c in query.eq.call_args_list] == [
+            ("model", "test-model"),
+            ("document_hash", "d1"),
+        ]
+        query.in_.assert_called_once_with("chunk_hash", ["c1", "c2"])
+        context_cache._supabase.table.return_value.upsert.assert_called_once_with(
+            [{"model": "test-model", "document_hash": "d2", "chunk_hash": "c3", "context": "fresh"}],
+            on_conflict="model,document_hash,chunk_hash",
+        )
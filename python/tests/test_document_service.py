@@ -0,0 +1,94 @@
+"""
+Tests for per-document patching of project docs and single-document version snapshots.
+"""
+
+from unittest.mock import MagicMock
+
+from src.server.services.projects.document_service import DocumentService
+from src.server.services.projects.versioning_service import VersioningService
+
+PREVIOUS_DOC = {"id": "doc-1", "title": "Old", "content": {"markdown": "old"}}
+
+
+def make_client(document_rpc_data: list[dict]) -> MagicMock:
+    """Client whose document RPCs return document_rpc_data and whose version inserts echo."""
+    client = MagicMock()
+
+    def rpc(name, params):
+        if name == "create_archon_document_version":
+            data = [{"version_number": 5, **params}]
+        else:
+            data = document_rpc_data
+        return MagicMock(execute=MagicMock(return_value=MagicMock(data=data)))
+
+    client.rpc.side_effect = rpc
+    # No earlier versions in any chain, so new versions are full snapshots
+    chain = client.table.return_value.select.return_value.eq.return_value.eq.return_value
+    for filtered in (chain.eq.return_value, chain.is_.return_value):
+        filtered.order.return_value.limit.return_value.execute.return_value = MagicMock(data=[])
+    return client
+
+
+def version_calls(client: MagicMock) -> list[dict]:
+    return [
+        call.args[1]
+        for call in client.rpc.call_args_list
+        if call.args[0] == "create_archon_document_version"
+    ]
+
+
+class TestUpdateDocument:
+    """Test suite for DocumentService.update_document"""
+
+    def test_only_the_patch_is_sent_and_only_the_document_is_versioned(self):
+        updated = {**PREVIOUS_DOC, "title": "New"}
+        client = make_client([{"previous_document": PREVIOUS_DOC, "document": updated}])
+
+        success, result = DocumentService(client).update_document(
+            "project-1", "doc-1", {"title": "New", "unknown": "ignored"}
+        )
+
+        assert success
+        assert result["document"] == updated
+        name, params = client.rpc.call_args_list[0].args
+        assert name == "update_archon_project_document"
+        assert params["doc_id_param"] == "doc-1"
+        assert set(params["patch_param"]) == {"title", "updated_at"}
+
+        [version] = version_calls(client)
+        assert version["content_param"] == [PREVIOUS_DOC]
+        assert version["content_format_param"] == "snapshot"
+        assert version["document_id_param"] == "doc-1"
+
+    def test_missing_document_and_project_are_reported(self):
+        service = DocumentService(make_client([{"previous_document": None, "document": None}]))
+        success, result = service.update_document("project-1", "doc-9", {"title": "New"})
+        assert not success
+        assert "Document with ID doc-9 not found" in result["error"]
+
+        service = DocumentService(make_client([]))
+        success, result = service.update_document("project-9", "doc-1", {"title": "New"})
+        assert not success
+        assert "Project with ID project-9 not found" in result["error"]
+
+
+class TestRestoreDocumentVersion:
+    """Test suite for restoring single-document snapshots"""
+
+    def test_single_document_snapshot_restores_only_that_document(self):
+        client = make_client([{"previous_document": {**PREVIOUS_DOC, "title": "New"}}])
+        lookup = client.table.return_value.select.return_value.eq.return_value.eq.return_value
+        lookup.eq.return_value.execute.return_value = MagicMock(
+            data=[{"field_name": "docs", "document_id": "doc-1", "content": [PREVIOUS_DOC]}]
+        )
+
+        success, result = VersioningService(client).restore_version("project-1", "docs", 3)
+
+        assert success
+        assert client.rpc.call_args_list[0].args == (
+            "upsert_archon_project_document",
+            {"project_id_param": "project-1", "document_param": PREVIOUS_DOC},
+        )
+        client.table.return_value.update.assert_not_called()
+        change_types = [version["change_type_param"] for version in version_calls(client)]
+        assert change_types == ["backup", "restore"]
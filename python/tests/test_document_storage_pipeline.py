@@ -0,0 +1,151 @@
+"""
+Tests for overlapped batch processing in add_documents_to_supabase.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.embeddings.embedding_service import EmbeddingBatchResult
+from src.server.services.storage.document_storage_service import (
+    add_documents_to_supabase,
+    get_ingestion_limiter,
+)
+
+MODULE = "src.server.services.storage.document_storage_service"
+
+
+def make_settings(parallel: str = "true", max_inflight: str = "4") -> dict:
+    return {
+        "DOCUMENT_STORAGE_BATCH_SIZE": "2",
+        "ENABLE_PARALLEL_BATCHES": parallel,
+        "DOCUMENT_STORAGE_MAX_INFLIGHT_BATCHES": max_inflight,
+    }
+
+
+async def store(contents: list[str], settings: dict, embed) -> tuple[MagicMock, set]:
+    urls = [f"https://a/{i}" for i in range(len(contents))]
+    credentials = MagicMock()
+    credentials.get_credentials_by_category = AsyncMock(return_value=settings)
+    credentials.get_credential = AsyncMock(return_value="false")
+
+    with (
+        patch(f"{MODULE}.credential_service", credentials),
+        patch(f"{MODULE}.create_embeddings_batch", side_effect=embed),
+        patch(f"{MODULE}.get_bulk_writer_mode", AsyncMock(return_value="postgrest")),
+        patch(f"{MODULE}.insert_batch", AsyncMock()) as insert,
+        patch(f"{MODULE}.execute_async", AsyncMock()),
+    ):
+        stored_chunks = await add_documents_to_supabase(
+            MagicMock(),
+            urls,
+            list(range(len(contents))),
+            contents,
+            [{"source_id": "a"} for _ in contents],
+            {},
+        )
+    return insert, stored_chunks
+
+
+class TestOverlappedBatches:
+    """Test suite for overlapped document batches"""
+
+    @pytest.mark.asyncio
+    async def test_batches_overlap_up_to_limit(self):
+        active = 0
+        peak = 0
+
+        async def embed(texts, provider=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            result = EmbeddingBatchResult()
+            for text in texts:
+                result.add_success([0.1], text)
+            return result
+
+        contents = [f"chunk {i}" for i in range(12)]
+        insert, _ = await store(contents, make_settings(), embed)
+
+        assert peak >= 2
+        stored = [row["content"] for call in insert.await_args_list for row in call.args[2]]
+        assert sorted(stored) == sorted(contents)
+
+    @pytest.mark.asyncio
+    async def test_parallel_disabled_runs_one_batch_at_a_time(self):
+        active = 0
+        peak = 0
+
+        async def embed(texts, provider=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            result = EmbeddingBatchResult()
+            for text in texts:
+                result.add_success([0.1], text)
+            return result
+
+        await store([f"chunk {i}" for i in range(6)], make_settings(parallel="false"), embed)
+
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_error_stops_remaining_batches(self):
+        calls = 0
+
+        async def embed(texts, provider=None):
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("provider down")
+
+        with pytest.raises(RuntimeError, match="provider down"):
+            await store([f"chunk {i}" for i in range(20)], make_settings(max_inflight="1"), embed)
+
+        assert calls == 1
+
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_carries_over_between_calls(self):
+        async def embed(texts, provider=None):
+            await asyncio.sleep(0.01)
+            result = EmbeddingBatchResult()
+            for text in texts:
+                result.add_success([0.1], text)
+            return result
+
+        await store([f"chunk {i}" for i in range(12)], make_settings(), embed)
+        limiter = get_ingestion_limiter(4)
+        assert limiter.limit > 2
+
+        # A later call (the next streaming batch) starts from what was learned
+        learned = limiter.limit
+        await store([f"chunk {i}" for i in range(2)], make_settings(), embed)
+        assert get_ingestion_limiter(4) is limiter
+        assert limiter.limit >= learned
+
+        # Lowering the setting caps the shared limiter
+        assert get_ingestion_limiter(1).limit == 1
+
+
+class TestStoredChunks:
+    """Test suite for the stored chunks reported by add_documents_to_supabase"""
+
+    @pytest.mark.asyncio
+    async def test_failed_embeddings_are_not_reported_as_stored(self):
+        async def embed(texts, provider=None):
+            result = EmbeddingBatchResult()
+            for text in texts:
+                if text == "chunk 1":
+                    result.add_failure(text, RuntimeError("quota"))
+                else:
+                    result.add_success([0.1], text)
+            return result
+
+        _, stored_chunks = await store(["chunk 0", "chunk 1", "chunk 2"], make_settings(), embed)
+
+        assert stored_chunks == {("https://a/0", 0), ("https://a/2", 2)}
@@ -0,0 +1,324 @@
+"""
+Tests for the shared document sync store, patch merging and the handlers that use them.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.server.api_routes import socketio_handlers
+from src.server.api_routes.socketio_handlers import (
+    DocumentChange,
+    document_batch_update,
+    process_document_change,
+)
+from src.server.services.document_sync_store import (
+    DocumentBusyError,
+    InMemoryDocumentSyncStore,
+    RedisDocumentSyncStore,
+)
+from src.server.services.projects.json_patch import paths_overlap, touched_paths
+
+
+class FakeRedisLock:
+    """redis.asyncio Lock stand-in: acquire() gives up after blocking_timeout."""
+
+    def __init__(self, mutex: asyncio.Lock, blocking_timeout: float | None):
+        self.mutex = mutex
+        self.blocking_timeout = blocking_timeout
+
+    async def acquire(self):
+        try:
+            await asyncio.wait_for(self.mutex.acquire(), self.blocking_timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    async def release(self):
+        self.mutex.release()
+
+
+class FakeRedis:
+    """The handful of redis.asyncio commands the store uses, backed by dicts."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.sets: dict[str, set[str]] = {}
+        self.mutexes: dict[str, asyncio.Lock] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value):
+        self.values[key] = value
+
+    async def delete(self, key):
+        return 1 if self.values.pop(key, None) is not None else 0
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    async def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def lock(self, name, timeout=None, blocking_timeout=None):
+        return FakeRedisLock(self.mutexes.setdefault(name, asyncio.Lock()), blocking_timeout)
+
+
+def make_change(
+    version: int, data: dict | None, user_id: str = "agent-1", change_type: str = "content", **extra
+) -> DocumentChange:
+    return DocumentChange(
+        id=f"change-{version}-{user_id}",
+        project_id="project-1",
+        document_id="doc-1",
+        change_type=change_type,
+        data=data,
+        user_id=user_id,
+        timestamp=time.time() * 1000,
+        version=version,
+        **extra,
+    )
+
+
+@pytest.fixture
+def mock_sio():
+    with patch.object(socketio_handlers, "sio") as sio:
+        sio.emit = AsyncMock()
+        yield sio
+
+
+@pytest.fixture
+def store():
+    store = InMemoryDocumentSyncStore()
+    with patch.object(socketio_handlers, "get_document_sync_store", return_value=store):
+        yield store
+
+
+class TestPatchPaths:
+    """Test suite for the overlap helpers in json_patch"""
+
+    def test_array_insertions_touch_the_whole_array(self):
+        document = {"content": {"items": [1, 2], "meta": {}}}
+        patch = [
+            {"op": "add", "path": "/content/items/-", "value": 3},
+            {"op": "add", "path": "/content/meta/owner", "value": "agent-1"},
+        ]
+
+        assert touched_paths(document, patch) == ["/content/items", "/content/meta/owner"]
+
+    def test_paths_overlap_by_whole_tokens(self):
+        assert paths_overlap("/content/items", "/content/items/0")
+        assert not paths_overlap("/content/a", "/content/ab")
+        assert paths_overlap("", "/title")
+
+
+class TestDocumentSyncStores:
+    """Test suite for the in-memory and Redis stores"""
+
+    @pytest.mark.asyncio
+    async def test_in_memory_store_returns_copies(self):
+        store = InMemoryDocumentSyncStore()
+        await store.save_state({"id": "doc-1", "project_id": "project-1", "content": {"a": 1}})
+
+        state = await store.get_state("doc-1")
+        state["content"]["a"] = 2
+
+        assert (await store.get_state("doc-1"))["content"] == {"a": 1}
+        assert await store.list_states("project-2") == []
+
+    @pytest.mark.asyncio
+    async def test_deleting_state_keeps_the_mutex_for_waiting_tasks(self):
+        store = InMemoryDocumentSyncStore()
+        await store.save_state({"id": "doc-1", "project_id": "project-1"})
+        events = []
+
+        async def waiter():
+            async with store.document_mutex("doc-1"):
+                events.append("waiter")
+
+        async with store.document_mutex("doc-1"):
+            task = asyncio.create_task(waiter())
+            await asyncio.sleep(0)
+            await store.delete_state("doc-1")
+            # A task arriving after the delete must still queue behind the holder
+            late = asyncio.create_task(waiter())
+            await asyncio.sleep(0)
+            events.append("holder")
+
+        await asyncio.gather(task, late)
+        assert events == ["holder", "waiter", "waiter"]
+
+    @pytest.mark.asyncio
+    async def test_redis_stores_share_state_and_locks_between_workers(self):
+        backend = FakeRedis()
+        worker_a = RedisDocumentSyncStore(client=backend)
+        worker_b = RedisDocumentSyncStore(client=backend)
+
+        await worker_a.save_state({"id": "doc-1", "project_id": "project-1", "version": 3})
+        await worker_a.save_lock("doc-1", {"user_id": "agent-1", "expiry": 1.0, "sid": "s1"})
+
+        assert (await worker_b.get_state("doc-1"))["version"] == 3
+        assert [state["id"] for state in await worker_b.list_states("project-1")] == ["doc-1"]
+        assert await worker_b.list_locks() == {
+            "doc-1": {"user_id": "agent-1", "expiry": 1.0, "sid": "s1"}
+        }
+
+        # Only one worker gets to remove the lock
+        assert await worker_b.delete_lock("doc-1")
+        assert not await worker_a.delete_lock("doc-1")
+
+        await worker_b.delete_state("doc-1")
+        assert await worker_a.list_states("project-1") == []
+
+
+class TestDocumentSyncHandlers:
+    """Test suite for document sync handlers running against a store"""
+
+    @pytest.mark.asyncio
+    async def test_changes_are_persisted_to_the_store(self, mock_sio):
+        store = InMemoryDocumentSyncStore()
+        with patch.object(socketio_handlers, "get_document_sync_store", return_value=store):
+            await process_document_change("sid-1", make_change(1, {"a": 1}))
+            await process_document_change("sid-1", make_change(2, {"b": 2}))
+
+        state = await store.get_state("doc-1")
+        assert state["content"] == {"a": 1, "b": 2}
+        assert state["version"] == 2
+        assert mock_sio.emit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_lock_is_cleaned_up_by_one_worker(self, mock_sio):
+        backend = FakeRedis()
+        store = RedisDocumentSyncStore(client=backend)
+        await store.save_state({
+            "id": "doc-1",
+            "project_id": "project-1",
+            "title": "",
+            "content": {},
+            "metadata": {},
+            "version": 1,
+            "last_modified": 0,
+            "last_modified_by": "agent-1",
+            "is_locked": True,
+            "lock_expiry": 1.0,
+        })
+        await store.save_lock("doc-1", {"user_id": "agent-1", "expiry": 1.0, "sid": "s1"})
+
+        workers = [RedisDocumentSyncStore(client=backend) for _ in range(2)]
+        for worker in workers:
+            with patch.object(socketio_handlers, "get_document_sync_store", return_value=worker):
+                await socketio_handlers.cleanup_expired_locks()
+
+        mock_sio.emit.assert_awaited_once()
+        assert mock_sio.emit.await_args.args[0] == "document_unlocked"
+        assert (await store.get_state("doc-1"))["is_locked"] is False
+
+    @pytest.mark.asyncio
+    async def test_busy_document_mutex_is_reported_to_the_sender(self, mock_sio):
+        backend = FakeRedis()
+        store = RedisDocumentSyncStore(client=backend)
+        # Another worker holds the document mutex past the blocking timeout
+        await backend.mutexes.setdefault(store._key("mutex", "doc-1"), asyncio.Lock()).acquire()
+
+        with (
+            patch("src.server.services.document_sync_store.MUTEX_TIMEOUT_SECONDS", 0.01),
+            patch.object(socketio_handlers, "get_document_sync_store", return_value=store),
+        ):
+            with pytest.raises(DocumentBusyError):
+                async with store.document_mutex("doc-1"):
+                    pass
+            await socketio_handlers.lock_document(
+                "sid-1", {"document_id": "doc-1", "user_id": "agent-1"}
+            )
+
+        mock_sio.emit.assert_awaited_once()
+        event_name, event = mock_sio.emit.await_args.args
+        assert event_name == "lock_failed"
+        assert event["reason"] == "busy"
+        assert mock_sio.emit.await_args.kwargs["to"] == "sid-1"
+        assert await store.get_lock("doc-1") is None
+
+
+class TestPatchMerging:
+    """Test suite for merging concurrent document changes"""
+
+    @pytest.mark.asyncio
+    async def test_non_overlapping_concurrent_changes_are_merged(self, mock_sio, store):
+        await process_document_change("sid-1", make_change(1, {"a": 1}, "agent-1"))
+        # agent-2 edited version 0 too, but a different key
+        conflict = await process_document_change("sid-2", make_change(1, {"b": 2}, "agent-2"))
+
+        assert conflict is None
+        state = await store.get_state("doc-1")
+        assert state["content"] == {"a": 1, "b": 2}
+        assert state["version"] == 2
+        assert state["version_vector"] == {"agent-1": 1, "agent-2": 1}
+
+        event = mock_sio.emit.await_args.args[1]
+        assert event["patch"] == [{"op": "add", "path": "/content/b", "value": 2}]
+        assert event["base_version"] == 0
+        assert event["version"] == 2
+        assert event["merged"] is True
+        assert "data" not in event
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "operation",
+        [
+            {"op": "replace", "path": "", "value": {"content": {}}},
+            {"op": "replace", "path": "", "value": "text"},
+            {"op": "remove", "path": "/title"},
+        ],
+    )
+    async def test_patch_removing_document_fields_is_rejected(self, mock_sio, store, operation):
+        await process_document_change("sid-1", make_change(1, {"a": 1}))
+        conflict = await process_document_change(
+            "sid-1", make_change(2, None, patch=[operation])
+        )
+
+        assert conflict["type"] == "invalid_patch"
+        assert conflict["resolution"] == "rejected"
+        state = await store.get_state("doc-1")
+        assert state["content"] == {"a": 1}
+        assert state["version"] == 1
+
+    @pytest.mark.asyncio
+    async def test_overlapping_concurrent_changes_are_rejected(self, mock_sio, store):
+        await process_document_change("sid-1", make_change(1, {"a": 1}, "agent-1"))
+        conflict = await process_document_change("sid-2", make_change(1, {"a": 5}, "agent-2"))
+
+        assert conflict["resolution"] == "rejected"
+        assert conflict["conflicting_paths"] == ["/content/a"]
+        assert (await store.get_state("doc-1"))["content"] == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_batch_broadcasts_patches_instead_of_the_document(self, mock_sio, store):
+        changes = [
+            make_change(1, None, patch=[{"op": "add", "path": "/content/a", "value": "x" * 500}]),
+            make_change(2, {"title": "Plan"}, change_type="title"),
+        ]
+
+        await document_batch_update(
+            "sid-1",
+            {
+                "project_id": "project-1",
+                "document_id": "doc-1",
+                "changes": [change.__dict__ for change in changes],
+            },
+        )
+
+        event_name, event = mock_sio.emit.await_args.args
+        assert event_name == "document_updated"
+        assert "data" not in event
+        assert [operation["path"] for operation in event["patch"]] == ["/content/a", "/title"]
+        assert event["versions"] == [1, 2]
+        assert (await store.get_state("doc-1"))["title"] == "Plan"
@@ -0,0 +1,170 @@
+"""
+Tests for delta-compressed document version history.
+"""
+
+import copy
+
+from src.server.services.projects.json_patch import apply_patch, make_patch
+from src.server.services.projects.versioning_service import SNAPSHOT_INTERVAL, VersioningService
+
+
+class FakeVersionsQuery:
+    """Just enough of the postgrest query builder to run against an in-memory table."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.filters = []
+        self.descending = False
+        self.row_limit = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row[column] <= value)
+        return self
+
+    def order(self, column, desc=False):
+        self.descending = desc
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        rows = [row for row in self.rows if all(check(row) for check in self.filters)]
+        rows.sort(key=lambda row: row["version_number"], reverse=self.descending)
+        rows = rows[: self.row_limit] if self.row_limit is not None else rows
+        return FakeResult(copy.deepcopy(rows))
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeVersionsClient:
+    """Stores versions in memory and numbers them like create_archon_document_version."""
+
+    def __init__(self):
+        self.rows: list[dict] = []
+
+    def table(self, name):
+        assert name == "archon_document_versions"
+        return FakeVersionsQuery(self.rows)
+
+    def rpc(self, name, params):
+        assert name == "create_archon_document_version"
+        numbers = [
+            row["version_number"]
+            for row in self.rows
+            if row["project_id"] == params["project_id_param"]
+            and row["field_name"] == params["field_name_param"]
+        ]
+        row = {
+            "project_id": params["project_id_param"],
+            "field_name": params["field_name_param"],
+            "version_number": max(numbers, default=0) + 1,
+            "content": copy.deepcopy(params["content_param"]),
+            "content_format": params["content_format_param"],
+            "base_version": params["base_version_param"],
+            "change_type": params["change_type_param"],
+            "document_id": params["document_id_param"],
+        }
+        self.rows.append(row)
+        query = FakeVersionsQuery([])
+        query.execute = lambda: FakeResult([copy.deepcopy(row)])
+        return query
+
+
+def make_docs(revision: int) -> list[dict]:
+    docs = [
+        {"id": f"doc-{index}", "title": f"Doc {index}", "content": {"markdown": "x" * 200}}
+        for index in range(5)
+    ]
+    docs[revision % 5]["title"] = f"Revision {revision}"
+    return docs
+
+
+class TestJsonPatch:
+    """Test suite for make_patch/apply_patch"""
+
+    def test_round_trips_nested_objects_and_lists(self):
+        source = {"a": 1, "b": [1, 2, 3], "c": {"d": "x", "e/f": True}, "gone": None}
+        target = {"a": 2, "b": [1, 5], "c": {"d": "x", "e/f": 1, "new": [1]}, "h": []}
+
+        patch = make_patch(source, target)
+
+        assert apply_patch(source, patch) == target
+        assert apply_patch(target, make_patch(target, source)) == source
+        assert source["b"] == [1, 2, 3]
+
+    def test_bool_and_int_are_different_values(self):
+        patch = make_patch({"flag": True}, {"flag": 1})
+
+        result = apply_patch({"flag": True}, patch)
+
+        assert result["flag"] == 1 and result["flag"] is not True
+
+    def test_equal_documents_produce_an_empty_patch(self):
+        assert make_patch([{"a": 1}], [{"a": 1}]) == []
+
+
+class TestDeltaVersions:
+    """Test suite for storing and rebuilding delta versions"""
+
+    def test_versions_are_stored_as_deltas_with_periodic_snapshots(self):
+        client = FakeVersionsClient()
+        service = VersioningService(client)
+
+        for revision in range(SNAPSHOT_INTERVAL + 2):
+            success, result = service.create_version("project-1", "docs", make_docs(revision))
+            assert success
+            assert result["version_number"] == revision + 1
+            assert result["version"]["content"] == make_docs(revision)
+
+        formats = [row["content_format"] for row in client.rows]
+        assert formats[0] == "snapshot"
+        assert formats[1] == "delta"
+        assert formats[SNAPSHOT_INTERVAL] == "snapshot"
+        assert client.rows[1]["base_version"] == 1
+
+        for revision in range(SNAPSHOT_INTERVAL + 2):
+            success, result = service.get_version_content("project-1", "docs", revision + 1)
+            assert success
+            assert result["content"] == make_docs(revision)
+
+    def test_list_versions_returns_full_content(self):
+        client = FakeVersionsClient()
+        service = VersioningService(client)
+        for revision in range(3):
+            service.create_version("project-1", "docs", make_docs(revision))
+
+        success, result = service.list_versions("project-1", "docs")
+
+        assert success
+        contents = [version["content"] for version in result["versions"]]
+        assert contents == [make_docs(2), make_docs(1), make_docs(0)]
+
+    def test_document_chains_are_kept_apart(self):
+        client = FakeVersionsClient()
+        service = VersioningService(client)
+
+        service.create_version("project-1", "docs", make_docs(0))
+        service.create_version("project-1", "docs", [make_docs(0)[0]], document_id="doc-0")
+        service.create_version("project-1", "docs", make_docs(1))
+
+        assert [row["version_number"] for row in client.rows] == [1, 2, 3]
+        assert client.rows[1]["content_format"] == "snapshot"
+        assert client.rows[2]["base_version"] == 1
+        success, result = service.get_version_content("project-1", "docs", 3)
+        assert result["content"] == make_docs(1)
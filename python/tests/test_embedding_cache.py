@@ -0,0 +1,176 @@
+"""
+Tests for the content-addressed embedding cache and its use in create_embeddings_batch.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.embeddings.embedding_cache import EmbeddingCache, hash_text
+from src.server.services.embeddings.embedding_service import create_embeddings_batch
+
+
+class AsyncContextManager:
+    """Helper class for properly mocking async context managers"""
+
+    def __init__(self, return_value):
+        self.return_value = return_value
+
+    async def __aenter__(self):
+        return self.return_value
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+def make_table_client(rows):
+    """Build a mock Supabase client whose cache-table select returns the given rows."""
+    client = MagicMock()
+    query = MagicMock()
+    query.eq.return_value = query
+    query.in_.return_value = query
+    query.execute.return_value.data = rows
+    client.table.return_value.select.return_value = query
+    return client
+
+
+class TestEmbeddingCache:
+    """Tests for the two-tier cache itself"""
+
+    @pytest.mark.asyncio
+    async def test_memory_hit_after_put(self):
+        cache = EmbeddingCache(max_entries=10, use_table=False)
+        await cache.put_many("openai", "m", 3, ["a"], [[0.5, 0.25, 0.125]])
+
+        lookup = await cache.get_many("openai", "m", 3, ["a", "b"])
+
+        assert lookup.hits == {0: [0.5, 0.25, 0.125]}
+        assert lookup.misses == [1]
+        assert lookup.memory_hits == 1
+        assert cache.get_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_key_includes_model_and_dimensions(self):
+        cache = EmbeddingCache(max_entries=10, use_table=False)
+        await cache.put_many("openai", "m", 3, ["a"], [[0.5, 0.25, 0.125]])
+
+        assert (await cache.get_many("openai", "other", 3, ["a"])).misses == [0]
+        assert (await cache.get_many("openai", "m", 2, ["a"])).misses == [0]
+        assert (await cache.get_many("ollama", "m", 3, ["a"])).misses == [0]
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_oldest(self):
+        cache = EmbeddingCache(max_entries=2, use_table=False)
+        await cache.put_many("p", "m", 1, ["a", "b"], [[1.0], [2.0]])
+        await cache.get_many("p", "m", 1, ["a"])  # touch "a" so "b" is oldest
+        await cache.put_many("p", "m", 1, ["c"], [[3.0]])
+
+        lookup = await cache.get_many("p", "m", 1, ["a", "b", "c"])
+        assert sorted(lookup.hits) == [0, 2]
+        assert lookup.misses == [1]
+
+    @pytest.mark.asyncio
+    async def test_table_hit_promotes_to_memory(self):
+        cache = EmbeddingCache(max_entries=10)
+        cache._supabase = make_table_client([
+            {"content_hash": hash_text("a"), "embedding": [1.0, 2.0]}
+        ])
+
+        first = await cache.get_many("p", "m", 2, ["a", "a"])
+        assert first.table_hits == 2
+        assert first.hits == {0: [1.0, 2.0], 1: [1.0, 2.0]}
+
+        second = await cache.get_many("p", "m", 2, ["a"])
+        assert second.memory_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_table_failure_degrades_to_miss(self):
+        cache = EmbeddingCache(max_entries=10)
+        cache._supabase = MagicMock()
+        cache._supabase.table.side_effect = Exception("db down")
+
+        lookup = await cache.get_many("p", "m", 2, ["a"])
+        assert lookup.misses == [0]
+
+        # Writes must not raise either
+        await cache.put_many("p", "m", 2, ["a"], [[1.0, 2.0]])
+        assert (await cache.get_many("p", "m", 2, ["a"])).memory_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_table_queries_do_not_block_the_event_loop(self):
+        cache = EmbeddingCache(max_entries=10)
+        cache._supabase = make_table_client([])
+
+        module = "src.server.services.content_cache"
+        with patch(f"{module}.execute_async", new=AsyncMock()) as mock_execute:
+            mock_execute.return_value.data = []
+            await cache.get_many("p", "m", 2, ["a"])
+            await cache.put_many("p", "m", 2, ["a"], [[1.0, 2.0]])
+
+        assert mock_execute.await_count == 2
+        cache._supabase.table.return_value.select.return_value.execute.assert_not_called()
+        cache._supabase.table.return_value.upsert.return_value.execute.assert_not_called()
+
+
+class TestCreateEmbeddingsBatchWithCache:
+    """Tests for cache integration in create_embeddings_batch"""
+
+    @pytest.mark.asyncio
+    async def test_only_misses_are_sent_to_provider(self):
+        cache = EmbeddingCache(max_entries=10, use_table=False)
+        await cache.put_many("openai", "text-embedding-3-small", 2, ["cached"], [[1.0, 1.0]])
+
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.data = [MagicMock(embedding=[2.0, 2.0])]
+        mock_client.embeddings.create = AsyncMock(return_value=mock_response)
+
+        mock_threading = MagicMock()
+        mock_threading.rate_limited_operation.return_value = AsyncContextManager(MagicMock())
+
+        base = "src.server.services.embeddings.embedding_service"
+        with (
+            patch(f"{base}.get_threading_service", return_value=mock_threading),
+            patch(f"{base}.get_llm_client", return_value=AsyncContextManager(mock_client)),
+            patch(f"{base}.get_embedding_model", return_value="text-embedding-3-small"),
+            patch(f"{base}.get_embedding_cache", return_value=cache),
+            patch(f"{base}.credential_service") as mock_cred,
+        ):
+            mock_cred.get_credentials_by_category = AsyncMock(
+                return_value={"EMBEDDING_CACHE_ENABLED": "true", "EMBEDDING_DIMENSIONS": "2"}
+            )
+
+            result = await create_embeddings_batch(["cached", "fresh"])
+
+        assert result.success_count == 2
+        assert dict(zip(result.texts_processed, result.embeddings, strict=True)) == {
+            "cached": [1.0, 1.0],
+            "fresh": [2.0, 2.0],
+        }
+        call_kwargs = mock_client.embeddings.create.call_args.kwargs
+        assert call_kwargs["input"] == ["fresh"]
+
+        # The freshly created embedding is now cached as well
+        assert (await cache.get_many("openai", "text-embedding-3-small", 2, ["fresh"])).hit_count == 1
+
+    @pytest.mark.asyncio
+    async def test_all_hits_skip_client_creation(self):
+        cache = EmbeddingCache(max_entries=10, use_table=False)
+        await cache.put_many("openai", "text-embedding-3-small", 1536, ["x"], [[0.1] * 1536])
+
+        base = "src.server.services.embeddings.embedding_service"
+        with (
+            patch(f"{base}.get_llm_client") as mock_get_client,
+            patch(f"{base}.get_embedding_model", return_value="text-embedding-3-small"),
+            patch(f"{base}.get_embedding_cache", return_value=cache),
+            patch(f"{base}.credential_service") as mock_cred,
+        ):
+            mock_cred.get_credentials_by_category = AsyncMock(
+                return_value={"EMBEDDING_CACHE_ENABLED": "true"}
+            )
+
+            result = await create_embeddings_batch(["x"])
+
+        assert result.success_count == 1
+        assert not result.has_failures
+        mock_get_client.assert_not_called()
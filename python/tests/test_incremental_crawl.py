@@ -0,0 +1,189 @@
+"""
+Tests for incremental recrawl fingerprints.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from src.server.services.crawling.incremental_crawl import IncrementalCrawlState, hash_text
+from src.server.services.crawling.strategies.sitemap import SitemapCrawlStrategy
+
+SALT = '[null, []]'
+
+
+def make_state(known_rows=None, conditional_requests=True) -> IncrementalCrawlState:
+    state = IncrementalCrawlState(
+        MagicMock(), "docs.example.com", {}, conditional_requests=conditional_requests
+    )
+    state._known = {row["url"]: row for row in known_rows or []}
+    return state
+
+
+def make_chunked(url: str, contents: list[str]) -> dict:
+    return {
+        "url": url,
+        "urls": [url] * len(contents),
+        "chunk_numbers": list(range(len(contents))),
+        "contents": contents,
+        "metadatas": [{"chunk_index": i} for i in range(len(contents))],
+        "word_count": sum(len(c.split()) for c in contents),
+    }
+
+
+class TestIncrementalCrawlState:
+    """Test suite for IncrementalCrawlState"""
+
+    def test_sitemap_entries_not_newer_than_last_crawl_are_pruned(self):
+        state = make_state([
+            {"url": "https://a", "sitemap_lastmod": "2024-05-01T00:00:00+00:00"},
+            {"url": "https://b", "sitemap_lastmod": "2024-05-01T00:00:00+00:00"},
+            {"url": "https://c", "sitemap_lastmod": None},
+        ])
+
+        urls = state.prune_sitemap_entries([
+            {"url": "https://a", "lastmod": "2024-05-01"},
+            {"url": "https://b", "lastmod": "2024-06-01T10:00:00Z"},
+            {"url": "https://c", "lastmod": "2024-01-01"},
+            {"url": "https://d", "lastmod": None},
+        ])
+
+        assert urls == ["https://b", "https://c", "https://d"]
+        assert state.pages_pruned == 1
+
+    @pytest.mark.asyncio
+    async def test_not_modified_urls_are_pruned(self):
+        state = make_state([
+            {"url": "https://a", "etag": '"v1"'},
+            {"url": "https://b", "last_modified": "Wed, 01 May 2024 00:00:00 GMT"},
+        ])
+        requests_seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests_seen.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200)
+
+        real_client = httpx.AsyncClient
+        with patch(
+            "src.server.services.crawling.incremental_crawl.httpx.AsyncClient",
+            side_effect=lambda **kwargs: real_client(
+                transport=httpx.MockTransport(handler), **kwargs
+            ),
+        ):
+            urls = await state.prune_not_modified(["https://a", "https://b", "https://new"])
+
+        # Only known URLs with validators are checked
+        assert sorted(str(r.url) for r in requests_seen) == ["https://a", "https://b"]
+        assert all(r.method == "HEAD" for r in requests_seen)
+        assert urls == ["https://b", "https://new"]
+        assert state.pages_pruned == 1
+
+    def test_unchanged_page_is_skipped_and_validators_refreshed(self):
+        state = make_state([
+            {"url": "https://a", "content_hash": hash_text(SALT + "# Page"), "etag": '"v1"'},
+        ])
+
+        page = {"url": "https://a", "markdown": "# Page", "response_headers": {"ETag": '"v2"'}}
+
+        assert state.is_unchanged(page) is True
+        assert state._pending["https://a"]["etag"] == '"v2"'
+        assert state.pages_unchanged == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_page_replaces_only_changed_chunks(self):
+        state = make_state([
+            {
+                "url": "https://a",
+                "content_hash": "old",
+                "chunk_hashes": [hash_text(SALT + "one"), hash_text(SALT + "two"), "x", "y"],
+                "word_count": 4,
+            },
+        ])
+        client = state.supabase_client
+
+        assert state.is_unchanged({"url": "https://a", "markdown": "one TWO three"}) is False
+        selected = state.select_changed_chunks(make_chunked("https://a", ["one", "TWO", "three"]))
+
+        assert selected["contents"] == ["TWO", "three"]
+        assert selected["chunk_numbers"] == [1, 2]
+        assert state.chunks_unchanged == 1
+
+        await state.delete_replaced_chunks(["https://a"])
+
+        # Changed chunks 1-2 plus chunk 3, which no longer exists, are deleted
+        delete = client.table.return_value.delete.return_value
+        delete.eq.assert_called_once_with("url", "https://a")
+        delete.eq.return_value.in_.assert_called_once_with("chunk_number", [1, 2, 3])
+
+    @pytest.mark.asyncio
+    async def test_new_page_replaces_all_chunks(self):
+        state = make_state()
+        client = state.supabase_client
+
+        state.is_unchanged({"url": "https://new", "markdown": "text"})
+        selected = state.select_changed_chunks(make_chunked("https://new", ["text"]))
+        await state.delete_replaced_chunks(["https://new"])
+
+        assert selected["contents"] == ["text"]
+        client.table.return_value.delete.return_value.in_.assert_called_once_with(
+            "url", ["https://new"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_total_word_count_includes_skipped_pages(self):
+        state = make_state([
+            {"url": "https://a", "content_hash": "old", "chunk_hashes": [], "word_count": 10},
+            {"url": "https://b", "content_hash": "old", "chunk_hashes": [], "word_count": 7},
+        ])
+
+        state.is_unchanged({"url": "https://a", "markdown": "one two three"})
+        state.select_changed_chunks(make_chunked("https://a", ["one two three"]))
+        await state.save_fingerprints(["https://a"])
+
+        upserted = state.supabase_client.table.return_value.upsert.call_args.args[0]
+        assert [row["url"] for row in upserted] == ["https://a"]
+        assert upserted[0]["source_id"] == "docs.example.com"
+        assert state.total_word_count() == 3 + 7
+
+    @pytest.mark.asyncio
+    async def test_pages_with_unstored_chunks_are_not_fingerprinted(self):
+        state = make_state()
+        upsert = state.supabase_client.table.return_value.upsert
+
+        for url in ("https://a", "https://b"):
+            state.is_unchanged({"url": url, "markdown": "one two"})
+            state.select_changed_chunks(make_chunked(url, ["one", "two"]))
+        stored_chunks = {("https://a", 0), ("https://a", 1), ("https://b", 0)}
+        await state.save_fingerprints(["https://a", "https://b"], stored_chunks)
+        await state.save_fingerprints()
+
+        saved = [row["url"] for call in upsert.call_args_list for row in call.args[0]]
+        assert saved == ["https://a"]
+
+
+class TestSitemapEntries:
+    """Test suite for sitemap <lastmod> parsing"""
+
+    def test_parse_sitemap_entries_reads_lastmod(self):
+        xml = b"""<?xml version="1.0" encoding="UTF-8"?>
+        <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+          <url><loc>https://a</loc><lastmod>2024-05-01</lastmod></url>
+          <url><loc>https://b</loc></url>
+        </urlset>"""
+        response = MagicMock(status_code=200, content=xml)
+
+        with patch(
+            "src.server.services.crawling.strategies.sitemap.requests.get", return_value=response
+        ):
+            strategy = SitemapCrawlStrategy()
+            entries = strategy.parse_sitemap_entries("https://example.com/sitemap.xml")
+            urls = strategy.parse_sitemap("https://example.com/sitemap.xml")
+
+        assert entries == [
+            {"url": "https://a", "lastmod": "2024-05-01"},
+            {"url": "https://b", "lastmod": None},
+        ]
+        assert urls == ["https://a", "https://b"]
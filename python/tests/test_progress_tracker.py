@@ -0,0 +1,166 @@
+"""
+Tests for delta-encoded, coalesced progress broadcasting.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.server.api_routes import socketio_handlers
+from src.server.utils.progress import ProgressTracker
+
+
+def make_sio() -> MagicMock:
+    sio = MagicMock()
+    sio.emit = AsyncMock()
+    sio.enter_room = AsyncMock()
+    return sio
+
+
+def emitted_payloads(sio: MagicMock) -> list[dict]:
+    return [c.args[1] for c in sio.emit.call_args_list]
+
+
+class TestProgressTracker:
+    """Test suite for ProgressTracker"""
+
+    @pytest.mark.asyncio
+    async def test_updates_emit_only_changed_fields_and_new_logs(self):
+        sio = make_sio()
+        tracker = ProgressTracker(sio, "progress-1", max_emits_per_second=0)
+
+        await tracker.start({"currentUrl": "https://a"})
+        await tracker.update("crawling", 10, "first")
+        await tracker.update("crawling", 20, "second")
+
+        snapshot, first, second = emitted_payloads(sio)
+        assert snapshot["isDelta"] is False
+        assert snapshot["currentUrl"] == "https://a"
+
+        assert first["isDelta"] is True
+        assert "currentUrl" not in first
+        assert [log["message"] for log in first["newLogs"]] == ["first"]
+
+        # Status is unchanged; only the percentage, log and timestamp moved
+        assert "status" not in second
+        assert second["percentage"] == 20
+        assert [log["message"] for log in second["newLogs"]] == ["second"]
+        assert "logs" not in second
+        assert [p["seq"] for p in (snapshot, first, second)] == [1, 2, 3]
+        assert all(p["progressId"] == "progress-1" for p in (snapshot, first, second))
+
+    @pytest.mark.asyncio
+    async def test_log_buffer_is_bounded(self):
+        tracker = ProgressTracker(make_sio(), "progress-1", max_logs=3, max_emits_per_second=0)
+
+        for i in range(10):
+            await tracker.update("crawling", i, f"log {i}")
+
+        assert [log["message"] for log in tracker.state["logs"]] == ["log 7", "log 8", "log 9"]
+
+    @pytest.mark.asyncio
+    async def test_rapid_updates_are_coalesced(self):
+        sio = make_sio()
+        tracker = ProgressTracker(sio, "progress-1", max_emits_per_second=20)
+
+        for i in range(10):
+            await tracker.update("crawling", i * 10, f"log {i}")
+
+        # First update goes out immediately, the rest wait for the window to close
+        assert sio.emit.await_count == 1
+        await asyncio.sleep(0.1)
+        assert sio.emit.await_count == 2
+
+        trailing = emitted_payloads(sio)[1]
+        assert trailing["percentage"] == 90
+        assert [log["message"] for log in trailing["newLogs"]] == [f"log {i}" for i in range(1, 10)]
+
+    @pytest.mark.asyncio
+    async def test_completion_flushes_pending_update_as_snapshot(self):
+        sio = make_sio()
+        tracker = ProgressTracker(sio, "progress-1", max_emits_per_second=1)
+
+        await tracker.update("crawling", 10, "first")
+        await tracker.update("crawling", 50, "coalesced")
+        await tracker.complete({"chunksStored": 5})
+        await asyncio.sleep(0)
+
+        payloads = emitted_payloads(sio)
+        assert len(payloads) == 2
+        assert payloads[1]["isDelta"] is False
+        assert payloads[1]["status"] == "completed"
+        assert [log["message"] for log in payloads[1]["logs"]] == ["first", "coalesced"]
+
+    @pytest.mark.asyncio
+    async def test_joining_socket_gets_snapshot_at_current_seq(self):
+        sio = make_sio()
+        tracker = ProgressTracker(sio, "progress-1", max_emits_per_second=0)
+        await tracker.update("crawling", 10, "first")
+
+        await tracker.join_room("sid-1")
+
+        sio.enter_room.assert_awaited_once_with("sid-1", "progress-1")
+        join_call = sio.emit.call_args_list[-1]
+        assert join_call.kwargs == {"to": "sid-1"}
+        assert join_call.args[1]["seq"] == 1
+        assert join_call.args[1]["isDelta"] is False
+
+    @pytest.mark.asyncio
+    async def test_merge_appends_caller_logs_once(self):
+        sio = make_sio()
+        tracker = ProgressTracker(sio, "progress-1", max_emits_per_second=0)
+
+        await tracker.merge({"status": "crawling", "logs": ["Starting"]}, snapshot=True)
+        await tracker.merge({"status": "crawling", "percentage": 10, "log": "Page 1"})
+        await tracker.merge({"status": "crawling", "percentage": 20, "log": "Page 1"})
+
+        snapshot, first, second = emitted_payloads(sio)
+        assert snapshot["logs"] == ["Starting"]
+        assert first["newLogs"] == ["Page 1"]
+        assert second == {
+            "percentage": 20,
+            "newLogs": [],
+            "progressId": "progress-1",
+            "seq": 3,
+            "isDelta": True,
+        }
+
+
+class TestCrawlProgressBroadcast:
+    """Test suite for crawl progress going through the delta protocol"""
+
+    @pytest.mark.asyncio
+    async def test_crawl_progress_is_sent_as_snapshot_then_deltas(self, monkeypatch):
+        sio = make_sio()
+        monkeypatch.setattr(socketio_handlers, "sio", sio)
+        monkeypatch.setattr(socketio_handlers, "_crawl_trackers", {})
+
+        await socketio_handlers.start_crawl_progress("crawl-1", {"logs": ["Starting crawl"]})
+        await socketio_handlers.update_crawl_progress(
+            "crawl-1", {"status": "crawling", "percentage": 10, "log": "Crawled page 1"}
+        )
+        await socketio_handlers.complete_crawl_progress("crawl-1", {"chunksStored": 3})
+
+        # The update arrives inside the broadcast interval and is folded into the completion
+        payloads = emitted_payloads(sio)
+        assert [p["isDelta"] for p in payloads] == [False, False]
+        assert payloads[1]["status"] == "completed"
+        assert payloads[1]["logs"] == ["Starting crawl", "Crawled page 1"]
+        assert "crawl-1" not in socketio_handlers._crawl_trackers
+
+    @pytest.mark.asyncio
+    async def test_subscriber_to_running_crawl_gets_a_snapshot(self, monkeypatch):
+        sio = make_sio()
+        monkeypatch.setattr(socketio_handlers, "sio", sio)
+        monkeypatch.setattr(socketio_handlers, "_crawl_trackers", {})
+        await socketio_handlers.start_crawl_progress("crawl-1", {"logs": ["Starting crawl"]})
+
+        await socketio_handlers.crawl_subscribe("sid-1", {"progress_id": "crawl-1"})
+
+        sio.enter_room.assert_awaited_once_with("sid-1", "crawl-1")
+        event, payload = sio.emit.call_args_list[-2].args
+        assert event == "crawl_progress"
+        assert payload["isDelta"] is False
+        assert payload["logs"] == ["Starting crawl"]
+        assert sio.emit.call_args_list[-1].args[0] == "crawl_subscribe_ack"
@@ -0,0 +1,84 @@
+"""
+Tests for project listing: summary mode and batched source lookups.
+"""
+
+from unittest.mock import MagicMock
+
+from src.server.services.projects.project_service import PROJECT_SUMMARY_COLUMNS, ProjectService
+from src.server.services.projects.source_linking_service import SourceLinkingService
+
+
+def make_project(project_id: str, **extra) -> dict:
+    return {
+        "id": project_id,
+        "title": f"Project {project_id}",
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-02T00:00:00",
+        **extra,
+    }
+
+
+class TestListProjects:
+    """Test suite for ProjectService.list_projects"""
+
+    def test_summary_mode_selects_only_scalar_columns(self):
+        client = MagicMock()
+        select = client.table.return_value.select
+        select.return_value.order.return_value.execute.return_value.data = [make_project("p1")]
+
+        success, result = ProjectService(client).list_projects(exclude_large_fields=True)
+
+        assert success
+        select.assert_called_once_with(PROJECT_SUMMARY_COLUMNS)
+        assert "docs" not in result["projects"][0]
+        assert "features" not in result["projects"][0]
+
+    def test_full_mode_keeps_jsonb_fields(self):
+        client = MagicMock()
+        select = client.table.return_value.select
+        select.return_value.order.return_value.execute.return_value.data = [
+            make_project("p1", docs=[{"id": "d1"}])
+        ]
+
+        success, result = ProjectService(client).list_projects()
+
+        select.assert_called_once_with("*")
+        assert result["projects"][0]["docs"] == [{"id": "d1"}]
+        assert result["projects"][0]["data"] == []
+
+
+class TestFormatProjectsWithSources:
+    """Test suite for SourceLinkingService.format_projects_with_sources"""
+
+    def test_sources_for_all_projects_are_fetched_in_one_query(self):
+        client = MagicMock()
+        query = client.table.return_value.select.return_value.in_
+        query.return_value.execute.return_value.data = [
+            {"project_id": "p1", "source_id": "s1", "notes": "technical"},
+            {"project_id": "p2", "source_id": "s2", "notes": "business"},
+            {"project_id": "p1", "source_id": "s3", "notes": "business"},
+        ]
+
+        formatted = SourceLinkingService(client).format_projects_with_sources([
+            make_project("p1"),
+            make_project("p2"),
+            make_project("p3"),
+        ])
+
+        query.assert_called_once_with("project_id", ["p1", "p2", "p3"])
+        assert formatted[0]["technical_sources"] == ["s1"]
+        assert formatted[0]["business_sources"] == ["s3"]
+        assert formatted[1]["business_sources"] == ["s2"]
+        assert formatted[2]["technical_sources"] == []
+        assert "docs" not in formatted[0]
+
+    def test_failed_source_lookup_still_formats_projects(self):
+        client = MagicMock()
+        client.table.return_value.select.return_value.in_.side_effect = RuntimeError("db down")
+
+        formatted = SourceLinkingService(client).format_projects_with_sources([
+            make_project("p1", docs=[])
+        ])
+
+        assert formatted[0]["technical_sources"] == []
+        assert formatted[0]["docs"] == []
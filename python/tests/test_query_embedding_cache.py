@@ -0,0 +1,102 @@
+"""
+Tests for the query embedding cache (TTL/LRU, single-flight and micro-batching).
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.server.services.embeddings.embedding_exceptions import EmbeddingAPIError
+from src.server.services.embeddings.embedding_service import EmbeddingBatchResult
+from src.server.services.embeddings.query_embedding_cache import QueryEmbeddingCache
+
+SERVICE = "src.server.services.embeddings.embedding_service"
+
+
+def key(query: str) -> tuple[str, str, str, str]:
+    return ("openai", "text-embedding-3-small", "1536", query)
+
+
+def make_batch(fail: set[str] = frozenset()) -> AsyncMock:
+    """create_embeddings_batch fake embedding each text as [len(text)], except texts in fail."""
+
+    async def create(texts, provider=None):
+        await asyncio.sleep(0)
+        result = EmbeddingBatchResult()
+        for text in texts:
+            if text in fail:
+                result.add_failure(text, RuntimeError("boom"))
+            else:
+                result.add_success([float(len(text))], text)
+        return result
+
+    return AsyncMock(side_effect=create)
+
+
+class TestQueryEmbeddingCache:
+    """Test suite for QueryEmbeddingCache"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_one_batched_request(self):
+        cache = QueryEmbeddingCache()
+        batch = make_batch()
+
+        with patch(f"{SERVICE}.create_embeddings_batch", batch):
+            results = await asyncio.gather(
+                cache.get_embedding(key("a")),
+                cache.get_embedding(key("bb")),
+                cache.get_embedding(key("a")),
+            )
+            again = await cache.get_embedding(key("bb"))
+
+        assert results == [[1.0], [2.0], [1.0]]
+        assert again == [2.0]
+        batch.assert_awaited_once()
+        assert batch.await_args.args[0] == ["a", "bb"]
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 2, 1)
+
+    @pytest.mark.asyncio
+    async def test_full_batches_flush_without_waiting_for_the_window(self):
+        cache = QueryEmbeddingCache(batch_window_seconds=60, max_batch_size=2)
+        batch = make_batch()
+
+        with patch(f"{SERVICE}.create_embeddings_batch", batch):
+            results = await asyncio.wait_for(
+                asyncio.gather(cache.get_embedding(key("a")), cache.get_embedding(key("bb"))),
+                timeout=1,
+            )
+
+        assert results == [[1.0], [2.0]]
+        batch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_embedded_again(self):
+        cache = QueryEmbeddingCache(ttl_seconds=0)
+        batch = make_batch()
+
+        with patch(f"{SERVICE}.create_embeddings_batch", batch):
+            await cache.get_embedding(key("a"))
+            await cache.get_embedding(key("a"))
+
+        assert batch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_raise_typed_errors_and_are_not_cached(self):
+        cache = QueryEmbeddingCache()
+        error = EmbeddingAPIError("Failed to create embedding: boom")
+
+        with (
+            patch(f"{SERVICE}.create_embeddings_batch", make_batch(fail={"bad"})),
+            patch(f"{SERVICE}.create_embedding", AsyncMock(side_effect=error)),
+        ):
+            good, bad = await asyncio.gather(
+                cache.get_embedding(key("good")),
+                cache.get_embedding(key("bad")),
+                return_exceptions=True,
+            )
+
+        assert good == [4.0]
+        assert bad is error
+        assert cache.get_stats()["memory_entries"] == 1
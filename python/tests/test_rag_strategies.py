@@ -145,6 +145,46 @@ class TestRAGService:
         assert result[0]["content"] == "Reranked content"
 
 
+class TestBaseSearchStrategy:
+    """Test base vector search strategy implementation"""
+
+    @pytest.fixture
+    def mock_supabase_client(self):
+        """Mock Supabase client"""
+        client = MagicMock()
+        client.rpc.return_value.execute.return_value.data = []
+        return client
+
+    @pytest.fixture
+    def base_strategy(self, mock_supabase_client):
+        """Create BaseSearchStrategy instance"""
+        from src.server.services.search.base_search_strategy import BaseSearchStrategy
+
+        return BaseSearchStrategy(mock_supabase_client)
+
+    @pytest.mark.asyncio
+    async def test_vector_search_passes_index_knobs(self, base_strategy, mock_supabase_client):
+        """Test configured ef_search/probes are sent, with ef_search raised to match_count"""
+        with patch.dict(
+            "os.environ", {"VECTOR_SEARCH_EF_SEARCH": "40", "VECTOR_SEARCH_PROBES": "10"}
+        ):
+            await base_strategy.vector_search(query_embedding=[0.1] * 1536, match_count=60)
+
+        rpc_params = mock_supabase_client.rpc.call_args.args[1]
+        assert rpc_params["ef_search"] == 60
+        assert rpc_params["probes"] == 10
+
+    @pytest.mark.asyncio
+    async def test_vector_search_omits_unset_knobs(self, base_strategy, mock_supabase_client):
+        """Test knobs are not sent when unconfigured so older RPC signatures still work"""
+        with patch.dict("os.environ", {"VECTOR_SEARCH_EF_SEARCH": "", "VECTOR_SEARCH_PROBES": ""}):
+            await base_strategy.vector_search(query_embedding=[0.1] * 1536, match_count=5)
+
+        rpc_params = mock_supabase_client.rpc.call_args.args[1]
+        assert "ef_search" not in rpc_params
+        assert "probes" not in rpc_params
+
+
 class TestHybridSearchStrategy:
     """Test hybrid search strategy implementation"""
 
@@ -204,6 +244,120 @@ class TestHybridSearchStrategy:
         if merged:
             assert any("Vector result" in str(r) or "Keyword result" in str(r) for r in merged)
 
+    def test_merge_search_results_rrf(self, hybrid_strategy):
+        """Test reciprocal-rank fusion rewards results ranked by both legs"""
+
+        def result(result_id, similarity=0.5):
+            return {
+                "id": result_id,
+                "content": f"content {result_id}",
+                "url": f"url{result_id}",
+                "chunk_number": 0,
+                "metadata": {},
+                "source_id": "source1",
+                "similarity": similarity,
+            }
+
+        vector_results = [result("a", 0.9), result("b", 0.8), result("c", 0.7)]
+        keyword_results = [result("c"), result("d")]
+
+        merged = hybrid_strategy._merge_search_results(
+            vector_results, keyword_results, match_count=3, fusion_mode="rrf", rrf_k=60
+        )
+
+        assert [r["id"] for r in merged] == ["c", "a", "b"]
+        assert merged[0]["match_type"] == "hybrid"
+        assert merged[0]["rrf_score"] == pytest.approx(1 / 63 + 1 / 61)
+
+        # Weighting the keyword leg lets a keyword-only match outrank vector-only ones
+        merged = hybrid_strategy._merge_search_results(
+            vector_results,
+            keyword_results,
+            match_count=4,
+            fusion_mode="rrf",
+            vector_weight=0.5,
+            keyword_weight=2.0,
+        )
+        assert [r["id"] for r in merged][:2] == ["c", "d"]
+        assert merged[1]["match_type"] == "keyword"
+
+    @pytest.mark.asyncio
+    async def test_hybrid_legs_run_concurrently(self, hybrid_strategy):
+        """Test the vector and keyword legs overlap instead of running back to back"""
+        running = 0
+        max_running = 0
+
+        async def leg(*args, **kwargs):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return []
+
+        with (
+            patch.object(hybrid_strategy.base_strategy, "vector_search", side_effect=leg),
+            patch.object(hybrid_strategy, "keyword_search", side_effect=leg),
+        ):
+            await hybrid_strategy.search_documents_hybrid(
+                query="retry policy", query_embedding=[0.1] * 1536, match_count=5
+            )
+
+        assert max_running == 2
+
+    @pytest.mark.asyncio
+    async def test_keyword_search_uses_single_ranked_rpc(
+        self, hybrid_strategy, mock_supabase_client
+    ):
+        """Test keyword search on archon tables is one full-text RPC round trip"""
+        mock_supabase_client.rpc.return_value.execute.return_value.data = [
+            {
+                "id": 7,
+                "url": "url7",
+                "chunk_number": 0,
+                "content": "Configure the retry policy for the client",
+                "metadata": {},
+                "source_id": "source1",
+                "rank": 0.4,
+            }
+        ]
+
+        results = await hybrid_strategy.keyword_search(
+            query="retry policy",
+            match_count=10,
+            table_name="archon_crawled_pages",
+            filter_metadata={"source": "source1"},
+        )
+
+        mock_supabase_client.rpc.assert_called_once()
+        rpc_name, rpc_params = mock_supabase_client.rpc.call_args.args
+        assert rpc_name == "match_archon_crawled_pages_keyword"
+        assert rpc_params["source_filter"] == "source1"
+        assert rpc_params["match_count"] == 10
+        assert "filter" not in rpc_params
+        mock_supabase_client.from_.assert_not_called()
+
+        assert results[0]["id"] == 7
+        assert results[0]["keyword_match_score"] == 2
+
+    @pytest.mark.asyncio
+    async def test_keyword_search_falls_back_to_ilike(self, hybrid_strategy, mock_supabase_client):
+        """Test keyword search still works when the keyword RPC is not installed"""
+        mock_supabase_client.rpc.side_effect = Exception("function does not exist")
+        query_builder = MagicMock()
+        query_builder.ilike.return_value = query_builder
+        query_builder.limit.return_value.execute.return_value.data = [
+            {"id": 1, "content": "retry policy docs"}
+        ]
+        mock_supabase_client.from_.return_value.select.return_value = query_builder
+
+        results = await hybrid_strategy.keyword_search(
+            query="retry policy", match_count=5, table_name="archon_crawled_pages"
+        )
+
+        assert [r["id"] for r in results] == [1]
+        assert results[0]["keyword_match_score"] == 2
+
 
 class TestRerankingStrategy:
     """Test reranking strategy implementation"""
@@ -497,6 +651,32 @@ class TestRAGConfiguration:
             assert rag_service.get_bool_setting("NONEXISTENT_SETTING", True) is True
             assert rag_service.get_bool_setting("NONEXISTENT_SETTING", False) is False
 
+    def test_strategies_share_the_credential_cache_settings(self, rag_service):
+        """Test every strategy reads settings, including encrypted ones, the same way"""
+        from src.server.services.credential_service import credential_service
+
+        with (
+            patch.object(credential_service, "_cache_initialized", True),
+            patch.object(
+                credential_service,
+                "_cache",
+                {
+                    "HYBRID_RRF_K": {"is_encrypted": True, "encrypted_value": "secret"},
+                    "VECTOR_SEARCH_PROBES": "7",
+                },
+            ),
+            patch.object(credential_service, "_decrypt_value", return_value="30"),
+            patch.dict("os.environ", {"HYBRID_FUSION_MODE": "rrf"}),
+        ):
+            fusion = rag_service.hybrid_strategy._get_fusion_settings()
+            probes = rag_service.base_strategy._get_index_setting("VECTOR_SEARCH_PROBES")
+            rrf_k = rag_service.get_setting("HYBRID_RRF_K")
+
+        assert fusion["fusion_mode"] == "rrf"
+        assert fusion["rrf_k"] == 30
+        assert probes == 7
+        assert rrf_k == "30"
+
     @pytest.mark.asyncio
     async def test_strategy_conditional_execution(self, rag_service):
         """Test that strategies only execute when enabled"""
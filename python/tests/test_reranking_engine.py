@@ -0,0 +1,82 @@
+"""
+Tests for the micro-batched, thread-offloaded reranking engine.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.server.services.search.reranking_engine import RerankingEngine, clip_to_tokens
+
+
+class FakeCrossEncoder:
+    """Scores each pair by document length and records the calling thread."""
+
+    def __init__(self):
+        self.calls: list[list[list[str]]] = []
+        self.threads: list[str] = []
+
+    def predict(self, pairs):
+        self.calls.append(pairs)
+        self.threads.append(threading.current_thread().name)
+        return [float(len(document)) for _, document in pairs]
+
+
+class TestRerankingEngine:
+    """Test suite for RerankingEngine"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_one_predict_call_off_the_loop(self):
+        model = FakeCrossEncoder()
+        engine = RerankingEngine(model)
+
+        first, second = await asyncio.gather(
+            engine.score("q1", ["a", "bbb"]),
+            engine.score("q2", ["cc"]),
+        )
+
+        assert first == [1.0, 3.0]
+        assert second == [2.0]
+        assert model.calls == [[["q1", "a"], ["q1", "bbb"], ["q2", "cc"]]]
+        assert model.threads[0] != threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_cached_scores_skip_inference(self):
+        model = FakeCrossEncoder()
+        engine = RerankingEngine(model)
+
+        await engine.score("q", ["a", "bb"])
+        again = await engine.score("q", ["bb", "a", "ccc"])
+
+        assert again == [2.0, 1.0, 3.0]
+        assert model.calls[1] == [["q", "ccc"]]
+        assert engine.get_stats()["cache_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_model_errors_reach_every_waiting_request(self):
+        class BrokenModel:
+            def predict(self, pairs):
+                raise RuntimeError("inference failed")
+
+        engine = RerankingEngine(BrokenModel())
+
+        results = await asyncio.gather(
+            engine.score("q1", ["a"]), engine.score("q2", ["b"]), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert engine.get_stats()["cache_entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_long_documents_are_clipped_to_the_pair_budget(self):
+        model = FakeCrossEncoder()
+        engine = RerankingEngine(model, max_pair_tokens=13)
+
+        await engine.score("query", ["word " * 100])
+
+        # 13 tokens minus ~1 for the query leaves 9 words at ~1.3 tokens per word
+        assert model.calls[0][0][1] == " ".join(["word"] * 9)
+
+    def test_clip_to_tokens_keeps_short_text_unchanged(self):
+        assert clip_to_tokens("  short text \n", 100) == "  short text \n"
@@ -0,0 +1,124 @@
+"""
+Tests for source record creation and background source summaries during ingestion.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.crawling.document_storage_operations import DocumentStorageOperations
+from src.server.services.source_management_service import upsert_source_records
+
+OPS_MODULE = "src.server.services.crawling.document_storage_operations"
+SOURCES_MODULE = "src.server.services.source_management_service"
+
+
+def make_chunks(*source_ids: str) -> tuple[list[dict], list[str]]:
+    metadatas = [{"source_id": source_id, "word_count": 10} for source_id in source_ids]
+    contents = [f"Documentation for {source_id} " * 20 for source_id in source_ids]
+    return metadatas, contents
+
+
+def make_client(*existing_rows: dict) -> tuple[MagicMock, list, object]:
+    """Client whose SELECT returns existing_rows and whose upserts echo (and record) rows."""
+    client = MagicMock()
+    upserted = []
+
+    def upsert(records, on_conflict=None):
+        upserted.append(records)
+        query = MagicMock()
+        query.data = records
+        return query
+
+    client.table.return_value.upsert.side_effect = upsert
+    client.table.return_value.select.return_value.in_.return_value = MagicMock(
+        data=list(existing_rows)
+    )
+
+    async def execute(query):
+        return MagicMock(data=query.data)
+
+    return client, upserted, execute
+
+
+class TestCreateSourceRecords:
+    """Test suite for DocumentStorageOperations._create_source_records"""
+
+    @pytest.mark.asyncio
+    async def test_records_are_stored_before_summaries_finish(self):
+        client, upserted, execute = make_client(
+            {"source_id": "old.example.com", "title": "Old Docs", "summary": "Old summary"}
+        )
+        ops = DocumentStorageOperations(client)
+        release = asyncio.Event()
+
+        async def slow_summary(source_id, content):
+            await release.wait()
+            return f"Summary of {source_id}"
+
+        metadatas, contents = make_chunks("new.example.com", "old.example.com")
+        with (
+            patch(f"{OPS_MODULE}.execute_async", side_effect=execute),
+            patch(f"{SOURCES_MODULE}.execute_async", side_effect=execute),
+            patch(f"{OPS_MODULE}.extract_source_summary_async", side_effect=slow_summary),
+            patch(
+                f"{OPS_MODULE}.generate_source_title_async",
+                AsyncMock(return_value="New Docs"),
+            ) as generate_title,
+        ):
+            await ops._create_source_records(metadatas, contents, {}, {"tags": ["a"]})
+
+            # One upsert for every source, with placeholders and the preserved title
+            assert len(upserted) == 1
+            placeholders = {row["source_id"]: row for row in upserted[0]}
+            assert placeholders["old.example.com"]["title"] == "Old Docs"
+            assert placeholders["old.example.com"]["summary"] == "Old summary"
+            assert placeholders["new.example.com"]["title"] == "new.example.com"
+
+            release.set()
+            await ops.wait_for_source_summaries()
+
+        assert len(upserted) == 2
+        final = {row["source_id"]: row for row in upserted[1]}
+        assert final["new.example.com"]["title"] == "New Docs"
+        assert final["old.example.com"]["title"] == "Old Docs"
+        assert final["old.example.com"]["summary"] == "Summary of old.example.com"
+        generate_title.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_summaries_leave_placeholders(self):
+        client, upserted, execute = make_client()
+        ops = DocumentStorageOperations(client)
+        never = asyncio.Event()
+
+        async def blocked_summary(source_id, content):
+            await never.wait()
+
+        metadatas, contents = make_chunks("new.example.com")
+        with (
+            patch(f"{OPS_MODULE}.execute_async", side_effect=execute),
+            patch(f"{SOURCES_MODULE}.execute_async", side_effect=execute),
+            patch(f"{OPS_MODULE}.extract_source_summary_async", side_effect=blocked_summary),
+        ):
+            await ops._create_source_records(metadatas, contents, {}, {})
+            ops.cancel_source_summaries()
+            await ops.wait_for_source_summaries()
+            await asyncio.sleep(0)
+
+        assert len(upserted) == 1
+
+
+class TestUpsertSourceRecords:
+    """Test suite for upsert_source_records"""
+
+    @pytest.mark.asyncio
+    async def test_missing_source_in_response_fails_verification(self):
+        with patch(
+            f"{SOURCES_MODULE}.execute_async",
+            AsyncMock(return_value=MagicMock(data=[{"source_id": "a"}])),
+        ):
+            with pytest.raises(Exception, match="verification failed"):
+                await upsert_source_records(
+                    MagicMock(), [{"source_id": "a"}, {"source_id": "b"}]
+                )
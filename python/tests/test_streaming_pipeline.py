@@ -0,0 +1,112 @@
+"""
+Tests for the bounded-queue crawl-to-storage streaming pipeline.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.server.services.crawling.document_storage_operations import DocumentStorageOperations
+from src.server.services.crawling.streaming_pipeline import StreamingCrawlPipeline
+
+PIPELINE_MODULE = "src.server.services.crawling.streaming_pipeline"
+
+
+def make_doc_storage_ops() -> DocumentStorageOperations:
+    ops = DocumentStorageOperations(MagicMock())
+    ops._create_source_records = AsyncMock()
+    ops.extract_and_store_code_examples = AsyncMock(return_value=1)
+    return ops
+
+
+def make_page(index: int) -> dict:
+    return {"url": f"https://docs.example.com/page{index}", "markdown": f"Page {index} body text"}
+
+
+class TestStreamingCrawlPipeline:
+    """Test suite for StreamingCrawlPipeline"""
+
+    @pytest.mark.asyncio
+    async def test_pages_are_stored_in_batches_as_they_arrive(self):
+        ops = make_doc_storage_ops()
+        pipeline = StreamingCrawlPipeline(
+            ops, {"knowledge_type": "technical"}, "webpage", "docs.example.com", batch_chunks=2
+        )
+
+        with patch(f"{PIPELINE_MODULE}.add_documents_to_supabase", new=AsyncMock()) as mock_add:
+            pipeline.start()
+            for i in range(5):
+                await pipeline.submit(make_page(i))
+            stats = await pipeline.finish()
+
+        # Each page is one chunk: batches of 2, 2 and 1 pages
+        assert [len(c.kwargs["urls"]) for c in mock_add.call_args_list] == [2, 2, 1]
+        ops._create_source_records.assert_awaited_once()
+        assert stats["pages_stored"] == 5
+        assert stats["chunk_count"] == 5
+        assert stats["code_examples_count"] == 3
+
+        # Final word count is written once everything is stored
+        ops.supabase_client.table.return_value.update.assert_called_once_with(
+            {"total_word_count": stats["total_word_count"]}
+        )
+
+    @pytest.mark.asyncio
+    async def test_slow_writer_applies_backpressure_to_crawler(self):
+        ops = make_doc_storage_ops()
+        pipeline = StreamingCrawlPipeline(
+            ops, {"extract_code_examples": False}, "webpage", "src", queue_size=2, batch_chunks=1
+        )
+        release_writer = asyncio.Event()
+
+        async def blocked_add(**kwargs):
+            await release_writer.wait()
+
+        with patch(f"{PIPELINE_MODULE}.add_documents_to_supabase", side_effect=blocked_add):
+            pipeline.start()
+
+            async def crawl():
+                for i in range(20):
+                    await pipeline.submit(make_page(i))
+
+            crawler = asyncio.create_task(crawl())
+            await asyncio.sleep(0.05)
+
+            # Writer holds 1 batch, 1 batch is queued, the chunker holds 1 page, 2 pages queued
+            assert not crawler.done()
+            assert pipeline.pages_received <= 5
+
+            release_writer.set()
+            await crawler
+            stats = await pipeline.finish()
+
+        assert stats["pages_stored"] == 20
+
+    @pytest.mark.asyncio
+    async def test_writer_failure_stops_the_crawl(self):
+        ops = make_doc_storage_ops()
+        pipeline = StreamingCrawlPipeline(ops, {}, "webpage", "src", queue_size=1, batch_chunks=1)
+
+        with patch(
+            f"{PIPELINE_MODULE}.add_documents_to_supabase",
+            new=AsyncMock(side_effect=RuntimeError("insert failed")),
+        ):
+            pipeline.start()
+            with pytest.raises(RuntimeError, match="insert failed"):
+                for i in range(50):
+                    await pipeline.submit(make_page(i))
+                    await asyncio.sleep(0)
+
+            with pytest.raises(RuntimeError, match="insert failed"):
+                await pipeline.finish()
+
+    @pytest.mark.asyncio
+    async def test_abort_cancels_stages(self):
+        ops = make_doc_storage_ops()
+        pipeline = StreamingCrawlPipeline(ops, {}, "webpage", "src")
+        pipeline.start()
+
+        await pipeline.abort()
+
+        assert all(task.done() for task in pipeline._tasks)
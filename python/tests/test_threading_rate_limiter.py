@@ -0,0 +1,185 @@
+"""
+Tests for the token-bucket RateLimiter in the threading service.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.server.services.threading_service import (
+    AdaptiveConcurrencyLimiter,
+    RateLimitConfig,
+    RateLimiter,
+    ThreadingService,
+)
+
+
+def make_limiter(tokens_per_minute: int = 6000, requests_per_minute: int = 6000) -> RateLimiter:
+    return RateLimiter(
+        RateLimitConfig(
+            tokens_per_minute=tokens_per_minute,
+            requests_per_minute=requests_per_minute,
+            max_concurrent=10,
+        )
+    )
+
+
+class TestRateLimiter:
+    """Test suite for RateLimiter"""
+
+    @pytest.mark.asyncio
+    async def test_acquire_within_budget_is_immediate(self):
+        limiter = make_limiter()
+
+        start = time.monotonic()
+        assert await limiter.acquire(1000)
+        assert await limiter.acquire(1000)
+        assert time.monotonic() - start < 0.05
+
+        usage = limiter._get_current_usage()
+        assert usage["tokens"] == pytest.approx(2000, abs=5)
+        assert usage["requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_waits_only_for_refill(self):
+        # 6000 tokens/minute refills 100 tokens per second
+        limiter = make_limiter(tokens_per_minute=6000)
+        await limiter.acquire(6000)
+
+        start = time.monotonic()
+        await limiter.acquire(20)
+        elapsed = time.monotonic() - start
+
+        assert 0.15 <= elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_is_clamped(self):
+        limiter = make_limiter(tokens_per_minute=6000)
+
+        start = time.monotonic()
+        assert await limiter.acquire(50_000)
+        assert time.monotonic() - start < 0.05
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_admitted_in_fifo_order(self):
+        limiter = make_limiter(tokens_per_minute=6000)
+        await limiter.acquire(6000)
+
+        order = []
+
+        async def worker(name: str, tokens: int):
+            await limiter.acquire(tokens)
+            order.append(name)
+
+        # "big" queues first; "small" could fit sooner but must not overtake it
+        big = asyncio.create_task(worker("big", 20))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(worker("small", 1))
+        await asyncio.gather(big, small)
+
+        assert order == ["big", "small"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_head_hands_turn_to_next_waiter(self):
+        limiter = make_limiter(tokens_per_minute=6000)
+        await limiter.acquire(6000)
+
+        head = asyncio.create_task(limiter.acquire(6000))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(limiter.acquire(10))
+        await asyncio.sleep(0.01)
+
+        head.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await head
+
+        assert await asyncio.wait_for(follower, timeout=1)
+        assert not limiter._waiters
+
+    @pytest.mark.asyncio
+    async def test_reconcile_refunds_over_estimate(self):
+        limiter = make_limiter(tokens_per_minute=6000)
+        await limiter.acquire(6000)
+
+        waiter = asyncio.create_task(limiter.acquire(3000))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        # The call only used 1000 of its 6000 estimated tokens
+        limiter.reconcile(6000, 1000)
+
+        assert await asyncio.wait_for(waiter, timeout=0.5)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_charges_under_estimate(self):
+        limiter = make_limiter(tokens_per_minute=6000)
+        await limiter.acquire(100)
+
+        limiter.reconcile(100, 600)
+
+        assert limiter._get_current_usage()["tokens"] == pytest.approx(600, abs=5)
+
+
+class TestRateLimitedOperation:
+    """Test suite for ThreadingService.rate_limited_operation"""
+
+    @pytest.mark.asyncio
+    async def test_recorded_usage_is_reconciled(self):
+        service = ThreadingService(rate_limit_config=RateLimitConfig(tokens_per_minute=6000))
+
+        async with service.rate_limited_operation(2000) as usage:
+            usage.record_usage(500)
+
+        assert service.rate_limiter._get_current_usage()["tokens"] == pytest.approx(500, abs=5)
+
+    @pytest.mark.asyncio
+    async def test_unrecorded_usage_keeps_estimate(self):
+        service = ThreadingService(rate_limit_config=RateLimitConfig(tokens_per_minute=6000))
+
+        async with service.rate_limited_operation(2000):
+            pass
+
+        assert service.rate_limiter._get_current_usage()["tokens"] == pytest.approx(2000, abs=5)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test suite for AdaptiveConcurrencyLimiter"""
+
+    def test_healthy_window_grows_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=3)
+
+        for _ in range(2):
+            limiter.record(0.1)
+        assert limiter.limit == 3
+
+        for _ in range(10):
+            limiter.record(0.1)
+        assert limiter.limit == 3
+
+    def test_throttling_halves_and_latency_spike_shrinks(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8)
+
+        limiter.record(0.1, throttled=True)
+        assert limiter.limit == 4
+
+        limiter.record(0.1)
+        limiter.record(0.5)
+        assert limiter.limit == 3
+
+        for _ in range(5):
+            limiter.record(0.1, throttled=True)
+        assert limiter.limit == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_a_free_slot(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await limiter.release()
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter.in_flight == 1
@@ -0,0 +1,48 @@
+"""
+Tests for the vector index maintenance service.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.server.services.knowledge import VectorIndexService
+
+
+class TestVectorIndexService:
+    """Test suite for VectorIndexService"""
+
+    @pytest.mark.asyncio
+    async def test_rebuild_calls_rpc_with_parameters(self):
+        client = MagicMock()
+        client.rpc.return_value.execute.return_value.data = [
+            {"table_name": "archon_crawled_pages", "rebuilt": True, "lists": 2000},
+            {"table_name": "archon_code_examples", "rebuilt": False, "lists": None},
+        ]
+
+        result = await VectorIndexService(client).rebuild_indexes(index_type="ivfflat", min_rows=5000)
+
+        rpc_name, rpc_params = client.rpc.call_args.args
+        assert rpc_name == "rebuild_archon_vector_indexes"
+        assert rpc_params["index_type"] == "ivfflat"
+        assert rpc_params["min_rows"] == 5000
+        assert rpc_params["ivfflat_lists"] is None
+        assert result["index_type"] == "ivfflat"
+        assert len(result["tables"]) == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"index_type": "flat"},
+            {"m": 16, "ef_construction": 16},
+            {"index_type": "ivfflat", "lists": 0},
+        ],
+    )
+    async def test_invalid_parameters_are_rejected(self, kwargs):
+        client = MagicMock()
+
+        with pytest.raises(ValueError):
+            await VectorIndexService(client).rebuild_indexes(**kwargs)
+
+        client.rpc.assert_not_called()